@@ -24,11 +24,19 @@ def create_app(config_name=None):
     # Initialize extensions
     db.init_app(app)
     cache.init_app(app)
-    socketio.init_app(app, cors_allowed_origins="*")
+    socketio.init_app(
+        app,
+        cors_allowed_origins="*",
+        message_queue=app.config.get('SOCKETIO_MESSAGE_QUEUE')
+    )
 
     # Configure logging
     configure_logging(app)
 
+    # orjson-backed JSON provider (stdlib fallback)
+    from app.serialization import init_json_provider
+    init_json_provider(app)
+
     # Register blueprints
     from app.routes import main as main_blueprint
     app.register_blueprint(main_blueprint)
@@ -36,6 +44,24 @@ def create_app(config_name=None):
     # Register error handlers
     register_error_handlers(app)
 
+    # Per-class concurrency limits and load shedding
+    from app.governor import register_governor
+    register_governor(app)
+
+    # ETag conditional GETs and response compression
+    from app.middleware import register_response_middleware
+    register_response_middleware(app)
+
+    # Resolve events that outlived their TTL
+    if app.config['EVENT_EXPIRY_ENABLED']:
+        from app.event_index import start_expiry_scheduler
+        start_expiry_scheduler(app)
+
+    # Open congestion events from anomalous traffic readings (loads NumPy)
+    if app.config['ANOMALY_ENABLED']:
+        from app.anomaly import start_anomaly_scheduler
+        start_anomaly_scheduler(app)
+
     return app
 
 
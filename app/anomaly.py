@@ -0,0 +1,421 @@
+"""
+Streaming anomaly detection over incoming traffic readings.
+
+Every road keeps a robust baseline per time-of-day slot (``ANOMALY_SLOT_MINUTES``
+wide): the median and the MAD (median absolute deviation, scaled to a standard
+deviation) of speed and volume over the last ``ANOMALY_HISTORY_DAYS`` of
+readings. Baselines are plain ``(roads, slots)`` arrays refitted from
+``TrafficData`` every ``ANOMALY_BASELINE_REFRESH`` seconds, so scoring a new
+reading is two array lookups: a speed drop scores ``(median - speed) / spread``
+and a volume spike ``(volume - median) / spread``.
+
+Every ``ANOMALY_INTERVAL`` seconds a background tick (started by
+:func:`start_anomaly_scheduler`, in the one worker holding the owner lease)
+fetches the readings of the last ``ANOMALY_LOOKBACK_SECONDS``
+before the newest one seen, drops those already scored and scores the rest for
+all roads at once. Selecting by timestamp rather than id means a reading whose
+transaction commits after higher ids were scored is still picked up. A road fires
+when ``ANOMALY_CONFIRM_READINGS`` consecutive readings score at or above
+``ANOMALY_SPEED_Z`` / ``ANOMALY_VOLUME_Z``; fired roads without an active
+``Congestion`` event get one, created in a single batch through
+:func:`~app.services.create_events_batch`.
+"""
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+
+import numpy as np
+from flask import current_app
+from sqlalchemy import Float, cast, select
+
+from . import db
+from .event_index import get_active_index, hold_lease
+from .models import TrafficData
+from .partitions import epoch_seconds
+from .road_registry import get_road_registry
+from .services import create_events_batch
+
+# Scales the MAD to a standard deviation for normally distributed data.
+MAD_SCALE = 1.4826
+# Spreads never drop below this share of the median (or 1 unit), so quiet
+# slots with near-identical readings do not flag every small wobble.
+MIN_RELATIVE_SPREAD = 0.05
+# Severity 2-5 by how far the score is past the threshold (x1, x1.5, x2, x3).
+SEVERITY_STEPS = (1.5, 2.0, 3.0)
+# Rows fetched from the cursor per batch when reading history and new readings.
+READ_BATCH_SIZE = 10000
+
+_METRICS = ('speed', 'volume')
+
+# Cache key naming the worker that runs anomaly detection.
+ANOMALY_OWNER_KEY = 'anomaly_owner'
+
+
+def _group_median(keys: np.ndarray, values: np.ndarray, groups: int):
+    """Median of ``values`` per key in ``[0, groups)`` and the group sizes."""
+    order = np.lexsort((values, keys))
+    ordered = values[order]
+    counts = np.bincount(keys, minlength=groups)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    present = counts > 0
+    low = (starts + (counts - 1) // 2)[present]
+    high = (starts + counts // 2)[present]
+    median = np.full(groups, np.nan)
+    median[present] = (ordered[low] + ordered[high]) / 2
+    return median, counts
+
+
+def _read_table(query, columns: int, batch_size: int = READ_BATCH_SIZE) -> np.ndarray:
+    """Stream a query's rows into one float64 array, a batch at a time.
+
+    Missing values come through as NaN.
+    """
+    result = db.session.execute(query.execution_options(yield_per=batch_size))
+    chunks = [np.array(rows, dtype=np.float64) for rows in result.partitions()]
+    if not chunks:
+        return np.zeros((0, columns))
+    return np.concatenate(chunks)
+
+
+class AnomalyDetector:
+    """Time-of-day median/MAD baselines and anomaly streaks for every road, as arrays."""
+
+    def __init__(self, slot_minutes: int = 15, speed_z: float = 3.5, volume_z: float = 3.5,
+                 min_samples: int = 8, confirm: int = 2, lookback_seconds: int = 300):
+        self.slot_seconds = slot_minutes * 60
+        self.slots = 24 * 3600 // self.slot_seconds
+        self.thresholds = {'speed': speed_z, 'volume': volume_z}
+        self.min_samples = min_samples
+        self.confirm = confirm
+        self.lookback = lookback_seconds
+        self.rows: Dict[int, int] = {}
+        self.road_ids = np.zeros(0, dtype=np.int64)
+        # Newest reading timestamp seen, and the readings scored within the lookback.
+        self.watermark = int(time.time())
+        self._seen_ids = np.zeros(0, dtype=np.int64)
+        self._seen_epochs = np.zeros(0, dtype=np.int64)
+        self.fitted_at = 0.0
+        self.lock = threading.Lock()
+        self._medians = {metric: np.zeros((0, self.slots)) for metric in _METRICS}
+        self._spreads = {metric: np.zeros((0, self.slots)) for metric in _METRICS}
+        self._streaks = np.zeros(0, dtype=np.int64)
+        self.scored = 0
+        self.anomalous = 0
+        self.fired = 0
+        self.events_created = 0
+
+    def slot_of(self, epochs: np.ndarray) -> np.ndarray:
+        """Time-of-day slot index for Unix timestamps (UTC)."""
+        return (epochs.astype(np.int64) % 86400) // self.slot_seconds
+
+    def _ensure_rows(self, road_ids) -> None:
+        new = [road_id for road_id in road_ids if road_id not in self.rows]
+        if not new:
+            return
+        for road_id in new:
+            self.rows[road_id] = len(self.rows)
+        grow = len(new)
+        for metric in _METRICS:
+            self._medians[metric] = np.vstack([self._medians[metric], np.full((grow, self.slots), np.nan)])
+            self._spreads[metric] = np.vstack([self._spreads[metric], np.full((grow, self.slots), np.nan)])
+        self.road_ids = np.concatenate([self.road_ids, np.array(new, dtype=np.int64)])
+        self._streaks = np.concatenate([self._streaks, np.zeros(grow, dtype=np.int64)])
+
+    def _row_indexes(self, road_ids: np.ndarray) -> np.ndarray:
+        return np.fromiter((self.rows[road_id] for road_id in road_ids), dtype=np.int64, count=len(road_ids))
+
+    # ------------------------------------------------------------------
+    # Baselines
+    # ------------------------------------------------------------------
+
+    def fit(self, road_ids: np.ndarray, epochs: np.ndarray, values: Dict[str, np.ndarray]) -> None:
+        """Replace every baseline with the median/MAD of a history batch.
+
+        Missing values are NaN. Cells with fewer than ``min_samples`` readings
+        stay NaN and never score.
+        """
+        self._ensure_rows(np.unique(road_ids).tolist())
+        cells = len(self.rows) * self.slots
+        keys = self._row_indexes(road_ids) * self.slots + self.slot_of(epochs)
+        for metric in _METRICS:
+            known = ~np.isnan(values[metric])
+            metric_keys, metric_values = keys[known], values[metric][known]
+            median, counts = _group_median(metric_keys, metric_values, cells)
+            mad, _ = _group_median(metric_keys, np.abs(metric_values - median[metric_keys]), cells)
+            spread = np.maximum(MAD_SCALE * mad, np.maximum(MIN_RELATIVE_SPREAD * np.abs(median), 1.0))
+            sparse = counts < self.min_samples
+            median[sparse] = np.nan
+            spread[sparse] = np.nan
+            self._medians[metric] = median.reshape(len(self.rows), self.slots)
+            self._spreads[metric] = spread.reshape(len(self.rows), self.slots)
+
+    def fit_history(self, history_days: int) -> int:
+        """Fit baselines on the last ``history_days`` of readings; returns how many.
+
+        The history is read outside the lock, in batches straight into arrays.
+        """
+        since = datetime.now(timezone.utc) - timedelta(days=history_days)
+        dialect = db.session.get_bind().dialect.name
+        table = _read_table(
+            select(
+                TrafficData.road_id,
+                epoch_seconds(TrafficData.timestamp, dialect),
+                cast(TrafficData.speed, Float),
+                cast(TrafficData.volume, Float),
+            ).where(TrafficData.timestamp >= since),
+            columns=4,
+        )
+        with self.lock:
+            self._ensure_rows(road.id for road in get_road_registry().ordered)
+            if len(table):
+                self.fit(table[:, 0].astype(np.int64), table[:, 1],
+                         {'speed': table[:, 2], 'volume': table[:, 3]})
+        return len(table)
+
+    # ------------------------------------------------------------------
+    # Scoring
+    # ------------------------------------------------------------------
+
+    def score(self, rows: np.ndarray, slots: np.ndarray, values: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Robust z-scores of readings against their cell; NaN where there is no baseline.
+
+        Positive scores point in the alarming direction: slower than usual for
+        speed, busier than usual for volume.
+        """
+        scores = {}
+        for metric, sign in (('speed', -1.0), ('volume', 1.0)):
+            median = self._medians[metric][rows, slots]
+            scores[metric] = sign * (values[metric] - median) / self._spreads[metric][rows, slots]
+        return scores
+
+    def process(self, road_ids: np.ndarray, epochs: np.ndarray, values: Dict[str, np.ndarray]) -> List[Dict]:
+        """Score a batch of new readings for every road at once.
+
+        The batch must be ordered by timestamp. Returns one anomaly per road
+        whose streak of anomalous readings reached ``confirm`` in this batch,
+        described by that road's newest reading.
+        """
+        if len(road_ids) == 0:
+            return []
+        self._ensure_rows(np.unique(road_ids).tolist())
+        rows = self._row_indexes(road_ids)
+        slots = self.slot_of(epochs)
+        scores = self.score(rows, slots, values)
+        with np.errstate(invalid='ignore'):
+            flags = {metric: scores[metric] >= self.thresholds[metric] for metric in _METRICS}
+        anomalous = flags['speed'] | flags['volume']
+
+        # Streaks: readings since each road's last normal one, or the carried streak plus all.
+        roads = len(self.rows)
+        order = np.argsort(rows, kind='stable')
+        per_road = np.bincount(rows, minlength=roads)
+        group_start = np.concatenate([[0], np.cumsum(per_road)[:-1]])
+        position = np.empty(len(rows), dtype=np.int64)
+        position[order] = np.arange(len(rows)) - group_start[rows[order]]
+        last_normal = np.full(roads, -1, dtype=np.int64)
+        np.maximum.at(last_normal, rows, np.where(anomalous, -1, position))
+        newest = np.full(roads, -1, dtype=np.int64)
+        np.maximum.at(newest, rows, np.arange(len(rows)))
+
+        streaks = np.where(last_normal >= 0, per_road - 1 - last_normal, self._streaks + per_road)
+        seen = per_road > 0
+        fired = np.flatnonzero(seen & (self._streaks < self.confirm) & (streaks >= self.confirm))
+        self._streaks[seen] = streaks[seen]
+
+        self.scored += len(rows)
+        self.anomalous += int(anomalous.sum())
+        self.fired += len(fired)
+
+        anomalies = []
+        for row in fired.tolist():
+            index = newest[row]
+            slot = slots[index]
+            anomaly = {'road_id': int(self.road_ids[row]), 'timestamp': float(epochs[index])}
+            for metric in _METRICS:
+                observed = values[metric][index]
+                anomaly[metric] = {
+                    'observed': None if np.isnan(observed) else float(observed),
+                    'typical': float(self._medians[metric][row, slot]),
+                    'score': None if np.isnan(scores[metric][index]) else float(scores[metric][index]),
+                    'flagged': bool(flags[metric][index]),
+                }
+            anomalies.append(anomaly)
+        return anomalies
+
+    def poll(self) -> List[Dict]:
+        """Process the readings within the lookback that have not been scored yet.
+
+        Readings older than ``lookback`` seconds before the newest one seen
+        when they commit are never scored.
+        """
+        since = datetime.fromtimestamp(self.watermark - self.lookback, timezone.utc)
+        dialect = db.session.get_bind().dialect.name
+        table = _read_table(
+            select(
+                TrafficData.id,
+                TrafficData.road_id,
+                epoch_seconds(TrafficData.timestamp, dialect),
+                cast(TrafficData.speed, Float),
+                cast(TrafficData.volume, Float),
+            ).where(TrafficData.timestamp >= since)
+            .order_by(TrafficData.timestamp.asc(), TrafficData.id.asc()),
+            columns=5,
+        )
+        with self.lock:
+            ids = table[:, 0].astype(np.int64)
+            epochs = table[:, 2].astype(np.int64)
+            fresh = ~np.isin(ids, self._seen_ids)
+            if len(table):
+                self.watermark = max(self.watermark, int(epochs.max()))
+            seen_ids = np.concatenate([self._seen_ids, ids[fresh]])
+            seen_epochs = np.concatenate([self._seen_epochs, epochs[fresh]])
+            # Readings before the next poll's window can never come back.
+            keep = seen_epochs >= self.watermark - self.lookback
+            self._seen_ids, self._seen_epochs = seen_ids[keep], seen_epochs[keep]
+            table = table[fresh]
+            return self.process(
+                table[:, 1].astype(np.int64),
+                table[:, 2],
+                {'speed': table[:, 3], 'volume': table[:, 4]},
+            )
+
+    def severity(self, anomaly: Dict) -> int:
+        """2-5, by the larger score relative to its threshold."""
+        ratio = max(
+            (anomaly[metric]['score'] or 0.0) / self.thresholds[metric] for metric in _METRICS
+        )
+        return 2 + int(np.digitize(ratio, SEVERITY_STEPS))
+
+    def stats(self) -> Dict:
+        return {
+            'enabled': True,
+            'roads': len(self.rows),
+            'baseline_cells': int(np.count_nonzero(~np.isnan(self._medians['speed']))),
+            'watermark': datetime.fromtimestamp(self.watermark, timezone.utc).isoformat(),
+            'readings_scored': self.scored,
+            'anomalous_readings': self.anomalous,
+            'anomalies': self.fired,
+            'events_created': self.events_created,
+        }
+
+
+def get_detector() -> AnomalyDetector:
+    """Process-wide detector for the current app, with baselines refitted when due.
+
+    A new detector starts ``ANOMALY_LOOKBACK_SECONDS`` before the current
+    time, so a worker taking over the owner lease also scores recent readings
+    its predecessor may not have reached; roads that already have an active
+    ``Congestion`` event are skipped either way.
+    """
+    config = current_app.config
+    detector = current_app.extensions.get('anomaly_detector')
+    if detector is None:
+        detector = AnomalyDetector(
+            slot_minutes=config['ANOMALY_SLOT_MINUTES'],
+            speed_z=config['ANOMALY_SPEED_Z'],
+            volume_z=config['ANOMALY_VOLUME_Z'],
+            min_samples=config['ANOMALY_MIN_SAMPLES'],
+            confirm=config['ANOMALY_CONFIRM_READINGS'],
+            lookback_seconds=config['ANOMALY_LOOKBACK_SECONDS'],
+        )
+        detector = current_app.extensions.setdefault('anomaly_detector', detector)
+
+    # Only the scheduler of the lease owner calls this, so refits never overlap.
+    now = time.monotonic()
+    if not detector.fitted_at or now - detector.fitted_at >= config['ANOMALY_BASELINE_REFRESH']:
+        detector.fit_history(config['ANOMALY_HISTORY_DAYS'])
+        detector.fitted_at = now
+    return detector
+
+
+def _describe(anomaly: Dict) -> str:
+    parts = []
+    speed, volume = anomaly['speed'], anomaly['volume']
+    if speed['flagged']:
+        parts.append(f"speed {speed['observed']:.1f} km/h vs typical {speed['typical']:.1f}")
+    if volume['flagged']:
+        parts.append(f"volume {volume['observed']:.0f} vs typical {volume['typical']:.0f}")
+    return 'Detected anomaly: ' + '; '.join(parts)
+
+
+def run_anomaly_tick() -> List[Dict]:
+    """Score new readings and open ``Congestion`` events for fired roads.
+
+    Roads that already have an active ``Congestion`` event are skipped.
+    Returns the created events.
+    """
+    detector = get_detector()
+    anomalies = detector.poll()
+    if not anomalies:
+        return []
+
+    index = get_active_index()
+    records = [
+        {
+            'road_id': anomaly['road_id'],
+            'type': 'Congestion',
+            'description': _describe(anomaly),
+            'timestamp': datetime.fromtimestamp(anomaly['timestamp'], timezone.utc),
+            'severity': detector.severity(anomaly),
+        }
+        for anomaly in anomalies
+        if not any(
+            index.events[event_id][1]['type'] == 'Congestion'
+            for event_id in index.by_road.get(anomaly['road_id'], ())
+        )
+    ]
+    if not records:
+        return []
+    created = create_events_batch(records)
+    detector.events_created += len(created)
+    return created
+
+
+def hold_anomaly_lease(app, token: str) -> bool:
+    """Renew or take the anomaly owner lease for ``token``; False while another worker has it.
+
+    The detector's streaks and scored readings live in the owner's memory, so
+    a worker that takes the lease over (or back) drops its own detector and
+    starts a fresh one.
+    """
+    from . import cache
+
+    renewing = cache.get(ANOMALY_OWNER_KEY) == token
+    if not hold_lease(ANOMALY_OWNER_KEY, token, app.config['ANOMALY_OWNER_TTL']):
+        return False
+    if not renewing:
+        app.extensions.pop('anomaly_detector', None)
+    return True
+
+
+def start_anomaly_scheduler(app) -> None:
+    """Run :func:`run_anomaly_tick` every ``ANOMALY_INTERVAL`` seconds.
+
+    Only the worker holding the owner lease (renewed every tick, expiring
+    after ``ANOMALY_OWNER_TTL`` seconds) scores readings; the others take
+    over when it stops renewing.
+    """
+    from . import socketio
+    from .websocket import broadcast_event
+
+    token = uuid.uuid4().hex
+
+    def run():
+        while True:
+            socketio.sleep(app.config['ANOMALY_INTERVAL'])
+            with app.app_context():
+                try:
+                    if not hold_anomaly_lease(app, token):
+                        continue
+                    created = run_anomaly_tick()
+                    if created:
+                        app.logger.info(f'Opened {len(created)} congestion events from anomalies')
+                        broadcast_event(created, action='created')
+                except Exception as exc:
+                    app.logger.error(f'Anomaly detection failed: {exc}', exc_info=True)
+                finally:
+                    db.session.remove()
+
+    socketio.start_background_task(run)
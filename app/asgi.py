@@ -0,0 +1,217 @@
+"""
+ASGI serving mode.
+
+The hot read-only endpoints are served natively from ``async_services`` on an
+async engine; every other request falls through to the Flask app running in a
+thread pool. Socket.IO runs on python-socketio's ``AsyncServer``. The async
+endpoints answer with the same ETags (data-scope versions for event listings,
+a content hash otherwise), ``304`` responses and compression as their Flask
+counterparts.
+"""
+import re
+from urllib.parse import parse_qs
+
+import socketio
+from asgiref.wsgi import WsgiToAsgi
+from marshmallow import ValidationError
+from werkzeug.http import generate_etag, parse_accept_header, parse_etags, quote_etag
+
+from . import async_services, cache, create_app
+from .middleware import compress_body, scoped_etag
+from .schemas import EventFilterSchema, MapQuerySchema, PaginationSchema
+from .serialization import dumps
+from .validation import load_query
+
+SUMMARY_CACHE_KEY = 'dashboard_summary'
+
+
+class AsyncReadAPI:
+    """ASGI app serving the read-only JSON endpoints, falling back to Flask."""
+
+    def __init__(self, flask_app, engine, fallback):
+        self.flask_app = flask_app
+        self.engine = engine
+        self.fallback = fallback
+        # (pattern, handler, ETag version scopes; None = content-hash ETag)
+        self.routes = [
+            (re.compile(r'^/api/traffic/latest$'), self.latest_traffic, None),
+            (re.compile(r'^/api/events$'), self.events, ('events',)),
+            (re.compile(r'^/api/events/map$'), self.events_map, ('events',)),
+            (re.compile(r'^/api/roads/(?P<road_id>\d+)$'), self.road_snapshot, None),
+            (re.compile(r'^/api/dashboard/summary$'), self.dashboard_summary, None),
+        ]
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http' and scope['method'] == 'GET':
+            for pattern, handler, etag_scopes in self.routes:
+                match = pattern.match(scope['path'])
+                if match:
+                    query_string = scope['query_string'].decode('latin-1')
+                    headers = {
+                        key.decode('latin-1').lower(): value.decode('latin-1')
+                        for key, value in scope['headers']
+                    }
+                    etag = None
+                    if etag_scopes:
+                        # Unchanged polls are answered before any query runs.
+                        with self.flask_app.app_context():
+                            etag = scoped_etag(etag_scopes, f"{scope['path']}?{query_string}")
+                        if parse_etags(headers.get('if-none-match')).contains_weak(etag):
+                            await self._send_not_modified(send, etag)
+                            return
+                    query = parse_qs(query_string)
+                    args = {key: values[-1] for key, values in query.items()}
+                    try:
+                        status, payload = await handler(args, **match.groupdict())
+                    except ValidationError as err:
+                        status, payload = 400, {'error': 'Validation failed', 'details': err.messages}
+                    except Exception as exc:
+                        self.flask_app.logger.error(f'Unhandled exception: {exc}', exc_info=True)
+                        status, payload = 500, {
+                            'error': 'Internal server error',
+                            'message': 'An unexpected error occurred',
+                        }
+                    await self._send_json(send, status, payload, headers, etag)
+                    return
+        await self.fallback(scope, receive, send)
+
+    @staticmethod
+    async def _send_not_modified(send, etag):
+        await send({
+            'type': 'http.response.start',
+            'status': 304,
+            'headers': [(b'etag', quote_etag(etag, weak=True).encode('latin-1'))],
+        })
+        await send({'type': 'http.response.body', 'body': b''})
+
+    async def _send_json(self, send, status, payload, request_headers, etag=None):
+        body = dumps(payload)
+        headers = [(b'content-type', b'application/json')]
+        if status == 200:
+            etag = etag or generate_etag(body)
+            if parse_etags(request_headers.get('if-none-match')).contains_weak(etag):
+                await self._send_not_modified(send, etag)
+                return
+            headers.append((b'etag', quote_etag(etag, weak=True).encode('latin-1')))
+            with self.flask_app.app_context():
+                if len(body) >= self.flask_app.config['COMPRESS_MIN_SIZE']:
+                    headers.append((b'vary', b'Accept-Encoding'))
+                body, encoding = compress_body(
+                    body, 'application/json', parse_accept_header(request_headers.get('accept-encoding'))
+                )
+            if encoding:
+                headers.append((b'content-encoding', encoding.encode('latin-1')))
+        headers.append((b'content-length', str(len(body)).encode('latin-1')))
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': body})
+
+    async def latest_traffic(self, args):
+        params = load_query(PaginationSchema, args)
+        return 200, await async_services.get_latest_traffic(
+            self.engine, params['limit'], params['offset']
+        )
+
+    async def events(self, args):
+        filters = load_query(EventFilterSchema, args)
+        return 200, await async_services.get_events(
+            self.engine,
+            limit=filters.get('limit'),
+            status=filters.get('status'),
+            offset=filters['offset'],
+            severity=filters.get('severity'),
+        )
+
+    async def events_map(self, args):
+        params = load_query(MapQuerySchema, args)
+        return 200, await async_services.get_map_events(self.engine, params['limit'])
+
+    async def road_snapshot(self, args, road_id):
+        snapshot = await async_services.get_road_snapshot(self.engine, int(road_id))
+        if not snapshot:
+            return 404, {'error': 'Road not found.'}
+        return 200, snapshot
+
+    async def dashboard_summary(self, args):
+        # Shares the cache entry written by the sync build_dashboard_summary.
+        with self.flask_app.app_context():
+            summary = cache.get(SUMMARY_CACHE_KEY)
+        if summary is None:
+            summary = await async_services.build_dashboard_summary(self.engine)
+            with self.flask_app.app_context():
+                cache.set(SUMMARY_CACHE_KEY, summary, timeout=60)
+        return 200, summary
+
+
+def register_async_socket_handlers(sio, engine):
+    """Async equivalents of the handlers in ``websocket.py``."""
+
+    @sio.event
+    async def connect(sid, environ):
+        await sio.emit('connected', {'data': 'Connected to traffic system'}, to=sid)
+
+    @sio.event
+    async def subscribe_traffic(sid, data=None):
+        room = 'traffic_updates'
+        await sio.enter_room(sid, room)
+        await sio.emit('subscribed', {'room': room, 'message': 'Subscribed to traffic updates'}, to=sid)
+
+    @sio.event
+    async def unsubscribe_traffic(sid, data=None):
+        room = 'traffic_updates'
+        await sio.leave_room(sid, room)
+        await sio.emit('unsubscribed', {'room': room}, to=sid)
+
+    @sio.event
+    async def subscribe_road(sid, data):
+        road_id = (data or {}).get('road_id')
+        if road_id:
+            room = f'road_{road_id}'
+            await sio.enter_room(sid, room)
+            await sio.emit('subscribed', {'room': room, 'road_id': road_id}, to=sid)
+
+    @sio.event
+    async def unsubscribe_road(sid, data):
+        road_id = (data or {}).get('road_id')
+        if road_id:
+            room = f'road_{road_id}'
+            await sio.leave_room(sid, room)
+            await sio.emit('unsubscribed', {'room': room, 'road_id': road_id}, to=sid)
+
+    @sio.event
+    async def subscribe_events(sid, data=None):
+        room = 'event_updates'
+        await sio.enter_room(sid, room)
+        await sio.emit('subscribed', {'room': room, 'message': 'Subscribed to event updates'}, to=sid)
+
+    @sio.event
+    async def request_traffic_update(sid, data=None):
+        traffic_data = await async_services.get_latest_traffic(engine, limit=10)
+        await sio.emit('traffic_update', {'data': traffic_data}, to=sid)
+
+    @sio.event
+    async def request_events_update(sid, data=None):
+        events = await async_services.get_events(engine, limit=10, status='active')
+        await sio.emit('events_update', {'data': events}, to=sid)
+
+
+def create_asgi_app(config_name=None):
+    """Build the ASGI application (async reads + Flask fallback + Socket.IO)."""
+    flask_app = create_app(config_name)
+    engine = async_services.create_read_engine(
+        flask_app.config['SQLALCHEMY_DATABASE_URI'],
+        pool_size=flask_app.config['ASYNC_DB_POOL_SIZE'],
+    )
+
+    # With a message queue, broadcasts from the Flask side (Flask-SocketIO)
+    # reach clients connected to this server.
+    message_queue = flask_app.config.get('SOCKETIO_MESSAGE_QUEUE')
+    client_manager = socketio.AsyncRedisManager(message_queue) if message_queue else None
+    sio = socketio.AsyncServer(
+        async_mode='asgi',
+        cors_allowed_origins='*',
+        client_manager=client_manager,
+    )
+    register_async_socket_handlers(sio, engine)
+
+    http_app = AsyncReadAPI(flask_app, engine, WsgiToAsgi(flask_app))
+    return socketio.ASGIApp(sio, other_asgi_app=http_app, on_shutdown=engine.dispose)
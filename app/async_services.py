@@ -0,0 +1,229 @@
+"""
+Async read-only service functions for the ASGI serving mode.
+
+These mirror the read endpoints in ``services.py`` (latest traffic, events,
+road snapshot, dashboard summary and map) on an async SQLAlchemy engine and
+return the same payloads, so both serving modes are interchangeable.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from .models import Event, Road, TrafficData
+from .services import (
+    _event_tuple_query,
+    _parse_point_wkt,
+    _serialize_event_tuple,
+    _serialize_traffic_tuple,
+    _to_float,
+    _to_iso,
+    _traffic_tuple_query,
+)
+
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+
+def async_database_uri(uri: str) -> str:
+    """Translate a sync SQLAlchemy URI into its async driver equivalent."""
+    url = make_url(uri)
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver configured for '{url.get_backend_name()}'.")
+    return url.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def create_read_engine(uri: str, pool_size: int = 10) -> AsyncEngine:
+    """Create the async engine used by the read-only endpoints."""
+    async_uri = async_database_uri(uri)
+    if async_uri.startswith("sqlite"):
+        return create_async_engine(async_uri)
+    return create_async_engine(async_uri, pool_size=pool_size, pool_pre_ping=True)
+
+
+async def get_latest_traffic(engine: AsyncEngine, limit: int = 10, offset: int = 0) -> Dict:
+    async with engine.connect() as conn:
+        total = (await conn.execute(select(func.count(TrafficData.id)))).scalar() or 0
+        rows = (
+            await conn.execute(
+                _traffic_tuple_query()
+                .order_by(TrafficData.timestamp.desc())
+                .limit(limit)
+                .offset(offset)
+            )
+        ).all()
+
+    return {
+        "data": [_serialize_traffic_tuple(row) for row in rows],
+        "total": total,
+        "limit": limit,
+        "offset": offset,
+    }
+
+
+async def get_events(
+    engine: AsyncEngine,
+    limit: Optional[int] = None,
+    status: Optional[str] = "active",
+    offset: int = 0,
+    severity: Optional[int] = None,
+) -> Dict:
+    query = _event_tuple_query().order_by(Event.timestamp.desc())
+    count_query = select(func.count(Event.id))
+    if status and status != "all":
+        query = query.where(Event.status == status)
+        count_query = count_query.where(Event.status == status)
+    if severity is not None:
+        query = query.where(Event.severity == severity)
+        count_query = count_query.where(Event.severity == severity)
+    if limit:
+        query = query.limit(limit).offset(offset)
+
+    async with engine.connect() as conn:
+        total = (await conn.execute(count_query)).scalar() or 0
+        rows = (await conn.execute(query)).all()
+
+    return {
+        "data": [_serialize_event_tuple(row) for row in rows],
+        "total": total,
+        "limit": limit or total,
+        "offset": offset,
+    }
+
+
+async def get_road_snapshot(engine: AsyncEngine, road_id: int) -> Optional[Dict]:
+    now = datetime.now(timezone.utc)
+    day_window = now - timedelta(hours=24)
+
+    async with engine.connect() as conn:
+        road = (await conn.execute(select(Road).where(Road.id == road_id))).first()
+        if not road:
+            return None
+
+        latest = (
+            await conn.execute(
+                _traffic_tuple_query()
+                .where(TrafficData.road_id == road_id)
+                .order_by(TrafficData.timestamp.desc())
+                .limit(1)
+            )
+        ).first()
+
+        avg_speed, avg_volume, avg_congestion = (
+            await conn.execute(
+                select(
+                    func.avg(TrafficData.speed),
+                    func.avg(TrafficData.volume),
+                    func.avg(TrafficData.congestion_level),
+                ).where(
+                    TrafficData.road_id == road_id,
+                    TrafficData.timestamp >= day_window,
+                )
+            )
+        ).first()
+
+        event_count = (
+            await conn.execute(
+                select(func.count(Event.id)).where(
+                    Event.road_id == road_id, Event.timestamp >= day_window
+                )
+            )
+        ).scalar() or 0
+
+    return {
+        "road": {
+            "id": road.id,
+            "name": road.name,
+            "code": road.code,
+            "lanes": road.lanes,
+            "length": _to_float(road.length),
+            "speed_limit": road.speed_limit,
+            "start_point": _parse_point_wkt(road.start_point),
+            "end_point": _parse_point_wkt(road.end_point),
+        },
+        "latest": _serialize_traffic_tuple(latest) if latest else None,
+        "averages": {
+            "speed": _to_float(avg_speed),
+            "volume": _to_float(avg_volume),
+            "congestion": _to_float(avg_congestion),
+        },
+        "events_last_24h": int(event_count),
+        "window_start": _to_iso(day_window),
+        "window_end": _to_iso(now),
+    }
+
+
+async def build_dashboard_summary(engine: AsyncEngine, window_hours: int = 1) -> Dict:
+    now = datetime.now(timezone.utc)
+    window_start = now - timedelta(hours=window_hours)
+
+    async with engine.connect() as conn:
+        total_roads = (await conn.execute(select(func.count(Road.id)))).scalar() or 0
+        active_events = (
+            await conn.execute(
+                select(func.count(Event.id)).where(Event.status == "active")
+            )
+        ).scalar() or 0
+        avg_speed, max_volume = (
+            await conn.execute(
+                select(func.avg(TrafficData.speed), func.max(TrafficData.volume))
+                .where(TrafficData.timestamp >= window_start)
+            )
+        ).first()
+        congested = (
+            await conn.execute(
+                select(
+                    Road.name.label("road_name"),
+                    func.avg(TrafficData.congestion_level).label("avg_congestion"),
+                )
+                .join(TrafficData, TrafficData.road_id == Road.id)
+                .where(TrafficData.timestamp >= window_start)
+                .group_by(Road.id)
+                .order_by(func.avg(TrafficData.congestion_level).desc())
+                .limit(5)
+            )
+        ).all()
+
+    return {
+        "generated_at": _to_iso(now),
+        "window_hours": window_hours,
+        "total_roads": total_roads,
+        "active_events": active_events,
+        "avg_speed_last_window": _to_float(avg_speed),
+        "max_volume_last_window": int(max_volume) if max_volume is not None else None,
+        "top_congested_roads": [
+            {"road_name": row.road_name, "avg_congestion": _to_float(row.avg_congestion)}
+            for row in congested
+        ],
+    }
+
+
+async def get_map_events(engine: AsyncEngine, limit: int = 50) -> List[Dict]:
+    async with engine.connect() as conn:
+        rows = (
+            await conn.execute(
+                _event_tuple_query()
+                .where(Event.position.isnot(None))
+                .order_by(Event.timestamp.desc())
+                .limit(limit)
+            )
+        ).all()
+
+    results = []
+    for row in rows:
+        coords = _parse_point_wkt(row.position)
+        if not coords:
+            continue
+        payload = _serialize_event_tuple(row)
+        payload["coordinates"] = coords
+        results.append(payload)
+    return results
@@ -0,0 +1,257 @@
+"""
+Authentication: bcrypt off the request thread, login throttling and signed
+session tokens.
+
+bcrypt runs in a bounded process pool so a burst of logins cannot starve the
+request threads. Once a password is verified the caller receives a signed,
+time-limited token; later requests are authenticated from the signature alone,
+without bcrypt or a ``users`` lookup.
+"""
+import atexit
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from datetime import datetime, timezone
+from functools import wraps
+from typing import Dict, Optional, Tuple
+
+import bcrypt
+from flask import current_app, g, jsonify, request
+from itsdangerous import BadSignature, SignatureExpired, URLSafeTimedSerializer
+from sqlalchemy import or_
+
+from . import cache, db
+from .models import User
+
+TOKEN_SALT = 'auth-session'
+
+# Verified against when the username is unknown, so response timing does not
+# reveal which accounts exist. One per cost factor, built on first use.
+_dummy_hashes: Dict[int, str] = {}
+_dummy_lock = threading.Lock()
+
+
+class AuthBusyError(Exception):
+    """Raised when the hashing pool queue is full."""
+
+
+class LoginThrottledError(Exception):
+    """Raised when a user or client IP exceeded its login attempt budget."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f'Too many login attempts. Retry in {retry_after} seconds.')
+        self.retry_after = retry_after
+
+
+def _hashpw(password: bytes, rounds: int) -> bytes:
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds=rounds))
+
+
+def _checkpw(password: bytes, hashed: bytes) -> bool:
+    return bcrypt.checkpw(password, hashed)
+
+
+class HashPool:
+    """Bounded process pool for bcrypt work.
+
+    At most ``max_pending`` operations may be queued or running; beyond that
+    callers get :class:`AuthBusyError` instead of piling up behind the pool.
+    So do callers whose operation does not finish within ``timeout`` seconds.
+    """
+
+    def __init__(self, workers: int, max_pending: int, timeout: float):
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _run(self, func, *args):
+        if not self._slots.acquire(blocking=False):
+            raise AuthBusyError('Authentication service is busy.')
+        try:
+            if self.workers <= 0:
+                return func(*args)
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            future = self._executor.submit(func, *args)
+            try:
+                return future.result(timeout=self.timeout)
+            except FuturesTimeoutError:
+                future.cancel()
+                raise AuthBusyError('Authentication service is busy.')
+        finally:
+            self._slots.release()
+
+    def hash(self, password: str, rounds: int) -> str:
+        return self._run(_hashpw, password.encode('utf-8'), rounds).decode('utf-8')
+
+    def check(self, password: str, hashed: str) -> bool:
+        return self._run(_checkpw, password.encode('utf-8'), hashed.encode('utf-8'))
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+_pool: Optional[HashPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_hash_pool() -> HashPool:
+    """Process-wide hashing pool, sized from the app config on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = HashPool(
+                workers=current_app.config['AUTH_HASH_WORKERS'],
+                max_pending=current_app.config['AUTH_HASH_MAX_PENDING'],
+                timeout=current_app.config['AUTH_HASH_TIMEOUT'],
+            )
+            atexit.register(_pool.shutdown)
+    return _pool
+
+
+def _dummy_hash(pool: HashPool, rounds: int) -> str:
+    """Hash with the same cost as real accounts, so unknown users take as long."""
+    with _dummy_lock:
+        if rounds not in _dummy_hashes:
+            _dummy_hashes[rounds] = pool.hash('dummy-password', rounds)
+        return _dummy_hashes[rounds]
+
+
+def bcrypt_cost(hashed: str) -> int:
+    """Cost factor encoded in a bcrypt hash (``$2b$12$...`` -> 12)."""
+    try:
+        return int(hashed.split('$')[2])
+    except (IndexError, ValueError):
+        return 0
+
+
+# ---------------------------------------------------------------------------
+# Login throttling
+# ---------------------------------------------------------------------------
+
+def _attempt_key(kind: str, value: str) -> str:
+    return f'login_attempts:{kind}:{value.lower()}'
+
+
+def _check_throttle(username: str, ip: str) -> None:
+    limits = (
+        ('user', username, current_app.config['AUTH_MAX_ATTEMPTS_PER_USER']),
+        ('ip', ip, current_app.config['AUTH_MAX_ATTEMPTS_PER_IP']),
+    )
+    now = time.time()
+    for kind, value, limit in limits:
+        count, expires_at = cache.get(_attempt_key(kind, value)) or (0, now)
+        if count >= limit and expires_at > now:
+            raise LoginThrottledError(max(1, int(expires_at - now + 0.999)))
+
+
+def _record_failure(username: str, ip: str) -> None:
+    """Count a failed attempt; the window runs from the first failure.
+
+    Counters are stored with their expiry, and every rewrite passes the time
+    left as the timeout, so later failures never stretch the window.
+    """
+    window = current_app.config['AUTH_THROTTLE_WINDOW']
+    now = time.time()
+    for kind, value in (('user', username), ('ip', ip)):
+        key = _attempt_key(kind, value)
+        if cache.add(key, (1, now + window), timeout=window):
+            continue
+        count, expires_at = cache.get(key) or (0, now + window)
+        remaining = expires_at - now
+        if remaining <= 0:
+            count, expires_at, remaining = 0, now + window, window
+        cache.set(key, (count + 1, expires_at), timeout=max(1, int(remaining + 0.999)))
+
+
+def _clear_failures(username: str) -> None:
+    cache.delete(_attempt_key('user', username))
+
+
+# ---------------------------------------------------------------------------
+# Session tokens
+# ---------------------------------------------------------------------------
+
+def _serializer() -> URLSafeTimedSerializer:
+    return URLSafeTimedSerializer(current_app.config['SECRET_KEY'], salt=TOKEN_SALT)
+
+
+def issue_token(user: User) -> str:
+    return _serializer().dumps({'uid': user.id, 'username': user.username, 'role': user.role})
+
+
+def verify_token(token: str) -> Optional[Dict]:
+    """Return the session claims for a valid, unexpired token, else None."""
+    try:
+        return _serializer().loads(token, max_age=current_app.config['AUTH_TOKEN_MAX_AGE'])
+    except (BadSignature, SignatureExpired):
+        return None
+
+
+def _request_token() -> Optional[str]:
+    header = request.headers.get('Authorization', '')
+    if header.startswith('Bearer '):
+        return header[len('Bearer '):].strip()
+    return request.cookies.get(current_app.config['AUTH_COOKIE_NAME'])
+
+
+def current_session() -> Optional[Dict]:
+    """Session claims for the current request (cached on ``g``)."""
+    if 'auth_session' not in g:
+        token = _request_token()
+        g.auth_session = verify_token(token) if token else None
+    return g.auth_session
+
+
+def login_required(view):
+    """Reject requests without a valid session token."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if current_session() is None:
+            return jsonify({'error': 'Authentication required.'}), 401
+        return view(*args, **kwargs)
+    return wrapper
+
+
+# ---------------------------------------------------------------------------
+# Login
+# ---------------------------------------------------------------------------
+
+def authenticate(username: str, password: str, ip: str) -> Tuple[Optional[User], Optional[str]]:
+    """Verify credentials; returns ``(user, token)`` or ``(None, None)``.
+
+    Raises :class:`LoginThrottledError` or :class:`AuthBusyError`. Hashes
+    below the configured cost are upgraded transparently on success.
+    """
+    _check_throttle(username, ip)
+    pool = get_hash_pool()
+
+    user = User.query.filter(
+        or_(User.username == username, User.email == username)
+    ).first()
+    if user is None or user.status == 0 or not user.password_hash:
+        pool.check(password, _dummy_hash(pool, current_app.config['AUTH_BCRYPT_ROUNDS']))
+        _record_failure(username, ip)
+        return None, None
+
+    if not pool.check(password, user.password_hash):
+        _record_failure(username, ip)
+        return None, None
+
+    _clear_failures(username)
+    rounds = current_app.config['AUTH_BCRYPT_ROUNDS']
+    if bcrypt_cost(user.password_hash) < rounds:
+        hashed = pool.hash(password, rounds)
+        user.password_hash = hashed
+        user.salt = hashed[:29]
+    user.last_login = datetime.now(timezone.utc)
+    db.session.commit()
+
+    return user, issue_token(user)
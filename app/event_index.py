@@ -0,0 +1,227 @@
+"""
+Event lifecycle: in-memory index of active events and TTL-based auto-expiry.
+
+Active events are few and read constantly (event lists, the dashboard count,
+alerts), so each process keeps them in an :class:`ActiveEventIndex` keyed by
+id, road and severity, ordered by timestamp. Writes made through the service
+layer update the index in place; the snapshot is stamped with the ``events``
+data version from :func:`~app.middleware.etag_version`, so writes from other
+processes cause a reload at the next version check (at most every
+``EVENT_INDEX_CHECK_INTERVAL`` seconds).
+
+The expiry scheduler resolves events that have outlived their type's TTL
+(``EVENT_TTL_MINUTES``) in batches of ``EVENT_EXPIRY_BATCH`` every
+``EVENT_EXPIRY_INTERVAL`` seconds, so ``active`` stays accurate.
+:func:`hold_lease` gives schedulers a single owner across workers.
+"""
+import bisect
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from flask import current_app
+
+from . import db
+from .middleware import etag_version
+from .models import Event
+
+def _epoch(value: datetime) -> float:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class ActiveEventIndex:
+    """Active events by id, road and severity, ordered by timestamp.
+
+    Events are stored as their serialized API dicts together with the
+    timestamp as Unix seconds, which is the sort and expiry key.
+    """
+
+    __slots__ = ('version', 'events', 'by_road', 'by_severity', '_order')
+
+    def __init__(self, version: str):
+        self.version = version
+        self.events: Dict[int, Tuple[float, Dict]] = {}
+        self.by_road: Dict[int, Set[int]] = {}
+        self.by_severity: Dict[Optional[int], Set[int]] = {}
+        self._order: List[Tuple[float, int]] = []  # ascending (timestamp, id)
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def add(self, event: Dict, timestamp: float) -> None:
+        self.discard(event['id'])
+        event_id = event['id']
+        self.events[event_id] = (timestamp, event)
+        self.by_road.setdefault(event['road_id'], set()).add(event_id)
+        self.by_severity.setdefault(event['severity'], set()).add(event_id)
+        bisect.insort(self._order, (timestamp, event_id))
+
+    def discard(self, event_id: int) -> None:
+        entry = self.events.pop(event_id, None)
+        if entry is None:
+            return
+        timestamp, event = entry
+        for index, key in ((self.by_road, event['road_id']), (self.by_severity, event['severity'])):
+            members = index.get(key)
+            if members is not None:
+                members.discard(event_id)
+                if not members:
+                    del index[key]
+        position = bisect.bisect_left(self._order, (timestamp, event_id))
+        if position < len(self._order) and self._order[position] == (timestamp, event_id):
+            del self._order[position]
+
+    def count(self, road_id: Optional[int] = None, severity: Optional[int] = None) -> int:
+        if road_id is not None and severity is not None:
+            return len(self.by_road.get(road_id, set()) & self.by_severity.get(severity, set()))
+        if road_id is not None:
+            return len(self.by_road.get(road_id, ()))
+        if severity is not None:
+            return len(self.by_severity.get(severity, ()))
+        return len(self.events)
+
+    def page(
+        self,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        road_id: Optional[int] = None,
+        severity: Optional[int] = None,
+    ) -> List[Dict]:
+        """Newest-first page of active events, optionally filtered."""
+        if road_id is None and severity is None:
+            end = len(self._order) - offset
+            start = 0 if limit is None else max(end - limit, 0)
+            ids = [event_id for _, event_id in reversed(self._order[start:max(end, 0)])]
+        else:
+            ids = [
+                event_id for _, event_id in reversed(self._order)
+                if (road_id is None or event_id in self.by_road.get(road_id, ()))
+                and (severity is None or event_id in self.by_severity.get(severity, ()))
+            ]
+            ids = ids[offset:] if limit is None else ids[offset:offset + limit]
+        return [self.events[event_id][1] for event_id in ids]
+
+    def expired(self, ttl_minutes: Dict[str, int], now: float) -> List[int]:
+        """Ids of events older than their type's TTL, oldest first."""
+        expired = []
+        for timestamp, event_id in self._order:
+            ttl = ttl_minutes.get(self.events[event_id][1]['type'])
+            if ttl and timestamp + ttl * 60 <= now:
+                expired.append(event_id)
+        return expired
+
+
+class _IndexState:
+    __slots__ = ('index', 'checked_at', 'lock')
+
+    def __init__(self):
+        self.index: Optional[ActiveEventIndex] = None
+        self.checked_at = 0.0
+        self.lock = threading.RLock()
+
+
+def _load(version: str) -> ActiveEventIndex:
+    # Serialization lives with the rest of the event views in services.
+    from .services import _event_tuple_query, _serialize_event_tuple
+
+    index = ActiveEventIndex(version)
+    rows = db.session.execute(_event_tuple_query().where(Event.status == 'active')).all()
+    for row in rows:
+        index.add(_serialize_event_tuple(row), _epoch(row.timestamp))
+    return index
+
+
+def _state() -> _IndexState:
+    return current_app.extensions.setdefault('event_index', _IndexState())
+
+
+def get_active_index() -> ActiveEventIndex:
+    """Current active-event index, reloaded when the events version changed."""
+    state = _state()
+    index = state.index
+    now = time.monotonic()
+    interval = current_app.config.get('EVENT_INDEX_CHECK_INTERVAL', 5)
+    if index is not None and now - state.checked_at < interval:
+        return index
+
+    with state.lock:
+        version = etag_version('events')
+        state.checked_at = now
+        if state.index is None or state.index.version != version:
+            state.index = _load(version)
+        return state.index
+
+
+def apply_event_changes(events: Iterable[Dict]) -> None:
+    """Fold committed event writes (serialized dicts) into this process's index.
+
+    Call after :func:`~app.services.invalidate_event_views`; the index then
+    adopts the new events version so it is not reloaded for its own write.
+    """
+    state = _state()
+    with state.lock:
+        index = state.index
+        if index is None:
+            return
+        for event in events:
+            if event['status'] == 'active':
+                index.add(event, datetime.fromisoformat(event['timestamp']).timestamp())
+            else:
+                index.discard(event['id'])
+        index.version = etag_version('events')
+        state.checked_at = time.monotonic()
+
+
+def expired_event_ids(now: Optional[float] = None) -> List[int]:
+    """Active events past their TTL according to ``EVENT_TTL_MINUTES``."""
+    now = time.time() if now is None else now
+    return get_active_index().expired(current_app.config['EVENT_TTL_MINUTES'], now)
+
+
+def start_expiry_scheduler(app) -> None:
+    """Run :func:`~app.services.expire_events` every ``EVENT_EXPIRY_INTERVAL`` seconds.
+
+    Each run is leased through the shared cache so one worker does it; the
+    update itself only reports events it changed, so an overlapping run in
+    another worker broadcasts nothing twice.
+    """
+    from . import cache, socketio
+
+    def run():
+        while True:
+            interval = app.config['EVENT_EXPIRY_INTERVAL']
+            socketio.sleep(interval)
+            with app.app_context():
+                try:
+                    if not cache.add(f'event_expiry:{int(time.time() // interval)}', 1, timeout=interval * 2):
+                        continue
+                    from .services import expire_events
+                    from .websocket import broadcast_event
+                    resolved = expire_events()
+                    if resolved:
+                        app.logger.info(f'Auto-resolved {len(resolved)} expired events')
+                        broadcast_event(resolved, action='resolved')
+                except Exception as exc:
+                    app.logger.error(f'Event expiry failed: {exc}', exc_info=True)
+                finally:
+                    db.session.remove()
+
+    socketio.start_background_task(run)
+
+
+def hold_lease(key: str, token: str, timeout: int) -> bool:
+    """Renew the shared-cache lease ``key`` if ``token`` holds it, or try to take it.
+
+    Returns whether ``token`` holds the lease for the next ``timeout`` seconds.
+    Schedulers that need a single long-lived owner across workers renew it on
+    every run.
+    """
+    from . import cache
+
+    if cache.get(key) == token:
+        cache.set(key, token, timeout=timeout)
+        return True
+    return bool(cache.add(key, token, timeout=timeout))
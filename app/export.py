@@ -3,43 +3,74 @@ Data export utilities for traffic system.
 """
 import io
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Callable, Optional
 
 import pandas as pd
-from flask import send_file
+import pyarrow as pa
+import pyarrow.parquet as pq
+from flask import Response, current_app, send_file, stream_with_context
+from sqlalchemy import select
 
-from .models import TrafficData, Event, Road
+from .models import Event
+from .partitions import traffic_window
+from .road_registry import get_road_registry
+from .services import _default_window
 from . import db
 
+ARROW_STREAM_MIMETYPE = 'application/vnd.apache.arrow.stream'
+PARQUET_MIMETYPE = 'application/vnd.apache.parquet'
 
-def export_traffic_data_csv(start_date: Optional[datetime] = None, end_date: Optional[datetime] = None):
-    """Export traffic data to CSV format."""
-    if not end_date:
-        end_date = datetime.now(timezone.utc)
-    if not start_date:
-        start_date = end_date - timedelta(days=7)
+_DICT_STRING = pa.dictionary(pa.int32(), pa.string())
+_TIMESTAMP = pa.timestamp('us', tz='UTC')
+
+TRAFFIC_ARROW_SCHEMA = pa.schema([
+    ('id', pa.int64()),
+    ('road_id', pa.int32()),
+    ('road_name', _DICT_STRING),
+    ('road_code', _DICT_STRING),
+    ('timestamp', _TIMESTAMP),
+    ('speed', pa.decimal128(6, 2)),
+    ('volume', pa.int32()),
+    ('status', _DICT_STRING),
+    ('congestion_level', pa.decimal128(3, 2)),
+])
+
+EVENTS_ARROW_SCHEMA = pa.schema([
+    ('id', pa.int64()),
+    ('road_id', pa.int32()),
+    ('road_name', _DICT_STRING),
+    ('type', _DICT_STRING),
+    ('description', pa.string()),
+    ('timestamp', _TIMESTAMP),
+    ('status', _DICT_STRING),
+    ('severity', pa.int8()),
+    ('position', pa.string()),
+])
+
+
+def _batched_rows(query, on_batch: Optional[Callable[[int], None]] = None):
+    """Rows of a select fetched ``EXPORT_BATCH_SIZE`` at a time; ``on_batch`` gets each batch size."""
+    batch_size = current_app.config['EXPORT_BATCH_SIZE']
+    result = db.session.execute(query.execution_options(yield_per=batch_size))
+    for rows in result.partitions():
+        yield from rows
+        if on_batch:
+            on_batch(len(rows))
 
+
+def write_traffic_csv(output, start_date: datetime, end_date: datetime, on_batch=None) -> int:
+    """Write traffic data as CSV to a binary file object; returns the row count."""
     # Query traffic data
-    query = TrafficData.query.filter(
-        TrafficData.timestamp.between(start_date, end_date)
-    ).join(Road).add_columns(
-        TrafficData.id,
-        Road.name.label('road_name'),
-        Road.code.label('road_code'),
-        TrafficData.timestamp,
-        TrafficData.speed,
-        TrafficData.volume,
-        TrafficData.status,
-        TrafficData.congestion_level
-    ).order_by(TrafficData.timestamp.desc())
+    roads = get_road_registry()
+    query = _traffic_export_query(start_date, end_date)
 
     # Convert to DataFrame
     data = []
-    for row in query.all():
+    for row in _batched_rows(query, on_batch):
         data.append({
             'ID': row.id,
-            'Road Name': row.road_name,
-            'Road Code': row.road_code,
+            'Road Name': roads.name(row.road_id),
+            'Road Code': roads.code(row.road_id),
             'Timestamp': row.timestamp.isoformat() if row.timestamp else '',
             'Speed (km/h)': float(row.speed) if row.speed else None,
             'Volume': row.volume,
@@ -48,10 +79,17 @@ def export_traffic_data_csv(start_date: Optional[datetime] = None, end_date: Opt
         })
 
     df = pd.DataFrame(data)
+    df.to_csv(output, index=False, encoding='utf-8')
+    return len(data)
+
+
+def export_traffic_data_csv(start_date: Optional[datetime] = None, end_date: Optional[datetime] = None):
+    """Export traffic data to CSV format."""
+    start_date, end_date = _default_window(start_date, end_date)
 
     # Create CSV in memory
     output = io.BytesIO()
-    df.to_csv(output, index=False, encoding='utf-8')
+    write_traffic_csv(output, start_date, end_date)
     output.seek(0)
 
     return send_file(
@@ -62,37 +100,20 @@ def export_traffic_data_csv(start_date: Optional[datetime] = None, end_date: Opt
     )
 
 
-def export_traffic_data_excel(start_date: Optional[datetime] = None, end_date: Optional[datetime] = None):
-    """Export traffic data to Excel format."""
-    if not end_date:
-        end_date = datetime.now(timezone.utc)
-    if not start_date:
-        start_date = end_date - timedelta(days=7)
-
+def write_traffic_excel(output, start_date: datetime, end_date: datetime, on_batch=None) -> int:
+    """Write the multi-sheet traffic report to a binary file object; returns the traffic row count."""
     # Create Excel file with multiple sheets
-    output = io.BytesIO()
-
+    roads = get_road_registry()
     with pd.ExcelWriter(output, engine='openpyxl') as writer:
         # Sheet 1: Traffic Data
-        traffic_query = TrafficData.query.filter(
-            TrafficData.timestamp.between(start_date, end_date)
-        ).join(Road).add_columns(
-            TrafficData.id,
-            Road.name.label('road_name'),
-            Road.code.label('road_code'),
-            TrafficData.timestamp,
-            TrafficData.speed,
-            TrafficData.volume,
-            TrafficData.status,
-            TrafficData.congestion_level
-        ).order_by(TrafficData.timestamp.desc())
+        traffic_query = _traffic_export_query(start_date, end_date)
 
         traffic_data = []
-        for row in traffic_query.all():
+        for row in _batched_rows(traffic_query, on_batch):
             traffic_data.append({
                 'ID': row.id,
-                'Road Name': row.road_name,
-                'Road Code': row.road_code,
+                'Road Name': roads.name(row.road_id),
+                'Road Code': roads.code(row.road_id),
                 'Timestamp': row.timestamp,
                 'Speed (km/h)': float(row.speed) if row.speed else None,
                 'Volume': row.volume,
@@ -105,10 +126,11 @@ def export_traffic_data_excel(start_date: Optional[datetime] = None, end_date: O
 
         # Sheet 2: Events
         events_query = Event.query.filter(
-            Event.timestamp.between(start_date, end_date)
-        ).join(Road).add_columns(
+            Event.timestamp.between(start_date, end_date),
+            Event.road_id.isnot(None)
+        ).add_columns(
             Event.id,
-            Road.name.label('road_name'),
+            Event.road_id,
             Event.type,
             Event.description,
             Event.timestamp,
@@ -120,7 +142,7 @@ def export_traffic_data_excel(start_date: Optional[datetime] = None, end_date: O
         for row in events_query.all():
             events_data.append({
                 'ID': row.id,
-                'Road Name': row.road_name,
+                'Road Name': roads.name(row.road_id),
                 'Event Type': row.type,
                 'Description': row.description,
                 'Timestamp': row.timestamp,
@@ -153,6 +175,15 @@ def export_traffic_data_excel(start_date: Optional[datetime] = None, end_date: O
         df_summary = pd.DataFrame(summary_data)
         df_summary.to_excel(writer, sheet_name='Summary', index=False)
 
+    return len(traffic_data)
+
+
+def export_traffic_data_excel(start_date: Optional[datetime] = None, end_date: Optional[datetime] = None):
+    """Export traffic data to Excel format."""
+    start_date, end_date = _default_window(start_date, end_date)
+
+    output = io.BytesIO()
+    write_traffic_excel(output, start_date, end_date)
     output.seek(0)
 
     return send_file(
@@ -163,27 +194,16 @@ def export_traffic_data_excel(start_date: Optional[datetime] = None, end_date: O
     )
 
 
-def export_events_csv(status: Optional[str] = None):
-    """Export events to CSV format."""
-    query = Event.query.join(Road).add_columns(
-        Event.id,
-        Road.name.label('road_name'),
-        Event.type,
-        Event.description,
-        Event.timestamp,
-        Event.status,
-        Event.severity,
-        Event.position
-    ).order_by(Event.timestamp.desc())
-
-    if status and status != 'all':
-        query = query.filter(Event.status == status)
+def write_events_csv(output, status: Optional[str] = None, on_batch=None) -> int:
+    """Write events as CSV to a binary file object; returns the row count."""
+    roads = get_road_registry()
+    query = _events_export_query(status)
 
     data = []
-    for row in query.all():
+    for row in _batched_rows(query, on_batch):
         data.append({
             'ID': row.id,
-            'Road Name': row.road_name,
+            'Road Name': roads.name(row.road_id),
             'Event Type': row.type,
             'Description': row.description,
             'Timestamp': row.timestamp.isoformat() if row.timestamp else '',
@@ -193,9 +213,14 @@ def export_events_csv(status: Optional[str] = None):
         })
 
     df = pd.DataFrame(data)
+    df.to_csv(output, index=False, encoding='utf-8')
+    return len(data)
+
 
+def export_events_csv(status: Optional[str] = None):
+    """Export events to CSV format."""
     output = io.BytesIO()
-    df.to_csv(output, index=False, encoding='utf-8')
+    write_events_csv(output, status)
     output.seek(0)
 
     return send_file(
@@ -204,3 +229,175 @@ def export_events_csv(status: Optional[str] = None):
         as_attachment=True,
         download_name=f'events_{status or "all"}_{datetime.now().date()}.csv'
     )
+
+
+def _traffic_export_query(start_date: datetime, end_date: datetime):
+    """Readings between the dates (inclusive), including rotated partitions, newest first."""
+    readings = traffic_window(start_date, end_date + timedelta(microseconds=1))
+    return select(readings).order_by(readings.c.timestamp.desc())
+
+
+def _events_export_query(status: Optional[str]):
+    query = (
+        select(
+            Event.id,
+            Event.road_id,
+            Event.type,
+            Event.description,
+            Event.timestamp,
+            Event.status,
+            Event.severity,
+            Event.position,
+        )
+        .where(Event.road_id.isnot(None))
+        .order_by(Event.timestamp.desc())
+    )
+    if status and status != 'all':
+        query = query.where(Event.status == status)
+    return query
+
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _record_batches(query, schema: pa.Schema, on_batch: Optional[Callable[[int], None]] = None):
+    """Yield Arrow record batches straight from the DB cursor.
+
+    Rows are fetched ``EXPORT_BATCH_SIZE`` at a time, so memory stays bounded by
+    one batch regardless of the export window. Schema fields are matched to
+    result columns by name; ``road_name`` / ``road_code`` are resolved from
+    ``road_id`` through the road registry.
+    """
+    batch_size = current_app.config['EXPORT_BATCH_SIZE']
+    roads = get_road_registry()
+    result = db.session.execute(query.execution_options(yield_per=batch_size))
+    keys = list(result.keys())
+    for rows in result.partitions():
+        columns = dict(zip(keys, zip(*rows)))
+        if 'road_id' in columns:
+            road_ids = columns['road_id']
+            columns['road_name'] = [roads.name(road_id) for road_id in road_ids]
+            columns['road_code'] = [roads.code(road_id) for road_id in road_ids]
+        arrays = []
+        for field in schema:
+            values = columns[field.name]
+            if pa.types.is_timestamp(field.type):
+                values = [_utc(value) for value in values]
+            if pa.types.is_dictionary(field.type):
+                arrays.append(pa.array(values, type=pa.string()).dictionary_encode())
+            else:
+                arrays.append(pa.array(values, type=field.type))
+        if on_batch:
+            on_batch(len(rows))
+        yield pa.record_batch(arrays, schema=schema)
+
+
+def _write_parquet(output, query, schema: pa.Schema, on_batch=None) -> int:
+    rows = 0
+    with pq.ParquetWriter(output, schema, compression='zstd') as writer:
+        for batch in _record_batches(query, schema, on_batch):
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    return rows
+
+
+def _write_arrow(output, query, schema: pa.Schema, on_batch=None) -> int:
+    rows = 0
+    with pa.ipc.new_stream(output, schema) as writer:
+        for batch in _record_batches(query, schema, on_batch):
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    return rows
+
+
+def write_traffic_parquet(output, start_date: datetime, end_date: datetime, on_batch=None) -> int:
+    """Write traffic data as zstd Parquet to a binary file object; returns the row count."""
+    return _write_parquet(output, _traffic_export_query(start_date, end_date), TRAFFIC_ARROW_SCHEMA, on_batch)
+
+
+def write_traffic_arrow(output, start_date: datetime, end_date: datetime, on_batch=None) -> int:
+    """Write traffic data as an Arrow IPC stream; returns the row count."""
+    return _write_arrow(output, _traffic_export_query(start_date, end_date), TRAFFIC_ARROW_SCHEMA, on_batch)
+
+
+def write_events_parquet(output, status: Optional[str] = None, on_batch=None) -> int:
+    """Write events as zstd Parquet to a binary file object; returns the row count."""
+    return _write_parquet(output, _events_export_query(status), EVENTS_ARROW_SCHEMA, on_batch)
+
+
+def write_events_arrow(output, status: Optional[str] = None, on_batch=None) -> int:
+    """Write events as an Arrow IPC stream; returns the row count."""
+    return _write_arrow(output, _events_export_query(status), EVENTS_ARROW_SCHEMA, on_batch)
+
+
+def _send_parquet(query, schema: pa.Schema, download_name: str):
+    output = io.BytesIO()
+    _write_parquet(output, query, schema)
+    output.seek(0)
+
+    return send_file(
+        output,
+        mimetype=PARQUET_MIMETYPE,
+        as_attachment=True,
+        download_name=download_name
+    )
+
+
+def _stream_arrow(query, schema: pa.Schema, download_name: str):
+    """Stream an Arrow IPC stream to the client one record batch at a time."""
+    def generate():
+        sink = io.BytesIO()
+        with pa.ipc.new_stream(sink, schema) as writer:
+            for batch in _record_batches(query, schema):
+                writer.write_batch(batch)
+                yield sink.getvalue()
+                sink.seek(0)
+                sink.truncate()
+        yield sink.getvalue()
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype=ARROW_STREAM_MIMETYPE,
+        headers={'Content-Disposition': f'attachment; filename={download_name}'}
+    )
+
+
+def export_traffic_data_parquet(start_date: Optional[datetime] = None, end_date: Optional[datetime] = None):
+    """Export traffic data to Parquet format."""
+    start_date, end_date = _default_window(start_date, end_date)
+    return _send_parquet(
+        _traffic_export_query(start_date, end_date),
+        TRAFFIC_ARROW_SCHEMA,
+        f'traffic_data_{start_date.date()}_{end_date.date()}.parquet'
+    )
+
+
+def export_traffic_data_arrow(start_date: Optional[datetime] = None, end_date: Optional[datetime] = None):
+    """Export traffic data as an Arrow IPC stream."""
+    start_date, end_date = _default_window(start_date, end_date)
+    return _stream_arrow(
+        _traffic_export_query(start_date, end_date),
+        TRAFFIC_ARROW_SCHEMA,
+        f'traffic_data_{start_date.date()}_{end_date.date()}.arrows'
+    )
+
+
+def export_events_parquet(status: Optional[str] = None):
+    """Export events to Parquet format."""
+    return _send_parquet(
+        _events_export_query(status),
+        EVENTS_ARROW_SCHEMA,
+        f'events_{status or "all"}_{datetime.now().date()}.parquet'
+    )
+
+
+def export_events_arrow(status: Optional[str] = None):
+    """Export events as an Arrow IPC stream."""
+    return _stream_arrow(
+        _events_export_query(status),
+        EVENTS_ARROW_SCHEMA,
+        f'events_{status or "all"}_{datetime.now().date()}.arrows'
+    )
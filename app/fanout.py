@@ -0,0 +1,158 @@
+"""
+Concurrent execution of independent read queries.
+
+Dashboard-style views run several aggregates that do not depend on each other.
+:class:`QueryFanout` runs them on a shared thread pool, each on its own pooled
+connection, so a view costs roughly its slowest query instead of the sum of
+all of them. Every call is timed: the wall time, the slowest query, the summed
+query time (the sequential cost) and the dispatch overhead (wall time minus the
+slowest query) are accumulated and reported by :meth:`QueryFanout.stats`.
+
+:meth:`QueryFanout.call` does the same for whole service functions, each in
+its own app context, on a second pool: a function that fans out its own
+queries never waits for a query worker held by one of its siblings.
+
+Engines whose pool hands every caller the same DB-API connection (SQLite
+``:memory:`` databases) cannot be used concurrently; queries then run one
+after another on a single connection.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from flask import current_app
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.pool import SingletonThreadPool, StaticPool
+
+from . import db
+
+Query = Callable[[Connection], Any]
+
+
+def scalar(statement) -> Query:
+    return lambda conn: conn.execute(statement).scalar()
+
+
+def first(statement) -> Query:
+    return lambda conn: conn.execute(statement).first()
+
+
+def rows(statement) -> Query:
+    return lambda conn: conn.execute(statement).all()
+
+
+class QueryFanout:
+    """Runs named queries concurrently and records dispatch timings."""
+
+    def __init__(self, engine: Engine, workers: int):
+        self.engine = engine
+        self.workers = workers
+        self.parallel = workers > 1 and not isinstance(engine.pool, (StaticPool, SingletonThreadPool))
+        self._executors: Dict[str, ThreadPoolExecutor] = {}
+        self._lock = threading.Lock()
+        self._calls = 0
+        self._queries = 0
+        self._wall = 0.0
+        self._slowest = 0.0
+        self._sequential = 0.0
+        self._dispatch = 0.0
+
+    def run(self, queries: Dict[str, Query]) -> Dict[str, Any]:
+        """Run every query and return their results under the same names.
+
+        An exception raised by any query propagates to the caller.
+        """
+        started = time.perf_counter()
+        if self.parallel and len(queries) > 1:
+            executor = self._get_executor('query-fanout')
+            futures = {name: executor.submit(self._timed, query) for name, query in queries.items()}
+            outcomes = {name: future.result() for name, future in futures.items()}
+        else:
+            with self.engine.connect() as conn:
+                outcomes = {name: self._timed(query, conn) for name, query in queries.items()}
+        wall = time.perf_counter() - started
+        self._record(len(queries), wall, [elapsed for _, elapsed in outcomes.values()])
+        return {name: result for name, (result, _) in outcomes.items()}
+
+    def call(self, tasks: Dict[str, Callable[[], Any]]) -> Dict[str, Any]:
+        """Run service functions concurrently, each in a fresh app context."""
+        if not self.parallel or len(tasks) < 2:
+            return {name: task() for name, task in tasks.items()}
+        app = current_app._get_current_object()
+        executor = self._get_executor('fanout-task')
+        futures = {name: executor.submit(_in_app_context, app, task) for name, task in tasks.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+    def _timed(self, query: Query, conn: Optional[Connection] = None):
+        started = time.perf_counter()
+        if conn is None:
+            with self.engine.connect() as conn:
+                result = query(conn)
+        else:
+            result = query(conn)
+        return result, time.perf_counter() - started
+
+    def _get_executor(self, prefix: str) -> ThreadPoolExecutor:
+        with self._lock:
+            executor = self._executors.get(prefix)
+            if executor is None:
+                executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=prefix)
+                self._executors[prefix] = executor
+        return executor
+
+    def _record(self, count: int, wall: float, elapsed) -> None:
+        slowest = max(elapsed, default=0.0)
+        with self._lock:
+            self._calls += 1
+            self._queries += count
+            self._wall += wall
+            self._slowest += slowest
+            self._sequential += sum(elapsed)
+            self._dispatch += max(wall - slowest, 0.0)
+
+    def stats(self) -> Dict:
+        """Cumulative call counts and mean per-call timings in milliseconds."""
+        with self._lock:
+            calls = self._calls or 1
+            return {
+                'parallel': self.parallel,
+                'workers': self.workers,
+                'calls': self._calls,
+                'queries': self._queries,
+                'avg_wall_ms': round(self._wall / calls * 1000, 3),
+                'avg_slowest_query_ms': round(self._slowest / calls * 1000, 3),
+                'avg_sequential_ms': round(self._sequential / calls * 1000, 3),
+                'avg_dispatch_overhead_ms': round(self._dispatch / calls * 1000, 3),
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            executors, self._executors = self._executors, {}
+        for executor in executors.values():
+            executor.shutdown(wait=wait)
+
+
+def _in_app_context(app, task: Callable[[], Any]) -> Any:
+    # The app context teardown also removes this thread's session.
+    with app.app_context():
+        return task()
+
+
+_fanout_lock = threading.Lock()
+
+
+def get_query_fanout() -> QueryFanout:
+    """Return the query fan-out for the current app, creating it on first use."""
+    app = current_app._get_current_object()
+    with _fanout_lock:
+        fanout = app.extensions.get('query_fanout')
+        if fanout is None:
+            fanout = QueryFanout(db.engine, app.config['QUERY_FANOUT_WORKERS'])
+            app.extensions['query_fanout'] = fanout
+    return fanout
+
+
+def fetch_concurrently(**queries: Query) -> Dict[str, Any]:
+    """Run independent queries through the current app's :class:`QueryFanout`."""
+    return get_query_fanout().run(queries)
@@ -0,0 +1,326 @@
+"""
+Short-term congestion forecasting per road.
+
+Each road gets a lightweight model of two parts:
+
+* a seasonal baseline: mean congestion level and speed per time-of-week slot
+  (``FORECAST_SLOT_MINUTES`` wide, 7 days x slots per day);
+* an exponentially smoothed residual (``FORECAST_ALPHA``) that tracks how far
+  the road currently runs above or below its baseline. Forecasts decay the
+  residual by ``FORECAST_DAMPING`` per slot back towards the baseline.
+
+All roads are fitted at once: the model state is a handful of NumPy arrays
+indexed by road row, and a batch of readings updates every road with
+``np.add.at`` scatter operations. The fitted state lives in process memory;
+at most every ``FORECAST_REFRESH_INTERVAL`` seconds the readings of the last
+``FORECAST_LOOKBACK_SECONDS`` before the newest one seen are read back and
+those not applied yet are folded in, so readings that commit after higher ids
+are not lost. A forecast request normally runs no SQL at all. The first fit runs in a background task; requests wait for it at
+most ``FORECAST_WARMUP_WAIT`` seconds and are answered ``503`` after that.
+"""
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+from flask import current_app
+from sqlalchemy import Float, cast, select
+
+from . import db, socketio
+from .models import TrafficData
+from .road_registry import get_road_registry
+
+# Status thresholds used by the data generator and sensors.
+MODERATE_LEVEL = 0.4
+CONGESTED_LEVEL = 0.7
+
+_METRICS = ('congestion', 'speed')
+_EPOCH_WEEKDAY = 3  # 1970-01-01 was a Thursday (Monday = 0)
+
+
+def congestion_status(level: float) -> str:
+    if level >= CONGESTED_LEVEL:
+        return 'CONGESTED'
+    if level >= MODERATE_LEVEL:
+        return 'MODERATE'
+    return 'SMOOTH'
+
+
+class ForecasterWarmingUp(Exception):
+    """Raised while the first fit is still running in the background."""
+
+
+class Forecaster:
+    """Seasonal baseline plus smoothed residual for every road, as arrays."""
+
+    def __init__(self, slot_minutes: int = 15, alpha: float = 0.3, damping: float = 0.9,
+                 lookback_seconds: int = 300):
+        self.slot_seconds = slot_minutes * 60
+        self.slots = 7 * 24 * 3600 // self.slot_seconds
+        self.alpha = alpha
+        self.damping = damping
+        self.lookback = lookback_seconds
+        self.rows: Dict[int, int] = {}
+        # Newest reading timestamp applied (None before the first fit), and the
+        # readings applied within the lookback.
+        self.watermark: Optional[int] = None
+        self._seen_ids = np.zeros(0, dtype=np.int64)
+        self._seen_epochs = np.zeros(0, dtype=np.int64)
+        self.refreshed_at = 0.0
+        self.lock = threading.Lock()
+        self.ready = threading.Event()
+        self.warming = False
+        self._sums = {metric: np.zeros((0, self.slots)) for metric in _METRICS}
+        self._counts = np.zeros((0, self.slots))
+        self._levels = {metric: np.zeros(0) for metric in _METRICS}
+        self._last_seen = np.zeros(0)
+
+    # ------------------------------------------------------------------
+    # Fitting
+    # ------------------------------------------------------------------
+
+    def slot_of(self, epoch_seconds: np.ndarray) -> np.ndarray:
+        """Time-of-week slot index for Unix timestamps (UTC)."""
+        seconds = epoch_seconds.astype(np.int64)
+        weekday = (seconds // 86400 + _EPOCH_WEEKDAY) % 7
+        return weekday * (86400 // self.slot_seconds) + (seconds % 86400) // self.slot_seconds
+
+    def _ensure_rows(self, road_ids) -> None:
+        new = [road_id for road_id in road_ids if road_id not in self.rows]
+        if not new:
+            return
+        rows = dict(self.rows)
+        for road_id in new:
+            rows[road_id] = len(rows)
+        grow = len(new)
+        for metric in _METRICS:
+            self._sums[metric] = np.vstack([self._sums[metric], np.zeros((grow, self.slots))])
+            self._levels[metric] = np.concatenate([self._levels[metric], np.zeros(grow)])
+        self._counts = np.vstack([self._counts, np.zeros((grow, self.slots))])
+        self._last_seen = np.concatenate([self._last_seen, np.zeros(grow)])
+        # Published last: forecasts read without the lock and must never see a
+        # row past the end of the arrays.
+        self.rows = rows
+
+    def _baseline(self, metric: str, rows: np.ndarray, slots: np.ndarray) -> np.ndarray:
+        """Slot means, falling back to the road's overall mean for empty slots."""
+        road_sums = self._sums[metric].sum(axis=1)
+        road_counts = self._counts.sum(axis=1)
+        road_mean = np.divide(road_sums, road_counts, out=np.zeros_like(road_sums), where=road_counts > 0)
+        sums = self._sums[metric][rows, slots]
+        counts = self._counts[rows, slots]
+        return np.divide(sums, counts, out=road_mean[rows], where=counts > 0)
+
+    def update(self, road_ids: np.ndarray, epochs: np.ndarray, values: Dict[str, np.ndarray]) -> None:
+        """Fold a batch of readings into every road's model at once.
+
+        The batch must be ordered by timestamp. Baselines absorb the readings
+        first; residuals against the updated baseline are then smoothed with
+        closed-form exponential weights, so each road's level ends up as if
+        its readings had been applied one at a time.
+        """
+        if len(road_ids) == 0:
+            return
+        self._ensure_rows(np.unique(road_ids).tolist())
+        rows = np.fromiter((self.rows[road_id] for road_id in road_ids), dtype=np.int64, count=len(road_ids))
+        slots = self.slot_of(epochs)
+
+        np.add.at(self._counts, (rows, slots), 1)
+        for metric in _METRICS:
+            np.add.at(self._sums[metric], (rows, slots), values[metric])
+
+        # Position of each reading counted from its road's newest reading.
+        order = np.argsort(rows, kind='stable')
+        per_road = np.bincount(rows, minlength=len(self.rows))
+        group_start = np.concatenate([[0], np.cumsum(per_road)[:-1]])
+        position = np.empty(len(rows), dtype=np.int64)
+        position[order] = np.arange(len(rows)) - group_start[rows[order]]
+        from_newest = per_road[rows] - 1 - position
+        weights = self.alpha * (1 - self.alpha) ** from_newest
+        carry = (1 - self.alpha) ** per_road
+
+        for metric in _METRICS:
+            residuals = values[metric] - self._baseline(metric, rows, slots)
+            smoothed = self._levels[metric] * carry
+            np.add.at(smoothed, rows, weights * residuals)
+            self._levels[metric] = smoothed
+        np.maximum.at(self._last_seen, rows, epochs)
+
+    def refresh(self, history_days: int) -> int:
+        """Fetch readings not applied yet and update the models.
+
+        The first call fits on the last ``history_days`` of the hot table;
+        later calls re-read ``lookback`` seconds before the newest reading
+        applied and skip the ids already applied. Returns the number of
+        readings applied.
+        """
+        if self.watermark is None:
+            since = datetime.now(timezone.utc) - timedelta(days=history_days)
+        else:
+            since = datetime.fromtimestamp(self.watermark - self.lookback, timezone.utc)
+        rows = db.session.execute(
+            select(
+                TrafficData.id,
+                TrafficData.road_id,
+                TrafficData.timestamp,
+                cast(TrafficData.congestion_level, Float),
+                cast(TrafficData.speed, Float),
+            ).where(
+                TrafficData.timestamp >= since,
+                TrafficData.congestion_level.isnot(None),
+                TrafficData.speed.isnot(None),
+            ).order_by(TrafficData.timestamp.asc(), TrafficData.id.asc())
+        ).all()
+        self._ensure_rows(road.id for road in get_road_registry().ordered)
+        if self.watermark is None:
+            self.watermark = int(since.timestamp())
+        if not rows:
+            return 0
+
+        ids, road_ids, timestamps, congestion, speed = (np.array(column) for column in zip(*rows))
+        ids = ids.astype(np.int64)
+        epochs = np.array(
+            [_naive_utc(timestamp) for timestamp in timestamps], dtype='datetime64[s]'
+        ).astype(np.int64)
+        fresh = ~np.isin(ids, self._seen_ids)
+        self.update(
+            road_ids[fresh].astype(np.int64),
+            epochs[fresh].astype(float),
+            {'congestion': congestion[fresh].astype(float), 'speed': speed[fresh].astype(float)},
+        )
+        self.watermark = max(self.watermark, int(epochs.max()))
+        seen_ids = np.concatenate([self._seen_ids, ids[fresh]])
+        seen_epochs = np.concatenate([self._seen_epochs, epochs[fresh]])
+        # Readings before the next refresh's window can never come back.
+        keep = seen_epochs >= self.watermark - self.lookback
+        self._seen_ids, self._seen_epochs = seen_ids[keep], seen_epochs[keep]
+        return int(fresh.sum())
+
+    # ------------------------------------------------------------------
+    # Forecasting
+    # ------------------------------------------------------------------
+
+    def forecast(self, road_id: int, start: datetime, steps: int) -> Optional[Dict[str, np.ndarray]]:
+        """Forecast ``steps`` slot-spaced points from ``start`` for one road."""
+        row = self.rows.get(road_id)
+        if row is None or self._counts[row].sum() == 0:
+            return None
+
+        epochs = start.timestamp() + self.slot_seconds * np.arange(1, steps + 1)
+        rows = np.full(steps, row)
+        slots = self.slot_of(epochs)
+        # Residuals fade back to the baseline with the time since the last reading.
+        elapsed = np.maximum(epochs - self._last_seen[row], 0) / self.slot_seconds
+        decay = self.damping ** elapsed
+
+        result = {'epochs': epochs}
+        for metric in _METRICS:
+            result[metric] = self._baseline(metric, rows, slots) + self._levels[metric][row] * decay
+        result['congestion'] = np.clip(result['congestion'], 0.0, 1.0)
+        result['speed'] = np.maximum(result['speed'], 0.0)
+        return result
+
+
+_warmup_lock = threading.Lock()
+
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _warm_up(app, forecaster: Forecaster) -> None:
+    """Initial fit, run as a background task."""
+    with app.app_context():
+        try:
+            with forecaster.lock:
+                forecaster.refresh(app.config['FORECAST_HISTORY_DAYS'])
+                forecaster.refreshed_at = time.monotonic()
+            forecaster.ready.set()
+        except Exception as exc:
+            app.logger.error(f'Forecaster warm-up failed: {exc}', exc_info=True)
+        finally:
+            forecaster.warming = False
+            db.session.remove()
+
+
+def get_forecaster() -> Forecaster:
+    """Process-wide forecaster for the current app, refreshed when due.
+
+    Raises :class:`ForecasterWarmingUp` if the first fit does not finish
+    within ``FORECAST_WARMUP_WAIT`` seconds.
+    """
+    config = current_app.config
+    forecaster = current_app.extensions.get('forecaster')
+    if forecaster is None:
+        forecaster = current_app.extensions.setdefault('forecaster', Forecaster(
+            slot_minutes=config['FORECAST_SLOT_MINUTES'],
+            alpha=config['FORECAST_ALPHA'],
+            damping=config['FORECAST_DAMPING'],
+            lookback_seconds=config['FORECAST_LOOKBACK_SECONDS'],
+        ))
+
+    if not forecaster.ready.is_set():
+        with _warmup_lock:
+            start = not forecaster.warming and not forecaster.ready.is_set()
+            if start:
+                forecaster.warming = True
+        if start:
+            socketio.start_background_task(_warm_up, current_app._get_current_object(), forecaster)
+        if not forecaster.ready.wait(config['FORECAST_WARMUP_WAIT']):
+            raise ForecasterWarmingUp('Forecasts are warming up; retry shortly.')
+        return forecaster
+
+    now = time.monotonic()
+    if forecaster.refreshed_at and now - forecaster.refreshed_at < config['FORECAST_REFRESH_INTERVAL']:
+        return forecaster
+    with forecaster.lock:
+        if not forecaster.refreshed_at or now - forecaster.refreshed_at >= config['FORECAST_REFRESH_INTERVAL']:
+            forecaster.refresh(config['FORECAST_HISTORY_DAYS'])
+            forecaster.refreshed_at = now
+    return forecaster
+
+
+def get_road_forecast(road_id: int, horizon_minutes: int) -> Optional[Dict]:
+    """Forecast a road's congestion level and speed over the next ``horizon_minutes``.
+
+    Returns ``None`` for unknown roads and raises :class:`ForecasterWarmingUp`
+    until the first fit is ready. ``congested_at`` is the first forecast
+    point at or above the CONGESTED threshold, if any.
+    """
+    road = get_road_registry().get(road_id)
+    if road is None:
+        return None
+
+    forecaster = get_forecaster()
+    now = datetime.now(timezone.utc)
+    steps = max(1, -(-horizon_minutes * 60 // forecaster.slot_seconds))
+    result = forecaster.forecast(road_id, now, steps)
+
+    points: List[Dict] = []
+    congested_at = None
+    if result is not None:
+        for epoch, congestion, speed in zip(
+            result['epochs'].tolist(), result['congestion'].tolist(), result['speed'].tolist()
+        ):
+            timestamp = datetime.fromtimestamp(epoch, timezone.utc).isoformat()
+            status = congestion_status(congestion)
+            if status == 'CONGESTED' and congested_at is None:
+                congested_at = timestamp
+            points.append({
+                'timestamp': timestamp,
+                'congestion_level': round(congestion, 3),
+                'speed': round(speed, 1),
+                'status': status,
+            })
+
+    return {
+        'road': {'id': road.id, 'name': road.name, 'code': road.code},
+        'generated_at': now.isoformat(),
+        'horizon_minutes': horizon_minutes,
+        'slot_minutes': forecaster.slot_seconds // 60,
+        'forecast': points,
+        'congested_at': congested_at,
+    }
@@ -0,0 +1,246 @@
+"""
+Request concurrency governor: per-class limits, realtime priority, load shedding.
+
+API requests are sorted into classes by path (:data:`ROUTE_CLASSES`):
+
+- ``export``: streamed file exports and export job downloads
+- ``analytics``: reports, history, the traffic matrix, replays, system status
+  and dashboard bootstraps that include a heavy section
+  (:data:`ANALYTICS_SECTIONS`)
+- ``realtime``: everything else the dashboard polls, including export job
+  submission and status polls
+
+Each class may run at most ``GOVERNOR_LIMITS[class]`` requests at once, and
+all classes together at most ``GOVERNOR_MAX_CONCURRENT``, of which
+``GOVERNOR_REALTIME_RESERVED`` slots only realtime requests may use. A request
+over its limit waits up to ``GOVERNOR_QUEUE_TIMEOUT[class]`` seconds for a
+slot; when one frees up, waiting realtime requests go first. A request that
+cannot get a slot in time is answered ``503`` with ``Retry-After``.
+
+Queue waits are reported per class by ``GET /api/system/governor`` and on each
+response as ``Server-Timing: queue;dur=<ms>``.
+"""
+import math
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+from flask import current_app, g, jsonify, request
+
+REALTIME = 'realtime'
+ANALYTICS = 'analytics'
+EXPORT = 'export'
+
+# First matching path prefix wins; paths outside /api/ are not governed.
+ROUTE_CLASSES = (
+    ('/api/export/traffic/', EXPORT),
+    ('/api/export/events/', EXPORT),
+    ('/api/reports/', ANALYTICS),
+    ('/api/traffic/history/', ANALYTICS),
+    ('/api/traffic/matrix', ANALYTICS),
+    ('/api/replays', ANALYTICS),
+    ('/api/system/status', ANALYTICS),
+    ('/api/', REALTIME),
+)
+
+BOOTSTRAP_PATH = '/api/dashboard/bootstrap'
+# Bootstrap sections that run report-sized aggregates; no ``sections`` means all.
+ANALYTICS_SECTIONS = frozenset(('weekly', 'system'))
+
+
+def classify(path: str, sections: Optional[str] = None) -> Optional[str]:
+    """Request class for ``path``; ``sections`` is the bootstrap query parameter."""
+    if path.startswith('/api/export/jobs/') and path.endswith('/download'):
+        return EXPORT
+    if path == BOOTSTRAP_PATH:
+        requested = set(sections.split(',')) if sections else ANALYTICS_SECTIONS
+        return ANALYTICS if requested & ANALYTICS_SECTIONS else REALTIME
+    for prefix, name in ROUTE_CLASSES:
+        if path.startswith(prefix):
+            return name
+    return None
+
+
+class GovernorSaturated(Exception):
+    """Raised when a request class has no free slot within its queue timeout."""
+
+    def __init__(self, name: str, retry_after: int):
+        super().__init__(f'Server busy: too many concurrent {name} requests. Retry later.')
+        self.name = name
+        self.retry_after = retry_after
+
+
+class _ClassStats:
+    __slots__ = ('active', 'waiting', 'admitted', 'rejected', 'wait_total', 'wait_max',
+                 'busy_total', 'recent_waits')
+
+    def __init__(self):
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.busy_total = 0.0  # summed run time of finished requests
+        self.recent_waits = deque(maxlen=1024)
+
+
+class ConcurrencyGovernor:
+    """Slot accounting for request classes, guarded by one condition variable."""
+
+    def __init__(
+        self,
+        limits: Dict[str, int],
+        queue_timeouts: Dict[str, float],
+        max_concurrent: int,
+        realtime_reserved: int = 0,
+    ):
+        self.limits = dict(limits)
+        self.queue_timeouts = dict(queue_timeouts)
+        self.max_concurrent = max_concurrent
+        self.realtime_reserved = min(realtime_reserved, max_concurrent)
+        self._cond = threading.Condition()
+        self._running = 0
+        self._stats = {name: _ClassStats() for name in self.limits}
+
+    def _can_run(self, name: str) -> bool:
+        stats = self._stats[name]
+        if stats.active >= self.limits[name]:
+            return False
+        if name == REALTIME:
+            return self._running < self.max_concurrent
+        if self._running >= self.max_concurrent - self.realtime_reserved:
+            return False
+        # Realtime requests that are only waiting for a shared slot go first.
+        realtime = self._stats.get(REALTIME)
+        return not (realtime and realtime.waiting and realtime.active < self.limits[REALTIME])
+
+    def acquire(self, name: str) -> float:
+        """Take a slot for ``name``, waiting if needed; returns the wait in seconds.
+
+        Raises :class:`GovernorSaturated` when no slot frees up within the
+        class's queue timeout.
+        """
+        started = time.monotonic()
+        deadline = started + self.queue_timeouts.get(name, 0.0)
+        stats = self._stats[name]
+        with self._cond:
+            stats.waiting += 1
+            try:
+                while not self._can_run(name):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        stats.rejected += 1
+                        raise GovernorSaturated(name, self._retry_after(stats))
+                    self._cond.wait(remaining)
+            finally:
+                stats.waiting -= 1
+            stats.active += 1
+            self._running += 1
+            waited = time.monotonic() - started
+            stats.admitted += 1
+            stats.wait_total += waited
+            stats.wait_max = max(stats.wait_max, waited)
+            stats.recent_waits.append(waited)
+        return waited
+
+    def release(self, name: str, busy: float = 0.0) -> None:
+        with self._cond:
+            stats = self._stats[name]
+            stats.active -= 1
+            stats.busy_total += busy
+            self._running -= 1
+            self._cond.notify_all()
+
+    def _retry_after(self, stats: _ClassStats) -> int:
+        """Seconds until a slot is likely free: the class's mean run time."""
+        finished = stats.admitted - stats.active
+        if not finished:
+            return 1
+        return max(1, math.ceil(stats.busy_total / finished))
+
+    def stats(self) -> Dict:
+        with self._cond:
+            classes = {}
+            for name, stats in self._stats.items():
+                recent = sorted(stats.recent_waits)
+                p95 = recent[min(len(recent) - 1, int(len(recent) * 0.95))] if recent else 0.0
+                classes[name] = {
+                    'limit': self.limits[name],
+                    'queue_timeout': self.queue_timeouts.get(name, 0.0),
+                    'active': stats.active,
+                    'waiting': stats.waiting,
+                    'admitted': stats.admitted,
+                    'rejected': stats.rejected,
+                    'avg_wait_ms': round(stats.wait_total / stats.admitted * 1000, 3) if stats.admitted else 0.0,
+                    'p95_wait_ms': round(p95 * 1000, 3),
+                    'max_wait_ms': round(stats.wait_max * 1000, 3),
+                }
+            return {
+                'max_concurrent': self.max_concurrent,
+                'realtime_reserved': self.realtime_reserved,
+                'running': self._running,
+                'classes': classes,
+            }
+
+
+def get_governor() -> ConcurrencyGovernor:
+    return current_app.extensions['governor']
+
+
+def register_governor(app):
+    """Admit API requests through the app's :class:`ConcurrencyGovernor`."""
+    if not app.config['GOVERNOR_ENABLED']:
+        return app
+
+    governor = ConcurrencyGovernor(
+        app.config['GOVERNOR_LIMITS'],
+        app.config['GOVERNOR_QUEUE_TIMEOUT'],
+        app.config['GOVERNOR_MAX_CONCURRENT'],
+        app.config['GOVERNOR_REALTIME_RESERVED'],
+    )
+    app.extensions['governor'] = governor
+
+    @app.before_request
+    def admit_request():
+        name = classify(request.path, request.args.get('sections'))
+        if name is None or name not in governor.limits:
+            return None
+        try:
+            waited = governor.acquire(name)
+        except GovernorSaturated as exc:
+            app.logger.warning(f'Shed {request.method} {request.path}: {exc}')
+            response = jsonify({'error': str(exc), 'class': exc.name})
+            response.status_code = 503
+            response.headers['Retry-After'] = str(exc.retry_after)
+            return response
+        g.governor_slot = [name, time.monotonic()]
+        g.governor_wait = waited
+        return None
+
+    def release(slot):
+        governor.release(slot[0], time.monotonic() - slot[1])
+
+    @app.after_request
+    def report_queue_wait(response):
+        slot = g.get('governor_slot')
+        if slot is None:
+            return response
+        response.headers.add('Server-Timing', f'queue;dur={g.governor_wait * 1000:.1f}')
+        if response.is_streamed and not response.direct_passthrough:
+            # Generated bodies (streamed exports) do their work while being
+            # sent, so they hold the slot until the server closes them.
+            # File responses are released at teardown: Werkzeug skips
+            # close callbacks for them.
+            g.pop('governor_slot')
+            response.call_on_close(lambda: release(slot))
+        return response
+
+    @app.teardown_request
+    def release_slot(exc):
+        slot = g.pop('governor_slot', None)
+        if slot is not None:
+            release(slot)
+
+    return app
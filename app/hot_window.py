@@ -0,0 +1,569 @@
+"""
+Shared hot-window store: the recent traffic window in a memory-mapped ring file.
+
+Almost every read (road snapshots, the dashboard summary) only looks at the
+last ``HOT_WINDOW_HOURS`` of ``traffic_data``. :class:`HotWindowStore` keeps
+that window in one fixed-layout file at ``HOT_WINDOW_PATH`` that every worker
+process maps with ``MAP_SHARED``:
+
+- a 64-byte file header (geometry, write generation, SQL fingerprint, coverage)
+- ``HOT_WINDOW_MAX_ROADS`` road segments, each a 64-byte segment header and a
+  ring of ``HOT_WINDOW_SLOTS`` struct-packed readings (:data:`RECORD`)
+
+Readers work on NumPy views of the mapping (no copies, no locks); each segment
+carries a sequence counter that is odd while a writer is inside it, and a read
+that overlaps a write is retried. Writers serialize on an ``flock`` of the
+file. When a ring wraps, the newest timestamp it overwrote is kept, so a query
+is only answered from the store if nothing it needs was evicted; otherwise, and
+for windows older than the store covers, services fall back to SQL.
+
+Readings reach the store from the ingestion API and from ORM commits. The file
+header records the id and timestamp of the newest reading in ``traffic_data``;
+a worker compares it with the database every ``HOT_WINDOW_CHECK_INTERVAL``
+seconds and reloads the window when another writer went around the store.
+"""
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from flask import current_app, has_app_context
+from sqlalchemy import Float, cast, event, select
+from sqlalchemy.orm import Session
+
+from . import db
+from .models import TrafficData
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process locking only
+    fcntl = None
+
+MAGIC = b'TRAFHOT1'
+STATUSES = (None, 'SMOOTH', 'MODERATE', 'CONGESTED')
+_STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+
+# magic, version, max_roads, slots, roads_used, generation, overflow,
+# last_id, last_ts, primed_at, covered_since
+_HEADER = struct.Struct('<8sIIIIIIqddd')
+_HEADER_SIZE = 64
+# road_id, seq, count, evicted_max_ts
+_SEGMENT = struct.Struct('<qQQd')
+_SEGMENT_HEADER_SIZE = 64
+_SEQ_OFFSET = 8
+_VERSION = 1
+_READ_RETRIES = 8
+
+RECORD = np.dtype([
+    ('id', '<i8'),
+    ('ts', '<f8'),
+    ('speed', '<f8'),  # NaN for NULL
+    ('congestion', '<f8'),  # NaN for NULL
+    ('volume', '<i4'),  # -1 for NULL
+    ('status', 'u1'),  # index into STATUSES
+    ('_pad', 'V3'),
+])
+
+# (id, road_id, epoch seconds, speed, volume, status, congestion_level)
+Reading = Tuple[int, int, float, Optional[float], Optional[int], Optional[str], Optional[float]]
+
+
+def _epoch(value: datetime) -> float:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _optional(value: float) -> Optional[float]:
+    return None if math.isnan(value) else float(value)
+
+
+class HotWindowStore:
+    """Fixed-record ring file of recent readings, one segment per road."""
+
+    def __init__(self, path: str, max_roads: int, slots: int):
+        self.path = path
+        self.max_roads = max_roads
+        self.slots = slots
+        self.segment_size = _SEGMENT_HEADER_SIZE + slots * RECORD.itemsize
+        self.size = _HEADER_SIZE + max_roads * self.segment_size
+        self._lock = threading.Lock()
+        self._segments: Dict[int, int] = {}
+        self._segments_key = None
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(path, 'a+b')
+        with self._locked():
+            if not self._valid_file():
+                self._file.truncate(0)
+                self._file.truncate(self.size)
+                self._file.flush()
+                self._map()
+                self._write_header(roads_used=0, generation=1, overflow=0, last_id=0,
+                                   last_ts=0.0, primed_at=0.0, covered_since=math.inf)
+            else:
+                self._map()
+        self._records = [
+            np.ndarray((slots,), dtype=RECORD, buffer=self._mm,
+                       offset=_HEADER_SIZE + index * self.segment_size + _SEGMENT_HEADER_SIZE)
+            for index in range(max_roads)
+        ]
+
+    # -- file layout -------------------------------------------------------
+
+    def _valid_file(self) -> bool:
+        self._file.seek(0)
+        raw = self._file.read(_HEADER.size)
+        if len(raw) < _HEADER.size or os.fstat(self._file.fileno()).st_size != self.size:
+            return False
+        magic, version, max_roads, slots = _HEADER.unpack(raw)[:4]
+        return (magic, version, max_roads, slots) == (MAGIC, _VERSION, self.max_roads, self.slots)
+
+    def _map(self) -> None:
+        self._mm = mmap.mmap(self._file.fileno(), self.size, access=mmap.ACCESS_WRITE)
+
+    def header(self) -> Dict:
+        values = _HEADER.unpack_from(self._mm, 0)
+        keys = ('magic', 'version', 'max_roads', 'slots', 'roads_used', 'generation', 'overflow',
+                'last_id', 'last_ts', 'primed_at', 'covered_since')
+        return dict(zip(keys, values))
+
+    def _write_header(self, **changes) -> None:
+        header = self.header() if self._mm[:8] == MAGIC else {}
+        header.update(changes, magic=MAGIC, version=_VERSION, max_roads=self.max_roads, slots=self.slots)
+        _HEADER.pack_into(
+            self._mm, 0, header['magic'], header['version'], header['max_roads'], header['slots'],
+            header['roads_used'], header['generation'], header['overflow'], header['last_id'],
+            header['last_ts'], header['primed_at'], header['covered_since'],
+        )
+
+    def _segment_offset(self, index: int) -> int:
+        return _HEADER_SIZE + index * self.segment_size
+
+    def _segment(self, index: int) -> Tuple[int, int, int, float]:
+        return _SEGMENT.unpack_from(self._mm, self._segment_offset(index))
+
+    def _seq(self, index: int) -> int:
+        return struct.unpack_from('<Q', self._mm, self._segment_offset(index) + _SEQ_OFFSET)[0]
+
+    def _segment_map(self) -> Dict[int, int]:
+        """road_id -> segment index, re-read when segments were added or reset."""
+        header = self.header()
+        key = (header['generation'], header['roads_used'])
+        if key != self._segments_key:
+            self._segments = {self._segment(index)[0]: index for index in range(header['roads_used'])}
+            self._segments_key = key
+        return self._segments
+
+    @contextmanager
+    def _locked(self):
+        """Exclusive write access across threads (lock) and processes (flock)."""
+        with self._lock:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+
+    # -- writes ------------------------------------------------------------
+
+    def reset(self, covered_since: float, last_id: int, last_ts: float) -> None:
+        """Empty every segment and start a new generation; call with the file locked.
+
+        Reads fall back to SQL until :meth:`publish` sets the coverage start.
+        """
+        header = self.header()
+        self._write_header(covered_since=math.inf)
+        for index in range(header['roads_used']):
+            offset = self._segment_offset(index)
+            _SEGMENT.pack_into(self._mm, offset, 0, self._segment(index)[1] + 2, 0, -math.inf)
+        self._write_header(roads_used=0, generation=header['generation'] + 1, overflow=0,
+                           last_id=last_id, last_ts=last_ts, primed_at=time.time(),
+                           covered_since=math.inf)
+        self._pending_coverage = covered_since
+
+    def publish(self) -> None:
+        """Open the store for reads after :meth:`reset` and the initial load."""
+        self._write_header(covered_since=self._pending_coverage)
+        self.reloads += 1
+
+    def write(self, readings: Sequence[Reading]) -> None:
+        """Append readings to their roads' rings and advance the SQL fingerprint."""
+        if readings:
+            with self._locked():
+                self.write_locked(readings)
+
+    def write_locked(self, readings: Sequence[Reading]) -> None:
+        by_road: Dict[int, List[Reading]] = {}
+        for reading in readings:
+            by_road.setdefault(reading[1], []).append(reading)
+
+        header = self.header()
+        segments = self._segment_map()
+        roads_used, overflow = header['roads_used'], header['overflow']
+        for road_id, road_readings in by_road.items():
+            index = segments.get(road_id)
+            if index is None:
+                if roads_used >= self.max_roads:
+                    overflow = 1
+                    continue
+                index = roads_used
+                roads_used += 1
+                _SEGMENT.pack_into(self._mm, self._segment_offset(index), road_id,
+                                   self._segment(index)[1], 0, -math.inf)
+                segments[road_id] = index
+            self._append(index, road_readings)
+
+        newest = max(readings, key=lambda reading: reading[0])
+        last_id, last_ts = header['last_id'], header['last_ts']
+        if newest[0] > last_id:
+            last_id, last_ts = newest[0], newest[2]
+        self._write_header(roads_used=roads_used, overflow=overflow, last_id=last_id, last_ts=last_ts)
+        self._segments_key = (header['generation'], roads_used)
+
+    def _append(self, index: int, readings: List[Reading]) -> None:
+        rows = np.array([
+            (
+                reading_id, ts,
+                math.nan if speed is None else round(speed, 2),
+                math.nan if congestion is None else round(congestion, 2),
+                -1 if volume is None else volume,
+                _STATUS_CODES.get(status, 0),
+                b'',
+            )
+            for reading_id, _, ts, speed, volume, status, congestion in readings
+        ], dtype=RECORD)
+        offset = self._segment_offset(index)
+        road_id, seq, count, evicted = self._segment(index)
+        records = self._records[index]
+        # A reload may already have picked up readings committed just before it.
+        rows = rows[~np.isin(rows['id'], records['id'][:min(count, self.slots)])]
+        if not rows.size:
+            return
+
+        writes = count + np.arange(len(rows))
+        positions = writes % self.slots
+        # Overwritten readings: old ring entries, or earlier rows of this batch.
+        old = (writes >= self.slots) & (np.arange(len(rows)) < self.slots)
+        candidates = [records['ts'][positions[old]], rows['ts'][:max(len(rows) - self.slots, 0)]]
+        evicted = max([evicted] + [float(part.max()) for part in candidates if part.size])
+
+        struct.pack_into('<Q', self._mm, offset + _SEQ_OFFSET, seq + 1)
+        keep = slice(-self.slots, None)
+        records[positions[keep]] = rows[keep]
+        _SEGMENT.pack_into(self._mm, offset, road_id, seq + 2, count + len(rows), evicted)
+
+    # -- reads -------------------------------------------------------------
+
+    def _read(self, index: int, reader):
+        """Run ``reader(records, evicted_max_ts)`` on a consistent view of a segment."""
+        for _ in range(_READ_RETRIES):
+            road_id, seq, count, evicted = self._segment(index)
+            if seq & 1:
+                time.sleep(0)
+                continue
+            result = reader(self._records[index][:min(count, self.slots)], evicted)
+            if self._seq(index) == seq:
+                return result
+        raise _Contended()
+
+    def _covers(self, start: float) -> bool:
+        header = self.header()
+        return not header['overflow'] and start >= header['covered_since']
+
+    def road_snapshot(self, road_id: int, start: float):
+        """Newest reading and (speed, volume, congestion) averages since ``start``.
+
+        Returns ``None`` when the store cannot answer exactly.
+        """
+        covered_since = self.header()['covered_since']
+        try:
+            result = self._road_snapshot(road_id, start, covered_since)
+        except _Contended:
+            result = None
+        self._count(result is not None)
+        return result
+
+    def _road_snapshot(self, road_id, start, covered_since):
+        if not self._covers(start):
+            return None
+        index = self._segment_map().get(road_id)
+        if index is None:
+            return None
+
+        def reader(records, evicted):
+            if not records.size or start <= evicted:
+                return None
+            newest = records[np.lexsort((records['id'], records['ts']))[-1]]
+            # Older readings left in SQL or evicted from the ring are not newer.
+            if newest['ts'] < covered_since or newest['ts'] < evicted:
+                return None
+            window = records[records['ts'] >= start]
+            latest = (
+                int(newest['id']), road_id, float(newest['ts']), _optional(newest['speed']),
+                None if newest['volume'] < 0 else int(newest['volume']),
+                STATUSES[newest['status']], _optional(newest['congestion']),
+            )
+            return latest, _averages(window)
+
+        return self._read(index, reader)
+
+    def window_summary(self, start: float, top: int = 5):
+        """Average speed, max volume and the ``top`` most congested roads since ``start``.
+
+        Returns ``None`` when any road's ring no longer holds the whole window.
+        """
+        try:
+            result = self._window_summary(start, top)
+        except _Contended:
+            result = None
+        self._count(result is not None)
+        return result
+
+    def _window_summary(self, start, top):
+        if not self._covers(start):
+            return None
+        speed_sum = speed_count = 0.0
+        max_volume = None
+        congestion = []
+        for road_id, index in list(self._segment_map().items()):
+            def reader(records, evicted):
+                if start <= evicted:
+                    return None
+                return records[records['ts'] >= start]
+
+            window = self._read(index, reader)
+            if window is None:
+                return None
+            if not window.size:
+                continue
+            speeds = window['speed'][~np.isnan(window['speed'])]
+            speed_sum += float(speeds.sum())
+            speed_count += speeds.size
+            volumes = window['volume'][window['volume'] >= 0]
+            if volumes.size:
+                max_volume = max(max_volume or 0, int(volumes.max()))
+            levels = window['congestion'][~np.isnan(window['congestion'])]
+            if levels.size:
+                congestion.append((road_id, float(levels.mean())))
+
+        congestion.sort(key=lambda item: item[1], reverse=True)
+        avg_speed = speed_sum / speed_count if speed_count else None
+        return avg_speed, max_volume, congestion[:top]
+
+    def _count(self, hit: bool) -> None:
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def stats(self) -> Dict:
+        header = self.header()
+        return {
+            'enabled': True,
+            'path': self.path,
+            'size_bytes': self.size,
+            'roads': header['roads_used'],
+            'max_roads': self.max_roads,
+            'slots': self.slots,
+            'overflow': bool(header['overflow']),
+            'covered_since': None if math.isinf(header['covered_since']) else
+            datetime.fromtimestamp(header['covered_since'], timezone.utc).isoformat(),
+            'hits': self.hits,
+            'misses': self.misses,
+            'reloads': self.reloads,
+        }
+
+    def close(self) -> None:
+        self._records = []
+        self._mm.close()
+        self._file.close()
+
+
+class _Contended(Exception):
+    """A segment kept changing while it was read."""
+
+
+def _averages(window) -> Tuple[Optional[float], Optional[float], Optional[float]]:
+    speeds = window['speed'][~np.isnan(window['speed'])]
+    volumes = window['volume'][window['volume'] >= 0]
+    levels = window['congestion'][~np.isnan(window['congestion'])]
+    return (
+        float(speeds.mean()) if speeds.size else None,
+        float(volumes.mean()) if volumes.size else None,
+        float(levels.mean()) if levels.size else None,
+    )
+
+
+# -- app integration --------------------------------------------------------
+
+class _StoreState:
+    def __init__(self, store: HotWindowStore):
+        self.store = store
+        self.lock = threading.Lock()
+        self.checked_at = 0.0
+        self.suspect = None
+
+
+_state_lock = threading.Lock()
+
+
+def _sql_fingerprint() -> Tuple[int, float]:
+    row = db.session.execute(
+        select(TrafficData.id, TrafficData.timestamp).order_by(TrafficData.id.desc()).limit(1)
+    ).first()
+    return (row[0], _epoch(row[1])) if row else (0, 0.0)
+
+
+def reload_hot_window(store: HotWindowStore, force: bool = True) -> None:
+    """Load the last ``HOT_WINDOW_HOURS`` of ``traffic_data`` into a reset store.
+
+    The file stays locked throughout; without ``force`` nothing is done if
+    another process brought the store up to date while this one waited.
+    """
+    hours = current_app.config['HOT_WINDOW_HOURS']
+    with store._locked():
+        last_id, last_ts = _sql_fingerprint()
+        header = store.header()
+        if not force and _in_sync(header, (last_id, last_ts)):
+            return
+        covered_since = datetime.now(timezone.utc) - timedelta(hours=hours)
+        store.reset(_epoch(covered_since), last_id, last_ts)
+        result = db.session.execute(
+            select(
+                TrafficData.id,
+                TrafficData.road_id,
+                TrafficData.timestamp,
+                cast(TrafficData.speed, Float),
+                TrafficData.volume,
+                TrafficData.status,
+                cast(TrafficData.congestion_level, Float),
+            )
+            .where(TrafficData.id <= last_id, TrafficData.timestamp >= covered_since)
+            .order_by(TrafficData.id)
+            .execution_options(yield_per=5000)
+        )
+        for chunk in result.partitions():
+            store.write_locked([
+                (reading_id, road_id, _epoch(timestamp), speed, volume, status, congestion)
+                for reading_id, road_id, timestamp, speed, volume, status, congestion in chunk
+            ])
+        store.publish()
+
+
+def _in_sync(header: Dict, fingerprint: Tuple[int, float]) -> bool:
+    return not math.isinf(header['covered_since']) and fingerprint == (header['last_id'], header['last_ts'])
+
+
+def _check_fingerprint(state: _StoreState) -> None:
+    """Reload when ``traffic_data`` changed behind the store's back.
+
+    A newer id that is still missing at the next check was written by someone
+    else; an older or different newest reading means the table was rewritten.
+    A store that was never loaded is loaded right away.
+    """
+    store = state.store
+    header = store.header()
+    current = _sql_fingerprint()
+    if _in_sync(header, current):
+        state.suspect = None
+        return
+    loaded = not math.isinf(header['covered_since'])
+    if loaded and current[0] > header['last_id'] and state.suspect != current:
+        state.suspect = current  # may be an ingestion between its commit and write
+        return
+    current_app.logger.info(
+        f"Reloading hot window: traffic_data {current} != store {(header['last_id'], header['last_ts'])}"
+    )
+    state.suspect = None
+    reload_hot_window(store, force=False)
+
+
+def get_hot_window() -> Optional[HotWindowStore]:
+    """The current app's store, opened on first use; ``None`` when disabled."""
+    app = current_app._get_current_object()
+    if not app.config['HOT_WINDOW_ENABLED']:
+        return None
+    with _state_lock:
+        state = app.extensions.get('hot_window')
+        if state is None:
+            store = HotWindowStore(
+                app.config['HOT_WINDOW_PATH'],
+                app.config['HOT_WINDOW_MAX_ROADS'],
+                app.config['HOT_WINDOW_SLOTS'],
+            )
+            state = app.extensions['hot_window'] = _StoreState(store)
+
+    now = time.monotonic()
+    if now - state.checked_at >= app.config['HOT_WINDOW_CHECK_INTERVAL']:
+        with state.lock:
+            if now - state.checked_at >= app.config['HOT_WINDOW_CHECK_INTERVAL']:
+                _check_fingerprint(state)
+                state.checked_at = time.monotonic()
+    return state.store
+
+
+def _as_reading(reading: Dict) -> Reading:
+    return (
+        reading['id'], reading['road_id'], _epoch(reading['timestamp']), reading.get('speed'),
+        reading.get('volume'), reading.get('status'), reading.get('congestion_level'),
+    )
+
+
+def record_readings(readings: Iterable[Dict]) -> None:
+    """Write committed readings (``id``, ``road_id``, ``timestamp``, ...) to the store."""
+    store = get_hot_window()
+    if store is not None:
+        store.write([_as_reading(reading) for reading in readings])
+
+
+def _open_store_state() -> Optional[_StoreState]:
+    if not has_app_context():
+        return None
+    return current_app.extensions.get('hot_window')
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_orm_readings(session, flush_context):
+    if _open_store_state() is None:
+        return
+    readings = [
+        {
+            'id': obj.id,
+            'road_id': obj.road_id,
+            'timestamp': obj.timestamp,
+            'speed': None if obj.speed is None else float(obj.speed),
+            'volume': obj.volume,
+            'status': obj.status,
+            'congestion_level': None if obj.congestion_level is None else float(obj.congestion_level),
+        }
+        for obj in session.new
+        if isinstance(obj, TrafficData)
+    ]
+    if readings:
+        session.info.setdefault('hot_window_readings', []).extend(readings)
+
+
+@event.listens_for(Session, 'after_commit')
+def _write_orm_readings(session):
+    # No SQL may run here, so skip get_hot_window()'s fingerprint check.
+    readings = session.info.pop('hot_window_readings', None)
+    state = _open_store_state()
+    if readings and state is not None:
+        state.store.write([_as_reading(reading) for reading in readings])
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_orm_readings(session):
+    session.info.pop('hot_window_readings', None)
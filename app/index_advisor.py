@@ -0,0 +1,148 @@
+"""
+Index advisor: EXPLAIN every query the service layer issues and flag plans
+that scan whole tables or sort through temporary B-trees.
+
+The workload calls the read service functions directly (bypassing their
+caches), captures the SQL they emit and re-runs each statement under
+``EXPLAIN QUERY PLAN`` (SQLite) or ``EXPLAIN`` (PostgreSQL).
+"""
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event, inspect, select
+
+from . import db
+from . import services
+from .models import Road
+
+# Reference tables small enough that a full scan is the right plan.
+SMALL_TABLES = frozenset({'roads', 'users'})
+
+
+@dataclass
+class QueryReport:
+    """EXPLAIN output and findings for one captured statement."""
+    source: str
+    statement: str
+    plan: List[str]
+    findings: List[str] = field(default_factory=list)
+
+
+def _uncached(func):
+    return getattr(func, 'uncached', func)
+
+
+def service_workload() -> List[Tuple[str, Callable[[], object]]]:
+    """Service calls exercised by the advisor, with representative arguments."""
+    road_id = db.session.scalar(select(Road.id).order_by(Road.id).limit(1)) or 1
+    now = datetime.now(timezone.utc)
+    return [
+        ('get_all_roads', _uncached(services.get_all_roads)),
+        ('get_latest_traffic', lambda: services.get_latest_traffic(10, 0)),
+        ('get_events(active)', lambda: services.get_events(limit=10, status='active')),
+        ('get_events(all)', lambda: services.get_events(limit=50, status='all')),
+        ('get_traffic_history', lambda: services.get_traffic_history(
+            road_id, now - timedelta(days=7), now)),
+        ('build_dashboard_summary', lambda: _uncached(services.build_dashboard_summary)()),
+        ('get_road_snapshot', lambda: services.get_road_snapshot(road_id)),
+        ('get_system_status', services.get_system_status),
+        ('get_weekly_report', services.get_weekly_report),
+        ('get_map_events', lambda: services.get_map_events(100)),
+    ]
+
+
+@contextmanager
+def capture_queries(engine):
+    """Collect ``(statement, parameters)`` for SELECTs executed on ``engine``."""
+    captured: List[Tuple[str, object]] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith('SELECT'):
+            captured.append((statement, parameters))
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield captured
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def explain(statement: str, parameters) -> List[str]:
+    """Return the plan lines for ``statement`` on the current connection."""
+    connection = db.session.connection()
+    dialect = connection.dialect.name
+    if dialect == 'sqlite':
+        rows = connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters).all()
+        return [row[-1] for row in rows]
+    if dialect == 'postgresql':
+        rows = connection.exec_driver_sql(f'EXPLAIN {statement}', parameters).all()
+        return [row[0] for row in rows]
+    raise ValueError(f"EXPLAIN is not supported for '{dialect}'.")
+
+
+def analyze_plan(plan: Sequence[str], small_tables=SMALL_TABLES) -> List[str]:
+    """Findings for full table scans and temporary B-tree sorts in ``plan``."""
+    findings = []
+    for line in plan:
+        detail = line.strip()
+        # SQLite: "SCAN traffic_data" (no index) vs "SCAN t USING COVERING INDEX ..."
+        if detail.startswith('SCAN ') and ' USING ' not in detail:
+            table = detail.split()[1]
+            # Subqueries (anon_1, "(subquery-1)") are scanned as they are produced.
+            if table not in small_tables and not table.startswith(('anon_', '(')):
+                findings.append(f'full scan of {table}')
+        elif 'USE TEMP B-TREE' in detail:
+            findings.append(detail.lower())
+        # PostgreSQL: "Seq Scan on traffic_data  (cost=...)"
+        elif 'Seq Scan on ' in detail:
+            table = detail.split('Seq Scan on ', 1)[1].split()[0]
+            if table not in small_tables:
+                findings.append(f'full scan of {table}')
+        elif detail.lstrip('-> ').startswith('Sort '):
+            findings.append('explicit sort')
+    return findings
+
+
+def run_advisor(workload: Optional[List[Tuple[str, Callable]]] = None) -> List[QueryReport]:
+    """Run the service workload and EXPLAIN every distinct captured query."""
+    if workload is None:
+        workload = service_workload()
+
+    reports: List[QueryReport] = []
+    seen = set()
+    for source, call in workload:
+        with capture_queries(db.engine) as captured:
+            call()
+        for statement, parameters in captured:
+            if statement in seen:
+                continue
+            seen.add(statement)
+            plan = explain(statement, parameters)
+            reports.append(QueryReport(source, statement, plan, analyze_plan(plan)))
+    db.session.rollback()
+    return reports
+
+
+def missing_indexes() -> List[db.Index]:
+    """Indexes declared on the models that do not exist in the database yet."""
+    inspector = inspect(db.session.connection())
+    missing = []
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        missing.extend(index for index in table.indexes if index.name not in existing)
+    return missing
+
+
+def apply_missing_indexes() -> Dict[str, str]:
+    """Create model-declared indexes missing from an existing database."""
+    created = {}
+    connection = db.session.connection()
+    for index in missing_indexes():
+        index.create(connection)
+        created[index.name] = index.table.name
+    db.session.commit()
+    return created
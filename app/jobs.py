@@ -0,0 +1,382 @@
+"""
+Background export jobs.
+
+Exports are built by a bounded thread pool instead of inside the request.
+Identical requests share one job, and finished files are kept on disk in an
+LRU cache bounded by ``EXPORT_JOB_CACHE_BYTES``. Finished and failed jobs are
+forgotten (and their files removed) ``EXPORT_JOB_TTL`` seconds after they end.
+
+Each job runs in the worker that accepted it, which publishes the job's state
+to the shared cache as it changes. Status polls and duplicate requests that
+reach another worker are answered from that state, and downloads are served
+there too when ``EXPORT_JOB_DIR`` is storage shared by all workers.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Dict, Optional, Tuple
+
+from flask import current_app
+from sqlalchemy import func, select
+
+from . import cache, db
+from .models import Event
+from .partitions import traffic_window
+from .services import _default_window, _parse_iso_datetime
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_FINISHED = 'finished'
+JOB_FAILED = 'failed'
+
+
+def _export():
+    """The export module, imported on first use (it loads pandas and pyarrow)."""
+    from . import export
+    return export
+
+
+def _traffic_window(params: Dict):
+    return _default_window(
+        _parse_iso_datetime(params.get('start')),
+        _parse_iso_datetime(params.get('end')),
+    )
+
+
+def _resolve_params(dataset: str, params: Dict) -> Dict:
+    """Pin a traffic job's default window to real dates, so it is part of the job key."""
+    if dataset != 'traffic':
+        return params
+    start, end = _traffic_window(params)
+    return {**params, 'start': start.isoformat(), 'end': end.isoformat()}
+
+
+def _count_traffic(params: Dict) -> int:
+    start, end = _traffic_window(params)
+    # Same inclusive window as the export writers.
+    readings = traffic_window(start, end + timedelta(microseconds=1), columns=('id',))
+    return db.session.scalar(select(func.count()).select_from(readings)) or 0
+
+
+def _count_events(params: Dict) -> int:
+    query = db.session.query(func.count(Event.id))
+    status = params.get('status')
+    if status and status != 'all':
+        query = query.filter(Event.status == status)
+    return query.scalar() or 0
+
+
+def _write_traffic_csv(output, params, on_batch):
+    return _export().write_traffic_csv(output, *_traffic_window(params), on_batch=on_batch)
+
+
+def _write_traffic_excel(output, params, on_batch):
+    return _export().write_traffic_excel(output, *_traffic_window(params), on_batch=on_batch)
+
+
+def _write_traffic_parquet(output, params, on_batch):
+    return _export().write_traffic_parquet(output, *_traffic_window(params), on_batch=on_batch)
+
+
+def _write_traffic_arrow(output, params, on_batch):
+    return _export().write_traffic_arrow(output, *_traffic_window(params), on_batch=on_batch)
+
+
+def _write_events_csv(output, params, on_batch):
+    return _export().write_events_csv(output, params.get('status'), on_batch=on_batch)
+
+
+def _write_events_parquet(output, params, on_batch):
+    return _export().write_events_parquet(output, params.get('status'), on_batch=on_batch)
+
+
+def _write_events_arrow(output, params, on_batch):
+    return _export().write_events_arrow(output, params.get('status'), on_batch=on_batch)
+
+
+# (dataset, format) -> (file extension, mimetype, row counter, writer)
+EXPORT_BUILDERS = {
+    ('traffic', 'csv'): ('csv', 'text/csv', _count_traffic, _write_traffic_csv),
+    ('traffic', 'excel'): (
+        'xlsx',
+        'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        _count_traffic,
+        _write_traffic_excel,
+    ),
+    ('traffic', 'parquet'): ('parquet', 'application/vnd.apache.parquet', _count_traffic, _write_traffic_parquet),
+    ('traffic', 'arrow'): ('arrows', 'application/vnd.apache.arrow.stream', _count_traffic, _write_traffic_arrow),
+    ('events', 'csv'): ('csv', 'text/csv', _count_events, _write_events_csv),
+    ('events', 'parquet'): ('parquet', 'application/vnd.apache.parquet', _count_events, _write_events_parquet),
+    ('events', 'arrow'): ('arrows', 'application/vnd.apache.arrow.stream', _count_events, _write_events_arrow),
+}
+
+
+def _state_key(job_id: str) -> str:
+    return f'export_job:{job_id}'
+
+
+def _owner_key(key: str) -> str:
+    return f'export_job_key:{key}'
+
+
+def job_key(dataset: str, fmt: str, params: Dict) -> str:
+    """Stable key identifying requests that would produce the same file."""
+    canonical = json.dumps([dataset, fmt, params], sort_keys=True, default=str)
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()
+
+
+class ExportJob:
+    """State of a single background export."""
+
+    def __init__(self, key: str, dataset: str, fmt: str, params: Dict):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.dataset = dataset
+        self.format = fmt
+        self.params = params
+        self.status = JOB_QUEUED
+        self.rows_written = 0
+        self.total_rows: Optional[int] = None
+        self.path: Optional[str] = None
+        self.size = 0
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.future = None
+
+    @property
+    def extension(self) -> str:
+        return EXPORT_BUILDERS[(self.dataset, self.format)][0]
+
+    @property
+    def mimetype(self) -> str:
+        return EXPORT_BUILDERS[(self.dataset, self.format)][1]
+
+    @property
+    def download_name(self) -> str:
+        return f'{self.dataset}_export_{self.id[:8]}.{self.extension}'
+
+    @property
+    def progress(self) -> float:
+        if self.status == JOB_FINISHED:
+            return 1.0
+        if not self.total_rows:
+            return 0.0
+        return min(1.0, self.rows_written / self.total_rows)
+
+    def to_dict(self) -> Dict:
+        return {
+            'id': self.id,
+            'dataset': self.dataset,
+            'format': self.format,
+            'params': self.params,
+            'status': self.status,
+            'progress': round(self.progress, 4),
+            'rows_written': self.rows_written,
+            'total_rows': self.total_rows,
+            'size': self.size,
+            'error': self.error,
+            'created_at': self.created_at,
+            'finished_at': self.finished_at,
+        }
+
+    def to_state(self) -> Dict:
+        """What other workers need to report on and serve this job."""
+        return {**self.to_dict(), 'key': self.key, 'path': self.path}
+
+    @classmethod
+    def from_state(cls, state: Dict) -> 'ExportJob':
+        """Read-only copy of a job running or finished in another worker."""
+        job = cls(state['key'], state['dataset'], state['format'], state['params'])
+        for name in ('id', 'status', 'rows_written', 'total_rows', 'size', 'error',
+                     'created_at', 'finished_at', 'path'):
+            setattr(job, name, state[name])
+        return job
+
+
+class ExportJobManager:
+    """Queues export jobs on a thread pool and manages their artifacts."""
+
+    def __init__(self, app):
+        self.app = app
+        self.directory = app.config['EXPORT_JOB_DIR']
+        self.max_bytes = app.config['EXPORT_JOB_CACHE_BYTES']
+        self.ttl = app.config['EXPORT_JOB_TTL']
+        self._executor = ThreadPoolExecutor(
+            max_workers=app.config['EXPORT_JOB_WORKERS'],
+            thread_name_prefix='export-job',
+        )
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, ExportJob] = {}
+        self._by_key: Dict[str, ExportJob] = {}
+        # Finished jobs in least-recently-used order
+        self._artifacts: 'OrderedDict[str, ExportJob]' = OrderedDict()
+        self._cached_bytes = 0
+        os.makedirs(self.directory, exist_ok=True)
+
+    def submit(self, dataset: str, fmt: str, params: Dict) -> Tuple[ExportJob, bool]:
+        """Queue an export, or return the matching job already queued or cached.
+
+        Jobs of other workers are found through the shared cache. Returns
+        ``(job, deduplicated)``.
+        """
+        params = _resolve_params(dataset, params)
+        key = job_key(dataset, fmt, params)
+        with self._lock:
+            self._prune()
+            existing = self._by_key.get(key)
+            if existing is not None and self._reusable(existing):
+                if existing.status == JOB_FINISHED:
+                    self._artifacts.move_to_end(existing.id)
+                return existing, True
+
+        shared = self._shared(cache.get(_owner_key(key)))
+        if shared is not None and shared.key == key and self._reusable(shared):
+            return shared, True
+
+        job = ExportJob(key, dataset, fmt, params)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._by_key[key] = job
+        self._publish(job)
+        cache.set(_owner_key(key), job.id, timeout=self.ttl)
+        job.future = self._executor.submit(self._run, job)
+        return job, False
+
+    def get(self, job_id: str) -> Optional[ExportJob]:
+        """A job of this worker, or a copy of one from another worker's shared state."""
+        with self._lock:
+            self._prune()
+            job = self._jobs.get(job_id)
+        return job or self._shared(job_id)
+
+    def touch(self, job: ExportJob) -> None:
+        """Mark a finished artifact as recently used."""
+        with self._lock:
+            if job.id in self._artifacts:
+                self._artifacts.move_to_end(job.id)
+
+    def cache_stats(self) -> Dict:
+        with self._lock:
+            return {
+                'artifacts': len(self._artifacts),
+                'bytes': self._cached_bytes,
+                'max_bytes': self.max_bytes,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+    def _reusable(self, job: ExportJob) -> bool:
+        if job.status in (JOB_QUEUED, JOB_RUNNING):
+            return True
+        if job.status == JOB_FINISHED:
+            if job.id in self._jobs:
+                stored = job.id in self._artifacts
+            else:
+                stored = bool(job.path) and os.path.exists(job.path)
+            return time.time() - job.finished_at < self.ttl and stored
+        return False
+
+    def _publish(self, job: ExportJob) -> None:
+        """Share the job's current state with the other workers for ``ttl`` seconds."""
+        cache.set(_state_key(job.id), job.to_state(), timeout=self.ttl)
+
+    def _shared(self, job_id: Optional[str]) -> Optional[ExportJob]:
+        state = cache.get(_state_key(job_id)) if job_id else None
+        return ExportJob.from_state(state) if state else None
+
+    def _run(self, job: ExportJob) -> None:
+        _, _, count_rows, write = EXPORT_BUILDERS[(job.dataset, job.format)]
+        final_path = os.path.join(self.directory, f'{job.id}.{job.extension}')
+        partial_path = final_path + '.part'
+
+        def on_batch(rows: int) -> None:
+            job.rows_written += rows
+            self._publish(job)
+
+        with self.app.app_context():
+            job.status = JOB_RUNNING
+            try:
+                job.total_rows = count_rows(job.params)
+                self._publish(job)
+                with open(partial_path, 'wb') as output:
+                    job.rows_written = write(output, job.params, on_batch)
+                os.replace(partial_path, final_path)
+            except Exception as exc:
+                self.app.logger.error(f'Export job {job.id} failed: {exc}', exc_info=True)
+                job.status = JOB_FAILED
+                job.error = str(exc)
+                job.finished_at = time.time()
+                self._publish(job)
+                if os.path.exists(partial_path):
+                    os.remove(partial_path)
+                return
+            finally:
+                db.session.remove()
+
+            with self._lock:
+                job.path = final_path
+                job.size = os.path.getsize(final_path)
+                job.finished_at = time.time()
+                job.status = JOB_FINISHED
+                self._artifacts[job.id] = job
+                self._cached_bytes += job.size
+                self._evict()
+            self._publish(job)
+        self.app.logger.info(f'Export job {job.id} finished: {job.rows_written} rows, {job.size} bytes')
+
+    def _evict(self) -> None:
+        """Drop least-recently-used artifacts until the cache fits its budget.
+
+        The most recent artifact is always kept so a single oversized export
+        can still be downloaded. Caller holds ``self._lock``.
+        """
+        while self._cached_bytes > self.max_bytes and len(self._artifacts) > 1:
+            self._drop(next(iter(self._artifacts.values())))
+
+    def _prune(self) -> None:
+        """Drop finished and failed jobs that ended over ``ttl`` seconds ago.
+
+        Caller holds ``self._lock``.
+        """
+        cutoff = time.time() - self.ttl
+        expired = [
+            job for job in self._jobs.values()
+            if job.status in (JOB_FINISHED, JOB_FAILED) and job.finished_at < cutoff
+        ]
+        for job in expired:
+            self._drop(job)
+
+    def _drop(self, job: ExportJob) -> None:
+        """Forget a job and delete its artifact. Caller holds ``self._lock``."""
+        if self._artifacts.pop(job.id, None) is not None:
+            self._cached_bytes -= job.size
+        self._jobs.pop(job.id, None)
+        if self._by_key.get(job.key) is job:
+            del self._by_key[job.key]
+        if job.path and os.path.exists(job.path):
+            os.remove(job.path)
+        cache.delete(_state_key(job.id))
+        if cache.get(_owner_key(job.key)) == job.id:
+            cache.delete(_owner_key(job.key))
+
+
+_manager_lock = threading.Lock()
+
+
+def get_export_job_manager() -> ExportJobManager:
+    """Return the export job manager for the current app, creating it on first use."""
+    app = current_app._get_current_object()
+    with _manager_lock:
+        manager = app.extensions.get('export_jobs')
+        if manager is None:
+            manager = ExportJobManager(app)
+            app.extensions['export_jobs'] = manager
+    return manager
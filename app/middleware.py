@@ -0,0 +1,162 @@
+"""
+Response-layer middleware: ETag conditional GETs and response compression.
+
+The ASGI read endpoints (``app/asgi.py``) bypass Flask and apply the same
+rules through :func:`scoped_etag` and :func:`compress_body`.
+"""
+import gzip
+import hashlib
+import uuid
+from functools import wraps
+from typing import Optional, Tuple
+
+from flask import current_app, make_response, request
+
+from . import cache
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+_COMPRESSIBLE_MIMETYPES = ('application/json', 'text/csv', 'text/html', 'text/css', 'application/javascript')
+
+
+def _zstd_compress(data: bytes) -> bytes:
+    return zstandard.ZstdCompressor(level=current_app.config['COMPRESS_ZSTD_LEVEL']).compress(data)
+
+
+def _brotli_compress(data: bytes) -> bytes:
+    return brotli.compress(data, quality=current_app.config['COMPRESS_BROTLI_LEVEL'])
+
+
+def _gzip_compress(data: bytes) -> bytes:
+    return gzip.compress(data, compresslevel=current_app.config['COMPRESS_GZIP_LEVEL'], mtime=0)
+
+
+def _available_encoders():
+    """Encoders in server preference order, skipping missing optional libraries."""
+    encoders = []
+    if zstandard is not None:
+        encoders.append(('zstd', _zstd_compress))
+    if brotli is not None:
+        encoders.append(('br', _brotli_compress))
+    encoders.append(('gzip', _gzip_compress))
+    return encoders
+
+
+def _select_encoder(accepted=None):
+    """Best encoder for ``accepted`` (the current request's Accept-Encoding by default)."""
+    if accepted is None:
+        accepted = request.accept_encodings
+    best = None
+    for name, encoder in _available_encoders():
+        quality = accepted.quality(name)
+        if quality > 0 and (best is None or quality > best[0]):
+            best = (quality, name, encoder)
+    return best[1:] if best else (None, None)
+
+
+def etag_version(scope: str) -> str:
+    """Return the current version token for a data scope.
+
+    Tokens live in the shared cache with ``ETAG_VERSION_TIMEOUT`` so writes that
+    bypass :func:`bump_etag_version` can only be hidden for that long.
+    """
+    key = f'etag_version:{scope}'
+    token = cache.get(key)
+    if token is None:
+        token = uuid.uuid4().hex[:12]
+        cache.set(key, token, timeout=current_app.config['ETAG_VERSION_TIMEOUT'])
+    return token
+
+
+def bump_etag_version(*scopes: str) -> None:
+    """Invalidate version-based ETags after a write to the given scopes."""
+    for scope in scopes:
+        cache.delete(f'etag_version:{scope}')
+
+
+def scoped_etag(scopes, full_path: str) -> str:
+    """ETag for ``full_path`` (path and query) from the current versions of ``scopes``."""
+    versions = '-'.join(etag_version(scope) for scope in scopes)
+    digest = hashlib.sha1(f'{versions}:{full_path}'.encode('utf-8')).hexdigest()[:20]
+    return f'v-{digest}'
+
+
+def compress_body(data: bytes, mimetype: str, accepted) -> Tuple[bytes, Optional[str]]:
+    """Compress ``data`` under the same rules as Flask responses.
+
+    Returns the body and its ``Content-Encoding`` (``None`` if left as-is).
+    """
+    if mimetype not in _COMPRESSIBLE_MIMETYPES or len(data) < current_app.config['COMPRESS_MIN_SIZE']:
+        return data, None
+    encoding, encoder = _select_encoder(accepted)
+    if encoding is None:
+        return data, None
+    return encoder(data), encoding
+
+
+def versioned_etag(*scopes: str):
+    """Answer If-None-Match from data-scope versions before running the view.
+
+    Unchanged polls return 304 without querying or serializing anything.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            etag = scoped_etag(scopes, request.full_path)
+            if request.method == 'GET' and request.if_none_match.contains_weak(etag):
+                response = current_app.response_class(status=304)
+                response.set_etag(etag, weak=True)
+                return response
+
+            response = make_response(view(*args, **kwargs))
+            if request.method == 'GET' and response.status_code == 200:
+                response.set_etag(etag, weak=True)
+            return response
+        return wrapper
+    return decorator
+
+
+def register_response_middleware(app):
+    """Register ETag and compression handling for outgoing responses."""
+
+    @app.after_request
+    def conditional_and_compress(response):
+        if (
+            request.method not in ('GET', 'HEAD')
+            or response.status_code != 200
+            or response.direct_passthrough
+            or response.is_streamed
+        ):
+            return response
+
+        if response.mimetype == 'application/json':
+            if 'ETag' not in response.headers:
+                response.add_etag(weak=True)
+            response.make_conditional(request)
+            if response.status_code == 304:
+                return response
+
+        if (
+            response.mimetype not in _COMPRESSIBLE_MIMETYPES
+            or 'Content-Encoding' in response.headers
+            or response.content_length is None
+            or response.content_length < app.config['COMPRESS_MIN_SIZE']
+        ):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding, encoder = _select_encoder()
+        if encoding is None:
+            return response
+
+        response.set_data(encoder(response.get_data()))
+        response.headers['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,253 @@
+"""
+Online-safe schema operations for Alembic revisions.
+
+Large tables such as ``traffic_data`` take continuous writes, so revisions use
+these helpers instead of the plain ``op`` calls:
+
+* :func:`create_index_online` builds indexes with ``CREATE INDEX CONCURRENTLY``
+  on PostgreSQL (no write lock) and ``IF NOT EXISTS`` everywhere.
+* :func:`add_column_online` adds a column as nullable, fills it with
+  :func:`batched_backfill` and only then applies ``NOT NULL`` (on PostgreSQL
+  through a validated ``CHECK`` constraint, so no step scans the table under
+  an exclusive lock).
+* :func:`batched_backfill` updates rows in primary-key ranges, committing and
+  pausing between batches and reporting progress, and sweeps again until
+  rows inserted meanwhile are filled too.
+
+Batch size and pause default to ``MIGRATION_BATCH_SIZE`` /
+``MIGRATION_BATCH_PAUSE`` when an app context is active.
+"""
+import logging
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional, Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from flask import current_app, has_app_context
+
+logger = logging.getLogger('alembic.online')
+
+DEFAULT_BATCH_SIZE = 5000
+DEFAULT_BATCH_PAUSE = 0.05
+
+
+def _setting(name: str, default):
+    if has_app_context():
+        return current_app.config.get(name, default)
+    return default
+
+
+def _dialect() -> str:
+    return op.get_bind().dialect.name
+
+
+@contextmanager
+def _batch_commits():
+    """Yield a ``commit()`` callable that ends each backfill batch's transaction.
+
+    With transactional DDL (PostgreSQL) the batches run in an autocommit
+    block. Elsewhere Alembic does not own a transaction and the connection's
+    implicit one is committed directly.
+    """
+    context = op.get_context()
+    if context.impl.transactional_ddl:
+        with context.autocommit_block():
+            yield lambda: None
+        return
+
+    bind = op.get_bind()
+
+    def commit():
+        if bind.in_transaction():
+            bind.commit()
+
+    yield commit
+
+
+def _drop_invalid_pg_index(name: str) -> None:
+    """Drop a leftover INVALID index from an interrupted concurrent build."""
+    invalid = op.get_bind().execute(
+        sa.text(
+            'SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid '
+            'WHERE c.relname = :name AND NOT i.indisvalid'
+        ),
+        {'name': name},
+    ).first()
+    if invalid:
+        logger.warning('Dropping invalid index %s left by an earlier build', name)
+        op.drop_index(name, postgresql_concurrently=True, if_exists=True)
+
+
+def create_index_online(
+    name: str, table: str, columns: Sequence[str], unique: bool = False, **kwargs
+) -> None:
+    """Create an index without blocking writes where the database allows it.
+
+    ``kwargs`` are passed to ``op.create_index`` (e.g. ``postgresql_where`` /
+    ``sqlite_where`` for partial indexes).
+    """
+    started = time.monotonic()
+    logger.info('Building index %s on %s (%s)', name, table, ', '.join(columns))
+    if _dialect() == 'postgresql':
+        # CONCURRENTLY cannot run inside a transaction block.
+        with op.get_context().autocommit_block():
+            _drop_invalid_pg_index(name)
+            op.create_index(
+                name, table, list(columns), unique=unique,
+                postgresql_concurrently=True, if_not_exists=True, **kwargs
+            )
+    else:
+        op.create_index(name, table, list(columns), unique=unique, if_not_exists=True, **kwargs)
+    logger.info('Built index %s in %.1fs', name, time.monotonic() - started)
+
+
+def drop_index_online(name: str, table: str) -> None:
+    if _dialect() == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+    else:
+        op.drop_index(name, table_name=table, if_exists=True)
+
+
+def batched_backfill(
+    table: str,
+    column: str,
+    value: str,
+    where: Optional[str] = None,
+    key: str = 'id',
+    batch_size: Optional[int] = None,
+    pause: Optional[float] = None,
+    report: Optional[Callable[[int, int], None]] = None,
+) -> int:
+    """Set ``column = value`` (a SQL expression) in primary-key batches.
+
+    Only rows where ``column IS NULL`` (and ``where``, if given) are touched,
+    so an interrupted backfill resumes where it stopped. Each batch commits on
+    its own and is followed by ``pause`` seconds so ingestion keeps up. Rows
+    inserted while a sweep runs are picked up by another sweep over the keys
+    still pending; it stops once none are left or a sweep fills nothing
+    (``value`` is NULL for the rest). ``report(done, total)`` is called after
+    every batch; by default progress is logged. Returns the number of rows
+    updated.
+    """
+    batch_size = batch_size or _setting('MIGRATION_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+    pause = _setting('MIGRATION_BATCH_PAUSE', DEFAULT_BATCH_PAUSE) if pause is None else pause
+
+    bind = op.get_bind()
+    target = sa.table(table, sa.column(key), sa.column(column))
+    pending = target.c[column].is_(None)
+    if where:
+        pending = sa.and_(pending, sa.text(where))
+
+    if report is None:
+        started = time.monotonic()
+
+        def report(done, total):
+            elapsed = time.monotonic() - started
+            rate = done / elapsed if elapsed else 0
+            logger.info(
+                'Backfill %s.%s: %d/%d rows (%.0f%%, %.0f rows/s)',
+                table, column, done, total, 100.0 * done / total, rate
+            )
+
+    done = 0
+    with _batch_commits() as commit:
+        while True:
+            low, high, remaining = bind.execute(
+                sa.select(sa.func.min(target.c[key]), sa.func.max(target.c[key]), sa.func.count())
+                .where(pending)
+            ).first()
+            commit()
+            if not remaining:
+                break
+            total = done + remaining
+            swept = done
+            for start in range(low, high + 1, batch_size):
+                result = bind.execute(
+                    sa.update(target)
+                    .where(target.c[key] >= start, target.c[key] < min(start + batch_size, high + 1), pending)
+                    .values({column: sa.text(value)})
+                )
+                commit()
+                if result.rowcount:
+                    done += result.rowcount
+                    report(done, total)
+                    if pause:
+                        time.sleep(pause)
+            if done == swept:
+                break
+    return done
+
+
+def _set_not_null_postgresql(
+    table: str, column: sa.Column, backfill: Optional[str] = None, **backfill_kwargs
+) -> int:
+    """``SET NOT NULL`` without scanning the table under ACCESS EXCLUSIVE.
+
+    A ``NOT VALID`` check constraint is added (brief lock, no scan), so rows
+    written from then on must carry a value. Rows inserted NULL before it are
+    filled by one more ``backfill`` sweep; then the constraint is validated
+    under SHARE UPDATE EXCLUSIVE (writes continue), after which PostgreSQL 12+
+    proves ``SET NOT NULL`` from the constraint instead of a scan. Each step
+    commits on its own so no lock is held across them. Returns the number of
+    rows the catch-up sweep filled.
+    """
+    quote = op.get_bind().dialect.identifier_preparer.quote
+    constraint = quote(f'ck_{table}_{column.name}_not_null')
+    table_name, column_name = quote(table), quote(column.name)
+    with op.get_context().autocommit_block():
+        op.execute(
+            f'ALTER TABLE {table_name} ADD CONSTRAINT {constraint} '
+            f'CHECK ({column_name} IS NOT NULL) NOT VALID'
+        )
+    filled = 0
+    if backfill is not None:
+        filled = batched_backfill(table, column.name, backfill, **backfill_kwargs)
+    with op.get_context().autocommit_block():
+        op.execute(f'ALTER TABLE {table_name} VALIDATE CONSTRAINT {constraint}')
+        op.execute(f'ALTER TABLE {table_name} ALTER COLUMN {column_name} SET NOT NULL')
+        op.execute(f'ALTER TABLE {table_name} DROP CONSTRAINT {constraint}')
+    return filled
+
+
+def add_column_online(
+    table: str,
+    column: sa.Column,
+    backfill: Optional[str] = None,
+    **backfill_kwargs,
+) -> int:
+    """Add ``column`` without a table rewrite, backfill it, then enforce NOT NULL.
+
+    The column is added nullable and without a server default (a cheap
+    catalog-only change); ``backfill`` is a SQL expression applied with
+    :func:`batched_backfill`. On PostgreSQL the server default is set before
+    the backfill (also catalog-only), so rows inserted meanwhile get it, and
+    ``NOT NULL`` is applied through :func:`_set_not_null_postgresql`.
+    Other backends use a plain column alter, which SQLite performs by rebuilding
+    the table, so it is not online there. Foreign keys and other constraints
+    are not copied; add them in a separate step. Returns the number of
+    backfilled rows.
+    """
+    nullable = column.nullable
+    op.add_column(table, sa.Column(column.name, column.type, nullable=True))
+    postgresql = _dialect() == 'postgresql'
+    if postgresql and column.server_default is not None:
+        op.alter_column(table, column.name, server_default=column.server_default.arg)
+
+    filled = 0
+    if backfill is not None:
+        filled = batched_backfill(table, column.name, backfill, **backfill_kwargs)
+
+    if postgresql:
+        if not nullable:
+            filled += _set_not_null_postgresql(table, column, backfill, **backfill_kwargs)
+    elif not nullable or column.server_default is not None:
+        with op.batch_alter_table(table) as batch:
+            batch.alter_column(
+                column.name,
+                existing_type=column.type,
+                nullable=nullable,
+                server_default=column.server_default.arg if column.server_default is not None else None,
+            )
+    return filled
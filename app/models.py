@@ -1,5 +1,8 @@
 from datetime import datetime, timezone
+from typing import Optional
+
 import bcrypt
+from flask import current_app, has_app_context
 
 from . import db
 
@@ -17,10 +20,16 @@ class User(db.Model):
     status = db.Column(db.Integer, default=1)
     events = db.relationship('Event', backref='reporter', lazy='dynamic')
 
-    def set_password(self, password: str) -> None:
-        """Hash and set user password using bcrypt."""
+    def set_password(self, password: str, rounds: Optional[int] = None) -> None:
+        """Hash and set user password using bcrypt.
+
+        The cost factor defaults to ``AUTH_BCRYPT_ROUNDS`` when an app context
+        is active.
+        """
+        if rounds is None and has_app_context():
+            rounds = current_app.config.get('AUTH_BCRYPT_ROUNDS')
         password_bytes = password.encode('utf-8')
-        salt = bcrypt.gensalt()
+        salt = bcrypt.gensalt(rounds=rounds) if rounds else bcrypt.gensalt()
         hashed = bcrypt.hashpw(password_bytes, salt)
         self.password_hash = hashed.decode('utf-8')
         self.salt = salt.decode('utf-8')  # Store salt separately for reference
@@ -59,6 +68,12 @@ class TrafficData(db.Model):
         db.Index('idx_status_timestamp', 'status', 'timestamp'),
         # Index for congestion analysis
         db.Index('idx_congestion_timestamp', 'congestion_level', 'timestamp'),
+        # Covering index for time-window aggregates (dashboard summary, congestion
+        # ranking, weekly report): answered from the index without table lookups
+        db.Index(
+            'idx_traffic_window_cover',
+            'timestamp', 'road_id', 'congestion_level', 'speed', 'volume'
+        ),
     )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
@@ -78,6 +93,15 @@ class Event(db.Model):
         db.Index('idx_event_status_timestamp', 'status', 'timestamp'),
         # Index for severity-based queries
         db.Index('idx_event_severity', 'severity', 'timestamp'),
+        # Index for unfiltered time-ordered listings and window counts
+        db.Index('idx_event_timestamp', 'timestamp'),
+        # Partial index for the map: only events with a position
+        db.Index(
+            'idx_event_map_timestamp',
+            'timestamp',
+            sqlite_where=db.text('position IS NOT NULL'),
+            postgresql_where=db.text('position IS NOT NULL')
+        ),
     )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
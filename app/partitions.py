@@ -0,0 +1,224 @@
+"""
+Monthly time partitioning for traffic data.
+
+``traffic_data`` stays the hot table that ingestion writes to. Readings older
+than the hot window are moved into per-month tables (``traffic_data_YYYYMM``)
+that live behind a small routing layer, and partitions past the retention
+period are archived to compressed Parquet files and dropped.
+"""
+import os
+import re
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from flask import current_app
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    DateTime,
+    Index,
+    Integer,
+    MetaData,
+    Numeric,
+    String,
+    Table,
+    cast,
+    func,
+    inspect,
+    select,
+    union_all,
+)
+
+from . import db
+from .models import TrafficData
+
+PARTITION_PREFIX = 'traffic_data_'
+_PARTITION_RE = re.compile(r'^traffic_data_(\d{4})(\d{2})$')
+_TRAFFIC_COLUMNS = ('id', 'road_id', 'timestamp', 'speed', 'volume', 'status', 'congestion_level')
+
+# Partition tables are kept out of db.metadata so create_all()/drop_all() leave them alone.
+_partition_metadata = MetaData()
+
+
+def month_start(dt: datetime) -> datetime:
+    """Return the first instant of the month containing ``dt`` (UTC)."""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    dt = dt.astimezone(timezone.utc)
+    return dt.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(dt: datetime, months: int) -> datetime:
+    """Shift a month-aligned datetime by ``months`` (may be negative)."""
+    index = dt.year * 12 + (dt.month - 1) + months
+    return dt.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(dt: datetime) -> str:
+    month = month_start(dt)
+    return f'{PARTITION_PREFIX}{month.year:04d}{month.month:02d}'
+
+
+def partition_table(name: str) -> Table:
+    """Return the Table for a partition, defining it on first use."""
+    if name in _partition_metadata.tables:
+        return _partition_metadata.tables[name]
+    return Table(
+        name,
+        _partition_metadata,
+        Column('id', Integer, primary_key=True, autoincrement=False),
+        Column('road_id', Integer, nullable=False),
+        Column('timestamp', DateTime, nullable=False),
+        Column('speed', Numeric(6, 2)),
+        Column('volume', Integer),
+        Column('status', String(20)),
+        Column('congestion_level', Numeric(3, 2)),
+        Index(f'idx_{name}_road_timestamp', 'road_id', 'timestamp'),
+    )
+
+
+def list_partitions() -> List[Tuple[datetime, str]]:
+    """List existing partitions as ``(month_start, table_name)``, oldest first."""
+    partitions = []
+    for name in inspect(db.session.connection()).get_table_names():
+        match = _PARTITION_RE.match(name)
+        if match:
+            year, month = int(match.group(1)), int(match.group(2))
+            partitions.append((datetime(year, month, 1, tzinfo=timezone.utc), name))
+    return sorted(partitions)
+
+
+def hot_cutoff(now: Optional[datetime] = None) -> datetime:
+    """Start of the hot window; older readings belong in monthly partitions."""
+    now = now or datetime.now(timezone.utc)
+    return add_months(month_start(now), -current_app.config['TRAFFIC_HOT_MONTHS'])
+
+
+def partitions_for_window(start: datetime, end: datetime) -> List[str]:
+    """Names of the partitions whose month overlaps ``[start, end]``."""
+    first = month_start(start)
+    return [
+        name for month, name in list_partitions()
+        if first <= month <= end
+    ]
+
+
+def fetch_partitioned_traffic(road_id: int, start: datetime, end: datetime) -> List:
+    """Read a road's archived readings from the partitions overlapping the window."""
+    rows = []
+    for name in partitions_for_window(start, end):
+        table = partition_table(name)
+        rows.extend(
+            db.session.execute(
+                select(*[table.c[col] for col in _TRAFFIC_COLUMNS])
+                .where(table.c.road_id == road_id, table.c.timestamp.between(start, end))
+                .order_by(table.c.timestamp.asc())
+            ).all()
+        )
+    return rows
+
+
+def traffic_window(start: datetime, end: datetime, columns=_TRAFFIC_COLUMNS):
+    """Subquery over all readings in ``[start, end)``, hot table plus partitions.
+
+    Partitions are only consulted when the window reaches past the hot cutoff.
+    """
+    tables = [TrafficData.__table__]
+    if start < hot_cutoff():
+        tables.extend(partition_table(name) for name in partitions_for_window(start, end))
+    selects = [
+        select(*[table.c[col] for col in columns])
+        .where(table.c.timestamp >= start, table.c.timestamp < end)
+        for table in tables
+    ]
+    return (union_all(*selects) if len(selects) > 1 else selects[0]).subquery()
+
+
+def epoch_seconds(column, dialect: str):
+    """SQL expression for a naive-UTC timestamp column as whole Unix seconds."""
+    if dialect == 'sqlite':
+        return cast(func.strftime('%s', column), BigInteger)
+    return cast(func.floor(func.extract('epoch', column)), BigInteger)
+
+
+def rotate_partitions(now: Optional[datetime] = None) -> Dict[str, int]:
+    """Move readings older than the hot window into their monthly partitions.
+
+    Each month is copied and deleted in its own transaction, so an interrupted
+    run leaves every reading in exactly one table.
+    """
+    cutoff = hot_cutoff(now)
+    source = TrafficData.__table__
+    moved = {}
+    while True:
+        # Rows are deleted as they move, so the oldest remaining reading
+        # always names the next month to rotate (empty months are skipped).
+        oldest = db.session.query(func.min(TrafficData.timestamp)).scalar()
+        if oldest is None or month_start(oldest) >= cutoff:
+            break
+        month = month_start(oldest)
+        next_month = add_months(month, 1)
+        window = (source.c.timestamp >= month) & (source.c.timestamp < next_month)
+        name = partition_name(month)
+        table = partition_table(name)
+        table.create(db.session.connection(), checkfirst=True)
+
+        result = db.session.execute(
+            table.insert().from_select(
+                list(_TRAFFIC_COLUMNS),
+                select(*[source.c[col] for col in _TRAFFIC_COLUMNS]).where(window),
+            )
+        )
+        db.session.execute(source.delete().where(window))
+        db.session.commit()
+        moved[name] = result.rowcount
+        current_app.logger.info(f'Moved {result.rowcount} traffic rows into {name}')
+    return moved
+
+
+def archive_partitions(now: Optional[datetime] = None) -> List[str]:
+    """Archive partitions past the retention period to Parquet and drop them.
+
+    Returns the paths of the written archive files.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise RuntimeError('pyarrow is required to archive traffic partitions') from exc
+
+    now = now or datetime.now(timezone.utc)
+    retention_start = add_months(month_start(now), -current_app.config['TRAFFIC_RETENTION_MONTHS'])
+    archive_dir = current_app.config['TRAFFIC_ARCHIVE_DIR']
+    os.makedirs(archive_dir, exist_ok=True)
+
+    schema = pa.schema([
+        ('id', pa.int64()),
+        ('road_id', pa.int32()),
+        ('timestamp', pa.timestamp('us', tz='UTC')),
+        ('speed', pa.decimal128(6, 2)),
+        ('volume', pa.int32()),
+        ('status', pa.dictionary(pa.int8(), pa.string())),
+        ('congestion_level', pa.decimal128(3, 2)),
+    ])
+
+    written = []
+    for month, name in list_partitions():
+        if month >= retention_start:
+            continue
+        table = partition_table(name)
+        rows = db.session.execute(select(table).order_by(table.c.timestamp.asc())).all()
+        columns = {col: [getattr(row, col) for row in rows] for col in _TRAFFIC_COLUMNS}
+        columns['timestamp'] = [
+            ts.replace(tzinfo=timezone.utc) if ts.tzinfo is None else ts
+            for ts in columns['timestamp']
+        ]
+
+        path = os.path.join(archive_dir, f'{name}.parquet')
+        pq.write_table(pa.table(columns, schema=schema), path, compression='zstd')
+        table.drop(db.session.connection())
+        db.session.commit()
+        _partition_metadata.remove(table)
+        written.append(path)
+        current_app.logger.info(f'Archived {len(rows)} traffic rows from {name} to {path}')
+    return written
@@ -0,0 +1,380 @@
+"""
+Historical traffic playback.
+
+A replay loads every reading of one time window (hot table and partitions)
+into a :class:`ReplayFrame`: parallel NumPy columns sorted by timestamp,
+about 24 bytes per reading instead of an ORM object each. A background task
+then walks the frame at ``speed`` times real time and emits the readings
+through the existing Socket.IO ``road_{id}`` rooms as ``road_update`` messages
+tagged with the replay id. Sessions can be paused, resumed, re-timed and
+seeked while they run. Finished, stopped and paused sessions that nobody has
+touched for ``REPLAY_IDLE_TTL`` seconds are unloaded, and finished or stopped
+ones make room for a new replay when all ``REPLAY_MAX_SESSIONS`` slots are taken.
+"""
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+from flask import current_app
+from sqlalchemy import Float, Integer, cast, func, select
+
+from . import db, socketio
+from .forecasting import congestion_status
+from .partitions import epoch_seconds, traffic_window
+from .road_registry import get_road_registry
+from .websocket import broadcast_road_update
+
+REPLAY_PLAYING = 'playing'
+REPLAY_PAUSED = 'paused'
+REPLAY_FINISHED = 'finished'
+REPLAY_STOPPED = 'stopped'
+
+
+class ReplayFrame:
+    """Readings of one window as parallel columns ordered by timestamp."""
+
+    __slots__ = ('timestamps', 'road_ids', 'speed', 'volume', 'congestion')
+
+    def __init__(self, timestamps, road_ids, speed, volume, congestion):
+        self.timestamps = np.asarray(timestamps, dtype=np.int64)
+        self.road_ids = np.asarray(road_ids, dtype=np.int32)
+        self.speed = np.asarray(speed, dtype=np.float32)
+        self.volume = np.asarray(volume, dtype=np.int32)
+        self.congestion = np.asarray(congestion, dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in self.__slots__)
+
+    def index_at(self, epoch: float) -> int:
+        """Index of the first reading at or after ``epoch``."""
+        return int(np.searchsorted(self.timestamps, epoch, side='left'))
+
+    def index_after(self, epoch: float) -> int:
+        """Index of the first reading strictly after ``epoch``."""
+        return int(np.searchsorted(self.timestamps, epoch, side='right'))
+
+    @staticmethod
+    def count(start: datetime, end: datetime) -> int:
+        """Number of readings in the window, without loading them."""
+        readings = traffic_window(start, end)
+        return db.session.execute(select(func.count()).select_from(readings)).scalar() or 0
+
+    @classmethod
+    def load(
+        cls, start: datetime, end: datetime, batch_size: int = 10000, limit: Optional[int] = None
+    ) -> 'ReplayFrame':
+        """Read the window straight from the cursor into columns, in batches.
+
+        Each batch is converted to the final column types as it arrives, so
+        only one batch is held as float64. At most ``limit`` readings are read.
+        """
+        readings = traffic_window(start, end)
+        dialect = db.session.get_bind().dialect.name
+        query = select(
+            epoch_seconds(readings.c.timestamp, dialect),
+            readings.c.road_id,
+            cast(readings.c.speed, Float),
+            cast(func.coalesce(readings.c.volume, 0), Integer),
+            cast(readings.c.congestion_level, Float),
+        ).order_by(readings.c.timestamp.asc(), readings.c.road_id.asc())
+        if limit is not None:
+            query = query.limit(limit)
+
+        columns: List[List[np.ndarray]] = [[] for _ in cls.__slots__]
+        dtypes = (np.int64, np.int32, np.float32, np.int32, np.float32)
+        result = db.session.execute(query.execution_options(yield_per=batch_size))
+        for rows in result.partitions():
+            # Missing speed / congestion come through as NaN.
+            table = np.array(rows, dtype=np.float64)
+            for index, dtype in enumerate(dtypes):
+                columns[index].append(table[:, index].astype(dtype))
+        if not columns[0]:
+            return cls([], [], [], [], [])
+        return cls(*(np.concatenate(chunks) for chunks in columns))
+
+
+def _epoch(value: datetime) -> float:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _iso(epoch: float) -> str:
+    return datetime.fromtimestamp(epoch, timezone.utc).isoformat()
+
+
+def _nullable(value: float) -> Optional[float]:
+    return None if np.isnan(value) else round(float(value), 2)
+
+
+class ReplaySession:
+    """Playback state of one frame on a virtual clock.
+
+    The virtual time advances at ``speed`` seconds per wall-clock second while
+    playing. ``clock`` is injectable so tests can drive playback directly
+    through :meth:`advance`.
+    """
+
+    def __init__(
+        self,
+        frame: ReplayFrame,
+        start: datetime,
+        end: datetime,
+        speed: float,
+        emit: Callable[[int, List[Dict], Dict], None],
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.id = uuid.uuid4().hex
+        self.frame = frame
+        self.start = _epoch(start)
+        self.end = _epoch(end)
+        self.speed = speed
+        self.state = REPLAY_PAUSED
+        self.emitted = 0
+        self.touched_at = time.time()  # last API access or end of playback
+        self._emit = emit
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._position = self.start  # virtual time reached so far
+        self._anchor = clock()
+        self._next = 0  # index of the next reading to emit
+        self._task = None
+
+    # ------------------------------------------------------------------
+    # Controls
+    # ------------------------------------------------------------------
+
+    def virtual_time(self) -> float:
+        with self._lock:
+            return self._virtual_time()
+
+    def _virtual_time(self) -> float:
+        if self.state != REPLAY_PLAYING:
+            return self._position
+        return min(self.end, self._position + (self._clock() - self._anchor) * self.speed)
+
+    def play(self) -> None:
+        with self._lock:
+            if self.state in (REPLAY_PAUSED, REPLAY_FINISHED) and self._next < len(self.frame):
+                self._anchor = self._clock()
+                self.state = REPLAY_PLAYING
+
+    def pause(self) -> None:
+        with self._lock:
+            if self.state == REPLAY_PLAYING:
+                self._position = self._virtual_time()
+                self.state = REPLAY_PAUSED
+
+    def set_speed(self, speed: float) -> None:
+        with self._lock:
+            self._position = self._virtual_time()
+            self._anchor = self._clock()
+            self.speed = speed
+
+    def seek(self, target: datetime) -> None:
+        """Jump to ``target``; playback continues from the first reading at or after it."""
+        epoch = min(max(_epoch(target), self.start), self.end)
+        with self._lock:
+            self._position = epoch
+            self._anchor = self._clock()
+            self._next = self.frame.index_at(epoch)
+            if self.state == REPLAY_FINISHED:
+                self.state = REPLAY_PAUSED
+
+    def stop(self) -> None:
+        with self._lock:
+            self.state = REPLAY_STOPPED
+            self.touched_at = time.time()
+
+    def idle_since(self, cutoff: float) -> bool:
+        """Not playing and untouched since ``cutoff`` (a ``time.time()`` value)."""
+        return self.state != REPLAY_PLAYING and self.touched_at < cutoff
+
+    # ------------------------------------------------------------------
+    # Playback
+    # ------------------------------------------------------------------
+
+    def advance(self) -> int:
+        """Emit every reading up to the current virtual time; returns how many."""
+        with self._lock:
+            if self.state != REPLAY_PLAYING:
+                return 0
+            now = self._virtual_time()
+            first, last = self._next, self.frame.index_after(now)
+            self._next = last
+            if last >= len(self.frame):
+                self._position = now
+                self.state = REPLAY_FINISHED
+                self.touched_at = time.time()
+        if last > first:
+            self._publish(first, last, now)
+        return last - first
+
+    def _publish(self, first: int, last: int, now: float) -> None:
+        frame = self.frame
+        registry = get_road_registry()
+        road_ids = frame.road_ids[first:last]
+        meta = {'id': self.id, 'time': _iso(now), 'speed': self.speed}
+        # One message per road, readings in timestamp order.
+        for road_id in np.unique(road_ids).tolist():
+            rows = first + np.flatnonzero(road_ids == road_id)
+            name = registry.name(road_id)
+            readings = []
+            for index in rows.tolist():
+                congestion = _nullable(frame.congestion[index])
+                readings.append({
+                    'road_id': road_id,
+                    'road_name': name,
+                    'timestamp': _iso(int(frame.timestamps[index])),
+                    'speed': _nullable(frame.speed[index]),
+                    'volume': int(frame.volume[index]),
+                    'status': congestion_status(congestion) if congestion is not None else None,
+                    'congestion_level': congestion,
+                })
+            self._emit(road_id, readings, meta)
+        self.emitted += last - first
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            position = self._virtual_time()
+        return {
+            'id': self.id,
+            'state': self.state,
+            'start': _iso(self.start),
+            'end': _iso(self.end),
+            'position': _iso(position),
+            'speed': self.speed,
+            'readings': len(self.frame),
+            'emitted': self.emitted,
+            'bytes': self.frame.nbytes,
+        }
+
+
+def _broadcast(road_id: int, readings: List[Dict], meta: Dict) -> None:
+    broadcast_road_update(road_id, readings, replay=meta)
+
+
+class ReplayManager:
+    """Owns replay sessions and runs one background playback task per session."""
+
+    def __init__(self, app):
+        self.app = app
+        self.tick = app.config['REPLAY_TICK_SECONDS']
+        self.max_sessions = app.config['REPLAY_MAX_SESSIONS']
+        self.max_readings = app.config['REPLAY_MAX_READINGS']
+        self.idle_ttl = app.config['REPLAY_IDLE_TTL']
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, ReplaySession] = {}
+        self._reserved = 0  # slots held by creates still loading
+
+    def create(self, start: datetime, end: datetime, speed: float, autoplay: bool = True) -> ReplaySession:
+        """Load the window and register a session.
+
+        Raises ``ValueError`` when the window holds more than
+        ``REPLAY_MAX_READINGS`` readings or too many replays are loaded. The
+        slot is reserved before loading, so concurrent creates cannot exceed
+        ``REPLAY_MAX_SESSIONS``.
+        """
+        with self._lock:
+            self._prune()
+            if len(self._sessions) + self._reserved >= self.max_sessions:
+                self._evict_ended()
+            if len(self._sessions) + self._reserved >= self.max_sessions:
+                raise ValueError(f'At most {self.max_sessions} replays can be loaded at once.')
+            self._reserved += 1
+
+        session = None
+        try:
+            total = ReplayFrame.count(start, end)
+            if total > self.max_readings:
+                raise ValueError(f'Window holds {total} readings; the limit is {self.max_readings}.')
+            # Stop reading if rows arrived since the count.
+            frame = ReplayFrame.load(
+                start, end, self.app.config['REPLAY_LOAD_BATCH'], limit=self.max_readings + 1
+            )
+            if len(frame) > self.max_readings:
+                raise ValueError(f'Window holds more than {self.max_readings} readings.')
+            session = ReplaySession(frame, start, end, speed, _broadcast)
+        finally:
+            with self._lock:
+                self._reserved -= 1
+                if session is not None:
+                    self._sessions[session.id] = session
+        if autoplay:
+            self.play(session)
+        return session
+
+    def get(self, replay_id: str) -> Optional[ReplaySession]:
+        with self._lock:
+            self._prune()
+            session = self._sessions.get(replay_id)
+        if session is not None:
+            session.touched_at = time.time()
+        return session
+
+    def _prune(self) -> None:
+        """Unload sessions idle for ``idle_ttl`` seconds. Caller holds ``self._lock``."""
+        cutoff = time.time() - self.idle_ttl
+        for replay_id in [key for key, session in self._sessions.items() if session.idle_since(cutoff)]:
+            self._sessions.pop(replay_id).stop()
+
+    def _evict_ended(self) -> None:
+        """Unload the least recently touched finished or stopped session. Caller holds ``self._lock``."""
+        ended = [
+            session for session in self._sessions.values()
+            if session.state in (REPLAY_FINISHED, REPLAY_STOPPED)
+        ]
+        if ended:
+            oldest = min(ended, key=lambda session: session.touched_at)
+            del self._sessions[oldest.id]
+
+    def play(self, session: ReplaySession) -> None:
+        session.play()
+        with self._lock:
+            if session.state == REPLAY_PLAYING and session._task is None:
+                session._task = socketio.start_background_task(self._run, session)
+
+    def remove(self, replay_id: str) -> Optional[ReplaySession]:
+        with self._lock:
+            session = self._sessions.pop(replay_id, None)
+        if session is not None:
+            session.stop()
+        return session
+
+    def _run(self, session: ReplaySession) -> None:
+        with self.app.app_context():
+            try:
+                while session.state == REPLAY_PLAYING:
+                    session.advance()
+                    socketio.sleep(self.tick)
+            except Exception as exc:
+                self.app.logger.error(f'Replay {session.id} failed: {exc}', exc_info=True)
+                session.stop()
+            finally:
+                with self._lock:
+                    session._task = None
+                db.session.remove()
+        # Resumed between the loop's last check and the task ending.
+        if session.state == REPLAY_PLAYING and self.get(session.id) is session:
+            self.play(session)
+
+
+_manager_lock = threading.Lock()
+
+
+def get_replay_manager() -> ReplayManager:
+    """Return the replay manager for the current app, creating it on first use."""
+    app = current_app._get_current_object()
+    with _manager_lock:
+        manager = app.extensions.get('replays')
+        if manager is None:
+            manager = ReplayManager(app)
+            app.extensions['replays'] = manager
+    return manager
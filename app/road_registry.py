@@ -0,0 +1,141 @@
+"""
+Process-wide road registry.
+
+The ``roads`` table is small and rarely changes, so services resolve road
+names, codes and limits from an immutable in-memory snapshot instead of
+querying or joining it on every request.
+
+The snapshot is stamped with the ``roads`` data version from
+:func:`~app.middleware.etag_version`. Commits that insert, update or delete a
+``Road`` bump that version, which marks the snapshot stale in this process
+immediately and in other processes at their next version check (at most every
+``ROAD_REGISTRY_CHECK_INTERVAL`` seconds). Version tokens expire after
+``ETAG_VERSION_TIMEOUT``, so writes made outside the ORM are picked up too.
+"""
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from . import db
+from .middleware import bump_etag_version, etag_version
+from .models import Road
+
+
+class RoadInfo(NamedTuple):
+    """Immutable road metadata."""
+    id: int
+    name: str
+    code: str
+    lanes: int
+    length: Optional[float]
+    level: Optional[int]
+    speed_limit: Optional[int]
+    start_point: Optional[str]
+    end_point: Optional[str]
+
+
+class RoadRegistry:
+    """Immutable snapshot of all roads with id and code lookups."""
+
+    __slots__ = ('version', 'by_id', 'by_code', 'ordered')
+
+    def __init__(self, version: str, roads: List[RoadInfo]):
+        self.version = version
+        self.by_id: Dict[int, RoadInfo] = {road.id: road for road in roads}
+        self.by_code: Dict[str, RoadInfo] = {road.code: road for road in roads}
+        self.ordered = tuple(sorted(roads, key=lambda road: road.name))
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+    def get(self, road_id: Optional[int]) -> Optional[RoadInfo]:
+        return self.by_id.get(road_id)
+
+    def get_by_code(self, code: str) -> Optional[RoadInfo]:
+        return self.by_code.get(code)
+
+    def name(self, road_id: Optional[int]) -> Optional[str]:
+        road = self.by_id.get(road_id)
+        return road.name if road else None
+
+    def code(self, road_id: Optional[int]) -> Optional[str]:
+        road = self.by_id.get(road_id)
+        return road.code if road else None
+
+
+class _RegistryState:
+    __slots__ = ('snapshot', 'checked_at', 'stale', 'lock')
+
+    def __init__(self):
+        self.snapshot: Optional[RoadRegistry] = None
+        self.checked_at = 0.0
+        self.stale = False
+        self.lock = threading.Lock()
+
+
+def _load(version: str) -> RoadRegistry:
+    rows = db.session.execute(
+        select(
+            Road.id, Road.name, Road.code, Road.lanes, Road.length, Road.level,
+            Road.speed_limit, Road.start_point, Road.end_point,
+        )
+    ).all()
+    roads = [
+        RoadInfo(
+            row.id, row.name, row.code, row.lanes,
+            float(row.length) if row.length is not None else None,
+            row.level, row.speed_limit, row.start_point, row.end_point,
+        )
+        for row in rows
+    ]
+    return RoadRegistry(version, roads)
+
+
+def _state() -> _RegistryState:
+    return current_app.extensions.setdefault('road_registry', _RegistryState())
+
+
+def get_road_registry() -> RoadRegistry:
+    """Current road snapshot, reloaded when the roads version has changed."""
+    state = _state()
+    snapshot = state.snapshot
+    now = time.monotonic()
+    interval = current_app.config.get('ROAD_REGISTRY_CHECK_INTERVAL', 5)
+    if snapshot is not None and not state.stale and now - state.checked_at < interval:
+        return snapshot
+
+    with state.lock:
+        version = etag_version('roads')
+        state.checked_at = now
+        if state.snapshot is None or state.stale or state.snapshot.version != version:
+            state.stale = False
+            state.snapshot = _load(version)
+        return state.snapshot
+
+
+def invalidate_road_registry() -> None:
+    """Mark the registry stale here and bump the shared roads version."""
+    if has_app_context():
+        _state().stale = True
+        bump_etag_version('roads')
+
+
+@event.listens_for(Session, 'before_flush')
+def _track_road_changes(session, flush_context, instances):
+    if any(isinstance(obj, Road) for obj in (*session.new, *session.dirty, *session.deleted)):
+        session.info['roads_changed'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    if session.info.pop('roads_changed', False):
+        invalidate_road_registry()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_on_rollback(session):
+    session.info.pop('roads_changed', None)
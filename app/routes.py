@@ -1,13 +1,48 @@
-from flask import Blueprint, render_template, jsonify, request
-from marshmallow import ValidationError
-from datetime import datetime
+import os
+import time
 
-from .schemas import EventCreateSchema, EventFilterSchema, PaginationSchema
+from flask import Blueprint, current_app, render_template, jsonify, request, send_file, url_for
+from .auth import (
+    AuthBusyError,
+    LoginThrottledError,
+    authenticate,
+    current_session,
+    login_required,
+)
+from .jobs import JOB_FINISHED, get_export_job_manager
+from .middleware import versioned_etag
+from .routing import plan_route
+from .serialization import object_response
+from .validation import validate_batch, validate_json, validate_query
+from .websocket import broadcast_event, broadcast_traffic_readings
+from .schemas import (
+    EventBatchCreateSchema,
+    EventBatchStatusSchema,
+    EventCreateSchema,
+    DashboardBootstrapSchema,
+    EventFilterSchema,
+    ExportFormatSchema,
+    ExportJobSchema,
+    ForecastQuerySchema,
+    LoginSchema,
+    MapQuerySchema,
+    PaginationSchema,
+    ReplayControlSchema,
+    ReplayCreateSchema,
+    RouteQuerySchema,
+    TrafficBatchSchema,
+    TrafficMatrixQuerySchema,
+    TrafficReadingSchema,
+    TrafficQuerySchema,
+)
 from .services import (
+    build_dashboard_bootstrap,
     build_dashboard_summary,
     create_event,
+    create_events_batch,
     get_alerts,
     get_all_roads,
+    get_cache_usage,
     get_events,
     get_latest_traffic,
     get_map_events,
@@ -15,16 +50,17 @@ from .services import (
     get_road_snapshot,
     get_system_status,
     get_traffic_history,
+    get_traffic_matrix,
     get_weekly_report,
-)
-from .export import (
-    export_traffic_data_csv,
-    export_traffic_data_excel,
-    export_events_csv
+    ingest_traffic_batch,
+    update_events_status_batch,
 )
 
 main = Blueprint('main', __name__)
 
+# Export engines (pandas, pyarrow), forecasting and replay (NumPy) are imported inside
+# their views, so workers that never serve them do not pay for the imports.
+
 @main.route('/')
 def index():
     return render_template('index.html')
@@ -37,7 +73,55 @@ def events_page():
 def auth_page():
     return render_template('auth.html')
 
+@main.route('/api/auth/login', methods=['POST'])
+@validate_json(LoginSchema, 'credentials')
+def login(credentials):
+    try:
+        user, token = authenticate(
+            credentials['username'], credentials['password'], request.remote_addr or 'unknown'
+        )
+    except LoginThrottledError as exc:
+        response = jsonify({'error': str(exc)})
+        response.headers['Retry-After'] = str(exc.retry_after)
+        return response, 429
+    except AuthBusyError as exc:
+        response = jsonify({'error': str(exc)})
+        response.headers['Retry-After'] = '1'
+        return response, 503
+
+    if not user:
+        return jsonify({'error': 'Invalid username or password.'}), 401
+
+    response = jsonify({
+        'token': token,
+        'expires_in': current_app.config['AUTH_TOKEN_MAX_AGE'],
+        'user': {'id': user.id, 'username': user.username, 'role': user.role},
+    })
+    response.set_cookie(
+        current_app.config['AUTH_COOKIE_NAME'],
+        token,
+        max_age=current_app.config['AUTH_TOKEN_MAX_AGE'],
+        httponly=True,
+        samesite='Lax'
+    )
+    return response
+
+@main.route('/api/auth/session')
+@login_required
+def session_endpoint():
+    claims = current_session()
+    return jsonify({
+        'user': {'id': claims['uid'], 'username': claims['username'], 'role': claims['role']},
+    })
+
+@main.route('/api/auth/logout', methods=['POST'])
+def logout():
+    response = jsonify({'message': 'Logged out.'})
+    response.delete_cookie(current_app.config['AUTH_COOKIE_NAME'])
+    return response
+
 @main.route('/api/roads')
+@versioned_etag('roads')
 def roads_endpoint():
     return jsonify(get_all_roads())
 
@@ -48,44 +132,48 @@ def road_snapshot(road_id):
         return jsonify({'error': 'Road not found.'}), 404
     return jsonify(snapshot)
 
-@main.route('/api/traffic/latest')
-def latest_traffic_endpoint():
-    limit = request.args.get('limit', default=10, type=int)
-    offset = request.args.get('offset', default=0, type=int)
-    limit = max(1, min(limit or 10, 100))
-    offset = max(0, offset)
-    return jsonify(get_latest_traffic(limit, offset))
-
-@main.route('/api/events', methods=['GET', 'POST'])
-def events_endpoint():
-    if request.method == 'GET':
-        # Validate query parameters
-        filter_schema = EventFilterSchema()
-        try:
-            filters = filter_schema.load(request.args)
-        except ValidationError as err:
-            return jsonify({'error': 'Validation failed', 'details': err.messages}), 400
-
-        offset = request.args.get('offset', default=0, type=int)
-        offset = max(0, offset)
-
-        return jsonify(get_events(
-            limit=filters.get('limit'),
-            status=filters.get('status'),
-            offset=offset
-        ))
-
-    # POST - Create event
-    payload = request.get_json(silent=True)
-    if not payload:
-        return jsonify({'error': 'Request body cannot be empty.'}), 400
-
-    # Validate input using schema
-    schema = EventCreateSchema()
+@main.route('/api/roads/<int:road_id>/forecast')
+@validate_query(ForecastQuerySchema)
+def road_forecast(road_id, params):
+    from .forecasting import ForecasterWarmingUp, get_road_forecast
+    try:
+        forecast = get_road_forecast(road_id, params['horizon'])
+    except ForecasterWarmingUp as exc:
+        response = jsonify({'error': str(exc)})
+        response.headers['Retry-After'] = '1'
+        return response, 503
+    if not forecast:
+        return jsonify({'error': 'Road not found.'}), 404
+    return jsonify(forecast)
+
+@main.route('/api/route')
+@validate_query(RouteQuerySchema)
+def route_endpoint(params):
+    """Fastest route between two points at current road speeds."""
     try:
-        validated_data = schema.load(payload)
-    except ValidationError as err:
-        return jsonify({'error': 'Validation failed', 'details': err.messages}), 400
+        return jsonify(plan_route(params['origin'], params['destination']))
+    except LookupError as exc:
+        return jsonify({'error': str(exc)}), 404
+
+@main.route('/api/traffic/latest')
+@validate_query(PaginationSchema)
+def latest_traffic_endpoint(params):
+    return jsonify(get_latest_traffic(params['limit'], params['offset']))
+
+@main.route('/api/events', methods=['GET'])
+@versioned_etag('events')
+@validate_query(EventFilterSchema, 'filters')
+def events_endpoint(filters):
+    return jsonify(get_events(
+        limit=filters.get('limit'),
+        status=filters.get('status'),
+        offset=filters['offset'],
+        severity=filters.get('severity')
+    ))
+
+@main.route('/api/events', methods=['POST'])
+@validate_json(EventCreateSchema, 'validated_data')
+def create_event_endpoint(validated_data):
 
     # Check if road exists
     if not get_road_by_id(validated_data['road_id']):
@@ -94,21 +182,99 @@ def events_endpoint():
     created = create_event(validated_data)
     return jsonify(created), 201
 
-@main.route('/api/traffic/history/<int:road_id>')
-def traffic_history(road_id):
-    start_str = request.args.get('start')
-    end_str = request.args.get('end')
+def _check_batch_size(size, limit_key='EVENT_BATCH_MAX', noun='events'):
+    limit = current_app.config[limit_key]
+    if size > limit:
+        return jsonify({'error': f'Batch size exceeds the limit of {limit} {noun}.'}), 413
+    return None
+
+@main.route('/api/events/batch', methods=['POST'])
+@validate_json(EventBatchCreateSchema)
+def create_events_batch_endpoint(payload):
+    """Create many events in one transaction."""
+    too_large = _check_batch_size(len(payload['events']))
+    if too_large:
+        return too_large
+
+    result = validate_batch(EventCreateSchema, payload['events'])
+    if result.errors:
+        return jsonify({'error': 'Validation failed', 'details': result.errors}), 400
+
+    try:
+        created = create_events_batch([record for _, record in result.valid])
+    except LookupError as exc:
+        return jsonify({'error': str(exc)}), 404
+
+    broadcast_event(created, action='created')
+    return jsonify({'data': created, 'count': len(created)}), 201
+
+@main.route('/api/events/batch', methods=['PATCH'])
+@validate_json(EventBatchStatusSchema)
+def update_events_batch_endpoint(payload):
+    """Apply one status transition to many events in one transaction."""
+    too_large = _check_batch_size(len(payload['ids']))
+    if too_large:
+        return too_large
+
+    try:
+        updated = update_events_status_batch(payload['ids'], payload['status'])
+    except LookupError as exc:
+        return jsonify({'error': str(exc)}), 404
+    except ValueError as exc:
+        return jsonify({'error': str(exc)}), 409
+
+    if updated:
+        broadcast_event(updated, action=payload['status'])
+    return jsonify({'data': updated, 'count': len(updated)})
+
+@main.route('/api/traffic/batch', methods=['POST'])
+@validate_json(TrafficBatchSchema)
+def ingest_traffic_endpoint(payload):
+    """Store a batch of sensor readings and push them to subscribed clients."""
+    too_large = _check_batch_size(len(payload['readings']), 'TRAFFIC_BATCH_MAX', 'readings')
+    if too_large:
+        return too_large
 
+    result = validate_batch(TrafficReadingSchema, payload['readings'])
+    if result.errors:
+        return jsonify({'error': 'Validation failed', 'details': result.errors}), 400
+
+    try:
+        readings = ingest_traffic_batch([record for _, record in result.valid])
+    except LookupError as exc:
+        return jsonify({'error': str(exc)}), 404
+
+    committed_at = time.time()
+    broadcast_traffic_readings(readings, committed_at)
+    return jsonify({'count': len(readings), 'committed_at': committed_at}), 201
+
+@main.route('/api/traffic/matrix')
+@validate_query(TrafficMatrixQuerySchema)
+def traffic_matrix(params):
+    """Average congestion, speed and volume for every road per time bucket."""
+    try:
+        matrix = get_traffic_matrix(
+            params.get('start'), params.get('end'), params['bucket_seconds'], params['encoding']
+        )
+    except ValueError as exc:
+        return jsonify({'error': str(exc)}), 400
+    return jsonify(matrix)
+
+@main.route('/api/traffic/history/<int:road_id>')
+@validate_query(TrafficQuerySchema)
+def traffic_history(road_id, params):
     road = get_road_by_id(road_id)
     if not road:
         return jsonify({'error': 'Road not found.'}), 404
 
     try:
-        traffic, events, window = get_traffic_history(road_id, start_str, end_str)
+        traffic, events, window = get_traffic_history(
+            road_id, params.get('start'), params.get('end'), raw=True
+        )
     except ValueError as exc:
         return jsonify({'error': str(exc)}), 400
 
-    return jsonify({
+    return object_response({
         'road': {
             'id': road.id,
             'name': road.name,
@@ -122,14 +288,84 @@ def traffic_history(road_id):
         'events': events,
     })
 
+@main.route('/api/replays', methods=['POST'])
+@validate_json(ReplayCreateSchema, 'options')
+def create_replay(options):
+    """Load a historical window and play it through the road rooms."""
+    from .replay import get_replay_manager
+    try:
+        session = get_replay_manager().create(
+            options['start'], options['end'], options['speed'], options['autoplay']
+        )
+    except ValueError as exc:
+        return jsonify({'error': str(exc)}), 400
+    return jsonify(session.to_dict()), 201
+
+@main.route('/api/replays/<replay_id>', methods=['GET'])
+def replay_status(replay_id):
+    from .replay import get_replay_manager
+    session = get_replay_manager().get(replay_id)
+    if session is None:
+        return jsonify({'error': 'Replay not found.'}), 404
+    return jsonify(session.to_dict())
+
+@main.route('/api/replays/<replay_id>', methods=['PATCH'])
+@validate_json(ReplayControlSchema, 'changes')
+def control_replay(replay_id, changes):
+    """Pause, resume, seek or change the speed of a replay."""
+    from .replay import get_replay_manager
+    manager = get_replay_manager()
+    session = manager.get(replay_id)
+    if session is None:
+        return jsonify({'error': 'Replay not found.'}), 404
+
+    if 'speed' in changes:
+        session.set_speed(changes['speed'])
+    if 'position' in changes:
+        session.seek(changes['position'])
+    if changes.get('state') == 'paused':
+        session.pause()
+    elif changes.get('state') == 'playing':
+        manager.play(session)
+    return jsonify(session.to_dict())
+
+@main.route('/api/replays/<replay_id>', methods=['DELETE'])
+def delete_replay(replay_id):
+    from .replay import get_replay_manager
+    if get_replay_manager().remove(replay_id) is None:
+        return jsonify({'error': 'Replay not found.'}), 404
+    return '', 204
+
 @main.route('/api/dashboard/summary')
 def dashboard_summary():
     return jsonify(build_dashboard_summary())
 
+@main.route('/api/dashboard/bootstrap')
+@validate_query(DashboardBootstrapSchema)
+def dashboard_bootstrap(params):
+    """Everything the dashboard renders on first paint, in one response."""
+    return jsonify(build_dashboard_bootstrap(
+        params['sections'],
+        limit=params['limit'],
+        map_limit=params['map_limit'],
+        road_id=params.get('road')
+    ))
+
 @main.route('/api/system/status')
 def system_status():
     return jsonify(get_system_status())
 
+@main.route('/api/system/governor')
+def governor_stats():
+    from .governor import get_governor
+    if 'governor' not in current_app.extensions:
+        return jsonify({'enabled': False})
+    return jsonify({'enabled': True, **get_governor().stats()})
+
+@main.route('/api/system/cache')
+def cache_usage():
+    return jsonify(get_cache_usage())
+
 @main.route('/api/reports/weekly')
 def weekly_report():
     return jsonify(get_weekly_report())
@@ -139,35 +375,111 @@ def alerts_endpoint():
     return jsonify(get_alerts())
 
 @main.route('/api/events/map')
-def events_map():
-    limit = request.args.get('limit', type=int, default=100)
-    limit = max(1, min(limit, 200))
-    return jsonify(get_map_events(limit))
+@versioned_etag('events')
+@validate_query(MapQuerySchema)
+def events_map(params):
+    return jsonify(get_map_events(params['limit']))
 
 @main.route('/api/export/traffic/csv')
-def export_traffic_csv():
+@validate_query(ExportFormatSchema)
+def export_traffic_csv(params):
     """Export traffic data to CSV."""
-    start_str = request.args.get('start')
-    end_str = request.args.get('end')
-
-    start_date = datetime.fromisoformat(start_str) if start_str else None
-    end_date = datetime.fromisoformat(end_str) if end_str else None
-
-    return export_traffic_data_csv(start_date, end_date)
+    from .export import export_traffic_data_csv
+    return export_traffic_data_csv(params.get('start'), params.get('end'))
 
 @main.route('/api/export/traffic/excel')
-def export_traffic_excel():
+@validate_query(ExportFormatSchema)
+def export_traffic_excel(params):
     """Export traffic data to Excel."""
-    start_str = request.args.get('start')
-    end_str = request.args.get('end')
+    from .export import export_traffic_data_excel
+    return export_traffic_data_excel(params.get('start'), params.get('end'))
 
-    start_date = datetime.fromisoformat(start_str) if start_str else None
-    end_date = datetime.fromisoformat(end_str) if end_str else None
+@main.route('/api/export/traffic/parquet')
+@validate_query(ExportFormatSchema)
+def export_traffic_parquet(params):
+    """Export traffic data to Parquet."""
+    from .export import export_traffic_data_parquet
+    return export_traffic_data_parquet(params.get('start'), params.get('end'))
 
-    return export_traffic_data_excel(start_date, end_date)
+@main.route('/api/export/traffic/arrow')
+@validate_query(ExportFormatSchema)
+def export_traffic_arrow(params):
+    """Export traffic data as an Arrow IPC stream."""
+    from .export import export_traffic_data_arrow
+    return export_traffic_data_arrow(params.get('start'), params.get('end'))
 
 @main.route('/api/export/events/csv')
-def export_events_csv_endpoint():
+@validate_query(ExportFormatSchema)
+def export_events_csv_endpoint(params):
     """Export events to CSV."""
-    status = request.args.get('status', default='all')
-    return export_events_csv(status)
+    from .export import export_events_csv
+    return export_events_csv(params['status'])
+
+
+@main.route('/api/export/events/parquet')
+@validate_query(ExportFormatSchema)
+def export_events_parquet_endpoint(params):
+    """Export events to Parquet."""
+    from .export import export_events_parquet
+    return export_events_parquet(params['status'])
+
+@main.route('/api/export/events/arrow')
+@validate_query(ExportFormatSchema)
+def export_events_arrow_endpoint(params):
+    """Export events as an Arrow IPC stream."""
+    from .export import export_events_arrow
+    return export_events_arrow(params['status'])
+
+
+def _export_job_payload(job):
+    payload = job.to_dict()
+    payload['status_url'] = url_for('main.export_job_status', job_id=job.id)
+    if job.status == JOB_FINISHED:
+        payload['download_url'] = url_for('main.export_job_download', job_id=job.id)
+    return payload
+
+@main.route('/api/export/jobs', methods=['POST'])
+@validate_json(ExportJobSchema, 'validated')
+def create_export_job(validated):
+    """Queue a background export job."""
+    params = {
+        'start': validated['start'].isoformat() if validated.get('start') else None,
+        'end': validated['end'].isoformat() if validated.get('end') else None,
+    } if validated['dataset'] == 'traffic' else {'status': validated['status']}
+
+    job, deduplicated = get_export_job_manager().submit(
+        validated['dataset'], validated['format'], params
+    )
+    response = _export_job_payload(job)
+    response['deduplicated'] = deduplicated
+    return jsonify(response), 202
+
+@main.route('/api/export/jobs/<job_id>')
+def export_job_status(job_id):
+    """Report the status and progress of an export job."""
+    job = get_export_job_manager().get(job_id)
+    if not job:
+        return jsonify({'error': 'Export job not found.'}), 404
+    return jsonify(_export_job_payload(job))
+
+@main.route('/api/export/jobs/<job_id>/download')
+def export_job_download(job_id):
+    """Download a finished export; supports HTTP Range requests for resuming."""
+    manager = get_export_job_manager()
+    job = manager.get(job_id)
+    if not job:
+        return jsonify({'error': 'Export job not found.'}), 404
+    if job.status != JOB_FINISHED:
+        return jsonify({'error': 'Export job is not finished.', 'status': job.status}), 409
+    if not os.path.exists(job.path):
+        # Built by another worker whose EXPORT_JOB_DIR this one cannot see.
+        return jsonify({'error': 'Export file is not available on this server.'}), 404
+
+    manager.touch(job)
+    return send_file(
+        job.path,
+        mimetype=job.mimetype,
+        as_attachment=True,
+        download_name=job.download_name,
+        conditional=True
+    )
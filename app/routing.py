@@ -0,0 +1,333 @@
+"""
+Travel-time routing over an in-memory road network.
+
+Each process keeps a :class:`RoadGraph` built from the road registry. Road
+endpoints are graph nodes; endpoints of different roads within
+``ROUTING_SNAP_METERS`` of each other are snapped to the same node. Roads
+carry no direction, so each one is a two-way edge.
+
+An edge costs ``length / speed``. The speed is the road's newest reading if it
+is less than ``ROUTING_SPEED_MAX_AGE`` minutes old, and otherwise the speed
+limit (``ROUTING_DEFAULT_SPEED`` when none is set). Speeds are folded in
+incrementally, and the graph is only rebuilt when the roads change:
+
+- ingestion in this process applies its readings directly
+- every ``ROUTING_REFRESH_INTERVAL`` seconds, the readings of the last
+  ``ROUTING_LOOKBACK_SECONDS`` before the newest one seen are read back, so
+  writes from other processes count too, including ones that commit after
+  higher ids were read (applying a reading twice is harmless)
+
+Routes are found with A*. The heuristic is the straight-line distance at the
+fastest speed on the network, scaled by the smallest ratio of road length to
+endpoint distance, so it never overestimates.
+"""
+import heapq
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from flask import current_app
+from sqlalchemy import Float, cast, func, select
+
+from . import db
+from .models import TrafficData
+from .road_registry import RoadInfo, get_road_registry
+
+EARTH_RADIUS_KM = 6371.0088
+_KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+Point = Tuple[float, float]  # (lat, lon)
+
+
+def haversine_km(a: Point, b: Point) -> float:
+    lat1, lon1, lat2, lon2 = map(math.radians, (*a, *b))
+    h = (math.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(h)))
+
+
+def parse_point(wkt: Optional[str]) -> Optional[Point]:
+    """``POINT(lon lat)`` as ``(lat, lon)``."""
+    if not wkt:
+        return None
+    text = wkt.strip()
+    if text.upper().startswith('POINT'):
+        text = text[5:]
+    try:
+        lon, lat = text.strip(' ()').split()
+        return float(lat), float(lon)
+    except ValueError:
+        return None
+
+
+def _epoch(value: datetime) -> float:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class Edge(NamedTuple):
+    road_id: int
+    start: int
+    end: int
+    length: float  # km
+    free_speed: float  # km/h
+
+
+class RoadGraph:
+    """Snapped road endpoints as nodes and roads as two-way travel-time edges."""
+
+    def __init__(self, roads: Iterable[RoadInfo], version: str, snap_km: float,
+                 default_speed: float, min_speed: float):
+        self.version = version
+        self.snap_km = snap_km
+        self.min_speed = min_speed
+        self.nodes: List[Point] = []
+        self.edges: Dict[int, Edge] = {}
+        self.adjacency: Dict[int, List[Tuple[int, int]]] = {}  # node -> [(neighbor, road_id)]
+        self.speeds: Dict[int, Tuple[float, float]] = {}  # road_id -> (km/h, epoch seconds)
+        self.reading_watermark: Optional[float] = None  # newest reading read back, epoch seconds
+        self._grid: Dict[Tuple[int, int], List[int]] = {}
+        self._max_speed = min_speed
+        self._detour = 1.0  # smallest length / endpoint distance
+
+        for road in roads:
+            start, end = parse_point(road.start_point), parse_point(road.end_point)
+            if start is None or end is None:
+                continue
+            direct = haversine_km(start, end)
+            length = road.length if road.length else direct
+            if length <= 0:
+                continue
+            start_node, end_node = self._snap(start), self._snap(end)
+            if start_node == end_node:
+                continue
+            free_speed = float(road.speed_limit or default_speed)
+            self.edges[road.id] = Edge(road.id, start_node, end_node, float(length), free_speed)
+            self.adjacency.setdefault(start_node, []).append((end_node, road.id))
+            self.adjacency.setdefault(end_node, []).append((start_node, road.id))
+            self._max_speed = max(self._max_speed, free_speed)
+            if direct > 0:
+                self._detour = min(self._detour, length / direct)
+
+    def _cell(self, point: Point) -> Tuple[int, int]:
+        size = self.snap_km / _KM_PER_DEGREE or 1e-9
+        return (math.floor(point[0] / size),
+                math.floor(point[1] * math.cos(math.radians(point[0])) / size))
+
+    def _snap(self, point: Point) -> int:
+        """Node within the snap distance of ``point``, created if there is none."""
+        row, col = self._cell(point)
+        for cell in ((row + i, col + j) for i in (-1, 0, 1) for j in (-1, 0, 1)):
+            for node in self._grid.get(cell, ()):
+                if haversine_km(self.nodes[node], point) <= self.snap_km:
+                    return node
+        self.nodes.append(point)
+        node = len(self.nodes) - 1
+        self._grid.setdefault((row, col), []).append(node)
+        return node
+
+    def nearest_node(self, point: Point) -> Tuple[Optional[int], float]:
+        """Closest node that has roads, and its distance in km."""
+        best, best_km = None, math.inf
+        for node in self.adjacency:
+            distance = haversine_km(self.nodes[node], point)
+            if distance < best_km:
+                best, best_km = node, distance
+        return best, best_km
+
+    def apply_speed(self, road_id: int, speed: Optional[float], timestamp: float) -> None:
+        """Record a reading for a road; older readings than the current one are ignored."""
+        if road_id not in self.edges or speed is None:
+            return
+        current = self.speeds.get(road_id)
+        if current is None or timestamp >= current[1]:
+            self.speeds[road_id] = (float(speed), timestamp)
+            self._max_speed = max(self._max_speed, float(speed))
+
+    def edge_speed(self, road_id: int, fresh_after: float) -> Tuple[float, str]:
+        """Speed used for a road (km/h) and its source, ``live`` or ``limit``."""
+        reading = self.speeds.get(road_id)
+        if reading is not None and reading[1] >= fresh_after:
+            return max(reading[0], self.min_speed), 'live'
+        return self.edges[road_id].free_speed, 'limit'
+
+    def shortest_path(self, source: int, target: int, fresh_after: float):
+        """A* over travel time: ``(seconds, [(road_id, from_node, to_node), ...])`` or ``None``."""
+        goal = self.nodes[target]
+        pace = self._detour / self._max_speed * 3600  # seconds per straight-line km
+
+        def estimate(node):
+            return haversine_km(self.nodes[node], goal) * pace
+
+        best = {source: 0.0}
+        previous: Dict[int, Tuple[int, int]] = {}
+        heap = [(estimate(source), 0.0, source)]
+        while heap:
+            _, cost, node = heapq.heappop(heap)
+            if node == target:
+                steps = []
+                while node != source:
+                    before, road_id = previous[node]
+                    steps.append((road_id, before, node))
+                    node = before
+                return cost, steps[::-1]
+            if cost > best[node]:
+                continue
+            for neighbor, road_id in self.adjacency.get(node, ()):
+                speed, _ = self.edge_speed(road_id, fresh_after)
+                candidate = cost + self.edges[road_id].length / speed * 3600
+                if candidate < best.get(neighbor, math.inf):
+                    best[neighbor] = candidate
+                    previous[neighbor] = (node, road_id)
+                    heapq.heappush(heap, (candidate + estimate(neighbor), candidate, neighbor))
+        return None
+
+
+class _GraphState:
+    def __init__(self):
+        self.graph: Optional[RoadGraph] = None
+        self.checked_at = 0.0
+        self.lock = threading.RLock()
+
+
+def _state() -> _GraphState:
+    return current_app.extensions.setdefault('road_graph', _GraphState())
+
+
+def _refresh_speeds(graph: RoadGraph) -> None:
+    """Fold in the newest reading per road within the lookback of the last refresh.
+
+    The first refresh reads the last ``ROUTING_SPEED_MAX_AGE`` minutes.
+    """
+    config = current_app.config
+    if graph.reading_watermark is None:
+        since = datetime.now(timezone.utc) - timedelta(minutes=config['ROUTING_SPEED_MAX_AGE'])
+    else:
+        since = datetime.fromtimestamp(
+            graph.reading_watermark - config['ROUTING_LOOKBACK_SECONDS'], timezone.utc
+        )
+    window = TrafficData.timestamp >= since
+    ranked = (
+        select(
+            TrafficData.road_id,
+            TrafficData.timestamp,
+            cast(TrafficData.speed, Float).label('speed'),
+            func.row_number().over(
+                partition_by=TrafficData.road_id,
+                order_by=(TrafficData.timestamp.desc(), TrafficData.id.desc()),
+            ).label('rank'),
+        )
+        .where(window)
+        .subquery()
+    )
+    rows = db.session.execute(
+        select(ranked.c.road_id, ranked.c.timestamp, ranked.c.speed).where(ranked.c.rank == 1)
+    ).all()
+    newest = graph.reading_watermark if graph.reading_watermark is not None else since.timestamp()
+    for road_id, timestamp, speed in rows:
+        epoch = _epoch(timestamp)
+        graph.apply_speed(road_id, speed, epoch)
+        newest = max(newest, epoch)
+    graph.reading_watermark = newest
+
+
+def get_road_graph() -> RoadGraph:
+    """This process's road graph: rebuilt when the roads change, speeds refreshed when due."""
+    config = current_app.config
+    state = _state()
+    registry = get_road_registry()
+    now = time.monotonic()
+    graph = state.graph
+    if (graph is not None and graph.version == registry.version
+            and now - state.checked_at < config['ROUTING_REFRESH_INTERVAL']):
+        return graph
+
+    with state.lock:
+        if state.graph is None or state.graph.version != registry.version:
+            state.graph = RoadGraph(
+                registry.ordered,
+                registry.version,
+                snap_km=config['ROUTING_SNAP_METERS'] / 1000,
+                default_speed=config['ROUTING_DEFAULT_SPEED'],
+                min_speed=config['ROUTING_MIN_SPEED'],
+            )
+            state.checked_at = 0.0
+        if now - state.checked_at >= config['ROUTING_REFRESH_INTERVAL']:
+            _refresh_speeds(state.graph)
+            state.checked_at = now
+        return state.graph
+
+
+def apply_traffic_readings(readings: Iterable[Dict]) -> None:
+    """Fold committed readings (``road_id``, ``speed``, ``timestamp``) into this process's graph.
+
+    Readings from other processes arrive with the next periodic refresh.
+    """
+    state = _state()
+    with state.lock:
+        graph = state.graph
+        if graph is None:
+            return
+        for reading in readings:
+            graph.apply_speed(reading['road_id'], reading.get('speed'), _epoch(reading['timestamp']))
+
+
+def plan_route(origin: Point, destination: Point) -> Dict:
+    """Fastest route between two points at current speeds.
+
+    Raises ``LookupError`` when either point is further than
+    ``ROUTING_MAX_ACCESS_METERS`` from the road network or no route connects them.
+    """
+    graph = get_road_graph()
+    max_access_km = current_app.config['ROUTING_MAX_ACCESS_METERS'] / 1000
+    ends = []
+    for label, point in (('origin', origin), ('destination', destination)):
+        node, distance = graph.nearest_node(point)
+        if node is None or distance > max_access_km:
+            raise LookupError(f'No road within {max_access_km * 1000:.0f} m of the {label}.')
+        ends.append((node, distance))
+    (source, source_km), (target, target_km) = ends
+
+    now = datetime.now(timezone.utc)
+    fresh_after = (now - timedelta(minutes=current_app.config['ROUTING_SPEED_MAX_AGE'])).timestamp()
+    found = graph.shortest_path(source, target, fresh_after)
+    if found is None:
+        raise LookupError('No route connects the origin and the destination.')
+    seconds, steps = found
+
+    registry = get_road_registry()
+    legs = []
+    free_flow = 0.0
+    for road_id, start, end in steps:
+        edge = graph.edges[road_id]
+        speed, source_kind = graph.edge_speed(road_id, fresh_after)
+        free_flow += edge.length / edge.free_speed * 3600
+        legs.append({
+            'road_id': road_id,
+            'road_name': registry.name(road_id),
+            'from': _point_dict(graph.nodes[start]),
+            'to': _point_dict(graph.nodes[end]),
+            'length_km': round(edge.length, 3),
+            'speed_kmh': round(speed, 1),
+            'speed_source': source_kind,
+            'travel_time_seconds': round(edge.length / speed * 3600, 1),
+        })
+
+    return {
+        'origin': {**_point_dict(origin), 'snapped_to': _point_dict(graph.nodes[source]),
+                   'snap_distance_m': round(source_km * 1000, 1)},
+        'destination': {**_point_dict(destination), 'snapped_to': _point_dict(graph.nodes[target]),
+                        'snap_distance_m': round(target_km * 1000, 1)},
+        'distance_km': round(sum(graph.edges[road_id].length for road_id, _, _ in steps), 3),
+        'travel_time_seconds': round(seconds, 1),
+        'free_flow_seconds': round(free_flow, 1),
+        'roads': legs,
+        'computed_at': now.isoformat(),
+    }
+
+
+def _point_dict(point: Point) -> Dict[str, float]:
+    return {'lat': point[0], 'lon': point[1]}
@@ -1,7 +1,38 @@
 """
 Marshmallow schemas for API input validation.
 """
-from marshmallow import Schema, fields, validate, validates, ValidationError
+from datetime import datetime, time, timezone
+
+from marshmallow import Schema, fields, post_load, validate, validates, validates_schema, ValidationError
+
+
+class UTCDateTime(fields.DateTime):
+    """ISO 8601 datetime normalised to UTC; naive values are taken as UTC."""
+
+    def _deserialize(self, value, attr, data, **kwargs):
+        result = super()._deserialize(value, attr, data, **kwargs)
+        if result.tzinfo is None:
+            return result.replace(tzinfo=timezone.utc)
+        return result.astimezone(timezone.utc)
+
+
+class GeoPoint(fields.Field):
+    """``lat,lon`` pair in decimal degrees, loaded as a ``(lat, lon)`` tuple."""
+
+    def _deserialize(self, value, attr, data, **kwargs):
+        try:
+            lat, lon = (float(part) for part in str(value).split(','))
+        except ValueError:
+            raise ValidationError('Expected "lat,lon" in decimal degrees.')
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            raise ValidationError('Coordinates out of range.')
+        return lat, lon
+
+
+def _check_window(data):
+    start, end = data.get('start'), data.get('end')
+    if start and end and start > end:
+        raise ValidationError('Start time must be earlier than end time.', 'start')
 
 
 class EventCreateSchema(Schema):
@@ -25,18 +56,136 @@ class EventCreateSchema(Schema):
     user_id = fields.Integer(allow_none=True, validate=validate.Range(min=1))
 
 
+class EventBatchCreateSchema(Schema):
+    """Envelope for bulk event creation; items are checked with ``validate_batch``."""
+    events = fields.List(fields.Dict(), required=True, validate=validate.Length(min=1))
+
+
+class EventBatchStatusSchema(Schema):
+    """Schema for bulk event status transitions."""
+    ids = fields.List(
+        fields.Integer(validate=validate.Range(min=1)),
+        required=True,
+        validate=validate.Length(min=1)
+    )
+    status = fields.String(
+        required=True,
+        validate=validate.OneOf(['active', 'resolved', 'cancelled'])
+    )
+
+
+class LoginSchema(Schema):
+    """Schema for login requests."""
+    username = fields.String(required=True, validate=validate.Length(min=1, max=100))
+    password = fields.String(required=True, validate=validate.Length(min=1, max=128))
+
+
+class TrafficReadingSchema(Schema):
+    """Schema for a single traffic sensor reading."""
+    road_id = fields.Integer(required=True, validate=validate.Range(min=1))
+    timestamp = UTCDateTime(required=True)
+    speed = fields.Float(allow_none=True, validate=validate.Range(min=0, max=300))
+    volume = fields.Integer(allow_none=True, validate=validate.Range(min=0))
+    status = fields.String(
+        allow_none=True,
+        validate=validate.OneOf(['SMOOTH', 'MODERATE', 'CONGESTED'])
+    )
+    congestion_level = fields.Float(allow_none=True, validate=validate.Range(min=0, max=1))
+
+
+class TrafficBatchSchema(Schema):
+    """Envelope for bulk reading ingestion; items are checked with ``validate_batch``."""
+    readings = fields.List(fields.Dict(), required=True, validate=validate.Length(min=1))
+
+
 class TrafficQuerySchema(Schema):
     """Schema for traffic history query parameters."""
-    start = fields.DateTime(allow_none=True)
-    end = fields.DateTime(allow_none=True)
+    start = UTCDateTime(allow_none=True)
+    end = UTCDateTime(allow_none=True)
 
     @validates('start')
-    def validate_start(self, value):
+    def validate_start(self, value, **kwargs):
         """Ensure start time is not in the future."""
-        from datetime import datetime, timezone
         if value and value > datetime.now(timezone.utc):
             raise ValidationError("Start time cannot be in the future.")
 
+    @validates_schema
+    def validate_window(self, data, **kwargs):
+        _check_window(data)
+
+
+_BUCKET_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+class TrafficMatrixQuerySchema(Schema):
+    """Schema for the roads x time-buckets traffic matrix.
+
+    ``bucket`` is a duration such as ``15m``, ``1h`` or ``1d`` and is loaded
+    as ``bucket_seconds``.
+    """
+    start = UTCDateTime(allow_none=True)
+    end = UTCDateTime(allow_none=True)
+    bucket = fields.String(
+        load_default='1h',
+        validate=validate.Regexp(r'^\d+[smhd]$', error='Use a duration such as 15m, 1h or 1d.')
+    )
+    encoding = fields.String(
+        load_default='json',
+        validate=validate.OneOf(['json', 'float32'])
+    )
+
+    @validates_schema
+    def validate_window(self, data, **kwargs):
+        _check_window(data)
+
+    @post_load
+    def resolve_bucket(self, data, **kwargs):
+        bucket = data.pop('bucket')
+        data['bucket_seconds'] = int(bucket[:-1]) * _BUCKET_UNITS[bucket[-1]]
+        if data['bucket_seconds'] < 60:
+            raise ValidationError('Bucket must be at least one minute.', 'bucket')
+        return data
+
+
+class ForecastQuerySchema(Schema):
+    """Schema for road forecast query parameters (horizon in minutes)."""
+    horizon = fields.Integer(
+        load_default=60,
+        validate=validate.Range(min=1, max=1440)
+    )
+
+
+class RouteQuerySchema(Schema):
+    """Schema for travel-time route queries."""
+    origin = GeoPoint(required=True, data_key='from')
+    destination = GeoPoint(required=True, data_key='to')
+
+
+class ReplayCreateSchema(Schema):
+    """Schema for loading a historical replay."""
+    start = UTCDateTime(required=True)
+    end = UTCDateTime(required=True)
+    speed = fields.Float(load_default=10.0, validate=validate.Range(min=0.1, max=3600))
+    autoplay = fields.Boolean(load_default=True)
+
+    @validates_schema
+    def validate_window(self, data, **kwargs):
+        start, end = data.get('start'), data.get('end')
+        if start and end and start >= end:
+            raise ValidationError('Start time must be earlier than end time.', 'start')
+
+
+class ReplayControlSchema(Schema):
+    """Schema for pausing, resuming, seeking or re-timing a replay."""
+    state = fields.String(validate=validate.OneOf(['playing', 'paused']))
+    position = UTCDateTime()
+    speed = fields.Float(validate=validate.Range(min=0.1, max=3600))
+
+    @validates_schema
+    def require_change(self, data, **kwargs):
+        if not data:
+            raise ValidationError('Provide at least one of state, position or speed.', '_schema')
+
 
 class PaginationSchema(Schema):
     """Schema for pagination parameters."""
@@ -49,11 +198,47 @@ class PaginationSchema(Schema):
         validate=validate.Range(min=1)
     )
     offset = fields.Integer(
-        allow_none=True,
+        load_default=0,
         validate=validate.Range(min=0)
     )
 
 
+class MapQuerySchema(Schema):
+    """Schema for the event map query parameters."""
+    limit = fields.Integer(
+        load_default=100,
+        validate=validate.Range(min=1, max=200)
+    )
+
+
+DASHBOARD_SECTIONS = (
+    'roads', 'traffic', 'events', 'summary', 'alerts', 'system', 'map', 'weekly', 'snapshot'
+)
+
+
+class DashboardBootstrapSchema(Schema):
+    """Schema for the combined dashboard request.
+
+    ``sections`` is a comma-separated subset of ``DASHBOARD_SECTIONS`` (default:
+    all of them) and is loaded as a list.
+    """
+    sections = fields.String(load_default=','.join(DASHBOARD_SECTIONS))
+    limit = fields.Integer(load_default=10, validate=validate.Range(min=1, max=100))
+    map_limit = fields.Integer(load_default=100, validate=validate.Range(min=1, max=200))
+    road = fields.Integer(validate=validate.Range(min=1))
+
+    @post_load
+    def split_sections(self, data, **kwargs):
+        sections = [name.strip() for name in data['sections'].split(',') if name.strip()]
+        unknown = sorted(set(sections) - set(DASHBOARD_SECTIONS))
+        if unknown or not sections:
+            raise ValidationError(
+                f"Choose sections from: {', '.join(DASHBOARD_SECTIONS)}.", 'sections'
+            )
+        data['sections'] = list(dict.fromkeys(sections))
+        return data
+
+
 class EventFilterSchema(PaginationSchema):
     """Schema for event filtering."""
     status = fields.String(
@@ -67,10 +252,54 @@ class EventFilterSchema(PaginationSchema):
 
 
 class ExportFormatSchema(Schema):
-    """Schema for data export requests."""
+    """Schema for data export requests.
+
+    ``start_date`` / ``end_date`` select whole days and are folded into
+    ``start`` / ``end`` when those are not given.
+    """
     format = fields.String(
         load_default='csv',
-        validate=validate.OneOf(['csv', 'excel', 'json'])
+        validate=validate.OneOf(['csv', 'excel', 'json', 'parquet', 'arrow'])
     )
+    start = UTCDateTime(allow_none=True)
+    end = UTCDateTime(allow_none=True)
     start_date = fields.Date(allow_none=True)
     end_date = fields.Date(allow_none=True)
+    status = fields.String(
+        load_default='all',
+        validate=validate.OneOf(['active', 'resolved', 'cancelled', 'all'])
+    )
+
+    @post_load
+    def resolve_window(self, data, **kwargs):
+        if not data.get('start') and data.get('start_date'):
+            data['start'] = datetime.combine(data['start_date'], time.min, timezone.utc)
+        if not data.get('end') and data.get('end_date'):
+            data['end'] = datetime.combine(data['end_date'], time.max, timezone.utc)
+        _check_window(data)
+        return data
+
+
+class ExportJobSchema(Schema):
+    """Schema for queueing a background export job."""
+    dataset = fields.String(
+        required=True,
+        validate=validate.OneOf(['traffic', 'events'])
+    )
+    format = fields.String(
+        load_default='csv',
+        validate=validate.OneOf(['csv', 'excel', 'parquet', 'arrow'])
+    )
+    start = UTCDateTime(allow_none=True)
+    end = UTCDateTime(allow_none=True)
+    status = fields.String(
+        load_default='all',
+        validate=validate.OneOf(['active', 'resolved', 'cancelled', 'all'])
+    )
+
+    @validates_schema
+    def validate_format(self, data, **kwargs):
+        """Excel reports are only available for traffic data."""
+        if data.get('dataset') == 'events' and data.get('format') == 'excel':
+            raise ValidationError('Excel export is only available for traffic data.', 'format')
+        _check_window(data)
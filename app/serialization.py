@@ -0,0 +1,118 @@
+"""
+Fast JSON encoding for API responses.
+
+Uses orjson when it is installed and falls back to the stdlib encoder, so the
+output is the same either way: UTC ISO 8601 timestamps and numbers for
+``Decimal`` values.
+"""
+import base64
+import json
+import sys
+from array import array
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Any, Iterable, Mapping, Optional, Sequence
+
+from flask import current_app
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS
+
+
+class RawJSON(bytes):
+    """Already-encoded JSON that :func:`encode_object` splices in verbatim."""
+
+
+def _default(value: Any):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    return DefaultJSONProvider.default(value)
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode ``obj`` to compact JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+    return json.dumps(obj, default=_default, separators=(',', ':')).encode('utf-8')
+
+
+def loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def encode_records(fields: Sequence[str], rows: Iterable[Sequence]) -> RawJSON:
+    """Encode row tuples as a JSON array of objects keyed by ``fields``.
+
+    Rows go straight from the DB cursor to the encoder: no ORM objects, no
+    per-field Python conversion (datetimes and decimals are handled by the
+    encoder itself).
+    """
+    return RawJSON(dumps([dict(zip(fields, row)) for row in rows]))
+
+
+def encode_float32(values: Iterable[Optional[float]]) -> str:
+    """Pack numbers as base64 little-endian float32; ``None`` becomes NaN."""
+    packed = array('f', (float('nan') if value is None else value for value in values))
+    if sys.byteorder != 'little':
+        packed.byteswap()
+    return base64.b64encode(packed.tobytes()).decode('ascii')
+
+
+def encode_object(mapping: Mapping[str, Any]) -> bytes:
+    """Encode a top-level object, splicing :class:`RawJSON` values unchanged."""
+    parts = []
+    for key, value in mapping.items():
+        encoded = value if isinstance(value, RawJSON) else dumps(value)
+        parts.append(dumps(key) + b':' + encoded)
+    return b'{' + b','.join(parts) + b'}'
+
+
+def object_response(mapping: Mapping[str, Any], status: int = 200):
+    """Build a JSON response from a mapping that may contain :class:`RawJSON` parts."""
+    return current_app.response_class(
+        encode_object(mapping), status=status, mimetype='application/json'
+    )
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson (stdlib fallback).
+
+    Keys keep insertion order instead of being sorted, and datetimes are
+    rendered as ISO 8601 rather than HTTP dates.
+    """
+
+    sort_keys = False
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return dumps(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs: Any) -> Any:
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj), mimetype=self.mimetype)
+
+
+def init_json_provider(app) -> None:
+    """Install the fast JSON provider unless ``FAST_JSON`` is disabled."""
+    if app.config.get('FAST_JSON', True):
+        app.json = FastJSONProvider(app)
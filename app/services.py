@@ -4,13 +4,47 @@ Business logic helpers for the Urban Traffic Status Inquiry System.
 
 from __future__ import annotations
 
+import math
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 
-from sqlalchemy import func
+from sqlalchemy import Float, cast, func, insert, select, update
+
+from flask import current_app
 
 from . import db, cache
+from .event_index import apply_event_changes, expired_event_ids, get_active_index
+from .fanout import fetch_concurrently, first, get_query_fanout, rows, scalar
+from .middleware import bump_etag_version
 from .models import Event, Road, TrafficData, User
+from .partitions import epoch_seconds, fetch_partitioned_traffic, hot_cutoff, traffic_window
+from .road_registry import RoadInfo, get_road_registry
+from .routing import apply_traffic_readings
+from .serialization import encode_float32, encode_records
+
+
+TRAFFIC_FIELDS = (
+    "id",
+    "road_id",
+    "road_name",
+    "timestamp",
+    "speed",
+    "volume",
+    "status",
+    "congestion_level",
+)
+
+EVENT_FIELDS = (
+    "id",
+    "road_id",
+    "road_name",
+    "type",
+    "description",
+    "position",
+    "timestamp",
+    "status",
+    "severity",
+)
 
 
 def _to_iso(dt: datetime) -> str:
@@ -26,19 +60,36 @@ def _to_float(value) -> Optional[float]:
     return float(value) if value is not None else None
 
 
-def _parse_iso_datetime(value: Optional[str]) -> Optional[datetime]:
-    """Parse ISO formatted string (accepting trailing Z) into an aware datetime."""
+def _parse_iso_datetime(value: Union[str, datetime, None]) -> Optional[datetime]:
+    """Parse ISO formatted string (accepting trailing Z) into an aware datetime.
+
+    Datetimes already parsed by a schema are only normalised to UTC.
+    """
     if not value:
         return None
-    normalized = value.strip()
-    if normalized.endswith("Z"):
-        normalized = normalized[:-1] + "+00:00"
-    dt = datetime.fromisoformat(normalized)
+    if isinstance(value, datetime):
+        dt = value
+    else:
+        normalized = value.strip()
+        if normalized.endswith("Z"):
+            normalized = normalized[:-1] + "+00:00"
+        dt = datetime.fromisoformat(normalized)
     if dt.tzinfo is None:
         dt = dt.replace(tzinfo=timezone.utc)
     return dt.astimezone(timezone.utc)
 
 
+def _default_window(
+    start: Optional[datetime], end: Optional[datetime]
+) -> Tuple[datetime, datetime]:
+    """Fill a missing export window end with now and start with seven days earlier."""
+    if not end:
+        end = datetime.now(timezone.utc)
+    if not start:
+        start = end - timedelta(days=7)
+    return start, end
+
+
 def _parse_point_wkt(wkt: Optional[str]) -> Optional[Dict[str, float]]:
     if not wkt:
         return None
@@ -50,10 +101,8 @@ def _parse_point_wkt(wkt: Optional[str]) -> Optional[Dict[str, float]]:
         return None
 
 
-@cache.cached(timeout=300, key_prefix='all_roads')
 def get_all_roads() -> List[Dict]:
-    """Get all roads (cached for 5 minutes)."""
-    roads = Road.query.order_by(Road.name.asc()).all()
+    """Get all roads, ordered by name (from the road registry)."""
     return [
         {
             "id": road.id,
@@ -62,14 +111,14 @@ def get_all_roads() -> List[Dict]:
             "lanes": road.lanes,
             "level": road.level,
             "speed_limit": road.speed_limit,
-            "length": _to_float(road.length),
+            "length": road.length,
         }
-        for road in roads
+        for road in get_road_registry().ordered
     ]
 
 
-def get_road_by_id(road_id: int) -> Optional[Road]:
-    return db.session.get(Road, road_id)
+def get_road_by_id(road_id: int) -> Optional[RoadInfo]:
+    return get_road_registry().get(road_id)
 
 
 def get_latest_traffic(limit: int = 10, offset: int = 0) -> Dict:
@@ -92,12 +141,30 @@ def get_latest_traffic(limit: int = 10, offset: int = 0) -> Dict:
 
 
 def get_events(
-    limit: Optional[int] = None, status: Optional[str] = "active", offset: int = 0
+    limit: Optional[int] = None,
+    status: Optional[str] = "active",
+    offset: int = 0,
+    severity: Optional[int] = None,
 ) -> Dict:
-    """Get events with pagination support."""
+    """Get events with pagination support.
+
+    Active events are served from the in-memory active-event index.
+    """
+    if status == "active":
+        index = get_active_index()
+        total = index.count(severity=severity)
+        return {
+            'data': index.page(limit, offset, severity=severity),
+            'total': total,
+            'limit': limit or total,
+            'offset': offset
+        }
+
     query = Event.query.order_by(Event.timestamp.desc())
     if status and status != "all":
         query = query.filter_by(status=status)
+    if severity is not None:
+        query = query.filter_by(severity=severity)
 
     total = query.count()
 
@@ -118,7 +185,7 @@ def _serialize_traffic_row(row: TrafficData) -> Dict:
     return {
         "id": row.id,
         "road_id": row.road_id,
-        "road_name": row.road.name if row.road else None,
+        "road_name": get_road_registry().name(row.road_id),
         "timestamp": _to_iso(row.timestamp),
         "speed": _to_float(row.speed),
         "volume": row.volume,
@@ -127,11 +194,56 @@ def _serialize_traffic_row(row: TrafficData) -> Dict:
     }
 
 
+def _traffic_tuple_query():
+    """Select traffic readings as plain row tuples in ``TRAFFIC_FIELDS`` order.
+
+    Decimals are cast to floats in SQL and the road name comes from a join, so
+    no ORM objects or per-row lazy loads are involved.
+    """
+    return select(
+        TrafficData.id,
+        TrafficData.road_id,
+        Road.name,
+        TrafficData.timestamp,
+        cast(TrafficData.speed, Float),
+        TrafficData.volume,
+        TrafficData.status,
+        cast(TrafficData.congestion_level, Float),
+    ).outerjoin(Road, TrafficData.road_id == Road.id)
+
+
+def _serialize_traffic_tuple(row) -> Dict:
+    serialized = dict(zip(TRAFFIC_FIELDS, row))
+    serialized["timestamp"] = _to_iso(row[3])
+    return serialized
+
+
+def _event_tuple_query():
+    """Select events as plain row tuples in ``EVENT_FIELDS`` order."""
+    return select(
+        Event.id,
+        Event.road_id,
+        Road.name,
+        Event.type,
+        Event.description,
+        Event.position,
+        Event.timestamp,
+        Event.status,
+        Event.severity,
+    ).outerjoin(Road, Event.road_id == Road.id)
+
+
+def _serialize_event_tuple(row) -> Dict:
+    serialized = dict(zip(EVENT_FIELDS, row))
+    serialized["timestamp"] = _to_iso(row[6])
+    return serialized
+
+
 def _serialize_event_row(row: Event) -> Dict:
     return {
         "id": row.id,
         "road_id": row.road_id,
-        "road_name": row.road.name if row.road else None,
+        "road_name": get_road_registry().name(row.road_id),
         "type": row.type,
         "description": row.description,
         "position": row.position,
@@ -142,8 +254,16 @@ def _serialize_event_row(row: Event) -> Dict:
 
 
 def get_traffic_history(
-    road_id: int, start: Optional[str], end: Optional[str]
+    road_id: int,
+    start: Union[str, datetime, None],
+    end: Union[str, datetime, None],
+    raw: bool = False,
 ) -> Tuple[List[Dict], List[Dict], Tuple[datetime, datetime]]:
+    """Traffic readings and events for a road over a time window.
+
+    With ``raw=True`` the readings are returned pre-encoded as JSON bytes
+    (:class:`RawJSON`) straight from the row tuples.
+    """
     default_end = datetime.now(timezone.utc)
     default_start = default_end - timedelta(days=7)
     start_dt = _parse_iso_datetime(start) or default_start
@@ -152,14 +272,38 @@ def get_traffic_history(
     if start_dt > end_dt:
         raise ValueError("Start time must be earlier than end time.")
 
-    traffic_rows = (
-        TrafficData.query.filter(
+    traffic_rows = db.session.execute(
+        _traffic_tuple_query()
+        .where(
             TrafficData.road_id == road_id,
             TrafficData.timestamp.between(start_dt, end_dt),
         )
         .order_by(TrafficData.timestamp.asc())
-        .all()
-    )
+    ).all()
+
+    # Only windows reaching past the hot table need to touch monthly partitions.
+    if start_dt < hot_cutoff():
+        road_name = get_road_registry().name(road_id)
+        archived = [
+            (
+                row.id,
+                row.road_id,
+                road_name,
+                row.timestamp,
+                _to_float(row.speed),
+                row.volume,
+                row.status,
+                _to_float(row.congestion_level),
+            )
+            for row in fetch_partitioned_traffic(road_id, start_dt, end_dt)
+        ]
+        if archived:
+            traffic_rows = sorted(archived + list(traffic_rows), key=lambda row: row[3])
+
+    if raw:
+        traffic = encode_records(TRAFFIC_FIELDS, traffic_rows)
+    else:
+        traffic = [_serialize_traffic_tuple(row) for row in traffic_rows]
 
     event_rows = (
         Event.query.filter(
@@ -171,49 +315,141 @@ def get_traffic_history(
     )
 
     return (
-        [_serialize_traffic_row(row) for row in traffic_rows],
+        traffic,
         [_serialize_event_row(row) for row in event_rows],
         (start_dt, end_dt),
     )
 
 
+MATRIX_METRICS = ("congestion", "speed", "volume")
+
+
+def _bucket_index(column, start: datetime, bucket_seconds: int, dialect: str):
+    """SQL expression for the bucket a timestamp at or after ``start`` falls in."""
+    return (epoch_seconds(column, dialect) - int(start.timestamp())) // bucket_seconds
+
+
+def get_traffic_matrix(
+    start: Union[str, datetime, None],
+    end: Union[str, datetime, None],
+    bucket_seconds: int,
+    encoding: str = "json",
+) -> Dict:
+    """Dense roads x time-buckets matrix of average congestion, speed and volume.
+
+    All readings in ``[start, end)`` (hot table plus any overlapping monthly
+    partitions) are aggregated with a single GROUP BY on road and bucket
+    index. Each metric is returned as one flat row-major array of
+    ``len(roads) * buckets`` cells; with ``encoding="float32"`` the arrays
+    are base64 little-endian float32 with NaN for empty cells, otherwise JSON
+    numbers with ``null``.
+
+    Raises ``ValueError`` for an empty window or one with more than
+    ``TRAFFIC_MATRIX_MAX_CELLS`` cells.
+    """
+    end_dt = _parse_iso_datetime(end) or datetime.now(timezone.utc)
+    start_dt = _parse_iso_datetime(start) or end_dt - timedelta(hours=24)
+    if start_dt >= end_dt:
+        raise ValueError("Start time must be earlier than end time.")
+
+    roads = get_road_registry().ordered
+    span = (end_dt - start_dt).total_seconds()
+    buckets = max(1, math.ceil(span / bucket_seconds))
+    max_cells = current_app.config["TRAFFIC_MATRIX_MAX_CELLS"]
+    if len(roads) * buckets > max_cells:
+        raise ValueError(
+            f"Matrix of {len(roads)} roads x {buckets} buckets exceeds {max_cells} cells; "
+            "use a larger bucket or a shorter window."
+        )
+
+    readings = traffic_window(
+        start_dt, end_dt, ("road_id", "timestamp", "speed", "volume", "congestion_level")
+    )
+
+    dialect = db.session.get_bind().dialect.name
+    bucket = _bucket_index(readings.c.timestamp, start_dt, bucket_seconds, dialect).label("bucket")
+    rows = db.session.execute(
+        select(
+            readings.c.road_id,
+            bucket,
+            cast(func.avg(readings.c.congestion_level), Float),
+            cast(func.avg(readings.c.speed), Float),
+            cast(func.avg(readings.c.volume), Float),
+        ).group_by(readings.c.road_id, bucket)
+    ).all()
+
+    row_of = {road.id: index for index, road in enumerate(roads)}
+    cells = len(roads) * buckets
+    matrix = {metric: [None] * cells for metric in MATRIX_METRICS}
+    for road_id, index, congestion, speed, volume in rows:
+        road_row = row_of.get(road_id)
+        if road_row is None or not 0 <= index < buckets:
+            continue
+        cell = road_row * buckets + index
+        matrix["congestion"][cell] = congestion
+        matrix["speed"][cell] = speed
+        matrix["volume"][cell] = volume
+
+    if encoding == "float32":
+        matrix = {metric: encode_float32(values) for metric, values in matrix.items()}
+
+    return {
+        "start": _to_iso(start_dt),
+        "end": _to_iso(end_dt),
+        "bucket_seconds": bucket_seconds,
+        "shape": [len(roads), buckets],
+        "encoding": encoding,
+        "roads": {
+            "id": [road.id for road in roads],
+            "name": [road.name for road in roads],
+            "code": [road.code for road in roads],
+        },
+        "metrics": matrix,
+    }
+
+
+def _hot_window():
+    """The shared hot-window store, or ``None`` when it is disabled.
+
+    Imported on use: the store maps its file with NumPy views.
+    """
+    if not current_app.config["HOT_WINDOW_ENABLED"]:
+        return None
+    from .hot_window import get_hot_window
+
+    return get_hot_window()
+
+
 @cache.cached(timeout=60, key_prefix='dashboard_summary')
 def build_dashboard_summary(window_hours: int = 1) -> Dict:
     """Build dashboard summary (cached for 1 minute)."""
     now = datetime.now(timezone.utc)
     window_start = now - timedelta(hours=window_hours)
 
-    total_roads = db.session.query(func.count(Road.id)).scalar() or 0
-    active_events = (
-        db.session.query(func.count(Event.id))
-        .filter(Event.status == "active")
-        .scalar()
-        or 0
-    )
-
-    avg_speed = (
-        db.session.query(func.avg(TrafficData.speed))
-        .filter(TrafficData.timestamp >= window_start)
-        .scalar()
-    )
-    max_volume = (
-        db.session.query(func.max(TrafficData.volume))
-        .filter(TrafficData.timestamp >= window_start)
-        .scalar()
-    )
-
-    congested = (
-        db.session.query(
-            Road.name.label("road_name"),
-            func.avg(TrafficData.congestion_level).label("avg_congestion"),
+    registry = get_road_registry()
+    total_roads = len(registry)
+    active_events = len(get_active_index())
+
+    hot = _hot_window()
+    traffic = hot.window_summary(window_start.timestamp()) if hot else None
+    if traffic is None:
+        window = TrafficData.timestamp >= window_start
+        results = fetch_concurrently(
+            avg_speed=scalar(select(func.avg(TrafficData.speed)).where(window)),
+            max_volume=scalar(select(func.max(TrafficData.volume)).where(window)),
+            congested=rows(
+                select(
+                    TrafficData.road_id,
+                    func.avg(TrafficData.congestion_level).label("avg_congestion"),
+                )
+                .where(window)
+                .group_by(TrafficData.road_id)
+                .order_by(func.avg(TrafficData.congestion_level).desc())
+                .limit(5)
+            ),
         )
-        .join(TrafficData, TrafficData.road_id == Road.id)
-        .filter(TrafficData.timestamp >= window_start)
-        .group_by(Road.id)
-        .order_by(func.avg(TrafficData.congestion_level).desc())
-        .limit(5)
-        .all()
-    )
+        traffic = results["avg_speed"], results["max_volume"], results["congested"]
+    avg_speed, max_volume, congested = traffic
 
     return {
         "generated_at": _to_iso(now),
@@ -223,8 +459,12 @@ def build_dashboard_summary(window_hours: int = 1) -> Dict:
         "avg_speed_last_window": _to_float(avg_speed),
         "max_volume_last_window": int(max_volume) if max_volume is not None else None,
         "top_congested_roads": [
-            {"road_name": row.road_name, "avg_congestion": _to_float(row.avg_congestion)}
-            for row in congested
+            {
+                "road_name": registry.name(road_id),
+                "avg_congestion": _to_float(avg_congestion),
+            }
+            for road_id, avg_congestion in congested
+            if road_id in registry.by_id
         ],
     }
 
@@ -237,31 +477,45 @@ def get_road_snapshot(road_id: int) -> Optional[Dict]:
     now = datetime.now(timezone.utc)
     day_window = now - timedelta(hours=24)
 
-    latest = (
-        TrafficData.query.filter_by(road_id=road_id)
-        .order_by(TrafficData.timestamp.desc())
-        .first()
-    )
-
-    avg_speed, avg_volume, avg_congestion = (
-        db.session.query(
-            func.avg(TrafficData.speed),
-            func.avg(TrafficData.volume),
-            func.avg(TrafficData.congestion_level),
+    queries = {
+        "event_count": scalar(
+            select(func.count(Event.id)).where(
+                Event.road_id == road_id, Event.timestamp >= day_window
+            )
+        ),
+    }
+    hot = _hot_window()
+    traffic = hot.road_snapshot(road_id, day_window.timestamp()) if hot else None
+    if traffic is None:
+        queries["latest"] = first(
+            _traffic_tuple_query()
+            .where(TrafficData.road_id == road_id)
+            .order_by(TrafficData.timestamp.desc())
+            .limit(1)
         )
-        .filter(
-            TrafficData.road_id == road_id,
-            TrafficData.timestamp >= day_window,
+        queries["averages"] = first(
+            select(
+                func.avg(TrafficData.speed),
+                func.avg(TrafficData.volume),
+                func.avg(TrafficData.congestion_level),
+            ).where(
+                TrafficData.road_id == road_id,
+                TrafficData.timestamp >= day_window,
+            )
         )
-        .first()
-    )
-
-    event_count = (
-        db.session.query(func.count(Event.id))
-        .filter(Event.road_id == road_id, Event.timestamp >= day_window)
-        .scalar()
-        or 0
-    )
+    results = fetch_concurrently(**queries)
+    event_count = results["event_count"] or 0
+    if traffic is None:
+        latest = results["latest"]
+        averages = results["averages"]
+    else:
+        reading, averages = traffic
+        reading_id, _, ts, speed, volume, status, congestion = reading
+        latest = (
+            reading_id, road_id, road.name, datetime.fromtimestamp(ts, timezone.utc),
+            speed, volume, status, congestion,
+        )
+    avg_speed, avg_volume, avg_congestion = averages
 
     return {
         "road": {
@@ -269,12 +523,12 @@ def get_road_snapshot(road_id: int) -> Optional[Dict]:
             "name": road.name,
             "code": road.code,
             "lanes": road.lanes,
-            "length": _to_float(road.length),
+            "length": road.length,
             "speed_limit": road.speed_limit,
             "start_point": _parse_point_wkt(road.start_point),
             "end_point": _parse_point_wkt(road.end_point),
         },
-        "latest": _serialize_traffic_row(latest) if latest else None,
+        "latest": _serialize_traffic_tuple(latest) if latest else None,
         "averages": {
             "speed": _to_float(avg_speed),
             "volume": _to_float(avg_volume),
@@ -286,6 +540,58 @@ def get_road_snapshot(road_id: int) -> Optional[Dict]:
     }
 
 
+def ingest_traffic_batch(records: List[Dict]) -> List[Dict]:
+    """Insert validated sensor readings in one transaction (executemany).
+
+    Readings are serialized from the input and the road registry instead of
+    being read back, so the cost stays one insert per batch. Raises
+    ``LookupError`` if any referenced road does not exist.
+    """
+    registry = get_road_registry().by_id
+    missing = sorted({record["road_id"] for record in records} - registry.keys())
+    if missing:
+        raise LookupError(f"Roads not found: {missing}")
+
+    rows = [
+        {
+            "road_id": record["road_id"],
+            "timestamp": record["timestamp"],
+            "speed": record.get("speed"),
+            "volume": record.get("volume"),
+            "status": record.get("status"),
+            "congestion_level": record.get("congestion_level"),
+        }
+        for record in records
+    ]
+    ids = list(
+        db.session.scalars(
+            insert(TrafficData).returning(TrafficData.id, sort_by_parameter_order=True),
+            rows,
+        )
+    )
+    db.session.commit()
+
+    if current_app.config["HOT_WINDOW_ENABLED"]:
+        from .hot_window import record_readings
+
+        record_readings({**row, "id": reading_id} for reading_id, row in zip(ids, rows))
+    apply_traffic_readings(rows)
+
+    return [
+        {
+            "id": reading_id,
+            "road_id": row["road_id"],
+            "road_name": registry[row["road_id"]].name,
+            "timestamp": _to_iso(row["timestamp"]),
+            "speed": row["speed"],
+            "volume": row["volume"],
+            "status": row["status"],
+            "congestion_level": row["congestion_level"],
+        }
+        for reading_id, row in zip(ids, rows)
+    ]
+
+
 def create_event(payload: Dict) -> Dict:
     timestamp = _parse_iso_datetime(payload.get("timestamp")) or datetime.now(
         timezone.utc
@@ -302,71 +608,214 @@ def create_event(payload: Dict) -> Dict:
     )
     db.session.add(event)
     db.session.commit()
+    invalidate_event_views()
+
+    created = _serialize_event_row(event)
+    apply_event_changes([created])
+    return created
+
+
+# Allowed status changes for batch transitions.
+EVENT_TRANSITIONS = {
+    "active": {"resolved", "cancelled"},
+    "resolved": {"active"},
+    "cancelled": {"active"},
+}
+
+
+def invalidate_event_views() -> None:
+    """Drop cached views derived from events (summary, alerts, event ETags)."""
+    # get_alerts is computed from the cached dashboard summary.
+    cache.delete("dashboard_summary")
+    bump_etag_version("events")
+
+
+def _fetch_serialized_events(ids: List[int]) -> List[Dict]:
+    rows = db.session.execute(
+        _event_tuple_query().where(Event.id.in_(ids)).order_by(Event.id.asc())
+    ).all()
+    return [_serialize_event_tuple(row) for row in rows]
+
+
+def create_events_batch(records: List[Dict]) -> List[Dict]:
+    """Insert many validated events in one transaction (executemany).
+
+    Raises ``LookupError`` if any referenced road does not exist.
+    """
+    road_ids = {record["road_id"] for record in records}
+    missing = sorted(road_ids - get_road_registry().by_id.keys())
+    if missing:
+        raise LookupError(f"Roads not found: {missing}")
+
+    now = datetime.now(timezone.utc)
+    rows = [
+        {
+            "user_id": record.get("user_id"),
+            "road_id": record["road_id"],
+            "type": record["type"],
+            "description": record.get("description"),
+            "position": record.get("position"),
+            "timestamp": _parse_iso_datetime(record.get("timestamp")) or now,
+            "status": record.get("status", "active"),
+            "severity": record.get("severity"),
+        }
+        for record in records
+    ]
+    ids = list(
+        db.session.scalars(
+            insert(Event).returning(Event.id, sort_by_parameter_order=True), rows
+        )
+    )
+    db.session.commit()
+    invalidate_event_views()
+
+    created = _fetch_serialized_events(ids)
+    apply_event_changes(created)
+    return created
 
-    return _serialize_event_row(event)
+
+def update_events_status_batch(ids: List[int], status: str) -> List[Dict]:
+    """Move many events to ``status`` in one transaction (executemany).
+
+    Raises ``LookupError`` for unknown ids and ``ValueError`` for transitions
+    not allowed by ``EVENT_TRANSITIONS``; nothing is applied in either case.
+    Events already in ``status`` are left untouched.
+    """
+    ids = list(dict.fromkeys(ids))
+    current = dict(
+        db.session.execute(select(Event.id, Event.status).where(Event.id.in_(ids))).all()
+    )
+    missing = [event_id for event_id in ids if event_id not in current]
+    if missing:
+        raise LookupError(f"Events not found: {missing}")
+
+    invalid = [
+        event_id
+        for event_id in ids
+        if current[event_id] != status
+        and status not in EVENT_TRANSITIONS.get(current[event_id], ())
+    ]
+    if invalid:
+        raise ValueError(f"Cannot move events {invalid} to '{status}'.")
+
+    changed = [event_id for event_id in ids if current[event_id] != status]
+    if changed:
+        db.session.execute(
+            update(Event), [{"id": event_id, "status": status} for event_id in changed]
+        )
+        db.session.commit()
+        invalidate_event_views()
+
+    updated = _fetch_serialized_events(changed)
+    apply_event_changes(updated)
+    return updated
+
+
+def expire_events(now: Optional[float] = None) -> List[Dict]:
+    """Resolve active events older than their type's ``EVENT_TTL_MINUTES``.
+
+    Updates run in chunks of ``EVENT_EXPIRY_BATCH``, each committed on its
+    own; events changed concurrently are skipped. Returns only the events
+    this call resolved, so workers racing on the same ids do not all report
+    them.
+    """
+    ids = expired_event_ids(now)
+    if not ids:
+        return []
+
+    batch = current_app.config["EVENT_EXPIRY_BATCH"]
+    returning = db.session.get_bind().dialect.update_returning
+    resolved: List[int] = []
+    for start in range(0, len(ids), batch):
+        chunk = ids[start:start + batch]
+        statement = (
+            update(Event)
+            .where(Event.id.in_(chunk), Event.status == "active")
+            .values(status="resolved")
+            .execution_options(synchronize_session=False)
+        )
+        if returning:
+            resolved.extend(db.session.scalars(statement.returning(Event.id)))
+        else:
+            # Without RETURNING, claim the still-active ids in the same transaction.
+            claimed = list(db.session.scalars(
+                select(Event.id).where(Event.id.in_(chunk), Event.status == "active").with_for_update()
+            ))
+            if claimed:
+                db.session.execute(statement.where(Event.id.in_(claimed)))
+            resolved.extend(claimed)
+        db.session.commit()
+
+    # Events changed concurrently come back in their current state.
+    apply_event_changes(_fetch_serialized_events(ids))
+    if not resolved:
+        return []
+    invalidate_event_views()
+    return _fetch_serialized_events(resolved)
 
 
 def get_system_status() -> Dict:
     now = datetime.now(timezone.utc)
     tables = {
         "users": db.session.query(func.count(User.id)).scalar() or 0,
-        "roads": db.session.query(func.count(Road.id)).scalar() or 0,
+        "roads": len(get_road_registry()),
         "traffic": db.session.query(func.count(TrafficData.id)).scalar() or 0,
         "events": db.session.query(func.count(Event.id)).scalar() or 0,
     }
 
     latest_event = Event.query.order_by(Event.timestamp.desc()).first()
     latest_traffic = TrafficData.query.order_by(TrafficData.timestamp.desc()).first()
+    hot = _hot_window()
+    detector = current_app.extensions.get("anomaly_detector")
 
     return {
         "generated_at": _to_iso(now),
         "totals": tables,
         "latest_event": _serialize_event_row(latest_event) if latest_event else None,
         "latest_traffic": _serialize_traffic_row(latest_traffic) if latest_traffic else None,
+        "query_fanout": get_query_fanout().stats(),
+        "hot_window": hot.stats() if hot else {"enabled": False},
+        "anomaly": detector.stats() if detector else {"enabled": current_app.config["ANOMALY_ENABLED"]},
     }
 
 
+def get_cache_usage() -> Dict:
+    """Per-prefix memory and hit statistics of the two-tier cache, if enabled."""
+    backend = cache.cache
+    if not hasattr(backend, "usage"):
+        return {"tiered": False, "backend": type(backend).__name__}
+    return {"tiered": True, "backend": type(backend.shared).__name__, **backend.usage()}
+
+
 def get_weekly_report() -> Dict:
     now = datetime.now(timezone.utc)
     start = now - timedelta(days=7)
 
-    traffic_count = (
-        db.session.query(func.count(TrafficData.id))
-        .filter(TrafficData.timestamp >= start)
-        .scalar()
-        or 0
-    )
-    avg_speed = (
-        db.session.query(func.avg(TrafficData.speed))
-        .filter(TrafficData.timestamp >= start)
-        .scalar()
-    )
-
-    total_events = (
-        db.session.query(func.count(Event.id))
-        .filter(Event.timestamp >= start)
-        .scalar()
-        or 0
-    )
-    severe_events = (
-        db.session.query(func.count(Event.id))
-        .filter(Event.timestamp >= start, Event.severity >= 3)
-        .scalar()
-        or 0
-    )
-
-    busiest_roads = (
-        db.session.query(
-            Road.name.label("road_name"),
-            func.avg(TrafficData.volume).label("avg_volume"),
-        )
-        .join(TrafficData, TrafficData.road_id == Road.id)
-        .filter(TrafficData.timestamp >= start)
-        .group_by(Road.id)
-        .order_by(func.avg(TrafficData.volume).desc())
-        .limit(3)
-        .all()
+    window = TrafficData.timestamp >= start
+    results = fetch_concurrently(
+        traffic_count=scalar(select(func.count(TrafficData.id)).where(window)),
+        avg_speed=scalar(select(func.avg(TrafficData.speed)).where(window)),
+        total_events=scalar(select(func.count(Event.id)).where(Event.timestamp >= start)),
+        severe_events=scalar(
+            select(func.count(Event.id)).where(Event.timestamp >= start, Event.severity >= 3)
+        ),
+        busiest_roads=rows(
+            select(
+                TrafficData.road_id,
+                func.avg(TrafficData.volume).label("avg_volume"),
+            )
+            .where(window)
+            .group_by(TrafficData.road_id)
+            .order_by(func.avg(TrafficData.volume).desc())
+            .limit(3)
+        ),
     )
+    traffic_count = results["traffic_count"] or 0
+    avg_speed = results["avg_speed"]
+    total_events = results["total_events"] or 0
+    severe_events = results["severe_events"] or 0
+    busiest_roads = results["busiest_roads"]
+    registry = get_road_registry()
 
     return {
         "window": {"start": _to_iso(start), "end": _to_iso(now)},
@@ -377,14 +826,16 @@ def get_weekly_report() -> Dict:
             "severe": severe_events,
         },
         "busiest_roads": [
-            {"road_name": row.road_name, "avg_volume": _to_float(row.avg_volume)}
+            {"road_name": registry.name(row.road_id), "avg_volume": _to_float(row.avg_volume)}
             for row in busiest_roads
+            if row.road_id in registry.by_id
         ],
     }
 
 
-def get_alerts() -> Dict:
-    summary = build_dashboard_summary()
+def get_alerts(summary: Optional[Dict] = None) -> Dict:
+    if summary is None:
+        summary = build_dashboard_summary()
     alerts = []
     if summary["active_events"] and summary["active_events"] > 8:
         alerts.append(
@@ -432,3 +883,43 @@ def get_map_events(limit: int = 50) -> List[Dict]:
         payload["coordinates"] = coords
         results.append(payload)
     return results
+
+
+def build_dashboard_bootstrap(
+    sections: Optional[List[str]] = None,
+    limit: int = 10,
+    map_limit: int = 100,
+    road_id: Optional[int] = None,
+) -> Dict:
+    """Dashboard sections in one payload, each as its own endpoint returns it.
+
+    ``sections`` defaults to all of them; they are computed concurrently
+    through the query fan-out. Alerts are derived from the summary section
+    rather than a second summary lookup, and ``snapshot`` covers ``road_id``
+    (default: the first road by name).
+    """
+    registry = get_road_registry()
+    if road_id is None and registry.ordered:
+        road_id = registry.ordered[0].id
+
+    builders = {
+        "roads": get_all_roads,
+        "traffic": lambda: get_latest_traffic(limit),
+        "events": lambda: get_events(limit=limit),
+        "summary": build_dashboard_summary,
+        "alerts": get_alerts,
+        "system": get_system_status,
+        "map": lambda: get_map_events(map_limit),
+        "weekly": get_weekly_report,
+        "snapshot": lambda: get_road_snapshot(road_id) if road_id is not None else None,
+    }
+    sections = list(builders) if sections is None else sections
+    tasks = {name: builders[name] for name in sections}
+    if "summary" in tasks:
+        tasks.pop("alerts", None)
+    payload = get_query_fanout().call(tasks)
+    if "alerts" in sections and "alerts" not in payload:
+        payload["alerts"] = get_alerts(payload["summary"])
+
+    payload["generated_at"] = _to_iso(datetime.now(timezone.utc))
+    return payload
@@ -53,96 +53,104 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     }
 
-    function populateRoads() {
-        return fetch('/api/roads')
-            .then(response => response.json())
-            .then(data => {
-                const selects = [roadSelect, historyRoadSelect].filter(Boolean);
-                selects.forEach(select => {
-                    select.innerHTML = '';
-                    data.forEach(road => {
-                        const option = document.createElement('option');
-                        option.value = road.id;
-                        option.textContent = `${road.name} (${road.code})`;
-                        select.appendChild(option);
-                    });
-                });
-                if (roadSelect && data.length && !roadSelect.value) {
-                    roadSelect.value = data[0].id;
-                }
-                if (historyRoadSelect && data.length && !historyRoadSelect.value) {
-                    historyRoadSelect.value = roadSelect ? roadSelect.value : data[0].id;
-                }
-                if (roadSelect && roadSelect.value) {
-                    fetchRoadSnapshot(roadSelect.value);
-                }
-                if (historyForm && historyRoadSelect && historyRoadSelect.value) {
-                    historyForm.dispatchEvent(new Event('submit'));
-                }
-            })
-            .catch(error => console.error('Failed to load roads', error));
+    // Paginated endpoints wrap their rows in `data`.
+    function rowsOf(payload) {
+        return Array.isArray(payload) ? payload : (payload?.data || []);
     }
 
-    function fetchLatestTraffic() {
-        fetch('/api/traffic/latest?limit=10')
-            .then(response => response.json())
-            .then(data => {
-                trafficTbody.innerHTML = '';
-                if (!data.length) {
-                    trafficTbody.innerHTML = '<tr><td colspan="5">No traffic data available.</td></tr>';
-                    return;
-                }
-                data.forEach(item => {
-                    const row = document.createElement('tr');
-                    row.innerHTML = `
-                        <td>${item.road_name ?? 'Unknown road'}</td>
-                        <td>${formatDateTime(item.timestamp)}</td>
-                        <td>${item.speed ?? '--'}</td>
-                        <td>${item.volume ?? '--'}</td>
-                        <td>${item.status ?? '--'}</td>
-                    `;
-                    trafficTbody.appendChild(row);
-                });
-            })
-            .catch(error => console.error('Failed to load latest traffic', error));
+    function renderRoads(data) {
+        const selects = [roadSelect, historyRoadSelect].filter(Boolean);
+        selects.forEach(select => {
+            select.innerHTML = '';
+            data.forEach(road => {
+                const option = document.createElement('option');
+                option.value = road.id;
+                option.textContent = `${road.name} (${road.code})`;
+                select.appendChild(option);
+            });
+        });
+        if (roadSelect && data.length && !roadSelect.value) {
+            roadSelect.value = data[0].id;
+        }
+        if (historyRoadSelect && data.length && !historyRoadSelect.value) {
+            historyRoadSelect.value = roadSelect ? roadSelect.value : data[0].id;
+        }
+        if (historyForm && historyRoadSelect && historyRoadSelect.value) {
+            historyForm.dispatchEvent(new Event('submit'));
+        }
     }
 
-    function fetchActiveEvents() {
-        fetch('/api/events?limit=10')
-            .then(response => response.json())
-            .then(data => {
-                eventsTbody.innerHTML = '';
-                if (!data.length) {
-                    eventsTbody.innerHTML = '<tr><td colspan="4">No active events.</td></tr>';
-                    return;
-                }
-                data.forEach(item => {
-                    const row = document.createElement('tr');
-                    row.innerHTML = `
-                        <td>${item.road_name ?? 'Unknown road'}</td>
-                        <td>${item.type}</td>
-                        <td>${item.description ?? '--'}</td>
-                        <td>${formatDateTime(item.timestamp)}</td>
-                    `;
-                    eventsTbody.appendChild(row);
-                });
-                if (timelineList) {
-                    timelineList.innerHTML = '';
-                    data.slice(0, 5).forEach(item => {
-                        const li = document.createElement('li');
-                        li.innerHTML = `
-                            <div class="timeline-dot"></div>
-                            <div>
-                                <div class="fw-semibold">${item.type} · ${item.road_name ?? 'Unknown'}</div>
-                                <div class="muted small">${formatDateTime(item.timestamp)}</div>
-                                <p class="mb-0">${item.description ?? 'No description provided.'}</p>
-                            </div>
-                        `;
-                        timelineList.appendChild(li);
-                    });
-                }
-            })
-            .catch(error => console.error('Failed to load events', error));
+    function renderLatestTraffic(payload) {
+        const data = rowsOf(payload);
+        trafficTbody.innerHTML = '';
+        if (!data.length) {
+            trafficTbody.innerHTML = '<tr><td colspan="5">No traffic data available.</td></tr>';
+            return;
+        }
+        data.forEach(item => {
+            const row = document.createElement('tr');
+            row.innerHTML = `
+                <td>${item.road_name ?? 'Unknown road'}</td>
+                <td>${formatDateTime(item.timestamp)}</td>
+                <td>${item.speed ?? '--'}</td>
+                <td>${item.volume ?? '--'}</td>
+                <td>${item.status ?? '--'}</td>
+            `;
+            trafficTbody.appendChild(row);
+        });
+    }
+
+    function renderActiveEvents(payload) {
+        const data = rowsOf(payload);
+        eventsTbody.innerHTML = '';
+        if (!data.length) {
+            eventsTbody.innerHTML = '<tr><td colspan="4">No active events.</td></tr>';
+            return;
+        }
+        data.forEach(item => {
+            const row = document.createElement('tr');
+            row.innerHTML = `
+                <td>${item.road_name ?? 'Unknown road'}</td>
+                <td>${item.type}</td>
+                <td>${item.description ?? '--'}</td>
+                <td>${formatDateTime(item.timestamp)}</td>
+            `;
+            eventsTbody.appendChild(row);
+        });
+        if (timelineList) {
+            timelineList.innerHTML = '';
+            data.slice(0, 5).forEach(item => {
+                const li = document.createElement('li');
+                li.innerHTML = `
+                    <div class="timeline-dot"></div>
+                    <div>
+                        <div class="fw-semibold">${item.type} · ${item.road_name ?? 'Unknown'}</div>
+                        <div class="muted small">${formatDateTime(item.timestamp)}</div>
+                        <p class="mb-0">${item.description ?? 'No description provided.'}</p>
+                    </div>
+                `;
+                timelineList.appendChild(li);
+            });
+        }
+    }
+
+    function renderRoadSnapshot(data) {
+        if (!data.road) return;
+        roadDetailsName.textContent = `${data.road.name} (${data.road.code})`;
+        roadDetailsMeta.textContent = `${data.road.length ?? '--'} km · ${data.road.lanes} lanes · Limit ${data.road.speed_limit ?? '--'} km/h`;
+        roadDetailsLatest.textContent = data.latest?.speed
+            ? `${Number(data.latest.speed).toFixed(1)} km/h`
+            : '--';
+        roadDetailsAvgSpeed.textContent = data.averages?.speed
+            ? `${Number(data.averages.speed).toFixed(1)} km/h`
+            : '--';
+        roadDetailsAvgVolume.textContent = data.averages?.volume
+            ? `${Number(data.averages.volume).toFixed(0)}`
+            : '--';
+        roadDetailsCongestion.textContent = data.averages?.congestion != null
+            ? `${Math.round(Number(data.averages.congestion) * 100)}%`
+            : '--';
+        roadDetailsEvents.textContent = data.events_last_24h ?? '0';
     }
 
     function fetchRoadSnapshot(roadId) {
@@ -154,56 +162,34 @@ document.addEventListener('DOMContentLoaded', () => {
                 }
                 return response.json();
             })
-            .then(data => {
-                if (!data.road) return;
-                roadDetailsName.textContent = `${data.road.name} (${data.road.code})`;
-                roadDetailsMeta.textContent = `${data.road.length ?? '--'} km · ${data.road.lanes} lanes · Limit ${data.road.speed_limit ?? '--'} km/h`;
-                roadDetailsLatest.textContent = data.latest?.speed
-                    ? `${Number(data.latest.speed).toFixed(1)} km/h`
-                    : '--';
-                roadDetailsAvgSpeed.textContent = data.averages?.speed
-                    ? `${Number(data.averages.speed).toFixed(1)} km/h`
-                    : '--';
-                roadDetailsAvgVolume.textContent = data.averages?.volume
-                    ? `${Number(data.averages.volume).toFixed(0)}`
-                    : '--';
-                roadDetailsCongestion.textContent = data.averages?.congestion != null
-                    ? `${Math.round(Number(data.averages.congestion) * 100)}%`
-                    : '--';
-                roadDetailsEvents.textContent = data.events_last_24h ?? '0';
-            })
+            .then(renderRoadSnapshot)
             .catch(error => console.error('Failed to load road snapshot', error));
     }
 
-    function fetchSummary() {
-        fetch('/api/dashboard/summary')
-            .then(response => response.json())
-            .then(data => {
-                summaryTotalRoads.textContent = data.total_roads ?? '--';
-                summaryActiveEvents.textContent = data.active_events ?? '--';
-                summaryAvgSpeed.textContent = data.avg_speed_last_window
-                    ? `${Number(data.avg_speed_last_window).toFixed(1)}`
-                    : '--';
-                summaryMaxVolume.textContent = data.max_volume_last_window ?? '--';
-                summaryUpdatedAt.textContent = data.generated_at
-                    ? `Updated at ${formatDateTime(data.generated_at)} (last ${data.window_hours}h)`
-                    : '';
+    function renderSummary(data) {
+        summaryTotalRoads.textContent = data.total_roads ?? '--';
+        summaryActiveEvents.textContent = data.active_events ?? '--';
+        summaryAvgSpeed.textContent = data.avg_speed_last_window
+            ? `${Number(data.avg_speed_last_window).toFixed(1)}`
+            : '--';
+        summaryMaxVolume.textContent = data.max_volume_last_window ?? '--';
+        summaryUpdatedAt.textContent = data.generated_at
+            ? `Updated at ${formatDateTime(data.generated_at)} (last ${data.window_hours}h)`
+            : '';
 
-                summaryCongestedList.innerHTML = '';
-                if (!data.top_congested_roads || !data.top_congested_roads.length) {
-                    summaryCongestedList.innerHTML = '<li>No congestion in the last window.</li>';
-                    return;
-                }
-                data.top_congested_roads.forEach(item => {
-                    const li = document.createElement('li');
-                    const percentage = item.avg_congestion != null
-                        ? `${Math.round(item.avg_congestion * 100)}%`
-                        : '--';
-                    li.innerHTML = `<span>${item.road_name}</span><strong>${percentage}</strong>`;
-                    summaryCongestedList.appendChild(li);
-                });
-            })
-            .catch(error => console.error('Failed to load summary', error));
+        summaryCongestedList.innerHTML = '';
+        if (!data.top_congested_roads || !data.top_congested_roads.length) {
+            summaryCongestedList.innerHTML = '<li>No congestion in the last window.</li>';
+            return;
+        }
+        data.top_congested_roads.forEach(item => {
+            const li = document.createElement('li');
+            const percentage = item.avg_congestion != null
+                ? `${Math.round(item.avg_congestion * 100)}%`
+                : '--';
+            li.innerHTML = `<span>${item.road_name}</span><strong>${percentage}</strong>`;
+            summaryCongestedList.appendChild(li);
+        });
     }
 
     function buildHistoryAnnotations(eventData) {
@@ -225,55 +211,45 @@ document.addEventListener('DOMContentLoaded', () => {
         return annotations;
     }
 
-    function fetchAlerts() {
+    function renderAlerts(data) {
         if (!alertCenter) return;
-        fetch('/api/alerts')
-            .then(response => response.json())
-            .then(data => {
-                alertCenter.innerHTML = '';
-                const alerts = data.alerts || [];
-                if (!alerts.length) {
-                    alertCenter.innerHTML = '<div class="col-12 text-muted">No active alerts.</div>';
-                    return;
-                }
-                    alerts.forEach(alert => {
-                    const col = document.createElement('div');
-                    col.className = 'col-md-6';
-                    col.innerHTML = `
-                        <div class="alert-card ${alert.level}">
-                            <div class="fs-5">${alert.level === 'critical' ? '🚨' : '⚠️'}</div>
-                            <div>
-                                <div class="fw-semibold text-uppercase small">${alert.level}</div>
-                                <p class="mb-0">${alert.message}</p>
-                            </div>
-                        </div>
-                    `;
-                    alertCenter.appendChild(col);
-                });
-            })
-            .catch(error => console.error('Failed to load alerts', error));
+        alertCenter.innerHTML = '';
+        const alerts = data.alerts || [];
+        if (!alerts.length) {
+            alertCenter.innerHTML = '<div class="col-12 text-muted">No active alerts.</div>';
+            return;
+        }
+        alerts.forEach(alert => {
+            const col = document.createElement('div');
+            col.className = 'col-md-6';
+            col.innerHTML = `
+                <div class="alert-card ${alert.level}">
+                    <div class="fs-5">${alert.level === 'critical' ? '🚨' : '⚠️'}</div>
+                    <div>
+                        <div class="fw-semibold text-uppercase small">${alert.level}</div>
+                        <p class="mb-0">${alert.message}</p>
+                    </div>
+                </div>
+            `;
+            alertCenter.appendChild(col);
+        });
     }
 
-    function fetchSystemStatus() {
+    function renderSystemStatus(data) {
         if (!systemStatusList) return;
-        fetch('/api/system/status')
-            .then(response => response.json())
-            .then(data => {
-                systemStatusList.innerHTML = '';
-                const totals = data.totals || {};
-                Object.entries(totals).forEach(([key, value]) => {
-                    const item = document.createElement('li');
-                    item.className = 'list-group-item d-flex justify-content-between';
-                    item.innerHTML = `<span class="text-capitalize">${key}</span><strong>${value}</strong>`;
-                    systemStatusList.appendChild(item);
-                });
-                if (systemStatusUpdated) {
-                    systemStatusUpdated.textContent = data.generated_at
-                        ? `Updated ${formatDateTime(data.generated_at)}`
-                        : '';
-                }
-            })
-            .catch(error => console.error('Failed to load system status', error));
+        systemStatusList.innerHTML = '';
+        const totals = data.totals || {};
+        Object.entries(totals).forEach(([key, value]) => {
+            const item = document.createElement('li');
+            item.className = 'list-group-item d-flex justify-content-between';
+            item.innerHTML = `<span class="text-capitalize">${key}</span><strong>${value}</strong>`;
+            systemStatusList.appendChild(item);
+        });
+        if (systemStatusUpdated) {
+            systemStatusUpdated.textContent = data.generated_at
+                ? `Updated ${formatDateTime(data.generated_at)}`
+                : '';
+        }
     }
 
     function initMap() {
@@ -288,104 +264,137 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     }
 
-    function updateMapMarkers() {
+    function renderMapMarkers(data) {
         if (!mapView) return;
         initMap();
-        fetch('/api/events/map?limit=100')
+        if (!mapInstance) return;
+        mapMarkers.forEach(marker => marker.remove());
+        mapMarkers = [];
+        data.forEach(event => {
+            if (!event.coordinates) return;
+            const marker = L.marker([event.coordinates.lat, event.coordinates.lon])
+                .addTo(mapInstance)
+                .bindPopup(`<strong>${event.type}</strong><br>${event.road_name ?? 'Unknown'}<br>${formatDateTime(event.timestamp)}`);
+            mapMarkers.push(marker);
+        });
+    }
+
+    function downloadWeeklyReport() {
+        fetch('/api/reports/weekly')
             .then(response => response.json())
             .then(data => {
-                if (!mapInstance) return;
-                mapMarkers.forEach(marker => marker.remove());
-                mapMarkers = [];
-                data.forEach(event => {
-                    if (!event.coordinates) return;
-                    const marker = L.marker([event.coordinates.lat, event.coordinates.lon])
-                        .addTo(mapInstance)
-                        .bindPopup(`<strong>${event.type}</strong><br>${event.road_name ?? 'Unknown'}<br>${formatDateTime(event.timestamp)}`);
-                    mapMarkers.push(marker);
-                });
+                const blob = new Blob([JSON.stringify(data, null, 2)], { type: 'application/json' });
+                const url = URL.createObjectURL(blob);
+                const link = document.createElement('a');
+                link.href = url;
+                link.download = 'weekly_report.json';
+                link.click();
+                URL.revokeObjectURL(url);
             })
-            .catch(error => console.error('Failed to load map events', error));
+            .catch(error => console.error('Failed to download weekly report', error));
     }
 
-    function fetchWeeklyReport(download = false) {
-        if (!weeklyReportCards) {
-            if (download) {
-                fetch('/api/reports/weekly')
-                    .then(response => response.json())
-                    .then(data => {
-                        const blob = new Blob([JSON.stringify(data, null, 2)], { type: 'application/json' });
-                        const url = URL.createObjectURL(blob);
-                        const link = document.createElement('a');
-                        link.href = url;
-                        link.download = 'weekly_report.json';
-                        link.click();
-                        URL.revokeObjectURL(url);
-                    });
-            }
-            return;
+    function renderWeeklyReport(data) {
+        if (!weeklyReportCards) return;
+        weeklyReportCards.innerHTML = '';
+        const cards = [
+            {
+                title: 'Traffic Records (7d)',
+                value: data.traffic_records ?? '--',
+                desc: 'Total samples ingested',
+            },
+            {
+                title: 'Avg Speed',
+                value: data.avg_speed ? `${Number(data.avg_speed).toFixed(1)} km/h` : '--',
+                desc: 'Across all roads',
+            },
+            {
+                title: 'Events',
+                value: data.events ? `${data.events.total} total / ${data.events.severe} severe` : '--',
+                desc: 'Created last 7 days',
+            },
+        ];
+        cards.forEach(card => {
+            const col = document.createElement('div');
+            col.className = 'col-md-4';
+            col.innerHTML = `
+                <div class="p-3 bg-light rounded-3 h-100">
+                    <h6>${card.title}</h6>
+                    <div class="display-6">${card.value}</div>
+                    <p class="muted mb-0">${card.desc}</p>
+                </div>
+            `;
+            weeklyReportCards.appendChild(col);
+        });
+
+        const roads = document.createElement('div');
+        roads.className = 'col-md-12';
+        const listItems = (data.busiest_roads || [])
+            .map(
+                item =>
+                    `<li class="road-stat"><span>${item.road_name}</span><strong>${item.avg_volume ? Number(item.avg_volume).toFixed(0) : '--'}</strong></li>`
+            )
+            .join('');
+        roads.innerHTML = `
+            <div class="p-3 bg-white rounded-3 h-100">
+                <h6>Busiest Roads</h6>
+                <div>${listItems || '<div class="muted">No data.</div>'}</div>
+            </div>
+        `;
+        weeklyReportCards.appendChild(roads);
+    }
+
+    // Sections of /api/dashboard/bootstrap and the renderer for each.
+    const SECTION_RENDERERS = {
+        roads: renderRoads,
+        traffic: renderLatestTraffic,
+        events: renderActiveEvents,
+        summary: renderSummary,
+        alerts: renderAlerts,
+        system: renderSystemStatus,
+        map: renderMapMarkers,
+        weekly: renderWeeklyReport,
+        snapshot: renderRoadSnapshot,
+    };
+    // `weekly` and `system` are heavier aggregates: the governor admits requests that
+    // include them as analytics, so they are refreshed apart from the realtime sections.
+    const REALTIME_SECTIONS = ['traffic', 'events', 'summary', 'alerts', 'map'];
+    // The system poll backs off (doubling up to the max) while analytics requests are shed.
+    const SYSTEM_POLL_INTERVAL = 30000;
+    const SYSTEM_POLL_MAX_INTERVAL = 5 * 60 * 1000;
+
+    function loadDashboard(sections) {
+        const params = new URLSearchParams({ sections: sections.join(','), limit: 10, map_limit: 100 });
+        if (roadSelect && roadSelect.value) {
+            params.append('road', roadSelect.value);
         }
-        fetch('/api/reports/weekly')
-            .then(response => response.json())
-            .then(data => {
-                if (download) {
-                    const blob = new Blob([JSON.stringify(data, null, 2)], { type: 'application/json' });
-                    const url = URL.createObjectURL(blob);
-                    const link = document.createElement('a');
-                    link.href = url;
-                    link.download = 'weekly_report.json';
-                    link.click();
-                    URL.revokeObjectURL(url);
-                    return;
+        return fetch(`/api/dashboard/bootstrap?${params}`)
+            .then(response => {
+                if (!response.ok) {
+                    throw new Error(`Dashboard request failed with ${response.status}`);
                 }
-                weeklyReportCards.innerHTML = '';
-                const cards = [
-                    {
-                        title: 'Traffic Records (7d)',
-                        value: data.traffic_records ?? '--',
-                        desc: 'Total samples ingested',
-                    },
-                    {
-                        title: 'Avg Speed',
-                        value: data.avg_speed ? `${Number(data.avg_speed).toFixed(1)} km/h` : '--',
-                        desc: 'Across all roads',
-                    },
-                    {
-                        title: 'Events',
-                        value: data.events ? `${data.events.total} total / ${data.events.severe} severe` : '--',
-                        desc: 'Created last 7 days',
-                    },
-                ];
-                cards.forEach(card => {
-                    const col = document.createElement('div');
-                    col.className = 'col-md-4';
-                    col.innerHTML = `
-                        <div class="p-3 bg-light rounded-3 h-100">
-                            <h6>${card.title}</h6>
-                            <div class="display-6">${card.value}</div>
-                            <p class="muted mb-0">${card.desc}</p>
-                        </div>
-                    `;
-                    weeklyReportCards.appendChild(col);
+                return response.json();
+            })
+            .then(data => {
+                sections.forEach(section => {
+                    if (data[section] != null) {
+                        SECTION_RENDERERS[section](data[section]);
+                    }
                 });
-
-                const roads = document.createElement('div');
-                roads.className = 'col-md-12';
-                const listItems = (data.busiest_roads || [])
-                    .map(
-                        item =>
-                            `<li class="road-stat"><span>${item.road_name}</span><strong>${item.avg_volume ? Number(item.avg_volume).toFixed(0) : '--'}</strong></li>`
-                    )
-                    .join('');
-                roads.innerHTML = `
-                    <div class="p-3 bg-white rounded-3 h-100">
-                        <h6>Busiest Roads</h6>
-                        <div>${listItems || '<div class="muted">No data.</div>'}</div>
-                    </div>
-                `;
-                weeklyReportCards.appendChild(roads);
+                return true;
             })
-            .catch(error => console.error('Failed to load weekly report', error));
+            .catch(error => {
+                console.error('Failed to load dashboard', error);
+                return false;
+            });
+    }
+
+    function pollSystemStatus(delay) {
+        setTimeout(() => {
+            loadDashboard(['system']).then(loaded => {
+                pollSystemStatus(loaded ? SYSTEM_POLL_INTERVAL : Math.min(delay * 2, SYSTEM_POLL_MAX_INTERVAL));
+            });
+        }, delay);
     }
 
     historyForm.addEventListener('submit', event => {
@@ -503,15 +512,6 @@ document.addEventListener('DOMContentLoaded', () => {
             });
     });
 
-    function refreshRealtimeData() {
-        fetchLatestTraffic();
-        fetchActiveEvents();
-        fetchSummary();
-        fetchAlerts();
-        fetchSystemStatus();
-        updateMapMarkers();
-    }
-
     if (roadSelect) {
         roadSelect.addEventListener('change', () => {
             fetchRoadSnapshot(roadSelect.value);
@@ -525,12 +525,12 @@ document.addEventListener('DOMContentLoaded', () => {
     }
 
     if (weeklyDownloadButton) {
-        weeklyDownloadButton.addEventListener('click', () => fetchWeeklyReport(true));
+        weeklyDownloadButton.addEventListener('click', downloadWeeklyReport);
     }
 
-    populateRoads();
-    refreshRealtimeData();
-    fetchWeeklyReport();
-    setInterval(refreshRealtimeData, 30000);
-    setInterval(fetchWeeklyReport, 5 * 60 * 1000);
+    // First paint: every section in one request.
+    loadDashboard(Object.keys(SECTION_RENDERERS));
+    setInterval(() => loadDashboard(REALTIME_SECTIONS), 30000);
+    pollSystemStatus(SYSTEM_POLL_INTERVAL);
+    setInterval(() => loadDashboard(['weekly']), 5 * 60 * 1000);
 });
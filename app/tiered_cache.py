@@ -0,0 +1,308 @@
+"""
+Two-tier cache backend for Flask-Caching.
+
+A bounded per-process LRU with a short TTL sits in front of the shared backend
+(Redis in production). Hot keys such as ``dashboard_summary`` are answered from
+process memory without a network round-trip or unpickling; writes and deletes
+go to the shared tier and are announced on an invalidation channel so the
+other processes drop their local copies.
+
+Enable with ``CACHE_TYPE = 'app.tiered_cache.TieredCache'``; the shared tier is
+chosen by ``CACHE_SHARED_TYPE`` (``RedisCache`` or ``SimpleCache``).
+
+Values in the local tier are shared between callers, so cached results must
+be treated as read-only.
+"""
+import logging
+import pickle
+import threading
+import time
+import uuid
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, Optional
+
+from flask_caching.backends.base import BaseCache
+from werkzeug.utils import import_string
+
+logger = logging.getLogger(__name__)
+
+
+def key_prefix(key: str) -> str:
+    """Accounting group of a cache key (``etag_version:roads`` -> ``etag_version``)."""
+    return key.split(':', 1)[0]
+
+
+def _sizeof(value: Any) -> int:
+    try:
+        return len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return 0
+
+
+class LocalInvalidationBus:
+    """In-process stand-in for pub/sub, used when the shared tier is not Redis.
+
+    Every :class:`TieredCache` on the same channel in this process receives the
+    messages, which is enough for tests and single-process deployments.
+    """
+
+    _subscribers: Dict[str, list] = defaultdict(list)
+    _lock = threading.Lock()
+
+    def __init__(self, channel: str):
+        self.channel = channel
+
+    def subscribe(self, callback) -> None:
+        with self._lock:
+            self._subscribers[self.channel].append(callback)
+
+    def publish(self, origin: str, keys) -> None:
+        with self._lock:
+            callbacks = list(self._subscribers[self.channel])
+        for callback in callbacks:
+            callback(origin, keys)
+
+    def close(self, callback=None) -> None:
+        with self._lock:
+            if callback in self._subscribers[self.channel]:
+                self._subscribers[self.channel].remove(callback)
+
+
+class RedisInvalidationBus:
+    """Invalidation messages over Redis pub/sub (listener runs in a thread)."""
+
+    def __init__(self, client, channel: str):
+        self.client = client
+        self.channel = channel
+        self._thread = None
+
+    def subscribe(self, callback) -> None:
+        def handle(message):
+            try:
+                origin, _, payload = message['data'].decode('utf-8').partition('|')
+                callback(origin, payload.split('\n') if payload else None)
+            except Exception:
+                logger.exception('Bad cache invalidation message')
+
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(**{self.channel: handle})
+        self._thread = pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+
+    def publish(self, origin: str, keys) -> None:
+        payload = '' if keys is None else '\n'.join(keys)
+        try:
+            self.client.publish(self.channel, f'{origin}|{payload}')
+        except Exception:
+            # Local copies still expire after CACHE_LOCAL_TTL.
+            logger.warning('Could not publish cache invalidation', exc_info=True)
+
+    def close(self, callback=None) -> None:
+        if self._thread is not None:
+            self._thread.stop()
+            self._thread = None
+
+
+class TieredCache(BaseCache):
+    """Per-process LRU (tier 1) in front of a shared cache backend (tier 2)."""
+
+    def __init__(
+        self,
+        shared: BaseCache,
+        bus=None,
+        local_ttl: float = 5,
+        max_items: int = 1024,
+        max_bytes: int = 32 * 1024 * 1024,
+        default_timeout: int = 300,
+    ):
+        super().__init__(default_timeout=default_timeout)
+        self.shared = shared
+        self.local_ttl = local_ttl
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.origin = uuid.uuid4().hex
+        self._local: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._local_bytes = 0
+        self._lock = threading.Lock()
+        self._stats = defaultdict(lambda: defaultdict(int))
+        self.bus = bus
+        if bus is not None:
+            bus.subscribe(self._on_invalidate)
+
+    @classmethod
+    def factory(cls, app, config, args, kwargs):
+        shared_type = config.get('CACHE_SHARED_TYPE', 'SimpleCache')
+        if '.' not in shared_type:
+            shared_type = f'flask_caching.backends.{shared_type}'
+        shared_cls = import_string(shared_type)
+        shared = shared_cls.factory(app, config, list(args), dict(kwargs))
+
+        channel = config.get('CACHE_INVALIDATION_CHANNEL', 'cache-invalidation')
+        client = getattr(shared, '_write_client', None)
+        bus = RedisInvalidationBus(client, channel) if client is not None else LocalInvalidationBus(channel)
+        return cls(
+            shared,
+            bus=bus,
+            local_ttl=config.get('CACHE_LOCAL_TTL', 5),
+            max_items=config.get('CACHE_LOCAL_MAX_ITEMS', 1024),
+            max_bytes=config.get('CACHE_LOCAL_MAX_BYTES', 32 * 1024 * 1024),
+            default_timeout=kwargs.get('default_timeout', 300),
+        )
+
+    # ------------------------------------------------------------------
+    # Local tier
+    # ------------------------------------------------------------------
+
+    def _local_get(self, key: str):
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return False, None
+            expires, value, _ = entry
+            if expires <= time.monotonic():
+                self._local_drop(key)
+                return False, None
+            self._local.move_to_end(key)
+            return True, value
+
+    def _local_put(self, key: str, value: Any, timeout: Optional[int], size: Optional[int] = None) -> None:
+        ttl = self.local_ttl
+        timeout = self._normalize_timeout(timeout)
+        if timeout:
+            ttl = min(ttl, timeout)
+        if ttl <= 0:
+            return
+        size = _sizeof(value) if size is None else size
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._local_drop(key)
+            self._local[key] = (time.monotonic() + ttl, value, size)
+            self._local_bytes += size
+            stats = self._stats[key_prefix(key)]
+            stats['local_keys'] += 1
+            stats['local_bytes'] += size
+            while self._local and (len(self._local) > self.max_items or self._local_bytes > self.max_bytes):
+                oldest = next(iter(self._local))
+                self._local_drop(oldest)
+                self._stats[key_prefix(oldest)]['evictions'] += 1
+
+    def _count(self, key: str, field: str, amount: int = 1) -> None:
+        with self._lock:
+            self._stats[key_prefix(key)][field] += amount
+
+    def _local_drop(self, key: str) -> None:
+        """Remove ``key`` from the local tier; caller holds the lock."""
+        entry = self._local.pop(key, None)
+        if entry is not None:
+            size = entry[2]
+            self._local_bytes -= size
+            stats = self._stats[key_prefix(key)]
+            stats['local_keys'] -= 1
+            stats['local_bytes'] -= size
+
+    def _invalidate(self, keys=None) -> None:
+        with self._lock:
+            for key in list(self._local) if keys is None else keys:
+                self._local_drop(key)
+        if self.bus is not None:
+            self.bus.publish(self.origin, None if keys is None else list(keys))
+
+    def _on_invalidate(self, origin: str, keys) -> None:
+        if origin == self.origin:
+            return
+        with self._lock:
+            for key in list(self._local) if keys is None else keys:
+                self._local_drop(key)
+
+    # ------------------------------------------------------------------
+    # BaseCache API
+    # ------------------------------------------------------------------
+
+    def get(self, key: str) -> Any:
+        found, value = self._local_get(key)
+        if found:
+            self._count(key, 'local_hits')
+            return value
+        value = self.shared.get(key)
+        if value is None:
+            self._count(key, 'misses')
+            return None
+        self._count(key, 'shared_hits')
+        self._local_put(key, value, None)
+        return value
+
+    def get_many(self, *keys):
+        return [self.get(key) for key in keys]
+
+    def has(self, key: str) -> bool:
+        found, _ = self._local_get(key)
+        return found or self.shared.has(key)
+
+    def set(self, key: str, value: Any, timeout: Optional[int] = None) -> bool:
+        timeout = self._normalize_timeout(timeout)
+        size = _sizeof(value)
+        result = self.shared.set(key, value, timeout=timeout)
+        self._invalidate([key])
+        self._count(key, 'shared_bytes_written', size)
+        if result:
+            self._local_put(key, value, timeout, size)
+        return result
+
+    def add(self, key: str, value: Any, timeout: Optional[int] = None) -> bool:
+        added = self.shared.add(key, value, timeout=self._normalize_timeout(timeout))
+        if added:
+            self._invalidate([key])
+        return added
+
+    def set_many(self, mapping, timeout: Optional[int] = None):
+        return [key for key, value in mapping.items() if self.set(key, value, timeout)]
+
+    def delete(self, key: str) -> bool:
+        result = self.shared.delete(key)
+        self._invalidate([key])
+        return result
+
+    def delete_many(self, *keys):
+        deleted = self.shared.delete_many(*keys)
+        self._invalidate(keys)
+        return deleted
+
+    def inc(self, key: str, delta: int = 1) -> Optional[int]:
+        value = self.shared.inc(key, delta)
+        self._invalidate([key])
+        return value
+
+    def dec(self, key: str, delta: int = 1) -> Optional[int]:
+        value = self.shared.dec(key, delta)
+        self._invalidate([key])
+        return value
+
+    def clear(self) -> bool:
+        result = self.shared.clear()
+        self._invalidate(None)
+        return result
+
+    # ------------------------------------------------------------------
+    # Accounting
+    # ------------------------------------------------------------------
+
+    def usage(self) -> Dict[str, Any]:
+        """Memory and hit statistics per key prefix."""
+        with self._lock:
+            prefixes = {
+                prefix: dict(values)
+                for prefix, values in sorted(self._stats.items())
+                if any(values.values())
+            }
+            return {
+                'local_items': len(self._local),
+                'local_bytes': self._local_bytes,
+                'max_items': self.max_items,
+                'max_bytes': self.max_bytes,
+                'local_ttl': self.local_ttl,
+                'prefixes': prefixes,
+            }
+
+    def close(self) -> None:
+        if self.bus is not None:
+            self.bus.close(self._on_invalidate)
@@ -0,0 +1,95 @@
+"""
+Request validation built on the marshmallow schemas in ``schemas.py``.
+
+Schema instances are built once per process and reused: constructing a schema
+deep-copies its declared fields, which is the bulk of the cost of validating a
+small request. Loading is stateless, so the shared instances are thread-safe.
+"""
+from functools import lru_cache, wraps
+from typing import Any, Dict, Iterable, List, NamedTuple, Tuple, Type
+
+from flask import jsonify, request
+from marshmallow import EXCLUDE, RAISE, Schema, ValidationError
+
+
+@lru_cache(maxsize=None)
+def get_schema(schema_cls: Type[Schema], unknown: str = RAISE) -> Schema:
+    """Shared instance of ``schema_cls`` for this process."""
+    return schema_cls(unknown=unknown)
+
+
+def validation_error_response(err: ValidationError):
+    return jsonify({'error': 'Validation failed', 'details': err.messages}), 400
+
+
+def load_query(schema_cls: Type[Schema], args=None) -> Dict[str, Any]:
+    """Validate query-string arguments; unknown parameters are ignored."""
+    return get_schema(schema_cls, EXCLUDE).load(request.args if args is None else args)
+
+
+def load_json(schema_cls: Type[Schema], payload) -> Dict[str, Any]:
+    """Validate a JSON request body; unknown keys are rejected."""
+    return get_schema(schema_cls).load(payload)
+
+
+def validate_query(schema_cls: Type[Schema], arg_name: str = 'params'):
+    """Validate ``request.args`` and pass the result to the view as ``arg_name``."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                kwargs[arg_name] = load_query(schema_cls)
+            except ValidationError as err:
+                return validation_error_response(err)
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def validate_json(schema_cls: Type[Schema], arg_name: str = 'payload'):
+    """Validate the JSON body and pass the result to the view as ``arg_name``."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            payload = request.get_json(silent=True)
+            if not payload:
+                return jsonify({'error': 'Request body cannot be empty.'}), 400
+            try:
+                kwargs[arg_name] = load_json(schema_cls, payload)
+            except ValidationError as err:
+                return validation_error_response(err)
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class BatchResult(NamedTuple):
+    """Outcome of :func:`validate_batch`.
+
+    ``valid`` holds ``(index, record)`` pairs in input order; ``errors`` maps
+    the index of each rejected record to its field errors.
+    """
+    valid: List[Tuple[int, Dict[str, Any]]]
+    errors: Dict[int, Dict[str, Any]]
+
+
+def validate_batch(schema_cls: Type[Schema], records: Iterable[Dict]) -> BatchResult:
+    """Validate many records in one ``load(many=True)`` pass.
+
+    Invalid records do not stop the batch; callers decide whether to apply the
+    valid subset or reject the request as a whole.
+    """
+    if isinstance(records, (dict, str, bytes)):
+        raise ValidationError('Expected a list of records.', '_schema')
+    records = list(records)
+    try:
+        loaded = get_schema(schema_cls).load(records, many=True)
+        return BatchResult(list(enumerate(loaded)), {})
+    except ValidationError as err:
+        messages = err.messages if isinstance(err.messages, dict) else {}
+        valid = [
+            (index, data)
+            for index, data in enumerate(err.valid_data or [])
+            if index not in messages
+        ]
+        return BatchResult(valid, messages)
@@ -77,16 +77,52 @@ def handle_events_update_request():
     emit('events_update', {'data': events})
 
 
-def broadcast_traffic_update(traffic_data):
-    """Broadcast traffic update to all subscribed clients."""
-    socketio.emit('traffic_update', {'data': traffic_data}, room='traffic_updates')
-
-
-def broadcast_road_update(road_id, traffic_data):
-    """Broadcast traffic update for a specific road."""
-    socketio.emit('road_update', {'road_id': road_id, 'data': traffic_data}, room=f'road_{road_id}')
-
-
-def broadcast_event(event_data):
-    """Broadcast new event to all subscribed clients."""
-    socketio.emit('new_event', {'data': event_data}, room='event_updates')
+def broadcast_traffic_update(traffic_data, committed_at=None):
+    """Broadcast traffic update to all subscribed clients.
+
+    Live ingestion passes ``committed_at`` (epoch seconds of the database
+    commit) so clients can measure delivery latency.
+    """
+    payload = {'data': traffic_data}
+    if committed_at is not None:
+        payload['committed_at'] = committed_at
+    socketio.emit('traffic_update', payload, room='traffic_updates')
+
+
+def broadcast_road_update(road_id, traffic_data, replay=None, committed_at=None):
+    """Broadcast traffic update for a specific road.
+
+    Historical playback passes ``replay`` (id, virtual time, speed) so clients
+    can tell replayed readings from live ones.
+    """
+    payload = {'road_id': road_id, 'data': traffic_data}
+    if replay:
+        payload['replay'] = replay
+    if committed_at is not None:
+        payload['committed_at'] = committed_at
+    socketio.emit('road_update', payload, room=f'road_{road_id}')
+
+
+def broadcast_traffic_readings(readings, committed_at):
+    """Fan an ingested batch out: one ``road_update`` per road with that road's
+    readings, then one ``traffic_update`` with the newest reading of each road.
+    """
+    by_road = {}
+    for reading in readings:
+        by_road.setdefault(reading['road_id'], []).append(reading)
+    for road_id, road_readings in by_road.items():
+        broadcast_road_update(road_id, road_readings, committed_at=committed_at)
+    latest = [max(road_readings, key=lambda r: r['timestamp']) for road_readings in by_road.values()]
+    broadcast_traffic_update(latest, committed_at=committed_at)
+
+
+def broadcast_event(event_data, action=None):
+    """Broadcast new event to all subscribed clients.
+
+    Batch operations pass a list of events and an ``action`` so clients get one
+    consolidated message instead of one per event.
+    """
+    payload = {'data': event_data}
+    if action:
+        payload['action'] = action
+    socketio.emit('new_event', payload, room='event_updates')
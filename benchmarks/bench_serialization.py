@@ -0,0 +1,107 @@
+"""
+Micro-benchmark: legacy ORM + _serialize_traffic_row + jsonify pipeline versus
+the row-tuple fast path (encode_records).
+
+    python benchmarks/bench_serialization.py --rows 50000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from flask.json.provider import DefaultJSONProvider
+
+from app import create_app, db
+from app.models import Road, TrafficData
+from app.serialization import encode_records
+from app.services import TRAFFIC_FIELDS, _serialize_traffic_row, _traffic_tuple_query
+
+
+def _seed(rows: int) -> None:
+    road = Road(name="Benchmark Road", code="B0001", length=3.2, lanes=3, speed_limit=60)
+    db.session.add(road)
+    db.session.commit()
+    now = datetime.now(timezone.utc)
+    db.session.execute(
+        TrafficData.__table__.insert(),
+        [
+            {
+                "road_id": road.id,
+                "timestamp": now - timedelta(seconds=30 * i),
+                "speed": round(random.uniform(5, 60), 2),
+                "volume": random.randint(50, 800),
+                "status": random.choice(("SMOOTH", "MODERATE", "CONGESTED")),
+                "congestion_level": round(random.random(), 2),
+            }
+            for i in range(rows)
+        ],
+    )
+    db.session.commit()
+
+
+def _best_of(repeats: int, func, fresh_session: bool = False) -> float:
+    timings = []
+    for _ in range(repeats):
+        if fresh_session:
+            db.session.expunge_all()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    app = create_app("testing")
+    stdlib_json = DefaultJSONProvider(app)
+    with app.app_context():
+        db.create_all()
+        _seed(args.rows)
+
+        def legacy():
+            rows = TrafficData.query.order_by(TrafficData.timestamp.asc()).all()
+            return stdlib_json.dumps([_serialize_traffic_row(row) for row in rows]).encode("utf-8")
+
+        def fast():
+            rows = db.session.execute(
+                _traffic_tuple_query().order_by(TrafficData.timestamp.asc())
+            ).all()
+            return encode_records(TRAFFIC_FIELDS, rows)
+
+        results = [
+            ("query + serialize (legacy)", _best_of(args.repeats, legacy, fresh_session=True)),
+            ("query + serialize (fast)", _best_of(args.repeats, fast, fresh_session=True)),
+        ]
+
+        orm_rows = TrafficData.query.all()
+        tuple_rows = db.session.execute(_traffic_tuple_query()).all()
+
+        def legacy_encode_only():
+            return stdlib_json.dumps([_serialize_traffic_row(row) for row in orm_rows]).encode("utf-8")
+
+        def fast_encode_only():
+            return encode_records(TRAFFIC_FIELDS, tuple_rows)
+
+        results += [
+            ("serialize only (legacy)", _best_of(args.repeats, legacy_encode_only)),
+            ("serialize only (fast)", _best_of(args.repeats, fast_encode_only)),
+        ]
+
+    print(f"{args.rows} traffic rows, best of {args.repeats}")
+    for label, seconds in results:
+        print(f"  {label:<30} {seconds * 1000:9.1f} ms  {args.rows / seconds:12,.0f} rows/s")
+    print(f"  end-to-end speedup: {results[0][1] / results[1][1]:.1f}x, "
+          f"serialization speedup: {results[2][1] / results[3][1]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Worker cold-start profile: time and memory to import the app and run
+create_app(), plus a ``python -X importtime`` breakdown of the slowest modules.
+
+Each run is a fresh interpreter, so nothing is shared between samples.
+
+    python benchmarks/bench_startup.py --runs 5 --top 25
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Modules that must stay out of a cold start; they load with the features using them.
+LAZY_MODULES = ("pandas", "pyarrow", "numpy", "openpyxl", "alembic")
+
+_PROBE = """
+import resource, sys, time
+started = time.perf_counter()
+from app import create_app
+create_app({config!r})
+elapsed = time.perf_counter() - started
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+loaded = ",".join(name for name in {lazy!r} if name in sys.modules)
+print(f"STARTUP {{elapsed:.6f}} {{rss_kb}} {{loaded}}")
+"""
+
+
+def _run(config: str, importtime: bool):
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    command += ["-c", _PROBE.format(config=config, lazy=LAZY_MODULES)]
+    result = subprocess.run(command, cwd=ROOT, capture_output=True, text=True, check=True)
+    line = next(line for line in result.stdout.splitlines() if line.startswith("STARTUP "))
+    _, elapsed, rss_kb, loaded = (line.split(" ") + [""])[:4]
+    return float(elapsed), int(rss_kb), [name for name in loaded.split(",") if name], result.stderr
+
+
+def parse_importtime(stderr: str):
+    """Map module -> (self µs, cumulative µs) from ``-X importtime`` output."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=20, help="slowest modules to list (cumulative time)")
+    parser.add_argument("--config", default="testing")
+    args = parser.parse_args()
+
+    timings, rss, loaded = [], [], set()
+    cumulative = defaultdict(list)
+    self_times = defaultdict(list)
+    for _ in range(args.runs):
+        elapsed, rss_kb, heavy, stderr = _run(args.config, importtime=False)
+        timings.append(elapsed)
+        rss.append(rss_kb)
+        loaded.update(heavy)
+        for name, (self_us, cumulative_us) in parse_importtime(_run(args.config, importtime=True)[3]).items():
+            self_times[name].append(self_us)
+            cumulative[name].append(cumulative_us)
+
+    print(f"create_app cold start ({args.runs} runs, config={args.config!r})")
+    print(f"  median: {statistics.median(timings) * 1000:8.1f} ms   min: {min(timings) * 1000:8.1f} ms")
+    print(f"  max RSS: {max(rss) / 1024:8.1f} MB")
+    print(f"  heavy modules loaded: {', '.join(sorted(loaded)) or 'none'}")
+
+    print(f"\nSlowest imports (median of {args.runs}, from -X importtime)")
+    print(f"  {'cumulative ms':>13}  {'self ms':>8}  module")
+    ranked = sorted(cumulative, key=lambda name: statistics.median(cumulative[name]), reverse=True)
+    for name in ranked[:args.top]:
+        print(
+            f"  {statistics.median(cumulative[name]) / 1000:13.1f}  "
+            f"{statistics.median(self_times[name]) / 1000:8.1f}  {name}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+"""
+Live sensor feed simulator and end-to-end throughput harness.
+
+A local stand-in for the sensor network produces per-road readings (and
+incident events) at a target rate and posts them to ``POST /api/traffic/batch``
+and ``POST /api/events/batch``. N simulated Socket.IO clients subscribe to the
+traffic feed, a few road rooms each and the event feed; every message they
+should have received is counted, so the report covers ingestion throughput,
+commit-to-client latency (from the ``committed_at`` stamp on each broadcast)
+and dropped messages.
+
+    # in-process: app on an in-memory database, Flask and Socket.IO test clients
+    python benchmarks/feed_simulator.py --rate 5000 --duration 10 --clients 50
+
+    # against a running server (needs: pip install "python-socketio[client]")
+    python main.py
+    python benchmarks/feed_simulator.py --url http://127.0.0.1:5000 --rate 20000 --clients 200
+
+In-process clients are drained after every batch, so their latency includes
+the broadcast fan-out but no network. Remote mode uses the server's existing
+roads; in-process mode seeds ``--roads`` roads first.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime, timezone
+
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.forecasting import CONGESTED_LEVEL, MODERATE_LEVEL
+
+STATUSES = np.array(["SMOOTH", "MODERATE", "CONGESTED"])
+INCIDENT_TYPES = ("Accident", "Congestion", "Control")
+
+
+class SensorNetwork:
+    """Vectorized per-road congestion model standing in for the field sensors.
+
+    Each road's congestion level is a mean-reverting random walk around a
+    road-specific baseline; incidents start at random, push the baseline up
+    for a while and are reported as events. Readings are handed out round-robin
+    across roads, so every road reports at ``rate / roads`` readings a second.
+    """
+
+    def __init__(self, roads, incident_rate=0.002, seed=None):
+        self.rng = np.random.default_rng(seed)
+        self.road_ids = np.array([road["id"] for road in roads], dtype=np.int64)
+        self.speed_limit = np.array([road.get("speed_limit") or 60 for road in roads], dtype=np.float64)
+        self.lanes = np.array([road.get("lanes") or 2 for road in roads], dtype=np.float64)
+        count = len(roads)
+        self.baseline = self.rng.uniform(0.1, 0.5, count)
+        self.level = self.baseline.copy()
+        self.incident_until = np.zeros(count)
+        self.incident_rate = incident_rate  # incidents per road per second
+        self._cursor = 0
+        self._clock = None
+
+    def step(self, count, now):
+        """Advance the model to ``now`` and return ``count`` readings and new incidents."""
+        dt = 1.0 if self._clock is None else max(now - self._clock, 1e-3)
+        self._clock = now
+
+        starting = (self.rng.random(self.level.size) < self.incident_rate * dt) & (self.incident_until <= now)
+        self.incident_until[starting] = now + self.rng.uniform(30, 300, starting.sum())
+        target = self.baseline + np.where(self.incident_until > now, 0.45, 0.0)
+        noise = self.rng.normal(0.0, 0.05 * np.sqrt(dt), self.level.size)
+        self.level = np.clip(self.level + 0.2 * dt * (target - self.level) + noise, 0.0, 1.0)
+
+        roads = (self._cursor + np.arange(count)) % self.road_ids.size
+        self._cursor = int((self._cursor + count) % self.road_ids.size)
+        congestion = np.clip(self.level[roads] + self.rng.normal(0.0, 0.02, count), 0.0, 1.0).round(2)
+        speed = (self.speed_limit[roads] * (1.0 - 0.85 * congestion) + self.rng.normal(0.0, 2.0, count)).clip(0).round(1)
+        volume = (self.lanes[roads] * 600 * (1.0 - 0.6 * congestion) * self.rng.uniform(0.8, 1.2, count)).astype(np.int64)
+        status = STATUSES[(congestion >= MODERATE_LEVEL).astype(int) + (congestion >= CONGESTED_LEVEL)]
+
+        timestamp = datetime.fromtimestamp(now, timezone.utc).isoformat()
+        readings = [
+            {
+                "road_id": road_id,
+                "timestamp": timestamp,
+                "speed": road_speed,
+                "volume": road_volume,
+                "status": road_status,
+                "congestion_level": level,
+            }
+            for road_id, road_speed, road_volume, road_status, level in zip(
+                self.road_ids[roads].tolist(), speed.tolist(), volume.tolist(),
+                status.tolist(), congestion.tolist(),
+            )
+        ]
+        incidents = [
+            {
+                "road_id": int(road_id),
+                "type": INCIDENT_TYPES[int(self.rng.integers(len(INCIDENT_TYPES)))],
+                "description": "Simulated incident",
+                "timestamp": timestamp,
+                "severity": int(self.rng.integers(1, 6)),
+            }
+            for road_id in self.road_ids[starting]
+        ]
+        return readings, incidents
+
+
+class Tally:
+    """Messages received by the simulated clients and their delivery latency."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.received = {}
+        self.latencies = []
+
+    def record(self, name, payload, now):
+        with self.lock:
+            self.received[name] = self.received.get(name, 0) + 1
+            committed_at = payload.get("committed_at") if isinstance(payload, dict) else None
+            if committed_at is not None:
+                self.latencies.append(now - committed_at)
+
+
+class InProcessTarget:
+    """The app itself, driven through the Flask and Socket.IO test clients."""
+
+    def __init__(self, roads, config_name):
+        from app import create_app, db, socketio
+        from app.models import Road
+        import app.websocket  # noqa: F401  registers the Socket.IO handlers
+
+        self.app = create_app(config_name)
+        self.socketio = socketio
+        self._context = self.app.app_context()
+        self._context.push()
+        db.create_all()
+        db.session.add_all([
+            Road(name=f"Sim Road {i}", code=f"S{i:04d}", length=2.0, lanes=2 + i % 3,
+                 speed_limit=(40, 60, 80)[i % 3])
+            for i in range(roads)
+        ])
+        db.session.commit()
+        self.http = self.app.test_client()
+        self.clients = []
+
+    def roads(self):
+        return self.http.get("/api/roads").get_json()
+
+    def post(self, path, payload):
+        response = self.http.post(path, json=payload)
+        return response.status_code, response.get_json()
+
+    def connect(self, road_ids, tally):
+        client = self.socketio.test_client(self.app)
+        _subscribe(client.emit, road_ids)
+        client.get_received()
+        self.clients.append((client, tally))
+
+    def drain(self):
+        now = time.time()
+        for client, tally in self.clients:
+            for message in client.get_received():
+                tally.record(message["name"], message["args"][0] if message["args"] else None, now)
+
+    def close(self):
+        for client, _ in self.clients:
+            client.disconnect()
+        self._context.pop()
+
+
+class RemoteTarget:
+    """A running server, over HTTP and real Socket.IO connections."""
+
+    def __init__(self, url):
+        self.url = url.rstrip("/")
+        self.clients = []
+
+    def roads(self):
+        with urllib.request.urlopen(f"{self.url}/api/roads") as response:
+            return json.load(response)
+
+    def post(self, path, payload):
+        request = urllib.request.Request(
+            f"{self.url}{path}", data=json.dumps(payload).encode(),
+            headers={"Content-Type": "application/json"}, method="POST",
+        )
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status, json.load(response)
+        except urllib.error.HTTPError as exc:
+            return exc.code, None
+
+    def connect(self, road_ids, tally):
+        try:
+            import socketio
+        except ImportError:
+            sys.exit('Remote mode needs the Socket.IO client: pip install "python-socketio[client]"')
+
+        client = socketio.Client(reconnection=False)
+        for name in ("road_update", "traffic_update", "new_event"):
+            client.on(name, lambda payload, name=name: tally.record(name, payload, time.time()))
+        client.connect(self.url)
+        _subscribe(client.emit, road_ids)
+        self.clients.append(client)
+
+    def drain(self):
+        pass  # messages arrive on the clients' own threads
+
+    def close(self):
+        for client in self.clients:
+            client.disconnect()
+
+
+def _subscribe(emit, road_ids):
+    emit("subscribe_traffic", {})
+    emit("subscribe_events")
+    for road_id in road_ids:
+        emit("subscribe_road", {"road_id": road_id})
+
+
+def _percentiles(values):
+    if len(values) < 2:
+        return "n/a"
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return (f"p50={cuts[49] * 1000:.1f}ms  p95={cuts[94] * 1000:.1f}ms  "
+            f"p99={cuts[98] * 1000:.1f}ms  max={max(values) * 1000:.1f}ms")
+
+
+def run(target, rate, duration, batch, clients, roads_per_client, grace, seed):
+    roads = target.roads()
+    if not roads:
+        sys.exit("No roads to simulate: seed the database first")
+    network = SensorNetwork(roads, seed=seed)
+    rng = np.random.default_rng(seed)
+    road_ids = [road["id"] for road in roads]
+
+    tally = Tally()
+    subscriptions = []
+    for _ in range(clients):
+        chosen = rng.choice(road_ids, size=min(roads_per_client, len(road_ids)), replace=False).tolist()
+        target.connect(chosen, tally)
+        subscriptions.append(set(chosen))
+
+    expected = 0
+    sent = accepted = events = failed = 0
+    post_latencies = []
+    interval = batch / rate
+    started = time.perf_counter()
+    wall_start = time.time()
+    batches = 0
+    while time.perf_counter() - started < duration:
+        due = started + batches * interval
+        pause = due - time.perf_counter()
+        if pause > 0:
+            time.sleep(pause)
+        readings, incidents = network.step(batch, wall_start + (time.perf_counter() - started))
+        batches += 1
+
+        posted = time.perf_counter()
+        status, _ = target.post("/api/traffic/batch", {"readings": readings})
+        post_latencies.append(time.perf_counter() - posted)
+        sent += len(readings)
+        if status == 201:
+            accepted += len(readings)
+            batch_roads = {reading["road_id"] for reading in readings}
+            expected += sum(len(batch_roads & roads) + 1 for roads in subscriptions)
+        else:
+            failed += 1
+
+        if incidents:
+            status, _ = target.post("/api/events/batch", {"events": incidents})
+            if status == 201:
+                events += len(incidents)
+                expected += clients
+        target.drain()
+    elapsed = time.perf_counter() - started
+
+    time.sleep(grace)
+    target.drain()
+    target.close()
+
+    received = sum(tally.received.values())
+    dropped = max(expected - received, 0)
+    print(f"target={rate:,} readings/s  batch={batch}  duration={elapsed:.1f}s  roads={len(roads)}")
+    print(f"  ingestion: {accepted:,} of {sent:,} readings in {batches} batches "
+          f"({accepted / elapsed:,.0f} readings/s), failed batches={failed}, events={events}")
+    print(f"  POST latency:      {_percentiles(post_latencies)}")
+    print(f"  clients: {clients}  expected={expected:,}  received={received:,}  "
+          f"dropped={dropped:,} ({dropped / expected * 100 if expected else 0:.2f}%)")
+    print(f"  commit-to-client:  {_percentiles(tally.latencies)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="base URL of a running server (default: in-process app)")
+    parser.add_argument("--config", default="testing", help="config name for the in-process app")
+    parser.add_argument("--rate", type=int, default=1000, help="readings per second (1k-100k)")
+    parser.add_argument("-d", "--duration", type=float, default=10.0)
+    parser.add_argument("--batch", type=int, help="readings per POST (default: rate / 10, at most 10000)")
+    parser.add_argument("--roads", type=int, default=200, help="roads to seed in-process")
+    parser.add_argument("-c", "--clients", type=int, default=20, help="simulated Socket.IO clients")
+    parser.add_argument("--roads-per-client", type=int, default=5)
+    parser.add_argument("--grace", type=float, default=1.0, help="seconds to wait for late messages")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    batch = args.batch or max(1, min(args.rate // 10, 10000))
+    target = RemoteTarget(args.url) if args.url else InProcessTarget(args.roads, args.config)
+    run(target, args.rate, args.duration, batch, args.clients, args.roads_per_client, args.grace, args.seed)
+
+
+if __name__ == "__main__":
+    main()
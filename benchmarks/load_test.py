@@ -0,0 +1,116 @@
+"""
+HTTP load test: hold N concurrent keep-alive connections against one endpoint
+and report throughput and latency percentiles.
+
+    # sync dev server
+    python main.py
+    python benchmarks/load_test.py http://127.0.0.1:5000/api/traffic/latest -c 200
+
+    # ASGI mode
+    uvicorn asgi:app --port 5000
+    python benchmarks/load_test.py http://127.0.0.1:5000/api/traffic/latest -c 200
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from urllib.parse import urlsplit
+
+
+async def _read_response(reader) -> int:
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("connection closed")
+    status = int(status_line.split()[1])
+    length = None
+    chunked = False
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        name = name.strip().lower()
+        if name == "content-length":
+            length = int(value)
+        elif name == "transfer-encoding" and "chunked" in value.lower():
+            chunked = True
+    if chunked:
+        while True:
+            size = int((await reader.readline()).strip(), 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif length:
+        await reader.readexactly(length)
+    return status
+
+
+async def _worker(host, port, request, deadline, timeout, latencies, errors):
+    reader = writer = None
+    while time.perf_counter() < deadline:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+            start = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            status = await asyncio.wait_for(_read_response(reader), timeout)
+            latencies.append(time.perf_counter() - start)
+            if status >= 400:
+                errors["http"] += 1
+        except asyncio.TimeoutError:
+            errors["timeout"] += 1
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+        except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError):
+            errors["connection"] += 1
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+            await asyncio.sleep(0.05)
+    if writer is not None:
+        writer.close()
+
+
+async def run(url: str, concurrency: int, duration: float, timeout: float) -> None:
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    path = parts.path + (f"?{parts.query}" if parts.query else "")
+    request = (
+        f"GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\n"
+        "Connection: keep-alive\r\nAccept: application/json\r\n\r\n"
+    ).encode("latin-1")
+
+    latencies = []
+    errors = {"http": 0, "connection": 0, "timeout": 0}
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*[
+        _worker(host, port, request, deadline, timeout, latencies, errors)
+        for _ in range(concurrency)
+    ])
+    elapsed = time.perf_counter() - started
+
+    print(f"{url}  concurrency={concurrency}  duration={elapsed:.1f}s")
+    print(f"  requests: {len(latencies)}  ({len(latencies) / elapsed:,.0f} req/s)")
+    print(f"  errors:   http={errors['http']} connection={errors['connection']} "
+          f"timeout={errors['timeout']}")
+    if len(latencies) >= 2:
+        cuts = statistics.quantiles(latencies, n=100)
+        print(f"  latency:  p50={cuts[49] * 1000:.1f}ms  p95={cuts[94] * 1000:.1f}ms  "
+              f"p99={cuts[98] * 1000:.1f}ms  max={max(latencies) * 1000:.1f}ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("url")
+    parser.add_argument("-c", "--concurrency", type=int, default=100)
+    parser.add_argument("-d", "--duration", type=float, default=10.0)
+    parser.add_argument("-t", "--timeout", type=float, default=5.0, help="per-request timeout in seconds")
+    args = parser.parse_args()
+    asyncio.run(run(args.url, args.concurrency, args.duration, args.timeout))
+
+
+if __name__ == "__main__":
+    main()
@@ -14,12 +14,106 @@ class Config:
         'sqlite:///' + os.path.join(basedir, 'traffic.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Schema migrations (batched backfills in app/migration_ops.py)
+    MIGRATION_BATCH_SIZE = int(os.environ.get('MIGRATION_BATCH_SIZE', 5000))
+    MIGRATION_BATCH_PAUSE = float(os.environ.get('MIGRATION_BATCH_PAUSE', 0.05))
+
+    # Bulk event operations
+    EVENT_BATCH_MAX = int(os.environ.get('EVENT_BATCH_MAX', 500))
+
+    # Bulk sensor reading ingestion
+    TRAFFIC_BATCH_MAX = int(os.environ.get('TRAFFIC_BATCH_MAX', 10000))
+
+    # Authentication
+    AUTH_BCRYPT_ROUNDS = int(os.environ.get('AUTH_BCRYPT_ROUNDS', 12))
+    AUTH_HASH_WORKERS = int(os.environ.get('AUTH_HASH_WORKERS', 2))
+    AUTH_HASH_MAX_PENDING = int(os.environ.get('AUTH_HASH_MAX_PENDING', 32))
+    AUTH_HASH_TIMEOUT = float(os.environ.get('AUTH_HASH_TIMEOUT', 10))
+    AUTH_MAX_ATTEMPTS_PER_USER = int(os.environ.get('AUTH_MAX_ATTEMPTS_PER_USER', 5))
+    AUTH_MAX_ATTEMPTS_PER_IP = int(os.environ.get('AUTH_MAX_ATTEMPTS_PER_IP', 20))
+    AUTH_THROTTLE_WINDOW = int(os.environ.get('AUTH_THROTTLE_WINDOW', 900))
+    AUTH_TOKEN_MAX_AGE = int(os.environ.get('AUTH_TOKEN_MAX_AGE', 12 * 3600))
+    AUTH_COOKIE_NAME = os.environ.get('AUTH_COOKIE_NAME', 'traffic_session')
+
     # Caching configuration
     CACHE_TYPE = os.environ.get('CACHE_TYPE', 'simple')
     CACHE_REDIS_HOST = os.environ.get('REDIS_HOST', 'localhost')
     CACHE_REDIS_PORT = int(os.environ.get('REDIS_PORT', 6379))
     CACHE_REDIS_DB = int(os.environ.get('REDIS_DB', 0))
     CACHE_DEFAULT_TIMEOUT = int(os.environ.get('CACHE_TIMEOUT', 300))
+    # Two-tier cache (CACHE_TYPE=app.tiered_cache.TieredCache): per-process LRU
+    # in front of the shared CACHE_SHARED_TYPE backend
+    CACHE_SHARED_TYPE = os.environ.get('CACHE_SHARED_TYPE', 'RedisCache')
+    CACHE_LOCAL_TTL = float(os.environ.get('CACHE_LOCAL_TTL', 5))
+    CACHE_LOCAL_MAX_ITEMS = int(os.environ.get('CACHE_LOCAL_MAX_ITEMS', 1024))
+    CACHE_LOCAL_MAX_BYTES = int(os.environ.get('CACHE_LOCAL_MAX_BYTES', 32 * 1024 * 1024))
+    CACHE_INVALIDATION_CHANNEL = os.environ.get('CACHE_INVALIDATION_CHANNEL', 'cache-invalidation')
+
+    # Real-time and ASGI serving
+    SOCKETIO_MESSAGE_QUEUE = os.environ.get('SOCKETIO_MESSAGE_QUEUE') or None
+    ASYNC_DB_POOL_SIZE = int(os.environ.get('ASYNC_DB_POOL_SIZE', 10))
+
+    # Use the orjson-backed JSON provider
+    FAST_JSON = os.environ.get('FAST_JSON', 'true').lower() in ('1', 'true', 'yes')
+
+    # Response compression and conditional GETs
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))
+    COMPRESS_GZIP_LEVEL = int(os.environ.get('COMPRESS_GZIP_LEVEL', 6))
+    COMPRESS_ZSTD_LEVEL = int(os.environ.get('COMPRESS_ZSTD_LEVEL', 3))
+    COMPRESS_BROTLI_LEVEL = int(os.environ.get('COMPRESS_BROTLI_LEVEL', 4))
+    ETAG_VERSION_TIMEOUT = int(os.environ.get('ETAG_VERSION_TIMEOUT', 60))
+
+    # Concurrent dashboard aggregates (threads, each on its own pooled connection; 0/1 = serial)
+    QUERY_FANOUT_WORKERS = int(os.environ.get('QUERY_FANOUT_WORKERS', 4))
+
+    # Request concurrency governor (per-class limits; realtime has priority)
+    GOVERNOR_ENABLED = os.environ.get('GOVERNOR_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    GOVERNOR_MAX_CONCURRENT = int(os.environ.get('GOVERNOR_MAX_CONCURRENT', 32))
+    GOVERNOR_REALTIME_RESERVED = int(os.environ.get('GOVERNOR_REALTIME_RESERVED', 8))
+    GOVERNOR_LIMITS = {
+        'realtime': int(os.environ.get('GOVERNOR_REALTIME_LIMIT', 32)),
+        'analytics': int(os.environ.get('GOVERNOR_ANALYTICS_LIMIT', 4)),
+        'export': int(os.environ.get('GOVERNOR_EXPORT_LIMIT', 2)),
+    }
+    # Seconds a request may wait for a slot before it is shed with 503
+    GOVERNOR_QUEUE_TIMEOUT = {
+        'realtime': float(os.environ.get('GOVERNOR_REALTIME_TIMEOUT', 2)),
+        'analytics': float(os.environ.get('GOVERNOR_ANALYTICS_TIMEOUT', 5)),
+        'export': float(os.environ.get('GOVERNOR_EXPORT_TIMEOUT', 0)),
+    }
+
+    # Road registry (in-process snapshot of the roads table)
+    ROAD_REGISTRY_CHECK_INTERVAL = float(os.environ.get('ROAD_REGISTRY_CHECK_INTERVAL', 5))
+
+    # Event lifecycle (active-event index and TTL auto-expiry)
+    EVENT_INDEX_CHECK_INTERVAL = float(os.environ.get('EVENT_INDEX_CHECK_INTERVAL', 5))
+    EVENT_TTL_MINUTES = {
+        'Accident': int(os.environ.get('EVENT_TTL_ACCIDENT', 180)),
+        'Congestion': int(os.environ.get('EVENT_TTL_CONGESTION', 60)),
+        'Control': int(os.environ.get('EVENT_TTL_CONTROL', 240)),
+        'Construction': int(os.environ.get('EVENT_TTL_CONSTRUCTION', 0)),  # 0 = never
+    }
+    EVENT_EXPIRY_ENABLED = os.environ.get('EVENT_EXPIRY_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    EVENT_EXPIRY_INTERVAL = int(os.environ.get('EVENT_EXPIRY_INTERVAL', 60))
+    EVENT_EXPIRY_BATCH = int(os.environ.get('EVENT_EXPIRY_BATCH', 500))
+
+    # Shared hot-window store (memory-mapped ring file of recent readings per road)
+    HOT_WINDOW_ENABLED = os.environ.get('HOT_WINDOW_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    HOT_WINDOW_PATH = os.environ.get('HOT_WINDOW_PATH') or \
+        os.path.join(basedir, 'hot_window', 'traffic.ring')
+    HOT_WINDOW_HOURS = int(os.environ.get('HOT_WINDOW_HOURS', 24))
+    HOT_WINDOW_MAX_ROADS = int(os.environ.get('HOT_WINDOW_MAX_ROADS', 512))
+    HOT_WINDOW_SLOTS = int(os.environ.get('HOT_WINDOW_SLOTS', 2880))  # per road: 24h at 30s
+    HOT_WINDOW_CHECK_INTERVAL = float(os.environ.get('HOT_WINDOW_CHECK_INTERVAL', 5))
+
+    # Travel-time routing (road graph from road endpoints, live speeds as weights)
+    ROUTING_SNAP_METERS = float(os.environ.get('ROUTING_SNAP_METERS', 30))
+    ROUTING_MAX_ACCESS_METERS = float(os.environ.get('ROUTING_MAX_ACCESS_METERS', 2000))
+    ROUTING_SPEED_MAX_AGE = int(os.environ.get('ROUTING_SPEED_MAX_AGE', 15))  # minutes
+    ROUTING_DEFAULT_SPEED = float(os.environ.get('ROUTING_DEFAULT_SPEED', 40))  # km/h
+    ROUTING_MIN_SPEED = float(os.environ.get('ROUTING_MIN_SPEED', 5))  # km/h
+    ROUTING_REFRESH_INTERVAL = float(os.environ.get('ROUTING_REFRESH_INTERVAL', 5))
+    ROUTING_LOOKBACK_SECONDS = int(os.environ.get('ROUTING_LOOKBACK_SECONDS', 120))
 
     # Logging
     LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
@@ -29,6 +123,54 @@ class Config:
     DEFAULT_PAGE_SIZE = int(os.environ.get('DEFAULT_PAGE_SIZE', 10))
     MAX_PAGE_SIZE = int(os.environ.get('MAX_PAGE_SIZE', 100))
 
+    # Congestion forecasting
+    FORECAST_SLOT_MINUTES = int(os.environ.get('FORECAST_SLOT_MINUTES', 15))
+    FORECAST_ALPHA = float(os.environ.get('FORECAST_ALPHA', 0.3))
+    FORECAST_DAMPING = float(os.environ.get('FORECAST_DAMPING', 0.9))
+    FORECAST_HISTORY_DAYS = int(os.environ.get('FORECAST_HISTORY_DAYS', 28))
+    FORECAST_REFRESH_INTERVAL = float(os.environ.get('FORECAST_REFRESH_INTERVAL', 30))
+    FORECAST_WARMUP_WAIT = float(os.environ.get('FORECAST_WARMUP_WAIT', 2))
+    FORECAST_LOOKBACK_SECONDS = int(os.environ.get('FORECAST_LOOKBACK_SECONDS', 300))
+
+    # Anomaly detection (time-of-day median/MAD baselines, auto-created Congestion events)
+    ANOMALY_ENABLED = os.environ.get('ANOMALY_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    ANOMALY_INTERVAL = int(os.environ.get('ANOMALY_INTERVAL', 60))
+    ANOMALY_SLOT_MINUTES = int(os.environ.get('ANOMALY_SLOT_MINUTES', 15))
+    ANOMALY_HISTORY_DAYS = int(os.environ.get('ANOMALY_HISTORY_DAYS', 14))
+    ANOMALY_BASELINE_REFRESH = float(os.environ.get('ANOMALY_BASELINE_REFRESH', 3600))
+    ANOMALY_MIN_SAMPLES = int(os.environ.get('ANOMALY_MIN_SAMPLES', 8))
+    ANOMALY_SPEED_Z = float(os.environ.get('ANOMALY_SPEED_Z', 3.5))
+    ANOMALY_VOLUME_Z = float(os.environ.get('ANOMALY_VOLUME_Z', 3.5))
+    ANOMALY_CONFIRM_READINGS = int(os.environ.get('ANOMALY_CONFIRM_READINGS', 2))
+    # Readings are re-checked this far back so late commits are still scored
+    ANOMALY_LOOKBACK_SECONDS = int(os.environ.get('ANOMALY_LOOKBACK_SECONDS', 300))
+    # Owner lease; must outlast ANOMALY_INTERVAL, since the owner renews it every tick
+    ANOMALY_OWNER_TTL = int(os.environ.get('ANOMALY_OWNER_TTL', 180))
+
+    # Historical replay
+    REPLAY_MAX_SESSIONS = int(os.environ.get('REPLAY_MAX_SESSIONS', 4))
+    REPLAY_MAX_READINGS = int(os.environ.get('REPLAY_MAX_READINGS', 2000000))
+    REPLAY_LOAD_BATCH = int(os.environ.get('REPLAY_LOAD_BATCH', 10000))
+    REPLAY_TICK_SECONDS = float(os.environ.get('REPLAY_TICK_SECONDS', 0.25))
+    REPLAY_IDLE_TTL = int(os.environ.get('REPLAY_IDLE_TTL', 600))
+
+    # Traffic matrix (roads x time buckets)
+    TRAFFIC_MATRIX_MAX_CELLS = int(os.environ.get('TRAFFIC_MATRIX_MAX_CELLS', 200000))
+
+    # Export
+    EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', 5000))
+    EXPORT_JOB_WORKERS = int(os.environ.get('EXPORT_JOB_WORKERS', 2))
+    EXPORT_JOB_DIR = os.environ.get('EXPORT_JOB_DIR') or \
+        os.path.join(basedir, 'exports')
+    EXPORT_JOB_CACHE_BYTES = int(os.environ.get('EXPORT_JOB_CACHE_BYTES', 512 * 1024 * 1024))
+    EXPORT_JOB_TTL = int(os.environ.get('EXPORT_JOB_TTL', 600))
+
+    # Traffic data partitioning and retention
+    TRAFFIC_HOT_MONTHS = int(os.environ.get('TRAFFIC_HOT_MONTHS', 2))
+    TRAFFIC_RETENTION_MONTHS = int(os.environ.get('TRAFFIC_RETENTION_MONTHS', 12))
+    TRAFFIC_ARCHIVE_DIR = os.environ.get('TRAFFIC_ARCHIVE_DIR') or \
+        os.path.join(basedir, 'archive')
+
 
 class DevelopmentConfig(Config):
     """Development configuration."""
@@ -54,6 +196,11 @@ class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     CACHE_TYPE = 'simple'
+    AUTH_BCRYPT_ROUNDS = 4
+    SOCKETIO_MESSAGE_QUEUE = None
+    EVENT_EXPIRY_ENABLED = False
+    HOT_WINDOW_ENABLED = False
+    ANOMALY_ENABLED = False
 
 
 # Configuration dictionary
@@ -0,0 +1,73 @@
+import argparse
+import os
+import sys
+import tempfile
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="EXPLAIN the service-layer queries and flag full scans and temp B-trees."
+    )
+    parser.add_argument(
+        "--scratch",
+        action="store_true",
+        help="run against a temporary SQLite database seeded with mock data "
+        "instead of the configured database",
+    )
+    parser.add_argument(
+        "--traffic-points", type=int, default=20000, help="readings to seed with --scratch"
+    )
+    parser.add_argument(
+        "--apply",
+        action="store_true",
+        help="create indexes declared on the models that are missing from the database",
+    )
+    parser.add_argument("--verbose", action="store_true", help="print SQL and full plans")
+    args = parser.parse_args()
+
+    scratch_dir = None
+    if args.scratch:
+        scratch_dir = tempfile.TemporaryDirectory()
+        # Must be set before config.py is imported.
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(scratch_dir.name, 'advisor.db')}"
+
+    from app import create_app, db
+    from app.index_advisor import apply_missing_indexes, missing_indexes, run_advisor
+    from generate_data import generate_mock_data
+
+    app = create_app()
+    with app.app_context():
+        if args.scratch:
+            db.create_all()
+            generate_mock_data(traffic_points=args.traffic_points, event_count=500)
+
+        pending = missing_indexes()
+        if args.apply:
+            for name, table in apply_missing_indexes().items():
+                print(f"Created index {name} on {table}")
+        elif pending:
+            names = ", ".join(index.name for index in pending)
+            print(f"Missing indexes (run with --apply): {names}")
+
+        flagged = 0
+        for report in run_advisor():
+            if report.findings:
+                flagged += 1
+            if report.findings or args.verbose:
+                status = "; ".join(report.findings) or "ok"
+                print(f"[{report.source}] {status}")
+                if args.verbose:
+                    print(f"  {' '.join(report.statement.split())}")
+                    for line in report.plan:
+                        print(f"    {line}")
+        print(f"{flagged} queries flagged.")
+
+    if scratch_dir is not None:
+        scratch_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+import argparse
+import os
+import sys
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app import create_app
+from app.partitions import archive_partitions, list_partitions, rotate_partitions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Maintain monthly traffic_data partitions.")
+    parser.add_argument(
+        "action",
+        choices=("rotate", "archive", "all", "list"),
+        help="rotate: move readings out of the hot table; archive: export expired "
+        "partitions to Parquet and drop them; all: rotate then archive",
+    )
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        if args.action in ("rotate", "all"):
+            moved = rotate_partitions()
+            for name, count in moved.items():
+                print(f"{name}: moved {count} rows")
+            print(f"Rotated {sum(moved.values())} traffic rows into {len(moved)} partitions.")
+        if args.action in ("archive", "all"):
+            paths = archive_partitions()
+            for path in paths:
+                print(f"Archived {path}")
+            print(f"Archived {len(paths)} partitions.")
+        if args.action == "list":
+            for month, name in list_partitions():
+                print(f"{name}\t{month.date()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Alembic environment.
+
+The target metadata is the Flask-SQLAlchemy model metadata. Without an explicit
+connection (``config.attributes['connection']``, used by the tests) the app is
+built from ``FLASK_ENV`` and its configured engine is used, inside an app
+context so the online operations can read their settings from the config.
+"""
+import os
+import re
+from logging.config import fileConfig
+
+from alembic import context
+
+from app import create_app, db
+import app.models  # noqa: F401  (registers the tables on db.metadata)
+
+config = context.config
+if config.config_file_name is not None and config.attributes.get('configure_logger', True):
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = db.metadata
+
+# Monthly partitions are managed by app.partitions, not by migrations.
+_PARTITION_TABLE = re.compile(r'^traffic_data_\d{6}$')
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    if type_ == 'table' and _PARTITION_TABLE.match(name or ''):
+        return False
+    return True
+
+
+def _configure(**kwargs):
+    context.configure(
+        target_metadata=target_metadata,
+        include_object=include_object,
+        # One transaction per revision, so autocommit blocks (CREATE INDEX
+        # CONCURRENTLY, batched backfills) only end their own revision's work.
+        transaction_per_migration=True,
+        render_as_batch=True,
+        **kwargs
+    )
+
+
+def run_migrations_offline():
+    flask_app = create_app(os.environ.get('FLASK_ENV'))
+    _configure(
+        url=flask_app.config['SQLALCHEMY_DATABASE_URI'],
+        literal_binds=True,
+        dialect_opts={'paramstyle': 'named'},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    connection = config.attributes.get('connection')
+    if connection is not None:
+        _configure(connection=connection)
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+
+    flask_app = create_app(os.environ.get('FLASK_ENV'))
+    with flask_app.app_context():
+        with db.engine.connect() as connection:
+            _configure(connection=connection)
+            with context.begin_transaction():
+                context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,99 @@
+"""Baseline schema: users, roads, traffic_data and events.
+
+Databases created earlier with ``db.create_all()`` should be stamped at this
+revision (``alembic stamp 0001``) before upgrading.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('username', sa.String(length=50), nullable=False),
+        sa.Column('password_hash', sa.String(length=128), nullable=False),
+        sa.Column('salt', sa.String(length=32), nullable=False),
+        sa.Column('role', sa.String(length=20), nullable=False),
+        sa.Column('email', sa.String(length=100), nullable=True),
+        sa.Column('phone', sa.String(length=20), nullable=True),
+        sa.Column('register_time', sa.DateTime(), nullable=True),
+        sa.Column('last_login', sa.DateTime(), nullable=True),
+        sa.Column('status', sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('email'),
+        sa.UniqueConstraint('username'),
+    )
+    op.create_table(
+        'roads',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('code', sa.String(length=20), nullable=False),
+        sa.Column('start_point', sa.String(length=100), nullable=True),
+        sa.Column('end_point', sa.String(length=100), nullable=True),
+        sa.Column('geometry', sa.Text(), nullable=True),
+        sa.Column('length', sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column('lanes', sa.Integer(), nullable=False),
+        sa.Column('level', sa.Integer(), nullable=True),
+        sa.Column('speed_limit', sa.Integer(), nullable=True),
+        sa.Column('create_time', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('code'),
+    )
+    op.create_table(
+        'traffic_data',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('road_id', sa.Integer(), nullable=False),
+        sa.Column('timestamp', sa.DateTime(), nullable=False),
+        sa.Column('speed', sa.Numeric(precision=6, scale=2), nullable=True),
+        sa.Column('volume', sa.Integer(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        sa.Column('congestion_level', sa.Numeric(precision=3, scale=2), nullable=True),
+        sa.ForeignKeyConstraint(['road_id'], ['roads.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('idx_road_timestamp', 'traffic_data', ['road_id', 'timestamp'])
+    op.create_index('idx_status_timestamp', 'traffic_data', ['status', 'timestamp'])
+    op.create_index('idx_congestion_timestamp', 'traffic_data', ['congestion_level', 'timestamp'])
+    op.create_index('ix_traffic_data_timestamp', 'traffic_data', ['timestamp'])
+    op.create_table(
+        'events',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('road_id', sa.Integer(), nullable=True),
+        sa.Column('type', sa.String(length=50), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('position', sa.String(length=100), nullable=True),
+        sa.Column('timestamp', sa.DateTime(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        sa.Column('severity', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['road_id'], ['roads.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('idx_event_road_timestamp', 'events', ['road_id', 'timestamp'])
+    op.create_index('idx_event_status_timestamp', 'events', ['status', 'timestamp'])
+    op.create_index('idx_event_severity', 'events', ['severity', 'timestamp'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('events')
+    op.drop_table('traffic_data')
+    op.drop_table('roads')
+    op.drop_table('users')
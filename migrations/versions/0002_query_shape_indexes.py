@@ -0,0 +1,47 @@
+"""Covering and partial indexes for the service query shapes.
+
+Built online: CONCURRENTLY on PostgreSQL, so ingestion into traffic_data is
+not blocked. Indexes already created by ``data/index_advisor.py --apply`` are
+left as they are.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 09:30:00
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from app.migration_ops import create_index_online, drop_index_online
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    create_index_online(
+        'idx_traffic_window_cover',
+        'traffic_data',
+        ['timestamp', 'road_id', 'congestion_level', 'speed', 'volume'],
+    )
+    create_index_online('idx_event_timestamp', 'events', ['timestamp'])
+    create_index_online(
+        'idx_event_map_timestamp',
+        'events',
+        ['timestamp'],
+        sqlite_where=sa.text('position IS NOT NULL'),
+        postgresql_where=sa.text('position IS NOT NULL'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    drop_index_online('idx_event_map_timestamp', 'events')
+    drop_index_online('idx_event_timestamp', 'events')
+    drop_index_online('idx_traffic_window_cover', 'traffic_data')
@@ -0,0 +1,112 @@
+"""
+Tests for streaming anomaly detection and auto-created congestion events.
+"""
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from app import db
+from app.anomaly import AnomalyDetector, hold_anomaly_lease, run_anomaly_tick
+from app.models import Event, TrafficData
+
+
+def _values(speed, volume):
+    return {'speed': np.array(speed, dtype=float), 'volume': np.array(volume, dtype=float)}
+
+
+def test_baselines_score_and_confirm_streaks():
+    """Test median/MAD baselines per slot and that a road fires once per streak."""
+    detector = AnomalyDetector(slot_minutes=60, min_samples=5, confirm=2)
+    # Road 1 at 08:xx, road 2 at 09:xx; one outlier must not move the median.
+    epochs = np.array([8 * 3600.0] * 6 + [9 * 3600.0] * 4)
+    detector.fit(
+        np.array([1] * 6 + [2] * 4),
+        epochs + 86400 * np.arange(10),
+        _values([50, 52, 48, 54, 46, 5, 30, 30, 30, 30], [300, 310, 290, 320, 280, np.nan, 100, 100, 100, 100]),
+    )
+    row = detector.rows[1]
+    assert detector._medians['speed'][row, 8] == 49.0
+    assert detector._spreads['speed'][row, 8] == pytest.approx(3 * 1.4826)
+    assert detector._medians['volume'][row, 8] == 300.0
+    assert np.isnan(detector._medians['speed'][detector.rows[2], 9])  # too few samples
+
+    at_eight = np.full(3, 8 * 3600.0 + 60)
+    assert detector.process(np.array([1, 1, 2]), at_eight, _values([20, 48, 5], [300, 300, 300])) == []
+    fired = detector.process(np.array([1, 1]), at_eight[:2], _values([20, 49], [300, 900]))
+    assert [anomaly['road_id'] for anomaly in fired] == [1]
+    assert fired[0]['volume']['flagged'] and not fired[0]['speed']['flagged']
+    assert detector.severity(fired[0]) == 5
+    # Still the same streak: nothing new until a normal reading breaks it.
+    assert detector.process(np.array([1]), at_eight[:1], _values([20], [300])) == []
+    assert detector.stats()['anomalies'] == 1 and detector.stats()['readings_scored'] == 6
+
+
+def test_tick_opens_one_congestion_event_per_road(app, client, sample_road):
+    """Test slow readings open a Congestion event in a batch, and only one while active."""
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    db.session.add_all([
+        TrafficData(road_id=sample_road.id, timestamp=now - timedelta(days=day),
+                    speed=50 + day % 3, volume=300 + 10 * (day % 4))
+        for day in range(1, 11)
+    ])
+    db.session.commit()
+    assert run_anomaly_tick() == []  # history is baseline, not scored
+
+    def post(speed):
+        response = client.post('/api/traffic/batch', json={'readings': [
+            {'road_id': sample_road.id, 'timestamp': now.isoformat(), 'speed': speed, 'volume': 310}
+            for _ in range(2)
+        ]})
+        assert response.status_code == 201
+
+    post(12)
+    created = run_anomaly_tick()
+    assert [(event['type'], event['road_id'], event['status']) for event in created] == [
+        ('Congestion', sample_road.id, 'active')
+    ]
+    assert 'speed 12.0 km/h vs typical 51.0' in created[0]['description']
+    assert created[0]['severity'] == 5
+
+    post(51)
+    post(10)
+    assert run_anomaly_tick() == []
+    assert Event.query.count() == 1
+
+    status = client.get('/api/system/status').get_json()['anomaly']
+    assert status['readings_scored'] == 6 and status['events_created'] == 1
+
+
+def test_poll_scores_late_commits_once(app, sample_road):
+    """Test a reading committed after higher ids is scored if it is within the lookback."""
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    detector = AnomalyDetector(lookback_seconds=300)
+
+    def add(reading_id, age):
+        db.session.add(TrafficData(id=reading_id, road_id=sample_road.id, timestamp=now - timedelta(seconds=age),
+                                   speed=50, volume=300))
+        db.session.commit()
+
+    add(50, 10)
+    detector.poll()
+    add(10, 120)  # lower id, committed later
+    add(11, 900)  # older than the lookback
+    detector.poll()
+    detector.poll()
+    assert detector.stats()['readings_scored'] == 2
+    assert sorted(detector._seen_ids.tolist()) == [10, 50]
+
+
+def test_owner_lease_is_renewed_and_taken_over(app):
+    """Test one worker holds the anomaly lease and a takeover drops its stale detector."""
+    from app import cache
+
+    assert hold_anomaly_lease(app, 'first')
+    assert hold_anomaly_lease(app, 'first')
+    assert not hold_anomaly_lease(app, 'second')
+
+    app.extensions['anomaly_detector'] = AnomalyDetector()
+    cache.delete('anomaly_owner')  # the first worker stopped renewing
+    assert hold_anomaly_lease(app, 'second')
+    assert 'anomaly_detector' not in app.extensions
+    assert not hold_anomaly_lease(app, 'first')
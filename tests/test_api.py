@@ -119,3 +119,18 @@ def test_system_status(client):
     data = json.loads(response.data)
     assert 'totals' in data
     assert 'generated_at' in data
+
+
+def test_traffic_history(client, sample_road, sample_traffic_data):
+    """Test GET /api/traffic/history/<id> endpoint."""
+    response = client.get(f'/api/traffic/history/{sample_road.id}')
+    assert response.status_code == 200
+
+    data = json.loads(response.data)
+    assert data['road']['code'] == 'R0001'
+    assert len(data['traffic']) == 1
+    reading = data['traffic'][0]
+    assert reading['road_name'] == 'Test Road'
+    assert reading['speed'] == 45.5
+    assert reading['congestion_level'] == 0.35
+    assert reading['timestamp'].endswith('+00:00')
@@ -0,0 +1,136 @@
+"""
+Tests for the ASGI serving mode and async read services.
+"""
+import asyncio
+import gzip
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from app import db
+from app.async_services import async_database_uri
+from app.models import Event, Road, TrafficData
+from config import config
+
+
+@pytest.fixture
+def asgi_app(tmp_path, monkeypatch):
+    """ASGI app backed by a file database shared with the sync session."""
+    monkeypatch.setattr(
+        config['testing'], 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'asgi.db'}"
+    )
+    from app.asgi import create_asgi_app
+    application = create_asgi_app('testing')
+    flask_app = application.other_asgi_app.flask_app
+    with flask_app.app_context():
+        db.create_all()
+        road = Road(name='Async Road', code='A0001', length=2.0, lanes=2,
+                    speed_limit=50, start_point='POINT(116.40 39.90)')
+        db.session.add(road)
+        db.session.commit()
+        db.session.add(TrafficData(road_id=road.id, timestamp=datetime.now(timezone.utc),
+                                   speed=42.5, volume=210, status='SMOOTH', congestion_level=0.15))
+        db.session.add(Event(road_id=road.id, type='Accident', status='active', severity=2,
+                             position='POINT(116.41 39.91)', timestamp=datetime.now(timezone.utc)))
+        db.session.commit()
+    yield application
+    asyncio.run(application.other_asgi_app.engine.dispose())
+
+
+def _request(application, path, query=b'', headers=()):
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        'type': 'http', 'method': 'GET', 'path': path, 'query_string': query,
+        'headers': [(name.lower().encode(), value.encode()) for name, value in headers],
+        'http_version': '1.1', 'scheme': 'http', 'root_path': '',
+        'server': ('testserver', 80), 'client': ('127.0.0.1', 1234),
+    }
+    asyncio.run(application(scope, receive, send))
+    response_headers = {name.decode(): value.decode() for name, value in messages[0]['headers']}
+    body = b''.join(m.get('body', b'') for m in messages[1:])
+    return messages[0]['status'], response_headers, body
+
+
+def _get(application, path, query=b''):
+    status, _, body = _request(application, path, query)
+    return status, body
+
+
+def test_async_database_uri():
+    """Test sync URIs are mapped to async drivers."""
+    assert async_database_uri('sqlite:///traffic.db') == 'sqlite+aiosqlite:///traffic.db'
+    assert async_database_uri('postgresql://u:p@db/traffic') == 'postgresql+asyncpg://u:p@db/traffic'
+
+
+def test_async_latest_traffic(asgi_app):
+    """Test /api/traffic/latest is served by the async path."""
+    status, body = _get(asgi_app, '/api/traffic/latest', b'limit=5')
+    assert status == 200
+    data = json.loads(body)
+    assert data['total'] == 1
+    assert data['data'][0]['road_name'] == 'Async Road'
+    assert data['data'][0]['speed'] == 42.5
+
+
+def test_async_events_and_map(asgi_app):
+    """Test event listing, validation and map endpoints on the async path."""
+    status, body = _get(asgi_app, '/api/events', b'status=active')
+    assert status == 200
+    assert json.loads(body)['data'][0]['type'] == 'Accident'
+
+    status, _ = _get(asgi_app, '/api/events', b'status=bogus')
+    assert status == 400
+
+    _, body = _get(asgi_app, '/api/events', b'severity=2')
+    assert json.loads(body)['total'] == 1
+    _, body = _get(asgi_app, '/api/events', b'severity=4')
+    assert json.loads(body)['total'] == 0
+
+    status, body = _get(asgi_app, '/api/events/map')
+    assert json.loads(body)[0]['coordinates'] == {'lat': 39.91, 'lon': 116.41}
+
+
+def test_async_snapshot_and_summary(asgi_app):
+    """Test road snapshot and dashboard summary on the async path."""
+    status, body = _get(asgi_app, '/api/roads/1')
+    assert status == 200
+    assert json.loads(body)['road']['start_point'] == {'lat': 39.90, 'lon': 116.40}
+
+    assert _get(asgi_app, '/api/roads/999')[0] == 404
+
+    status, body = _get(asgi_app, '/api/dashboard/summary')
+    assert json.loads(body)['active_events'] == 1
+
+
+def test_other_routes_fall_back_to_flask(asgi_app):
+    """Test non-async routes are served by the wrapped Flask app."""
+    status, body = _get(asgi_app, '/api/roads')
+    assert status == 200
+    assert json.loads(body)[0]['code'] == 'A0001'
+
+
+def test_async_reads_are_conditional_and_compressed(asgi_app):
+    """Test async endpoints send the same ETags, 304s and compression as Flask."""
+    status, headers, _ = _request(asgi_app, '/api/events/map')
+    etag = headers['etag']
+    assert etag.startswith('W/"v-')
+    status, headers, body = _request(asgi_app, '/api/events/map', headers=[('If-None-Match', etag)])
+    assert (status, body) == (304, b'')
+
+    status, headers, _ = _request(asgi_app, '/api/traffic/latest')
+    status, _, body = _request(asgi_app, '/api/traffic/latest', headers=[('If-None-Match', headers['etag'])])
+    assert (status, body) == (304, b'')
+
+    flask_app = asgi_app.other_asgi_app.flask_app
+    flask_app.config['COMPRESS_MIN_SIZE'] = 10
+    status, headers, body = _request(asgi_app, '/api/traffic/latest', headers=[('Accept-Encoding', 'gzip')])
+    assert headers['content-encoding'] == 'gzip' and headers['vary'] == 'Accept-Encoding'
+    assert json.loads(gzip.decompress(body))['total'] == 1
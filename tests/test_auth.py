@@ -0,0 +1,106 @@
+"""
+Tests for the login and session API.
+"""
+import pytest
+
+from app import cache, db
+from app.auth import HashPool, _attempt_key, _dummy_hashes, bcrypt_cost, get_hash_pool
+
+
+@pytest.fixture(autouse=True)
+def inline_hashing(app, monkeypatch):
+    """Run bcrypt inline so tests do not spawn worker processes."""
+    pool = get_hash_pool()
+    monkeypatch.setattr(pool, 'workers', 0)
+
+
+def _login(client, username='testuser', password='testpass123'):
+    return client.post('/api/auth/login', json={'username': username, 'password': password})
+
+
+def test_login_issues_token(client, sample_user):
+    """Test that valid credentials return a signed session token."""
+    response = _login(client)
+    assert response.status_code == 200
+
+    data = response.get_json()
+    assert data['user']['username'] == 'testuser'
+    session = client.get('/api/auth/session', headers={'Authorization': f"Bearer {data['token']}"})
+    assert session.status_code == 200
+    assert session.get_json()['user']['id'] == sample_user.id
+
+
+def test_login_by_email(client, sample_user):
+    """Test logging in with the account email."""
+    assert _login(client, username='test@example.com').status_code == 200
+
+
+def test_invalid_credentials(client, sample_user):
+    """Test that wrong passwords and unknown users are rejected."""
+    assert _login(client, password='wrong').status_code == 401
+    assert _login(client, username='nobody').status_code == 401
+
+
+def test_session_requires_valid_token(client):
+    """Test that missing or tampered tokens are rejected."""
+    assert client.get('/api/auth/session').status_code == 401
+    response = client.get('/api/auth/session', headers={'Authorization': 'Bearer forged.token'})
+    assert response.status_code == 401
+
+
+def test_login_throttling(app, client, sample_user):
+    """Test that repeated failures for one user are rate limited."""
+    app.config['AUTH_MAX_ATTEMPTS_PER_USER'] = 3
+    for _ in range(3):
+        assert _login(client, password='wrong').status_code == 401
+
+    response = _login(client)
+    assert response.status_code == 429
+    assert 'Retry-After' in response.headers
+
+
+def test_throttle_window_runs_from_first_failure(app, client, sample_user, monkeypatch):
+    """Test that later failures do not push the lockout past AUTH_THROTTLE_WINDOW."""
+    app.config.update(AUTH_MAX_ATTEMPTS_PER_USER=3, AUTH_THROTTLE_WINDOW=60)
+    clock = [1000.0]
+    monkeypatch.setattr('app.auth.time.time', lambda: clock[0])
+    for _ in range(3):
+        assert _login(client, password='wrong').status_code == 401
+        clock[0] += 15
+
+    response = _login(client)
+    assert response.status_code == 429
+    assert cache.get(_attempt_key('user', 'testuser')) == (3, 1060.0)
+    clock[0] = 1061.0
+    assert _login(client).status_code == 200
+
+
+def test_unknown_user_checked_at_configured_cost(app, client):
+    """Test that unknown usernames are verified against a hash of the real cost."""
+    app.config['AUTH_BCRYPT_ROUNDS'] = 5
+    assert _login(client, username='nobody').status_code == 401
+    assert bcrypt_cost(_dummy_hashes[5]) == 5
+
+
+def test_hash_upgraded_on_login(app, client, sample_user):
+    """Test that hashes below the configured cost are upgraded transparently."""
+    app.config['AUTH_BCRYPT_ROUNDS'] = 5
+    assert bcrypt_cost(sample_user.password_hash) == 4
+
+    assert _login(client).status_code == 200
+    db.session.refresh(sample_user)
+    assert bcrypt_cost(sample_user.password_hash) == 5
+    assert sample_user.check_password('testpass123')
+    assert sample_user.last_login is not None
+
+
+def test_hash_timeout_answers_busy(app, client, sample_user, monkeypatch):
+    """Test that a hash pool too slow to answer in time yields 503, not 500."""
+    pool = HashPool(workers=1, max_pending=2, timeout=0.001)
+    monkeypatch.setattr('app.auth._pool', pool)
+    try:
+        response = _login(client)
+    finally:
+        pool.shutdown()
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
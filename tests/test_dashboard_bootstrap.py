@@ -0,0 +1,44 @@
+"""
+Tests for the combined dashboard bootstrap endpoint.
+"""
+from app import cache
+
+
+def test_bootstrap_matches_individual_endpoints(client, sample_road, sample_traffic_data, sample_event):
+    """Test each section equals what its own endpoint returns."""
+    response = client.get('/api/dashboard/bootstrap')
+    assert response.status_code == 200
+    data = response.get_json()
+
+    assert set(data) == {
+        'roads', 'traffic', 'events', 'summary', 'alerts', 'system', 'map', 'weekly',
+        'snapshot', 'generated_at',
+    }
+    assert data['roads'] == client.get('/api/roads').get_json()
+    assert data['traffic'] == client.get('/api/traffic/latest?limit=10').get_json()
+    assert data['events'] == client.get('/api/events?limit=10').get_json()
+    assert data['summary'] == client.get('/api/dashboard/summary').get_json()
+    assert data['alerts'] == client.get('/api/alerts').get_json()
+    weekly = client.get('/api/reports/weekly').get_json()
+    assert {**data['weekly'], 'window': None} == {**weekly, 'window': None}
+    assert data['snapshot']['road']['id'] == sample_road.id
+    assert data['snapshot']['events_last_24h'] == 1
+
+
+def test_bootstrap_sections_parameter(client, app, sample_road, sample_traffic_data):
+    """Test section selection, the road parameter and shared summary caching."""
+    cache.set('dashboard_summary', {'active_events': 42, 'top_congested_roads': []})
+
+    data = client.get('/api/dashboard/bootstrap?sections=alerts, summary,alerts').get_json()
+    assert set(data) == {'summary', 'alerts', 'generated_at'}
+    assert data['summary']['active_events'] == 42
+    assert data['alerts']['summary'] is not None
+    assert data['alerts']['alerts'][0]['level'] == 'critical'
+
+    data = client.get('/api/dashboard/bootstrap?sections=snapshot&road=9999').get_json()
+    assert data['snapshot'] is None
+
+    response = client.get('/api/dashboard/bootstrap?sections=traffic,bogus')
+    assert response.status_code == 400
+    assert 'sections' in response.get_json()['details']
+    assert client.get('/api/dashboard/bootstrap?sections=').status_code == 400
@@ -0,0 +1,125 @@
+"""
+Tests for the active-event index and TTL auto-expiry.
+"""
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import event, select, update
+
+from app import db
+from app.event_index import ActiveEventIndex, get_active_index
+from app.middleware import bump_etag_version
+from app.models import Event
+from app.services import expire_events
+
+
+def _event(event_id, road_id, timestamp, severity=3, type_='Accident'):
+    return {'id': event_id, 'road_id': road_id, 'severity': severity, 'type': type_, 'status': 'active'}, timestamp
+
+
+def test_index_pages_and_counts():
+    """Test newest-first paging, filters and removal."""
+    index = ActiveEventIndex('v1')
+    for event_id, road_id, timestamp, severity in ((1, 10, 100.0, 3), (2, 11, 300.0, 5), (3, 10, 200.0, 5)):
+        index.add(*_event(event_id, road_id, timestamp, severity))
+
+    assert [e['id'] for e in index.page()] == [2, 3, 1]
+    assert [e['id'] for e in index.page(limit=1, offset=1)] == [3]
+    assert [e['id'] for e in index.page(severity=5)] == [2, 3]
+    assert index.count(road_id=10) == 2 and index.count(road_id=10, severity=5) == 1
+
+    index.add(*_event(1, 11, 400.0, 5))  # re-adding moves the event
+    assert [e['id'] for e in index.page(road_id=11)] == [1, 2]
+    index.discard(3)
+    assert index.count(road_id=10) == 0 and index.count(severity=5) == 2
+    assert 10 not in index.by_road
+    assert index.expired({'Accident': 1}, now=400.0 + 59) == [2]
+
+
+def test_active_events_served_from_index(client, app, sample_event):
+    """Test event reads and the dashboard count issue no event queries once loaded."""
+    road_id = sample_event.road_id
+    assert client.get('/api/events').get_json()['total'] == 1
+
+    created = client.post('/api/events', json={'road_id': road_id, 'type': 'Control', 'severity': 5})
+    created_id = created.get_json()['id']
+
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        data = client.get('/api/events?severity=5').get_json()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listener)
+    assert statements == []
+    assert [item['id'] for item in data['data']] == [created_id]
+
+    response = client.patch('/api/events/batch', json={'ids': [created_id], 'status': 'resolved'})
+    assert response.status_code == 200
+    assert get_active_index().count() == 1
+    assert client.get('/api/dashboard/summary').get_json()['active_events'] == 1
+    assert client.get('/api/events?status=resolved').get_json()['data'][0]['id'] == created_id
+
+
+def test_index_reloads_on_foreign_writes(app, sample_event):
+    """Test a write from another process is picked up at the next version check."""
+    app.config['EVENT_INDEX_CHECK_INTERVAL'] = 0
+    index = get_active_index()
+    assert len(index) == 1
+
+    db.session.add(Event(road_id=sample_event.road_id, type='Accident', status='active',
+                         timestamp=datetime.now(timezone.utc)))
+    db.session.commit()
+    assert get_active_index() is index  # version unchanged
+
+    bump_etag_version('events')
+    assert len(get_active_index()) == 2
+
+
+def test_expire_events_resolves_in_batches(app, sample_road):
+    """Test events past their type's TTL are resolved chunk by chunk."""
+    app.config['EVENT_EXPIRY_BATCH'] = 2
+    now = datetime.now(timezone.utc)
+    db.session.add_all(
+        [Event(road_id=sample_road.id, type='Congestion', status='active',
+               timestamp=now - timedelta(hours=2)) for _ in range(5)]
+        + [Event(road_id=sample_road.id, type='Congestion', status='active', timestamp=now),
+           Event(road_id=sample_road.id, type='Construction', status='active',
+                 timestamp=now - timedelta(days=30))]
+    )
+    db.session.commit()
+    assert len(get_active_index()) == 7
+
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        resolved = expire_events(time.time())
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listener)
+
+    assert len(resolved) == 5 and {e['status'] for e in resolved} == {'resolved'}
+    assert sum(s.lstrip().upper().startswith('UPDATE') for s in statements) == 3
+    assert Event.query.filter_by(status='active').count() == 2
+    assert {e['type'] for e in get_active_index().page()} == {'Congestion', 'Construction'}
+    assert expire_events() == []
+
+
+def test_expire_events_reports_only_its_own_updates(app, sample_road):
+    """Test a worker whose index is stale does not report events another worker resolved."""
+    now = datetime.now(timezone.utc)
+    db.session.add_all([
+        Event(road_id=sample_road.id, type='Congestion', status='active', timestamp=now - timedelta(hours=2))
+        for _ in range(3)
+    ])
+    db.session.commit()
+    assert len(get_active_index()) == 3
+
+    # Another worker resolves two of them; this worker's index has not reloaded yet.
+    first_two = [event_id for event_id, in db.session.execute(select(Event.id).order_by(Event.id).limit(2))]
+    db.session.execute(update(Event).where(Event.id.in_(first_two)).values(status='resolved'))
+    db.session.commit()
+
+    resolved = expire_events(time.time())
+    assert [e['id'] for e in resolved] == [max(first_two) + 1]
+    assert len(get_active_index()) == 0
@@ -0,0 +1,82 @@
+"""
+Tests for bulk event creation and status transitions.
+"""
+import pytest
+
+from app import cache
+from app.models import Event
+
+
+@pytest.fixture
+def broadcasts(monkeypatch):
+    """Capture socket broadcasts made by the batch endpoints."""
+    sent = []
+    monkeypatch.setattr('app.routes.broadcast_event', lambda data, action=None: sent.append((action, data)))
+    return sent
+
+
+def _event(road_id, **overrides):
+    payload = {'road_id': road_id, 'type': 'Accident', 'severity': 3, 'description': 'Pile-up'}
+    payload.update(overrides)
+    return payload
+
+
+def test_create_events_batch(client, sample_road, broadcasts):
+    """Test POST /api/events/batch inserts all events and broadcasts once."""
+    cache.set('dashboard_summary', {'stale': True})
+    events = [_event(sample_road.id), _event(sample_road.id, type='Control', timestamp='2024-01-01T08:00:00Z')]
+
+    response = client.post('/api/events/batch', json={'events': events})
+    assert response.status_code == 201
+
+    data = response.get_json()
+    assert data['count'] == 2
+    assert [item['type'] for item in data['data']] == ['Accident', 'Control']
+    assert data['data'][0]['road_name'] == sample_road.name
+    assert Event.query.count() == 2
+    assert len(broadcasts) == 1 and broadcasts[0][0] == 'created'
+    assert cache.get('dashboard_summary') is None
+
+
+def test_create_events_batch_is_all_or_nothing(client, sample_road, broadcasts):
+    """Test that one invalid record or unknown road rejects the whole batch."""
+    response = client.post('/api/events/batch', json={
+        'events': [_event(sample_road.id), _event(sample_road.id, severity=9)]
+    })
+    assert response.status_code == 400
+    assert '1' in response.get_json()['details']
+
+    response = client.post('/api/events/batch', json={'events': [_event(sample_road.id), _event(9999)]})
+    assert response.status_code == 404
+
+    assert Event.query.count() == 0
+    assert broadcasts == []
+
+
+def test_update_events_status_batch(client, sample_road, broadcasts):
+    """Test PATCH /api/events/batch resolves many events at once."""
+    created = client.post('/api/events/batch', json={
+        'events': [_event(sample_road.id) for _ in range(3)]
+    }).get_json()['data']
+    ids = [item['id'] for item in created]
+
+    response = client.patch('/api/events/batch', json={'ids': ids, 'status': 'resolved'})
+    assert response.status_code == 200
+    assert {item['status'] for item in response.get_json()['data']} == {'resolved'}
+    assert Event.query.filter_by(status='resolved').count() == 3
+    assert broadcasts[-1][0] == 'resolved'
+
+    # Resolved events cannot be cancelled, and nothing is applied.
+    response = client.patch('/api/events/batch', json={'ids': ids, 'status': 'cancelled'})
+    assert response.status_code == 409
+
+    response = client.patch('/api/events/batch', json={'ids': ids + [9999], 'status': 'active'})
+    assert response.status_code == 404
+    assert Event.query.filter_by(status='resolved').count() == 3
+
+
+def test_batch_size_limit(app, client, sample_road):
+    """Test that oversized batches are rejected."""
+    app.config['EVENT_BATCH_MAX'] = 2
+    response = client.post('/api/events/batch', json={'events': [_event(sample_road.id)] * 3})
+    assert response.status_code == 413
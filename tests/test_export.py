@@ -0,0 +1,167 @@
+"""
+Tests for data export endpoints.
+"""
+import io
+import os
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from app import db, jobs
+from app.models import TrafficData
+
+
+def test_export_traffic_parquet(client, sample_traffic_data):
+    """Test GET /api/export/traffic/parquet returns typed columns."""
+    response = client.get('/api/export/traffic/parquet')
+    assert response.status_code == 200
+    assert response.mimetype == 'application/vnd.apache.parquet'
+
+    table = pq.read_table(pa.BufferReader(response.data))
+    assert table.num_rows == 1
+    assert pa.types.is_dictionary(table.schema.field('status').type)
+    assert pa.types.is_timestamp(table.schema.field('timestamp').type)
+    row = table.to_pylist()[0]
+    assert row['road_name'] == 'Test Road'
+    assert row['speed'] == Decimal('45.50')
+
+
+def test_export_traffic_arrow_stream(client, sample_traffic_data):
+    """Test GET /api/export/traffic/arrow streams an Arrow IPC payload."""
+    response = client.get('/api/export/traffic/arrow')
+    assert response.status_code == 200
+
+    table = pa.ipc.open_stream(response.data).read_all()
+    assert table.num_rows == 1
+    assert table.column('status').to_pylist() == ['MODERATE']
+
+
+def test_export_events_arrow_filters_status(client, sample_event):
+    """Test event Arrow export honours the status filter."""
+    response = client.get('/api/export/events/arrow?status=resolved')
+    assert response.status_code == 200
+    assert pa.ipc.open_stream(response.data).read_all().num_rows == 0
+
+    response = client.get('/api/export/events/parquet?status=active')
+    table = pq.read_table(pa.BufferReader(response.data))
+    assert table.column('type').to_pylist() == ['Accident']
+
+
+def _run_export_job(app, client, payload):
+    response = client.post('/api/export/jobs', json=payload)
+    assert response.status_code == 202
+    job = response.get_json()
+    app.extensions['export_jobs'].get(job['id']).future.result(timeout=10)
+    return job
+
+
+def test_export_job_lifecycle(app, client, sample_traffic_data, tmp_path):
+    """Test queueing an export job, polling it and downloading with Range."""
+    app.config['EXPORT_JOB_DIR'] = str(tmp_path)
+    job = _run_export_job(app, client, {'dataset': 'traffic', 'format': 'csv'})
+
+    status = client.get(job['status_url']).get_json()
+    assert status['status'] == 'finished'
+    assert status['progress'] == 1.0
+    assert status['rows_written'] == 1
+
+    full = client.get(status['download_url'])
+    assert full.status_code == 200
+    assert full.data.startswith(b'ID,Road Name')
+
+    partial = client.get(status['download_url'], headers={'Range': 'bytes=0-9'})
+    assert partial.status_code == 206
+    assert partial.data == full.data[:10]
+
+
+def test_export_job_deduplicates_identical_requests(app, client, sample_event, tmp_path):
+    """Test that identical export requests share one job."""
+    app.config['EXPORT_JOB_DIR'] = str(tmp_path)
+    payload = {'dataset': 'events', 'format': 'parquet', 'status': 'active'}
+    first = _run_export_job(app, client, payload)
+
+    second = client.post('/api/export/jobs', json=payload).get_json()
+    assert second['id'] == first['id']
+    assert second['deduplicated'] is True
+
+
+def test_export_job_rejects_events_excel(client):
+    """Test that unsupported dataset/format combinations are rejected."""
+    response = client.post('/api/export/jobs', json={'dataset': 'events', 'format': 'excel'})
+    assert response.status_code == 400
+
+
+def test_export_job_lru_eviction(app, client, sample_traffic_data, sample_event, tmp_path):
+    """Test that old artifacts are evicted once the cache budget is exceeded."""
+    app.config['EXPORT_JOB_DIR'] = str(tmp_path)
+    app.config['EXPORT_JOB_CACHE_BYTES'] = 1
+    first = _run_export_job(app, client, {'dataset': 'events', 'format': 'csv'})
+    _run_export_job(app, client, {'dataset': 'traffic', 'format': 'csv'})
+
+    assert client.get(first['status_url']).status_code == 404
+    assert app.extensions['export_jobs'].cache_stats()['artifacts'] == 1
+
+
+def test_csv_writers_report_progress_per_batch(app, sample_road):
+    """Test that CSV exports call on_batch for every EXPORT_BATCH_SIZE rows."""
+    from app.export import write_traffic_csv
+    app.config['EXPORT_BATCH_SIZE'] = 2
+    now = datetime.now(timezone.utc)
+    db.session.add_all([
+        TrafficData(road_id=sample_road.id, timestamp=now - timedelta(minutes=i), speed=40)
+        for i in range(5)
+    ])
+    db.session.commit()
+
+    batches = []
+    rows = write_traffic_csv(io.BytesIO(), now - timedelta(hours=1), now, on_batch=batches.append)
+    assert rows == 5
+    assert batches == [2, 2, 1]
+
+
+def test_export_jobs_pruned_after_ttl(app, client, sample_traffic_data, tmp_path, monkeypatch):
+    """Test that failed and expired jobs are forgotten and their files removed."""
+    app.config['EXPORT_JOB_DIR'] = str(tmp_path)
+    finished = _run_export_job(app, client, {'dataset': 'traffic', 'format': 'csv'})
+
+    def fail(output, params, on_batch):
+        raise RuntimeError('disk full')
+    monkeypatch.setitem(jobs.EXPORT_BUILDERS, ('events', 'csv'), ('csv', 'text/csv', jobs._count_events, fail))
+    failed = _run_export_job(app, client, {'dataset': 'events', 'format': 'csv'})
+    assert client.get(failed['status_url']).get_json()['error'] == 'disk full'
+
+    manager = app.extensions['export_jobs']
+    manager.ttl = -1
+    assert client.get(finished['status_url']).status_code == 404
+    assert client.get(failed['status_url']).status_code == 404
+    assert manager._by_key == {} and manager.cache_stats()['bytes'] == 0
+    assert os.listdir(tmp_path) == []
+
+
+def test_export_jobs_visible_to_other_workers(app, client, sample_traffic_data, tmp_path):
+    """Test that another worker reports, deduplicates and serves a job through the shared cache."""
+    app.config['EXPORT_JOB_DIR'] = str(tmp_path)
+    job = _run_export_job(app, client, {'dataset': 'traffic', 'format': 'csv'})
+    other = jobs.ExportJobManager(app)
+    app.extensions['export_jobs'] = other
+    try:
+        status = client.get(job['status_url']).get_json()
+        assert (status['id'], status['status'], status['rows_written']) == (job['id'], 'finished', 1)
+        assert client.get(status['download_url']).data.startswith(b'ID,Road Name')
+
+        again, deduplicated = other.submit('traffic', 'csv', job['params'])
+        assert (again.id, deduplicated) == (job['id'], True)
+    finally:
+        other.shutdown()
+
+
+def test_export_job_default_window_is_pinned(app, client, sample_traffic_data, tmp_path):
+    """Test that a job without dates records, and is keyed by, the window it exports."""
+    app.config['EXPORT_JOB_DIR'] = str(tmp_path)
+    job = _run_export_job(app, client, {'dataset': 'traffic', 'format': 'csv'})
+    start = datetime.fromisoformat(job['params']['start'])
+    end = datetime.fromisoformat(job['params']['end'])
+    assert end - start == timedelta(days=7)
+    assert datetime.now(timezone.utc) - end < timedelta(minutes=1)
@@ -0,0 +1,92 @@
+"""
+Tests for concurrent fan-out of independent aggregate queries.
+"""
+import threading
+import time
+
+import pytest
+from flask import current_app
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.pool import StaticPool
+
+from app.fanout import QueryFanout, scalar
+
+
+def _slow(value, delay=0.2):
+    def query(conn):
+        time.sleep(delay)
+        return conn.execute(select(text(str(value)))).scalar(), threading.current_thread().name
+    return query
+
+
+def test_fanout_runs_queries_concurrently(tmp_path):
+    """Test queries run on separate pooled connections and latency is the slowest one."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'fanout.db'}")
+    fanout = QueryFanout(engine, workers=4)
+    assert fanout.parallel
+
+    started = time.perf_counter()
+    results = fanout.run({'a': _slow(1), 'b': _slow(2), 'c': _slow(3), 'd': scalar(select(text('4')))})
+    elapsed = time.perf_counter() - started
+
+    assert {name: value for name, (value, _) in list(results.items())[:3]} == {'a': 1, 'b': 2, 'c': 3}
+    assert results['d'] == 4
+    assert all(thread.startswith('query-fanout') for _, thread in list(results.values())[:3])
+    assert elapsed < 0.5
+
+    stats = fanout.stats()
+    assert stats['calls'] == 1 and stats['queries'] == 4
+    assert stats['avg_sequential_ms'] >= 600
+    assert stats['avg_slowest_query_ms'] >= 200
+    assert 0 <= stats['avg_dispatch_overhead_ms'] < stats['avg_wall_ms']
+
+    def failing(conn):
+        raise RuntimeError('boom')
+
+    with pytest.raises(RuntimeError):
+        fanout.run({'ok': _slow(1, delay=0), 'bad': failing})
+    fanout.shutdown()
+    engine.dispose()
+
+
+def test_fanout_is_serial_on_shared_connection_pools():
+    """Test single-connection pools (SQLite :memory:) run queries in the caller's thread."""
+    engine = create_engine('sqlite://', poolclass=StaticPool)
+    fanout = QueryFanout(engine, workers=4)
+    assert not fanout.parallel
+
+    results = fanout.run({'a': _slow(1, delay=0), 'b': _slow(2, delay=0)})
+    assert results == {
+        'a': (1, threading.current_thread().name),
+        'b': (2, threading.current_thread().name),
+    }
+    assert fanout.stats()['calls'] == 1
+
+
+def test_aggregate_views_use_fanout(client, sample_road, sample_traffic_data, sample_event):
+    """Test the dashboard, weekly report and road snapshot go through the fan-out."""
+    road_id = sample_road.id
+    assert client.get('/api/dashboard/summary').status_code == 200
+    assert client.get('/api/reports/weekly').get_json()['traffic_records'] == 1
+    snapshot = client.get(f'/api/roads/{road_id}').get_json()
+    assert snapshot['latest']['road_name'] == 'Test Road'
+    assert snapshot['events_last_24h'] == 1
+
+    stats = client.get('/api/system/status').get_json()['query_fanout']
+    assert stats['calls'] == 3 and stats['queries'] == 3 + 5 + 3
+
+
+def test_fanout_calls_service_functions_in_app_contexts(app, tmp_path):
+    """Test whole service functions run on the task pool, each with an app context."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'fanout.db'}")
+    fanout = QueryFanout(engine, workers=2)
+
+    def task():
+        return current_app.name, threading.current_thread().name
+
+    results = fanout.call({'a': task, 'b': task})
+    assert {name for name, _ in results.values()} == {app.name}
+    assert all(thread.startswith('fanout-task') for _, thread in results.values())
+    assert fanout.call({'only': task})['only'][1] == threading.current_thread().name
+    fanout.shutdown()
+    engine.dispose()
@@ -0,0 +1,171 @@
+"""
+Tests for per-road congestion forecasting.
+"""
+import threading
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+from sqlalchemy import event
+
+from app import db
+from app.forecasting import Forecaster, congestion_status, get_forecaster
+from app.models import TrafficData
+
+MONDAY = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _batch(readings):
+    road_ids, times, congestion, speed = zip(*readings)
+    return (
+        np.array(road_ids),
+        np.array([t.timestamp() for t in times]),
+        {'congestion': np.array(congestion, dtype=float), 'speed': np.array(speed, dtype=float)},
+    )
+
+
+def test_batch_update_matches_sequential_smoothing():
+    """Test that the vectorized batch equals smoothing each road's readings in order."""
+    readings = [
+        (road_id, MONDAY + timedelta(minutes=15 * step), 0.1 * ((step + road_id) % 7), 30 + step)
+        for step in range(40)
+        for road_id in (7, 9)
+    ]
+    forecaster = Forecaster(alpha=0.3)
+    road_ids, epochs, values = _batch(readings)
+    forecaster.update(road_ids, epochs, values)
+    assert forecaster._counts.sum() == 80
+
+    rows = np.array([forecaster.rows[road_id] for road_id in road_ids])
+    baseline = forecaster._baseline('congestion', rows, forecaster.slot_of(epochs))
+    for road_id in (7, 9):
+        level = 0.0
+        for index in np.flatnonzero(road_ids == road_id):
+            level = 0.3 * (values['congestion'][index] - baseline[index]) + 0.7 * level
+        assert forecaster._levels['congestion'][forecaster.rows[road_id]] == pytest.approx(level)
+
+
+def test_forecast_follows_baseline_and_residual():
+    """Test seasonal slots drive the forecast and a recent surge decays."""
+    forecaster = Forecaster(slot_minutes=60, alpha=0.5, damping=0.5)
+    week = [
+        (1, MONDAY + timedelta(weeks=w, hours=h), 0.8 if h == 8 else 0.2, 20 if h == 8 else 60)
+        for w in range(2)
+        for h in range(24)
+    ]
+    forecaster.update(*_batch(week))
+
+    # Monday 07:00 of week 3: the next slot (08:00) is the rush hour.
+    start = MONDAY + timedelta(weeks=2, hours=7)
+    result = forecaster.forecast(1, start, 2)
+    assert result['congestion'][0] == pytest.approx(0.8, abs=0.05)
+    assert result['congestion'][1] == pytest.approx(0.2, abs=0.05)
+    assert congestion_status(result['congestion'][0]) == 'CONGESTED'
+
+    forecaster.update(*_batch([(1, start, 0.9, 10)]))
+    surged = forecaster.forecast(1, start, 3)
+    assert surged['congestion'][1] > result['congestion'][1]
+    assert surged['congestion'][2] - 0.2 < surged['congestion'][1] - 0.2
+    assert forecaster.forecast(99, start, 2) is None
+
+
+def test_forecast_endpoint(client, app, sample_road):
+    """Test the endpoint forecasts from stored readings without querying again."""
+    now = datetime.now(timezone.utc)
+    db.session.add_all([
+        TrafficData(
+            road_id=sample_road.id,
+            timestamp=now - timedelta(minutes=15 * step),
+            speed=25,
+            volume=400,
+            status='CONGESTED',
+            congestion_level=0.85
+        )
+        for step in range(1, 20)
+    ])
+    db.session.commit()
+    road_id = sample_road.id
+
+    response = client.get(f'/api/roads/{road_id}/forecast?horizon=60')
+    assert response.status_code == 200
+    data = response.get_json()
+    assert len(data['forecast']) == 4
+    assert data['forecast'][0]['status'] == 'CONGESTED'
+    assert data['congested_at'] == data['forecast'][0]['timestamp']
+
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        assert client.get(f'/api/roads/{road_id}/forecast').status_code == 200
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listener)
+    assert statements == []
+
+    assert client.get('/api/roads/9999/forecast').status_code == 404
+    assert client.get(f'/api/roads/{road_id}/forecast?horizon=0').status_code == 400
+
+
+def test_forecaster_refits_incrementally(app, sample_road):
+    """Test that refreshes apply new and late-committed readings exactly once."""
+    app.config['FORECAST_REFRESH_INTERVAL'] = 0
+    now = datetime.now(timezone.utc)
+
+    def add(reading_id, minutes_ago, level):
+        reading = TrafficData(
+            id=reading_id,
+            road_id=sample_road.id,
+            timestamp=now - timedelta(minutes=minutes_ago),
+            speed=40,
+            volume=100,
+            status=congestion_status(level),
+            congestion_level=level
+        )
+        db.session.add(reading)
+        db.session.commit()
+
+    add(10, 30, 0.2)
+    forecaster = get_forecaster()
+    assert forecaster._counts.sum() == 1
+
+    add(30, 2, 0.6)
+    assert get_forecaster() is forecaster
+    assert forecaster._counts.sum() == 2
+
+    # Committed after a higher id was applied, but within the lookback.
+    add(20, 3, 0.5)
+    get_forecaster()
+    get_forecaster()
+    assert forecaster._counts.sum() == 3
+
+
+def test_forecast_unavailable_until_warm_up_finishes(app, client, sample_road, monkeypatch):
+    """Test the first fit runs in the background and requests get 503 meanwhile."""
+    app.config['FORECAST_WARMUP_WAIT'] = 0
+    release = threading.Event()
+    refresh = Forecaster.refresh
+
+    def slow_refresh(self, history_days):
+        release.wait(5)
+        return refresh(self, history_days)
+    monkeypatch.setattr(Forecaster, 'refresh', slow_refresh)
+
+    response = client.get(f'/api/roads/{sample_road.id}/forecast')
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+    assert client.get(f'/api/roads/{sample_road.id}/forecast').status_code == 503
+
+    release.set()
+    assert app.extensions['forecaster'].ready.wait(5)
+    assert client.get(f'/api/roads/{sample_road.id}/forecast').status_code == 200
+
+
+def test_new_rows_published_after_arrays_grow():
+    """Test new roads are published by swapping the mapping once the arrays have grown."""
+    forecaster = Forecaster()
+    forecaster._ensure_rows([7])
+    published = forecaster.rows
+    forecaster._ensure_rows([8, 9])
+    assert published == {7: 0}  # readers holding the old mapping are unaffected
+    assert forecaster.rows == {7: 0, 8: 1, 9: 2}
+    assert len(forecaster._counts) == len(forecaster._last_seen) == 3
@@ -0,0 +1,137 @@
+"""
+Tests for the request concurrency governor.
+"""
+import threading
+import time
+
+import pytest
+
+from app.governor import (
+    ANALYTICS,
+    EXPORT,
+    REALTIME,
+    ConcurrencyGovernor,
+    GovernorSaturated,
+    classify,
+)
+
+
+def _governor(max_concurrent=2, reserved=0, timeout=1.0):
+    limits = {REALTIME: 4, ANALYTICS: 4, EXPORT: 1}
+    return ConcurrencyGovernor(limits, {name: timeout for name in limits}, max_concurrent, reserved)
+
+
+def _wait_until(predicate):
+    deadline = time.monotonic() + 2
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def test_classify_routes():
+    """Test route classes come from path prefixes."""
+    assert classify('/api/export/traffic/csv') == EXPORT
+    assert classify('/api/export/jobs/abc/download') == EXPORT
+    assert classify('/api/reports/weekly') == ANALYTICS
+    assert classify('/api/traffic/history/3') == ANALYTICS
+    assert classify('/api/traffic/latest') == REALTIME
+    assert classify('/static/js/main.js') is None
+
+
+def test_classify_bootstrap_and_export_jobs():
+    """Test heavy bootstrap sections count as analytics and job polls stay realtime."""
+    assert classify('/api/dashboard/bootstrap', 'weekly') == ANALYTICS
+    assert classify('/api/dashboard/bootstrap', 'traffic,system') == ANALYTICS
+    assert classify('/api/dashboard/bootstrap', 'system') == ANALYTICS  # the dashboard's system poll
+    assert classify('/api/dashboard/bootstrap') == ANALYTICS  # all sections
+    assert classify('/api/dashboard/bootstrap', 'traffic,events,summary') == REALTIME
+    assert classify('/api/export/events/arrow') == EXPORT
+    assert classify('/api/export/jobs') == REALTIME
+    assert classify('/api/export/jobs/abc') == REALTIME
+
+
+def test_realtime_waiters_take_freed_slots_first():
+    """Test a freed shared slot goes to a waiting realtime request."""
+    governor = _governor()
+    governor.acquire(ANALYTICS)
+    governor.acquire(ANALYTICS)
+    admitted = []
+
+    def request(name):
+        governor.acquire(name)
+        admitted.append(name)
+
+    analytics = threading.Thread(target=request, args=(ANALYTICS,))
+    analytics.start()
+    _wait_until(lambda: governor.stats()['classes'][ANALYTICS]['waiting'] == 1)
+    realtime = threading.Thread(target=request, args=(REALTIME,))
+    realtime.start()
+    _wait_until(lambda: governor.stats()['classes'][REALTIME]['waiting'] == 1)
+
+    governor.release(ANALYTICS)
+    realtime.join(1)
+    time.sleep(0.05)
+    assert admitted == [REALTIME]
+
+    governor.release(REALTIME)
+    analytics.join(1)
+    assert admitted == [REALTIME, ANALYTICS]
+    stats = governor.stats()['classes']
+    assert stats[ANALYTICS]['max_wait_ms'] > stats[REALTIME]['max_wait_ms'] > 0
+
+
+def test_reserved_slots_and_shedding():
+    """Test reserved realtime capacity, class limits and the Retry-After estimate."""
+    governor = _governor(max_concurrent=2, reserved=1, timeout=0)
+    governor.acquire(EXPORT)
+    with pytest.raises(GovernorSaturated) as exc:
+        governor.acquire(ANALYTICS)  # the remaining slot is realtime-only
+    assert exc.value.retry_after == 1
+    governor.acquire(REALTIME)
+
+    governor.release(REALTIME)
+    governor.release(EXPORT, busy=2.5)
+    governor.acquire(EXPORT)
+    with pytest.raises(GovernorSaturated) as exc:
+        governor.acquire(EXPORT)
+    assert exc.value.retry_after == 3  # mean run time of finished exports
+
+    stats = governor.stats()
+    assert stats['running'] == 1
+    assert stats['classes'][ANALYTICS]['rejected'] == 1
+    assert stats['classes'][EXPORT]['rejected'] == 1
+
+
+def test_saturated_class_returns_503(app, client, sample_road):
+    """Test a full export class sheds requests while realtime endpoints still answer."""
+    governor = app.extensions['governor']
+    for _ in range(app.config['GOVERNOR_LIMITS'][EXPORT]):
+        governor.acquire(EXPORT)
+
+    response = client.get('/api/export/traffic/csv')
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+    assert response.get_json()['class'] == EXPORT
+
+    response = client.get('/api/roads')
+    assert response.status_code == 200
+    assert response.headers['Server-Timing'].startswith('queue;dur=')
+
+    stats = client.get('/api/system/governor').get_json()
+    assert stats['enabled'] is True
+    assert stats['classes'][EXPORT]['rejected'] == 1
+    assert stats['classes'][REALTIME]['admitted'] == 2
+    assert stats['running'] == 2 + 1  # held exports + this status request
+
+
+def test_streamed_responses_hold_their_slot(app, client):
+    """Test generated bodies keep the slot until closed; others release at teardown."""
+    governor = app.extensions['governor']
+    client.get('/api/traffic/latest')
+    client.get('/api/export/traffic/csv')  # file body, released at teardown
+    assert governor.stats()['running'] == 0
+
+    response = client.get('/api/export/traffic/arrow')
+    assert governor.stats()['classes'][EXPORT]['active'] == 1
+    response.close()
+    assert governor.stats()['running'] == 0
@@ -0,0 +1,127 @@
+"""
+Tests for the memory-mapped hot-window store.
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import insert
+
+from app import cache, db
+from app.hot_window import HotWindowStore
+from app.models import TrafficData
+
+
+def _reading(reading_id, road_id, ts, speed=40.0, congestion=0.5):
+    return (reading_id, road_id, float(ts), speed, 100 + reading_id, 'MODERATE', congestion)
+
+
+def test_ring_eviction_and_shared_mapping(tmp_path):
+    """Test rings keep the newest readings and refuse windows they no longer cover."""
+    path = str(tmp_path / 'traffic.ring')
+    store = HotWindowStore(path, max_roads=2, slots=3)
+    assert store.road_snapshot(1, 0) is None  # never loaded
+    store.reset(covered_since=0.0, last_id=0, last_ts=0.0)
+    store.publish()
+
+    store.write([_reading(i, 1, i * 100, speed=10.0 * i) for i in (1, 2, 3)])
+    latest, averages = store.road_snapshot(1, 150)
+    assert latest == (3, 1, 300.0, 30.0, 103, 'MODERATE', 0.5)
+    assert averages == (25.0, 102.5, 0.5)
+
+    store.write([_reading(i, 1, i * 100, speed=10.0 * i) for i in (4, 5)])
+    assert store.road_snapshot(1, 150) is None  # 200 was evicted
+    assert store.road_snapshot(1, 250)[1] == (40.0, 104.0, 0.5)
+    assert store.window_summary(150) is None
+    assert store.window_summary(250) == (40.0, 105, [(1, 0.5)])
+
+    other = HotWindowStore(path, max_roads=2, slots=3)
+    assert other.road_snapshot(1, 250)[0][0] == 5
+    assert other.header()['last_id'] == 5
+
+    store.write([_reading(6, 2, 600), _reading(7, 3, 700)])
+    assert other.window_summary(250) is None  # road 3 did not fit
+    assert store.stats()['overflow'] is True
+    assert store.stats()['hits'] == 3 and store.stats()['misses'] == 3
+
+    resized = HotWindowStore(path, max_roads=2, slots=4)
+    assert resized.road_snapshot(1, 250) is None
+    for opened in (store, other, resized):
+        opened.close()
+
+
+@pytest.fixture
+def hot_app(app, tmp_path):
+    app.config.update(
+        HOT_WINDOW_ENABLED=True,
+        HOT_WINDOW_PATH=str(tmp_path / 'traffic.ring'),
+        HOT_WINDOW_MAX_ROADS=8,
+        HOT_WINDOW_SLOTS=16,
+        HOT_WINDOW_CHECK_INTERVAL=0,
+    )
+    yield app
+    state = app.extensions.pop('hot_window', None)
+    if state is not None:
+        state.store.close()
+
+
+def _sql_views(app, client, road_id):
+    app.config['HOT_WINDOW_ENABLED'] = False
+    cache.clear()
+    snapshot = client.get(f'/api/roads/{road_id}').get_json()
+    summary = client.get('/api/dashboard/summary').get_json()
+    app.config['HOT_WINDOW_ENABLED'] = True
+    cache.clear()
+    return snapshot, summary
+
+
+def _exact_fields(payload):
+    """Everything but the timestamps and the float averages (summed in another order)."""
+    return {key: value for key, value in payload.items()
+            if key not in ('generated_at', 'window_start', 'window_end', 'averages',
+                           'avg_speed_last_window', 'top_congested_roads')}
+
+
+def test_services_read_recent_window_from_store(hot_app, client, sample_road, sample_traffic_data):
+    """Test snapshots and the summary match SQL and follow ingestion and ORM writes."""
+    road_id = sample_road.id
+    now = datetime.now(timezone.utc)
+    client.post('/api/traffic/batch', json={'readings': [{
+        'road_id': road_id, 'timestamp': now.isoformat(), 'speed': 30.25,
+        'volume': 500, 'status': 'CONGESTED', 'congestion_level': 0.8,
+    }]})
+    db.session.add(TrafficData(road_id=road_id, timestamp=now - timedelta(minutes=5),
+                               speed=50, volume=200, status='SMOOTH', congestion_level=0.2))
+    db.session.commit()
+
+    expected_snapshot, expected_summary = _sql_views(hot_app, client, road_id)
+    snapshot = client.get(f'/api/roads/{road_id}').get_json()
+    summary = client.get('/api/dashboard/summary').get_json()
+    assert snapshot['latest']['speed'] == 30.25
+    assert _exact_fields(snapshot) == _exact_fields(expected_snapshot)
+    assert snapshot['averages'] == pytest.approx(expected_snapshot['averages'])
+    assert _exact_fields(summary) == _exact_fields(expected_summary)
+    assert summary['avg_speed_last_window'] == pytest.approx(expected_summary['avg_speed_last_window'])
+    assert [(road['road_name'], pytest.approx(road['avg_congestion']))
+            for road in summary['top_congested_roads']] == [
+        (road['road_name'], road['avg_congestion']) for road in expected_summary['top_congested_roads']
+    ]
+
+    stats = client.get('/api/system/status').get_json()['hot_window']
+    assert stats['reloads'] == 1 and stats['roads'] == 1
+    assert stats['hits'] == 2 and stats['misses'] == 0
+
+
+def test_out_of_band_writes_trigger_reload(hot_app, client, sample_road, sample_traffic_data):
+    """Test a reading inserted around the store is picked up at the second check."""
+    road_id = sample_road.id
+    client.get(f'/api/roads/{road_id}')
+    db.session.execute(insert(TrafficData), [{
+        'road_id': road_id, 'timestamp': datetime.now(timezone.utc), 'speed': 12.5,
+        'volume': 50, 'status': 'CONGESTED', 'congestion_level': 0.9,
+    }])
+    db.session.commit()
+
+    # The first check may be racing an ingestion between its commit and write.
+    assert client.get(f'/api/roads/{road_id}').get_json()['latest']['speed'] == 45.5
+    assert client.get(f'/api/roads/{road_id}').get_json()['latest']['speed'] == 12.5
+    assert hot_app.extensions['hot_window'].store.reloads == 2
@@ -0,0 +1,44 @@
+"""
+Tests for the EXPLAIN-based index advisor.
+"""
+from sqlalchemy import text
+
+from app import db
+from app.index_advisor import analyze_plan, apply_missing_indexes, missing_indexes, run_advisor
+
+
+def test_analyze_plan_flags_scans_and_sorts():
+    """Test detection of full scans and temporary B-trees."""
+    plan = [
+        'SCAN events',
+        'USE TEMP B-TREE FOR ORDER BY',
+        'SCAN roads',
+        'SCAN anon_1',
+        'SCAN traffic_data USING COVERING INDEX idx_traffic_window_cover',
+    ]
+    assert analyze_plan(plan) == ['full scan of events', 'use temp b-tree for order by']
+    assert analyze_plan(['Seq Scan on events  (cost=0.00..1.10 rows=10 width=4)']) == ['full scan of events']
+
+
+def test_service_queries_use_indexes(app, sample_traffic_data, sample_event):
+    """Test that event listings and the map are served by indexes."""
+    reports = run_advisor()
+    assert reports
+
+    by_source = {}
+    for report in reports:
+        by_source.setdefault(report.source, []).extend(report.findings)
+    for source in ('get_events(all)', 'get_map_events', 'get_traffic_history', 'get_road_snapshot'):
+        assert not [f for f in by_source[source] if f.startswith('full scan')], source
+
+
+def test_apply_missing_indexes(app):
+    """Test that indexes missing from an existing database are created."""
+    assert missing_indexes() == []
+
+    db.session.execute(text('DROP INDEX idx_event_map_timestamp'))
+    db.session.commit()
+    assert [index.name for index in missing_indexes()] == ['idx_event_map_timestamp']
+
+    assert apply_missing_indexes() == {'idx_event_map_timestamp': 'events'}
+    assert missing_indexes() == []
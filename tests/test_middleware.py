@@ -0,0 +1,66 @@
+"""
+Tests for response compression and ETag conditional GETs.
+"""
+import gzip
+import json
+
+
+def _make_roads(count):
+    from app import db
+    from app.models import Road
+    for i in range(count):
+        db.session.add(Road(
+            name=f'Road {i}',
+            code=f'R{i:04d}',
+            length=1.5,
+            lanes=2,
+            speed_limit=50
+        ))
+    db.session.commit()
+
+
+def test_large_json_is_gzip_compressed(app, client):
+    """Test that JSON above the threshold is compressed when accepted."""
+    _make_roads(40)
+    response = client.get('/api/roads', headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert len(json.loads(gzip.decompress(response.data))) == 40
+
+
+def test_small_json_is_not_compressed(client, sample_road):
+    """Test that responses under the threshold are sent as-is."""
+    response = client.get('/api/roads', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+
+
+def test_versioned_etag_returns_304(client, sample_road, monkeypatch):
+    """Test that an unchanged poll is answered with 304 without running the view."""
+    from app import routes
+    first = client.get('/api/roads')
+    etag = first.headers['ETag']
+
+    calls = []
+    monkeypatch.setattr(routes, 'get_all_roads', lambda: calls.append(1) or [])
+    second = client.get('/api/roads', headers={'If-None-Match': etag})
+    assert second.status_code == 304
+    assert second.data == b''
+    assert calls == []
+
+
+def test_event_write_invalidates_etag(client, sample_road):
+    """Test that creating an event changes the events ETag."""
+    etag = client.get('/api/events/map').headers['ETag']
+    client.post('/api/events', json={'road_id': sample_road.id, 'type': 'Accident'})
+
+    response = client.get('/api/events/map', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+
+def test_content_hash_etag(client, sample_road, sample_traffic_data):
+    """Test that unversioned JSON endpoints still get content-hash ETags."""
+    first = client.get('/api/dashboard/summary')
+    second = client.get('/api/dashboard/summary', headers={'If-None-Match': first.headers['ETag']})
+    assert second.status_code == 304
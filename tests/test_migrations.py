@@ -0,0 +1,159 @@
+"""
+Tests for the Alembic migrations and online schema operations.
+"""
+import io
+import os
+
+import sqlalchemy as sa
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+
+from app import db
+from app.migration_ops import add_column_online, batched_backfill, create_index_online
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _alembic_config(connection):
+    config = Config(os.path.join(ROOT, 'alembic.ini'))
+    config.attributes['connection'] = connection
+    config.attributes['configure_logger'] = False
+    return config
+
+
+def _migrated_engine(tmp_path):
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'migrations.db'}")
+    with engine.begin() as connection:
+        command.upgrade(_alembic_config(connection), 'head')
+    return engine
+
+
+def test_migrations_match_models(app, tmp_path):
+    """Test that upgrading to head yields exactly the model schema."""
+    engine = _migrated_engine(tmp_path)
+    with engine.connect() as connection:
+        diff = compare_metadata(MigrationContext.configure(connection), db.metadata)
+    assert diff == []
+
+    with engine.begin() as connection:
+        command.downgrade(_alembic_config(connection), 'base')
+    assert sa.inspect(engine).get_table_names() == ['alembic_version']
+
+
+def test_online_column_add_and_backfill(app, tmp_path):
+    """Test adding a NOT NULL column with a batched, resumable backfill."""
+    engine = _migrated_engine(tmp_path)
+    with engine.begin() as connection:
+        connection.execute(sa.text(
+            "INSERT INTO roads (name, code, length, lanes) VALUES ('Ring', 'R1', 1.0, 2)"
+        ))
+        for minute in range(25):
+            connection.execute(sa.text(
+                "INSERT INTO traffic_data (road_id, timestamp, speed) "
+                f"VALUES (1, '2024-01-01 08:{minute:02d}:00', {minute})"
+            ))
+
+    progress = []
+    with engine.connect() as connection:
+        context = MigrationContext.configure(connection)
+        with Operations.context(context), context.begin_transaction():
+            filled = add_column_online(
+                'traffic_data',
+                sa.Column('speed_mps', sa.Float(), nullable=False),
+                backfill='speed / 3.6',
+                batch_size=10,
+                pause=0,
+                report=lambda done, total: progress.append((done, total)),
+            )
+            # Nothing left to do on a second run.
+            assert batched_backfill('traffic_data', 'speed_mps', '0', pause=0) == 0
+            create_index_online('idx_traffic_speed_mps', 'traffic_data', ['speed_mps'])
+            # Re-running an index build is a no-op.
+            create_index_online('idx_traffic_speed_mps', 'traffic_data', ['speed_mps'])
+
+    assert filled == 25
+    assert progress == [(10, 25), (20, 25), (25, 25)]
+
+    inspector = sa.inspect(engine)
+    column = next(c for c in inspector.get_columns('traffic_data') if c['name'] == 'speed_mps')
+    assert column['nullable'] is False
+    assert 'idx_traffic_speed_mps' in {index['name'] for index in inspector.get_indexes('traffic_data')}
+
+
+def test_backfill_fills_rows_inserted_meanwhile(app, tmp_path):
+    """Test that rows written during the backfill are swept up before NOT NULL applies."""
+    engine = _migrated_engine(tmp_path)
+    with engine.begin() as connection:
+        connection.execute(sa.text(
+            "INSERT INTO roads (name, code, length, lanes) VALUES ('Ring', 'R1', 1.0, 2)"
+        ))
+        for minute in range(5):
+            connection.execute(sa.text(
+                "INSERT INTO traffic_data (road_id, timestamp, speed) "
+                f"VALUES (1, '2024-01-01 08:{minute:02d}:00', 36)"
+            ))
+
+    def ingest(done, total):
+        # Ingestion keeps writing rows without the new column.
+        if done <= 5:
+            connection.execute(sa.text(
+                "INSERT INTO traffic_data (road_id, timestamp, speed) "
+                f"VALUES (1, '2024-01-01 09:0{done}:00', 72)"
+            ))
+
+    with engine.connect() as connection:
+        context = MigrationContext.configure(connection)
+        with Operations.context(context), context.begin_transaction():
+            filled = add_column_online(
+                'traffic_data',
+                sa.Column('speed_mps', sa.Float(), nullable=False),
+                backfill='speed / 3.6',
+                batch_size=2,
+                pause=0,
+                report=ingest,
+            )
+
+    with engine.connect() as connection:
+        values = connection.execute(sa.text('SELECT speed_mps FROM traffic_data')).scalars().all()
+    assert filled == len(values) == 8
+    assert sorted(values) == [10.0] * 5 + [20.0] * 3
+
+
+def test_not_null_on_postgresql_uses_validated_check():
+    """Test that PostgreSQL gets NOT NULL through a NOT VALID check, never a scan under lock."""
+    output = io.StringIO()
+    context = MigrationContext.configure(
+        dialect_name='postgresql', opts={'as_sql': True, 'output_buffer': output}
+    )
+    with Operations.context(context):
+        add_column_online('traffic_data', sa.Column('speed_mps', sa.Float(), nullable=False))
+
+    statements = [line for line in output.getvalue().splitlines() if line.startswith('ALTER TABLE')]
+    assert statements == [
+        'ALTER TABLE traffic_data ADD COLUMN speed_mps FLOAT;',
+        'ALTER TABLE traffic_data ADD CONSTRAINT ck_traffic_data_speed_mps_not_null '
+        'CHECK (speed_mps IS NOT NULL) NOT VALID;',
+        'ALTER TABLE traffic_data VALIDATE CONSTRAINT ck_traffic_data_speed_mps_not_null;',
+        'ALTER TABLE traffic_data ALTER COLUMN speed_mps SET NOT NULL;',
+        'ALTER TABLE traffic_data DROP CONSTRAINT ck_traffic_data_speed_mps_not_null;',
+    ]
+    assert 'COMMIT;' in output.getvalue()
+
+
+def test_postgresql_default_is_set_before_backfill():
+    """Test that the server default applies to rows inserted while the backfill runs."""
+    output = io.StringIO()
+    context = MigrationContext.configure(
+        dialect_name='postgresql', opts={'as_sql': True, 'output_buffer': output}
+    )
+    with Operations.context(context):
+        add_column_online('traffic_data', sa.Column('source', sa.String(20), server_default='sensor'))
+
+    statements = [line for line in output.getvalue().splitlines() if line.startswith('ALTER TABLE')]
+    assert statements == [
+        'ALTER TABLE traffic_data ADD COLUMN source VARCHAR(20);',
+        "ALTER TABLE traffic_data ALTER COLUMN source SET DEFAULT 'sensor';",
+    ]
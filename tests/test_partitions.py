@@ -0,0 +1,101 @@
+"""
+Tests for monthly traffic data partitioning.
+"""
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app import db
+from app.models import TrafficData
+from app.partitions import (
+    add_months,
+    archive_partitions,
+    list_partitions,
+    month_start,
+    partition_name,
+    rotate_partitions,
+)
+from app.services import get_traffic_history
+
+
+def _add_reading(road, timestamp, speed=40.0):
+    db.session.add(TrafficData(
+        road_id=road.id,
+        timestamp=timestamp,
+        speed=speed,
+        volume=100,
+        status='SMOOTH',
+        congestion_level=0.2
+    ))
+    db.session.commit()
+
+
+def test_add_months_crosses_year_boundary():
+    """Test month arithmetic around January."""
+    jan = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    assert add_months(jan, -1) == datetime(2023, 12, 1, tzinfo=timezone.utc)
+    assert add_months(jan, 13) == datetime(2025, 2, 1, tzinfo=timezone.utc)
+    assert partition_name(datetime(2024, 3, 15, 8, 30)) == 'traffic_data_202403'
+
+
+def test_rotate_moves_old_readings(app, sample_road):
+    """Test that readings older than the hot window leave the hot table."""
+    now = datetime.now(timezone.utc)
+    old = add_months(month_start(now), -4) + timedelta(days=3)
+    _add_reading(sample_road, old)
+    _add_reading(sample_road, now - timedelta(hours=1))
+
+    moved = rotate_partitions(now)
+
+    assert moved == {partition_name(old): 1}
+    assert TrafficData.query.count() == 1
+    assert [name for _, name in list_partitions()] == [partition_name(old)]
+
+
+def test_history_routes_to_partitions(app, sample_road):
+    """Test that history spanning archived months merges partition rows."""
+    now = datetime.now(timezone.utc)
+    old = add_months(month_start(now), -4) + timedelta(days=3)
+    _add_reading(sample_road, old, speed=30.0)
+    _add_reading(sample_road, now - timedelta(hours=1), speed=50.0)
+    rotate_partitions(now)
+
+    traffic, _, _ = get_traffic_history(
+        sample_road.id, (old - timedelta(days=1)).isoformat(), now.isoformat()
+    )
+
+    assert [row['speed'] for row in traffic] == [30.0, 50.0]
+    assert traffic[0]['road_name'] == 'Test Road'
+
+
+def test_archive_writes_parquet(app, sample_road, tmp_path):
+    """Test that expired partitions are exported to Parquet and dropped."""
+    pq = pytest.importorskip('pyarrow.parquet')
+    app.config['TRAFFIC_ARCHIVE_DIR'] = str(tmp_path)
+    now = datetime.now(timezone.utc)
+    old = add_months(month_start(now), -14) + timedelta(days=3)
+    _add_reading(sample_road, old)
+    rotate_partitions(now)
+
+    paths = archive_partitions(now)
+
+    assert paths == [os.path.join(str(tmp_path), f'{partition_name(old)}.parquet')]
+    assert pq.read_table(paths[0]).num_rows == 1
+    assert list_partitions() == []
+
+
+def test_exports_include_rotated_partitions(app, sample_road):
+    """Test that traffic exports and export-job counts read archived months too."""
+    import io
+    from app.export import write_traffic_csv
+    from app.jobs import _count_traffic
+    now = datetime.now(timezone.utc)
+    old = add_months(month_start(now), -4) + timedelta(days=3)
+    _add_reading(sample_road, old)
+    _add_reading(sample_road, now - timedelta(hours=1))
+    rotate_partitions(now)
+
+    start = old - timedelta(days=1)
+    assert write_traffic_csv(io.BytesIO(), start, now) == 2
+    assert _count_traffic({'start': start.isoformat(), 'end': now.isoformat()}) == 2
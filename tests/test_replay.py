@@ -0,0 +1,179 @@
+"""
+Tests for historical traffic replay.
+"""
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from app import db, socketio
+from app import websocket  # noqa: F401  registers the Socket.IO handlers
+from app.models import Road, TrafficData
+from app.partitions import add_months, month_start, rotate_partitions
+from app.replay import REPLAY_FINISHED, REPLAY_PAUSED, ReplayFrame, ReplaySession
+
+START = datetime(2024, 5, 1, 8, 0, tzinfo=timezone.utc)
+
+
+def _reading(road_id, timestamp, speed=40.0, congestion=0.3):
+    return TrafficData(
+        road_id=road_id,
+        timestamp=timestamp,
+        speed=speed,
+        volume=100,
+        status='SMOOTH',
+        congestion_level=congestion
+    )
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_frame_loads_window_in_timestamp_order(app, sample_road):
+    """Test the compact columns, ordering across roads and partitions."""
+    other = Road(name='Other Road', code='R0002', length=1.0, lanes=2)
+    db.session.add(other)
+    db.session.commit()
+
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    old = add_months(month_start(now), -4) + timedelta(days=2)
+    db.session.add_all([
+        _reading(sample_road.id, old),
+        _reading(other.id, now - timedelta(minutes=5), speed=20.0, congestion=0.9),
+        _reading(sample_road.id, now - timedelta(minutes=10)),
+        _reading(other.id, now + timedelta(days=1)),  # outside the window
+    ])
+    db.session.commit()
+    rotate_partitions(now)
+
+    frame = ReplayFrame.load(old - timedelta(hours=1), now)
+
+    assert len(frame) == 3
+    assert frame.timestamps.dtype == np.int64 and frame.road_ids.dtype == np.int32
+    assert frame.speed.dtype == np.float32
+    assert frame.nbytes == 24 * 3
+    assert list(frame.timestamps) == sorted(frame.timestamps)
+    assert frame.timestamps[0] == int(old.timestamp())
+    assert frame.road_ids.tolist() == [sample_road.id, sample_road.id, other.id]
+
+
+def test_session_plays_pauses_and_seeks(app):
+    """Test virtual-time playback at a speed multiplier."""
+    base = int(START.timestamp())
+    frame = ReplayFrame(
+        [base, base + 60, base + 60, base + 600],
+        [1, 1, 2, 1],
+        [50, 45, 30, 20],
+        [10, 20, 30, 40],
+        [0.1, 0.2, float('nan'), 0.8],
+    )
+    sent = []
+    clock = FakeClock()
+    session = ReplaySession(
+        frame, START, START + timedelta(hours=1), 60,
+        lambda road_id, readings, meta: sent.append((road_id, readings, meta)), clock
+    )
+
+    assert session.advance() == 0  # paused until played
+    session.play()
+    clock.now = 1.0  # one wall second = one virtual minute
+    assert session.advance() == 3
+    assert [road_id for road_id, _, _ in sent] == [1, 2]
+    assert [r['speed'] for r in sent[0][1]] == [50.0, 45.0]
+    assert sent[1][1][0]['congestion_level'] is None
+    assert sent[0][2]['id'] == session.id
+
+    session.pause()
+    clock.now = 20.0
+    assert session.advance() == 0
+    assert session.virtual_time() == base + 60
+
+    session.seek(START)
+    session.set_speed(600)
+    session.play()
+    clock.now = 21.0
+    assert session.advance() == 4
+    assert session.state == REPLAY_FINISHED
+    assert session.emitted == 7
+
+
+def test_replay_api_streams_to_road_rooms(app, client, sample_road):
+    """Test loading, controlling and deleting a replay over the API."""
+    db.session.add_all([
+        _reading(sample_road.id, START + timedelta(minutes=minute))
+        for minute in (0, 1, 2)
+    ])
+    db.session.commit()
+    road_id = sample_road.id
+
+    response = client.post('/api/replays', json={
+        'start': '2024-05-01T08:00:00Z', 'end': '2024-05-01T09:00:00Z', 'autoplay': False,
+    })
+    assert response.status_code == 201
+    replay = response.get_json()
+    assert replay['readings'] == 3 and replay['state'] == REPLAY_PAUSED
+
+    socket = socketio.test_client(app)
+    socket.emit('subscribe_road', {'road_id': road_id})
+    socket.get_received()
+
+    session = app.extensions['replays'].get(replay['id'])
+    session.seek(START + timedelta(minutes=2))
+    session.play()
+    session.advance()
+    updates = [message for message in socket.get_received() if message['name'] == 'road_update']
+    assert len(updates) == 1
+    payload = updates[0]['args'][0]
+    assert payload['replay']['id'] == replay['id']
+    assert payload['data'][0]['road_name'] == 'Test Road'
+    socket.disconnect()
+
+    patched = client.patch(f"/api/replays/{replay['id']}", json={'state': 'paused', 'speed': 30})
+    assert patched.get_json()['speed'] == 30
+    assert client.patch(f"/api/replays/{replay['id']}", json={}).status_code == 400
+
+    assert client.delete(f"/api/replays/{replay['id']}").status_code == 204
+    assert client.get(f"/api/replays/{replay['id']}").status_code == 404
+
+
+def test_replay_rejects_oversized_windows(app, client, sample_road):
+    """Test the per-replay reading limit and window validation."""
+    app.config['REPLAY_MAX_READINGS'] = 1
+    db.session.add_all([_reading(sample_road.id, START + timedelta(minutes=m)) for m in (1, 2)])
+    db.session.commit()
+
+    window = {'start': '2024-05-01T08:00:00Z', 'end': '2024-05-01T09:00:00Z'}
+    response = client.post('/api/replays', json=window)
+    assert response.status_code == 400
+    assert 'limit is 1' in response.get_json()['error']
+
+    reversed_window = {'start': window['end'], 'end': window['start']}
+    assert client.post('/api/replays', json=reversed_window).status_code == 400
+
+
+def test_replay_slots_freed_by_ended_and_idle_sessions(app, client, sample_road):
+    """Test that finished, stopped and idle replays do not hold slots forever."""
+    app.config.update(REPLAY_MAX_SESSIONS=2, REPLAY_IDLE_TTL=600)
+    db.session.add(_reading(sample_road.id, START + timedelta(minutes=1)))
+    db.session.commit()
+    window = {'start': '2024-05-01T08:00:00Z', 'end': '2024-05-01T09:00:00Z', 'autoplay': False}
+
+    first = client.post('/api/replays', json=window).get_json()
+    second = client.post('/api/replays', json=window).get_json()
+    assert client.post('/api/replays', json=window).status_code == 400
+
+    manager = app.extensions['replays']
+    manager.get(first['id']).stop()
+    third = client.post('/api/replays', json=window)
+    assert third.status_code == 201
+    assert client.get(f"/api/replays/{first['id']}").status_code == 404
+
+    # A paused replay nobody looked at for REPLAY_IDLE_TTL is unloaded.
+    manager.get(second['id']).touched_at -= 601
+    assert client.post('/api/replays', json=window).status_code == 201
+    assert client.get(f"/api/replays/{second['id']}").status_code == 404
+    assert manager._reserved == 0
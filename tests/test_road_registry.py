@@ -0,0 +1,77 @@
+"""
+Tests for the in-process road registry.
+"""
+from sqlalchemy import event
+
+from app import cache, db
+from app.models import Road
+from app.road_registry import RoadInfo, get_road_registry, invalidate_road_registry
+from app.services import get_all_roads, get_road_by_id
+
+
+def _count_queries():
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    return statements, lambda: event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def test_registry_lookups(sample_road):
+    """Test id and code lookups return immutable road records."""
+    registry = get_road_registry()
+
+    road = registry.get(sample_road.id)
+    assert isinstance(road, RoadInfo)
+    assert road.name == 'Test Road'
+    assert road.length == 5.5
+    assert registry.get_by_code('R0001') is road
+    assert registry.name(sample_road.id) == 'Test Road'
+    assert registry.code(None) is None
+    assert len(registry) == 1
+
+
+def test_repeated_lookups_do_not_query(sample_road):
+    """Test that resolving roads from a loaded registry issues no SQL."""
+    road_id = sample_road.id
+    get_road_registry()
+    statements, stop = _count_queries()
+    try:
+        for _ in range(3):
+            assert get_road_by_id(road_id).name == 'Test Road'
+            assert get_all_roads()[0]['code'] == 'R0001'
+    finally:
+        stop()
+    assert statements == []
+
+
+def test_registry_refreshes_after_road_commit(sample_road):
+    """Test that committing a road change replaces the snapshot."""
+    before = get_road_registry()
+
+    sample_road.name = 'Renamed Road'
+    db.session.add(Road(name='Second Road', code='R0002', length=1.2, lanes=2))
+    db.session.commit()
+
+    after = get_road_registry()
+    assert after is not before
+    assert after.name(sample_road.id) == 'Renamed Road'
+    assert after.get_by_code('R0002').lanes == 2
+    assert before.name(sample_road.id) == 'Test Road'
+
+
+def test_registry_reloads_on_version_change(app, sample_road):
+    """Test that another process bumping the roads version is picked up."""
+    app.config['ROAD_REGISTRY_CHECK_INTERVAL'] = 0
+    before = get_road_registry()
+    assert get_road_registry() is before
+
+    # Simulates another worker's write: only the shared version changes.
+    cache.delete('etag_version:roads')
+    assert get_road_registry() is not before
+
+    invalidate_road_registry()
+    app.config['ROAD_REGISTRY_CHECK_INTERVAL'] = 3600
+    assert get_road_registry().version == cache.get('etag_version:roads')
@@ -0,0 +1,129 @@
+"""
+Tests for travel-time routing over the road graph.
+"""
+from datetime import datetime, timedelta, timezone
+
+from app import db
+from app.models import Road, TrafficData
+from app.road_registry import RoadInfo
+from app.routing import RoadGraph
+
+# A(0, 0) -- B(0, 0.01) -- C(0, 0.02) along the equator, and a detour A -- D -- C.
+A, B, C, D = (0.0, 0.0), (0.0, 0.01), (0.0, 0.02), (0.01, 0.0)
+ROADS = (
+    # id, start, end, length (km), speed limit; road 2 starts ~5 m from B and is snapped to it
+    (1, A, B, 1.12, 60),
+    (2, (0.00004, 0.01002), C, 1.11, 60),
+    (3, A, D, 1.11, 80),
+    (4, D, C, 2.49, 80),
+)
+
+
+def _wkt(point):
+    return f'POINT({point[1]} {point[0]})'
+
+
+def _road_infos():
+    return [
+        RoadInfo(road_id, f'Road {road_id}', f'R{road_id:04d}', 2, length, 1, limit, _wkt(start), _wkt(end))
+        for road_id, start, end, length, limit in ROADS
+    ]
+
+
+def _route(graph, fresh_after=0.0):
+    seconds, steps = graph.shortest_path(graph.nearest_node(A)[0], graph.nearest_node(C)[0], fresh_after)
+    return round(seconds, 1), [road_id for road_id, _, _ in steps]
+
+
+def test_graph_snaps_endpoints_and_follows_live_speeds():
+    """Test snapping, free-flow routing and incremental speed updates."""
+    graph = RoadGraph(_road_infos(), 'v1', snap_km=0.03, default_speed=40, min_speed=5)
+    assert len(graph.nodes) == 4
+    assert _route(graph) == (round((1.12 + 1.11) / 60 * 3600, 1), [1, 2])
+
+    graph.apply_speed(2, 10.0, timestamp=1000.0)
+    assert _route(graph)[1] == [3, 4]
+    assert _route(graph, fresh_after=2000.0)[1] == [1, 2]  # the reading went stale
+
+    graph.apply_speed(2, 60.0, timestamp=500.0)  # older than the current reading
+    assert graph.edge_speed(2, 0.0) == (10.0, 'live')
+    graph.apply_speed(2, 0.0, timestamp=1500.0)
+    assert graph.edge_speed(2, 0.0) == (5.0, 'live')
+
+
+def _seed_roads():
+    roads = [
+        Road(name=f'Road {road_id}', code=f'R{road_id:04d}', start_point=_wkt(start),
+             end_point=_wkt(end), length=length, lanes=2, speed_limit=limit)
+        for road_id, start, end, length, limit in ROADS
+    ]
+    db.session.add_all(roads)
+    db.session.commit()
+    return [road.id for road in roads]
+
+
+def test_route_endpoint_uses_current_speeds(app, client):
+    """Test the API picks the faster detour once a road slows down, without rebuilding."""
+    ids = _seed_roads()
+    app.config['ROUTING_REFRESH_INTERVAL'] = 0
+    query = '/api/route?from=0.0001,0.0&to=0.0,0.0201'
+
+    data = client.get(query).get_json()
+    assert [leg['road_id'] for leg in data['roads']] == [ids[0], ids[1]]
+    assert data['travel_time_seconds'] == data['free_flow_seconds']
+    assert data['origin']['snapped_to'] == {'lat': 0.0, 'lon': 0.0}
+    assert 10 < data['origin']['snap_distance_m'] < 12
+    graph = app.extensions['road_graph'].graph
+
+    now = datetime.now(timezone.utc)
+    response = client.post('/api/traffic/batch', json={'readings': [
+        {'road_id': ids[1], 'timestamp': now.isoformat(), 'speed': 10},
+    ]})
+    assert response.status_code == 201
+    data = client.get(query).get_json()
+    assert [leg['road_id'] for leg in data['roads']] == [ids[2], ids[3]]
+    assert data['travel_time_seconds'] == round((1.11 + 2.49) / 80 * 3600, 1)
+
+    # Readings written around this process arrive with the periodic refresh.
+    db.session.add(TrafficData(road_id=ids[1], timestamp=now + timedelta(seconds=1), speed=60))
+    db.session.commit()
+    data = client.get(query).get_json()
+    assert [leg['road_id'] for leg in data['roads']] == [ids[0], ids[1]]
+    assert data['roads'][1]['speed_source'] == 'live'
+    assert app.extensions['road_graph'].graph is graph
+
+
+def test_refresh_reads_late_commits(app, client):
+    """Test a reading committed after a higher id was read back still updates its road."""
+    ids = _seed_roads()
+    app.config['ROUTING_REFRESH_INTERVAL'] = 0
+    query = '/api/route?from=0.0001,0.0&to=0.0,0.0201'
+    now = datetime.now(timezone.utc)
+
+    db.session.add(TrafficData(id=100, road_id=ids[0], timestamp=now, speed=60))
+    db.session.commit()
+    assert [leg['road_id'] for leg in client.get(query).get_json()['roads']] == [ids[0], ids[1]]
+
+    db.session.add(TrafficData(id=50, road_id=ids[1], timestamp=now, speed=10))
+    db.session.commit()
+    assert [leg['road_id'] for leg in client.get(query).get_json()['roads']] == [ids[2], ids[3]]
+
+
+def test_route_endpoint_errors(app, client):
+    """Test invalid coordinates, points off the network and disconnected roads."""
+    _seed_roads()
+    response = client.get('/api/route?from=91,0&to=0,0.02')
+    assert response.status_code == 400
+    assert 'from' in response.get_json()['details']
+    assert client.get('/api/route?from=0,0').status_code == 400
+
+    response = client.get('/api/route?from=0,0&to=1,1')
+    assert response.status_code == 404
+    assert 'destination' in response.get_json()['error']
+
+    db.session.add(Road(name='Island', code='R9999', start_point='POINT(0.5 0.5)',
+                        end_point='POINT(0.51 0.5)', length=1.1, lanes=1))
+    db.session.commit()
+    response = client.get('/api/route?from=0,0&to=0.5,0.5')
+    assert response.status_code == 404
+    assert 'No route' in response.get_json()['error']
@@ -0,0 +1,46 @@
+"""
+Tests for the fast JSON serialization path.
+"""
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import app.serialization as serialization
+from app.serialization import RawJSON, encode_object, encode_records
+
+
+ROWS = [
+    (1, 7, 'Main "Road"', datetime(2024, 1, 1, 8, 30, 0, 250000), 45.5, 320, 'MODERATE', 0.35),
+    (2, 7, None, datetime(2024, 1, 1, 8, 35, tzinfo=timezone.utc), None, None, None, None),
+]
+FIELDS = ('id', 'road_id', 'road_name', 'timestamp', 'speed', 'volume', 'status', 'congestion_level')
+
+
+def test_encode_records_matches_dict_serialization():
+    """Test that row tuples encode to the same objects as the dict path."""
+    decoded = json.loads(encode_records(FIELDS, ROWS))
+    assert decoded[0] == {
+        'id': 1,
+        'road_id': 7,
+        'road_name': 'Main "Road"',
+        'timestamp': '2024-01-01T08:30:00.250000+00:00',
+        'speed': 45.5,
+        'volume': 320,
+        'status': 'MODERATE',
+        'congestion_level': 0.35,
+    }
+    assert decoded[1]['timestamp'] == '2024-01-01T08:35:00+00:00'
+
+
+def test_stdlib_fallback_is_equivalent(monkeypatch):
+    """Test that the stdlib fallback produces identical JSON."""
+    fast = encode_records(FIELDS, ROWS)
+    monkeypatch.setattr(serialization, 'orjson', None)
+    assert json.loads(encode_records(FIELDS, ROWS)) == json.loads(fast)
+    assert json.loads(serialization.dumps({'value': Decimal('1.25')})) == {'value': 1.25}
+
+
+def test_encode_object_splices_raw_json():
+    """Test that pre-encoded parts are embedded unchanged."""
+    body = encode_object({'road': {'id': 1}, 'traffic': RawJSON(b'[1,2]')})
+    assert json.loads(body) == {'road': {'id': 1}, 'traffic': [1, 2]}
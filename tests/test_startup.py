@@ -0,0 +1,22 @@
+"""
+Tests that heavy optional dependencies stay out of worker start-up.
+"""
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def test_create_app_does_not_import_heavy_modules():
+    """Test that pandas, pyarrow and NumPy load only with export and forecast views."""
+    probe = (
+        "import sys\n"
+        "from app import create_app\n"
+        "create_app('testing')\n"
+        "print(','.join(m for m in ('pandas', 'pyarrow', 'numpy', 'openpyxl') if m in sys.modules))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, '-c', probe], cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == ''
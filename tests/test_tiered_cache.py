@@ -0,0 +1,92 @@
+"""
+Tests for the two-tier (local LRU + shared) cache backend.
+"""
+import time
+
+import pytest
+from flask_caching.backends import SimpleCache
+
+from app import cache, create_app, db
+from app.tiered_cache import LocalInvalidationBus, TieredCache
+from config import config
+
+
+@pytest.fixture
+def tiers():
+    """Two processes' worth of tiered caches over one shared backend."""
+    shared = SimpleCache()
+    first = TieredCache(shared, bus=LocalInvalidationBus('test'), local_ttl=30)
+    second = TieredCache(shared, bus=LocalInvalidationBus('test'), local_ttl=30)
+    yield first, second
+    first.close()
+    second.close()
+
+
+def test_reads_are_served_locally(tiers):
+    """Test that repeated reads hit the local tier."""
+    first, second = tiers
+    first.set('all_roads', [{'id': 1}])
+
+    assert second.get('all_roads') == [{'id': 1}]
+    assert second.get('all_roads') == [{'id': 1}]
+    stats = second.usage()['prefixes']['all_roads']
+    assert stats['shared_hits'] == 1
+    assert stats['local_hits'] == 1
+
+
+def test_writes_invalidate_other_processes(tiers):
+    """Test that set/delete/inc drop stale local copies elsewhere."""
+    first, second = tiers
+    first.set('dashboard_summary', {'active_events': 1})
+    assert second.get('dashboard_summary') == {'active_events': 1}
+
+    first.set('dashboard_summary', {'active_events': 2})
+    assert second.get('dashboard_summary') == {'active_events': 2}
+
+    first.delete('dashboard_summary')
+    assert second.get('dashboard_summary') is None
+
+    first.set('login_attempts:user:bob', 1)
+    assert second.get('login_attempts:user:bob') == 1
+    first.inc('login_attempts:user:bob')
+    assert second.get('login_attempts:user:bob') == 2
+
+
+def test_local_tier_is_bounded():
+    """Test LRU eviction, local TTL and per-prefix size accounting."""
+    cache = TieredCache(SimpleCache(), local_ttl=0.05, max_items=2)
+    cache.set('etag_version:roads', 'a')
+    cache.set('etag_version:events', 'b')
+    cache.get('etag_version:roads')
+    cache.set('all_roads', ['x' * 100])
+
+    usage = cache.usage()
+    assert usage['local_items'] == 2
+    assert usage['prefixes']['etag_version']['evictions'] == 1
+    assert usage['prefixes']['all_roads']['local_bytes'] > 100
+    assert usage['local_bytes'] == sum(p['local_bytes'] for p in usage['prefixes'].values())
+
+    time.sleep(0.06)
+    assert cache.get('all_roads') == ['x' * 100]
+    assert cache.usage()['prefixes']['all_roads']['shared_hits'] == 1
+
+
+def test_app_uses_tiered_cache(monkeypatch):
+    """Test the backend wired through CACHE_TYPE and the usage endpoint."""
+    monkeypatch.setattr(config['testing'], 'CACHE_TYPE', 'app.tiered_cache.TieredCache', raising=False)
+    monkeypatch.setattr(config['testing'], 'CACHE_SHARED_TYPE', 'SimpleCache', raising=False)
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        client = app.test_client()
+        client.get('/api/dashboard/summary')
+        client.get('/api/dashboard/summary')
+
+        data = client.get('/api/system/cache').get_json()
+        assert data['tiered'] is True
+        assert data['backend'] == 'SimpleCache'
+        assert data['prefixes']['dashboard_summary']['local_hits'] >= 1
+
+        cache.cache.close()
+        db.session.remove()
+        db.drop_all()
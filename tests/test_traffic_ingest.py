@@ -0,0 +1,62 @@
+"""
+Tests for bulk traffic reading ingestion.
+"""
+from app import db, socketio
+from app import websocket  # noqa: F401  registers the Socket.IO handlers
+from app.models import TrafficData
+
+
+def _reading(road_id, minute, congestion=0.2):
+    return {
+        'road_id': road_id,
+        'timestamp': f'2024-05-01T08:{minute:02d}:00Z',
+        'speed': 50.0,
+        'volume': 120,
+        'status': 'SMOOTH',
+        'congestion_level': congestion,
+    }
+
+
+def test_ingest_batch_stores_and_broadcasts(app, client, sample_road):
+    """Test readings are inserted in one batch and pushed to road and traffic rooms."""
+    road_id = sample_road.id
+    socket = socketio.test_client(app)
+    socket.emit('subscribe_road', {'road_id': road_id})
+    socket.emit('subscribe_traffic', {})
+    socket.get_received()
+
+    readings = [_reading(road_id, minute, congestion=minute / 10) for minute in range(3)]
+    response = client.post('/api/traffic/batch', json={'readings': readings})
+    assert response.status_code == 201
+    body = response.get_json()
+    assert body['count'] == 3
+    assert db.session.query(TrafficData).count() == 3
+
+    received = {message['name']: message['args'][0] for message in socket.get_received()}
+    road_update = received['road_update']
+    assert road_update['committed_at'] == body['committed_at']
+    assert [reading['congestion_level'] for reading in road_update['data']] == [0.0, 0.1, 0.2]
+    assert road_update['data'][0]['road_name'] == 'Test Road'
+    latest = received['traffic_update']['data']
+    assert len(latest) == 1 and latest[0]['timestamp'] == '2024-05-01T08:02:00+00:00'
+    assert latest[0] == client.get('/api/traffic/latest?limit=1').get_json()['data'][0]
+
+
+def test_ingest_batch_rejects_bad_input(app, client, sample_road):
+    """Test item errors, unknown roads and the batch size limit insert nothing."""
+    road_id = sample_road.id
+    response = client.post('/api/traffic/batch', json={
+        'readings': [_reading(road_id, 0), {**_reading(road_id, 1), 'congestion_level': 2}]
+    })
+    assert response.status_code == 400
+    assert list(response.get_json()['details']) == ['1']
+
+    response = client.post('/api/traffic/batch', json={'readings': [_reading(9999, 0)]})
+    assert response.status_code == 404
+
+    app.config['TRAFFIC_BATCH_MAX'] = 2
+    response = client.post('/api/traffic/batch', json={
+        'readings': [_reading(road_id, minute) for minute in range(3)]
+    })
+    assert response.status_code == 413
+    assert db.session.query(TrafficData).count() == 0
@@ -0,0 +1,96 @@
+"""
+Tests for the roads x time-buckets traffic matrix.
+"""
+import base64
+import math
+import struct
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app import db
+from app.models import Road, TrafficData
+from app.partitions import add_months, month_start, rotate_partitions
+from app.services import get_traffic_matrix
+
+START = datetime(2024, 5, 1, 8, 0, tzinfo=timezone.utc)
+
+
+def _reading(road_id, timestamp, speed, volume, congestion):
+    return TrafficData(
+        road_id=road_id,
+        timestamp=timestamp,
+        speed=speed,
+        volume=volume,
+        status='MODERATE',
+        congestion_level=congestion
+    )
+
+
+def _second_road():
+    road = Road(name='Another Road', code='R0002', length=2.0, lanes=2)
+    db.session.add(road)
+    db.session.commit()
+    return road
+
+
+def test_matrix_buckets_every_road(client, sample_road):
+    """Test one cell per road and bucket, averaged, with gaps as null."""
+    other = _second_road()
+    db.session.add_all([
+        _reading(sample_road.id, START + timedelta(minutes=5), 40, 100, 0.2),
+        _reading(sample_road.id, START + timedelta(minutes=50), 60, 300, 0.4),
+        _reading(sample_road.id, START + timedelta(hours=2, minutes=1), 20, 50, 0.8),
+        _reading(other.id, START + timedelta(hours=1), 30, 10, 0.5),
+    ])
+    db.session.commit()
+
+    response = client.get(
+        '/api/traffic/matrix?start=2024-05-01T08:00:00Z&end=2024-05-01T11:00:00Z&bucket=1h'
+    )
+    assert response.status_code == 200
+    data = response.get_json()
+
+    assert data['shape'] == [2, 3]
+    assert data['bucket_seconds'] == 3600
+    # Rows follow road name order.
+    assert data['roads']['name'] == ['Another Road', 'Test Road']
+    assert data['metrics']['speed'] == [None, 30.0, None, 50.0, None, 20.0]
+    assert data['metrics']['volume'] == [None, 10.0, None, 200.0, None, 50.0]
+    assert data['metrics']['congestion'][3] == pytest.approx(0.3)
+
+
+def test_matrix_float32_encoding(app, sample_road):
+    """Test the base64 float32 form decodes to the same cells with NaN gaps."""
+    db.session.add(_reading(sample_road.id, START + timedelta(minutes=40), 42.5, 120, 0.25))
+    db.session.commit()
+
+    data = get_traffic_matrix(START, START + timedelta(hours=1), 1800, encoding='float32')
+
+    speed = struct.unpack('<2f', base64.b64decode(data['metrics']['speed']))
+    assert data['shape'] == [1, 2]
+    assert math.isnan(speed[0]) and speed[1] == 42.5
+
+
+def test_matrix_includes_partitions(app, sample_road):
+    """Test that windows reaching into archived months read the partitions."""
+    now = datetime.now(timezone.utc)
+    old = add_months(month_start(now), -4) + timedelta(days=3, hours=1)
+    db.session.add(_reading(sample_road.id, old, 35, 80, 0.6))
+    db.session.commit()
+    rotate_partitions(now)
+
+    data = get_traffic_matrix(old - timedelta(hours=1), old + timedelta(hours=1), 3600)
+
+    assert data['metrics']['speed'] == [None, 35.0]
+
+
+def test_matrix_rejects_bad_requests(client, app, sample_road):
+    """Test bucket validation and the cell limit."""
+    assert client.get('/api/traffic/matrix?bucket=5x').status_code == 400
+    assert client.get('/api/traffic/matrix?bucket=30s').status_code == 400
+
+    app.config['TRAFFIC_MATRIX_MAX_CELLS'] = 10
+    response = client.get('/api/traffic/matrix?bucket=1h')
+    assert response.status_code == 400
+    assert 'exceeds 10 cells' in response.get_json()['error']
@@ -0,0 +1,69 @@
+"""
+Tests for the request validation layer.
+"""
+from datetime import timezone
+
+import pytest
+from marshmallow import ValidationError
+
+from app.schemas import EventCreateSchema, ExportFormatSchema, TrafficReadingSchema
+from app.validation import get_schema, validate_batch
+
+
+def test_schemas_built_once():
+    """Test that schema instances are reused across requests."""
+    assert get_schema(EventCreateSchema) is get_schema(EventCreateSchema)
+
+
+def test_invalid_export_window_is_rejected(client):
+    """Test that malformed export dates return 400 instead of 500."""
+    response = client.get('/api/export/traffic/csv?start=not-a-date')
+    assert response.status_code == 400
+    assert 'start' in response.get_json()['details']
+
+    response = client.get('/api/export/traffic/parquet?start=2024-02-01T00:00:00&end=2024-01-01T00:00:00')
+    assert response.status_code == 400
+
+
+def test_invalid_history_window_is_rejected(client, sample_road):
+    """Test that traffic history validates its query parameters."""
+    response = client.get(f'/api/traffic/history/{sample_road.id}?end=yesterday')
+    assert response.status_code == 400
+
+
+def test_query_validation(client, sample_traffic_data):
+    """Test that pagination is validated and unknown parameters are ignored."""
+    assert client.get('/api/traffic/latest?limit=500').status_code == 400
+    assert client.get('/api/events?status=unknown').status_code == 400
+
+    response = client.get('/api/traffic/latest?limit=5&_=1700000000')
+    assert response.status_code == 200
+    assert response.get_json()['limit'] == 5
+
+
+def test_export_date_range_folds_into_window():
+    """Test that start_date/end_date select whole UTC days."""
+    params = get_schema(ExportFormatSchema).load({'start_date': '2024-01-01', 'end_date': '2024-01-02'})
+    assert params['start'].isoformat() == '2024-01-01T00:00:00+00:00'
+    assert params['end'].tzinfo == timezone.utc
+    assert params['end'].day == 2 and params['end'].hour == 23
+
+
+def test_validate_batch():
+    """Test batch validation keeps valid records and reports errors by index."""
+    records = [
+        {'road_id': 1, 'timestamp': '2024-01-01T08:00:00Z', 'speed': 42.5, 'volume': 120},
+        {'road_id': 0, 'timestamp': '2024-01-01T08:05:00Z'},
+        {'road_id': 2, 'timestamp': '2024-01-01T08:10:00', 'congestion_level': 0.4},
+        {'road_id': 3},
+    ]
+    result = validate_batch(TrafficReadingSchema, records)
+
+    assert [index for index, _ in result.valid] == [0, 2]
+    assert set(result.errors) == {1, 3}
+    assert 'road_id' in result.errors[1]
+    assert 'timestamp' in result.errors[3]
+    assert result.valid[1][1]['timestamp'].tzinfo == timezone.utc
+
+    with pytest.raises(ValidationError):
+        validate_batch(TrafficReadingSchema, {'road_id': 1})